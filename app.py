@@ -16,19 +16,55 @@ MELHORIAS DE UX/UI:
 Execute: streamlit run app.py
 """
 
+import time
+import weakref
+_INICIO_SCRIPT = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
-import io
 import sys
 import os
 from pathlib import Path
 
 # Adiciona o diretório src ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-from detector import PIIDetector
+from processamento import (
+    detectar_colunar, mascarar_textos, montar_colunas_resultado, anonimizar_listas
+)
+from paralelo import MotorParalelo, VisaoMotor, criar_detector
+from compartilhado import CarregadorEmSegundoPlano, DetectorCompartilhado
+from servico import ClienteServico
+from arquivos import EXTENSOES_ENTRADA, TIPOS_MIME, erros_escrita, identificar_formato, ler_tabela, salvar_streaming
+from cache import CacheResultados, assinatura_detector
+from prefiltro import PrefiltroNomes, DetectorComPrefiltro
+from incremental import analisar_incremental, analise_compativel, ler_analise_anterior, motivo_incompatibilidade
+from progresso import LogExecucao, Progresso
+from perfil import DetectorPerfilado, PerfilPipeline
+from resumo import ResumoAnalise
+from explorador import IndiceResultados
+from titulares import IndiceTitulares, impressao_arquivo
+from visoes import ativar_copy_on_write, montar_visao, separar_resultado
+from exportacao import GeradorExportacoes, salvar_excel_abas
+
+# As visões da sessão (visoes.py) só não copiam os dados com o Copy-on-Write
+ativar_copy_on_write()
+
+# plotly e o modelo spaCy ficam fora dos imports do topo: plotly é importado
+# nos gráficos e o modelo é carregado em segundo plano (obter_carregador_detector)
+_SEGUNDOS_IMPORTS = time.perf_counter() - _INICIO_SCRIPT
+
+CAMINHO_CACHE = Path("./cache/resultados_pii.sqlite")
+DIRETORIO_LOGS = Path("./output/logs")
+DIRETORIO_EXPORTACOES = Path("./output/exportacoes")
+CAMINHO_INDICE_TITULARES = Path("./cache/indice_titulares.sqlite")
+# Formatos do arquivo mascarado (Parquet/Feather gravam muito mais rápido que o Excel)
+FORMATOS_SAIDA = {
+    'xlsx': 'Excel (.xlsx)',
+    'parquet': 'Parquet (.parquet)',
+    'feather': 'Feather / Arrow IPC (.feather)',
+    'csv': 'CSV (.csv)',
+}
 
 # Configuração da página
 st.set_page_config(
@@ -186,25 +222,144 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+@st.cache_resource(show_spinner=False)
+def obter_carregador_detector() -> CarregadorEmSegundoPlano:
+    """
+    Carga do detector único do processo, compartilhado por todas as sessões.
+
+    Começa (em segundo plano) na primeira execução do app, enquanto o
+    usuário ainda escolhe o arquivo; as sessões seguintes recebem o mesmo
+    detector (thread-safe) sem recarregar o modelo spaCy.
+    """
+    return CarregadorEmSegundoPlano(lambda: DetectorCompartilhado.carregar(criar_detector))
+
+
+@st.cache_resource(show_spinner=False)
+def obter_relatorio_inicializacao() -> dict:
+    """Tempos da primeira execução do app neste processo (imports e primeira tela)."""
+    return {'imports': _SEGUNDOS_IMPORTS, 'primeira_tela': None}
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def obter_pool_paralelo(n_workers: int, chunk_size: int, limiar_prefiltro: int = None) -> MotorParalelo:
+    """
+    Pool de processos do servidor, compartilhado pelas sessões com a mesma configuração.
+
+    Cada worker carrega o próprio modelo spaCy: um pool por sessão multiplicaria
+    a memória. Só a configuração mais recente fica em cache; o pool anterior
+    termina os blocos em andamento e seus processos saem quando nenhuma
+    sessão o referencia mais.
+    """
+    prefiltro = PrefiltroNomes(limiar=limiar_prefiltro) if limiar_prefiltro is not None else None
+    return MotorParalelo(n_workers=n_workers, chunk_size=chunk_size, prefiltro=prefiltro)
+
+
+@st.cache_resource(show_spinner=False)
+def obter_gerador_exportacoes() -> GeradorExportacoes:
+    """Gerador de arquivos de download do processo (cache em disco compartilhado pelas sessões)."""
+    return GeradorExportacoes(DIRETORIO_EXPORTACOES)
+
+
+@st.cache_resource(show_spinner=False)
+def obter_indice_titulares() -> IndiceTitulares:
+    """Índice persistente de titulares do processo (compartilhado pelas sessões)."""
+    return IndiceTitulares(CAMINHO_INDICE_TITULARES)
+
+
+def obter_detector() -> DetectorCompartilhado:
+    """
+    Retorna o detector compartilhado, esperando a carga em segundo plano se necessário.
+
+    Returns:
+        DetectorCompartilhado (o mesmo para todas as sessões)
+    """
+    if st.session_state.get('detector') is None:
+        carregador = obter_carregador_detector()
+        inicio = time.perf_counter()
+        try:
+            if carregador.pronto():
+                detector = carregador.obter()
+            else:
+                with st.spinner('Carregando modelo de IA...'):
+                    detector = carregador.obter()
+        except Exception:
+            # Permite nova tentativa na próxima execução
+            obter_carregador_detector.clear()
+            raise
+        detector.registrar_sessao()
+        st.session_state.detector = detector
+        # Quanto esta sessão esperou pelo modelo (zero se a carga terminou antes do primeiro uso)
+        st.session_state.segundos_espera_modelo = time.perf_counter() - inicio
+    return st.session_state.detector
+
+
 def init_session_state():
     """Inicializa o estado da sessão."""
+    # Cada dado é guardado uma vez: o original (somente leitura), o resultado da análise
+    # (só as colunas de resultado) e o texto mascarado (uma coluna); as tabelas são visões
     if 'df_original' not in st.session_state:
         st.session_state.df_original = None
+    if 'resultado_analise' not in st.session_state:
+        st.session_state.resultado_analise = None
     if 'df_analisado' not in st.session_state:
         st.session_state.df_analisado = None
-    if 'df_mascarado_limpo' not in st.session_state:
-        st.session_state.df_mascarado_limpo = None
+    if 'mascaramento' not in st.session_state:
+        st.session_state.mascaramento = None
+        st.session_state.visao_mascarada = None
     if 'coluna_texto' not in st.session_state:
         st.session_state.coluna_texto = None
+    if 'nome_arquivo' not in st.session_state:
+        st.session_state.nome_arquivo = None
+    if 'impressao_arquivo' not in st.session_state:
+        st.session_state.impressao_arquivo = None
     if 'detector' not in st.session_state:
-        with st.spinner('Carregando modelo de IA...'):
-            st.session_state.detector = PIIDetector()
+        # Só dispara a carga (não bloqueia): o detector é obtido no primeiro uso
+        obter_carregador_detector()
+        st.session_state.detector = None
+        st.session_state.segundos_espera_modelo = None
     if 'historico_acoes' not in st.session_state:
         st.session_state.historico_acoes = []
     if 'passo_atual' not in st.session_state:
         st.session_state.passo_atual = 1
     if 'arquivo_mascarado_path' not in st.session_state:
         st.session_state.arquivo_mascarado_path = None
+    if 'spans_deteccao' not in st.session_state:
+        st.session_state.spans_deteccao = None
+    if 'config_execucao' not in st.session_state:
+        st.session_state.config_execucao = {
+            'n_workers': 1, 'chunk_size': 500, 'batch_size': 50, 'usar_cache': True, 'cache_max_mb': 512,
+            'usar_prefiltro': False, 'limiar_prefiltro': 1, 'url_servico': '', 'perfilar': False,
+            'indice_titulares': False, 'substituir_titulares': False,
+        }
+    if 'motor_paralelo' not in st.session_state:
+        st.session_state.motor_paralelo = None
+    if 'cache_resultados' not in st.session_state:
+        st.session_state.cache_resultados = None
+    if 'estatisticas_cache' not in st.session_state:
+        st.session_state.estatisticas_cache = None
+    if 'prefiltro' not in st.session_state:
+        st.session_state.prefiltro = None
+    if 'estatisticas_prefiltro' not in st.session_state:
+        st.session_state.estatisticas_prefiltro = None
+    if 'analise_anterior' not in st.session_state:
+        st.session_state.analise_anterior = None
+    if 'estatisticas_incremental' not in st.session_state:
+        st.session_state.estatisticas_incremental = None
+    if 'log_execucao' not in st.session_state:
+        st.session_state.log_execucao = None
+    if 'instrumentacao' not in st.session_state:
+        st.session_state.instrumentacao = {}
+    if 'perfil_pipeline' not in st.session_state:
+        st.session_state.perfil_pipeline = None
+    if 'resumo_analise' not in st.session_state:
+        st.session_state.resumo_analise = None
+        st.session_state.resumo_origem = None
+    if 'indice_resultados' not in st.session_state:
+        st.session_state.indice_resultados = None
+        st.session_state.indice_origem = None
+    if 'exportacoes_sessao' not in st.session_state:
+        # Chaves dos arquivos de download pedidos nesta sessão (apagados ao recomeçar)
+        st.session_state.exportacoes_sessao = set()
 
 
 def exibir_wizard():
@@ -233,6 +388,668 @@ def exibir_wizard():
     st.markdown(wizard_html, unsafe_allow_html=True)
 
 
+def configurar_execucao():
+    """Exibe as opções de execução paralela (processos e tamanho de bloco)."""
+    config = st.session_state.config_execucao
+
+    with st.expander("⚙️ Opções de Execução (multiprocessamento)", expanded=False):
+        col_exec1, col_exec2 = st.columns(2)
+        with col_exec1:
+            config['n_workers'] = st.number_input(
+                "Processos paralelos:",
+                min_value=1,
+                max_value=os.cpu_count() or 1,
+                value=config['n_workers'],
+                help="1 = processamento sequencial. Cada processo carrega seu próprio modelo de IA."
+            )
+        with col_exec2:
+            config['chunk_size'] = st.number_input(
+                "Registros por bloco:",
+                min_value=50,
+                max_value=10000,
+                value=config['chunk_size'],
+                step=50,
+                help="Quantidade de textos enviada a cada processo por vez"
+            )
+
+        config['batch_size'] = st.select_slider(
+            "Lote do NLP (textos por lote do spaCy):",
+            options=[16, 32, 50, 64, 128, 256, 512, 1000],
+            value=config['batch_size'],
+            help="Tamanho de lote do nlp.pipe dentro do detector. Lotes maiores aproveitam melhor a CPU "
+                 "e usam mais memória; meça com 'python benchmark.py lote-nlp'."
+        )
+
+        col_cache1, col_cache2 = st.columns(2)
+        with col_cache1:
+            config['usar_cache'] = st.checkbox(
+                "Reaproveitar resultados de análises anteriores (cache)",
+                value=config['usar_cache'],
+                help="Textos já analisados (em qualquer arquivo) não passam de novo pelo detector. "
+                     "Os resultados ficam cifrados em ./cache por até 30 dias; para apagá-los antes, "
+                     "use 'python expurgar_cache.py --tudo'."
+            )
+        with col_cache2:
+            config['cache_max_mb'] = st.number_input(
+                "Tamanho máximo do cache (MB):",
+                min_value=16,
+                max_value=16384,
+                value=config['cache_max_mb'],
+                step=64,
+                disabled=not config['usar_cache']
+            )
+
+        col_prefiltro1, col_prefiltro2 = st.columns(2)
+        with col_prefiltro1:
+            config['usar_prefiltro'] = st.checkbox(
+                "Pré-filtro de nomes (pular o NLP em textos sem indício de nome)",
+                value=config['usar_prefiltro'],
+                help="Textos sem nome conhecido que sejam curtos ou administrativos (sem palavras "
+                     "capitalizadas nem de contexto) não passam pelo spaCy. Ajuste o limiar com 'python benchmark.py prefiltro'."
+            )
+        with col_prefiltro2:
+            config['limiar_prefiltro'] = st.number_input(
+                "Limiar do pré-filtro (sinais de nome):",
+                min_value=1,
+                max_value=5,
+                value=config['limiar_prefiltro'],
+                disabled=not config['usar_prefiltro'],
+                help="Maior = mais textos dispensam o NLP (menor recall de nomes)"
+            )
+
+        config['url_servico'] = st.text_input(
+            "Serviço de detecção (opcional):",
+            value=config['url_servico'],
+            placeholder="http://127.0.0.1:8765",
+            help="Endereço de um 'python servico_deteccao.py' já em execução. A detecção passa a usar os "
+                 "detectores aquecidos do serviço (o pré-filtro é configurado no próprio serviço)."
+        ).strip()
+
+        config['perfilar'] = st.checkbox(
+            "Perfil por fase (diagnóstico)",
+            value=config['perfilar'],
+            help="Mede o tempo do spaCy e das regras em cada chamada ao detector e conta os candidatos "
+                 "antes e depois da lista de imunidade (uma passada extra de regex). Resultado no relatório. "
+                 "Só no processamento local: sem processos paralelos nem serviço."
+        )
+
+        config['indice_titulares'] = st.checkbox(
+            "Indexar titulares para consultas do Art. 18 (LGPD)",
+            value=config['indice_titulares'],
+            help="Guarda CPFs, e-mails, telefones e nomes detectados como hashes com chave secreta (HMAC), "
+                 "para responder em milissegundos em quais arquivos analisados um titular aparece. "
+                 "Cada arquivo é identificado pelo nome e pelo conteúdo: outro arquivo com o mesmo nome "
+                 "é indexado à parte."
+        )
+        config['substituir_titulares'] = st.checkbox(
+            "Substituir indexações anteriores do arquivo com o mesmo nome",
+            value=config['substituir_titulares'],
+            disabled=not config['indice_titulares'],
+            help="Apaga do índice de titulares as versões com outro conteúdo deste nome de arquivo "
+                 "(ex: planilha corrigida). Sem a opção, elas continuam consultáveis."
+        )
+
+        exibir_estatisticas_detector()
+
+
+def exibir_estatisticas_detector():
+    """Mostra carga, memória e uso do detector compartilhado entre as sessões."""
+    carregador = obter_carregador_detector()
+    if not carregador.pronto():
+        st.caption(f"🧠 Modelo de IA carregando em segundo plano "
+                   f"({time.perf_counter() - carregador.inicio:.0f}s)...")
+        return
+
+    estatisticas = obter_detector().estatisticas()
+    memoria = estatisticas['memoria_modelo_mb']
+    processo = estatisticas['memoria_processo_mb']
+    st.caption(
+        f"🧠 Modelo compartilhado por {estatisticas['sessoes']} sessão(ões): carregado em "
+        f"{estatisticas['segundos_carga']:.1f}s + aquecimento {estatisticas['segundos_aquecimento']:.1f}s"
+        + (f", ~{memoria:.0f} MB" if memoria is not None else '')
+        + (f" (processo: {processo:.0f} MB)" if processo is not None else '')
+        + f" · espera pelo detector: {estatisticas['segundos_espera']:.1f}s no total, "
+          f"máx. {estatisticas['espera_maxima']:.1f}s"
+    )
+
+
+def exibir_relatorio_inicializacao():
+    """Tempos de inicialização: imports, primeira tela e carga do modelo em segundo plano."""
+    relatorio = obter_relatorio_inicializacao()
+    carregador = obter_carregador_detector()
+
+    with st.expander("⏱️ Inicialização", expanded=False):
+        st.caption(f"Imports do app: {relatorio['imports']:.2f}s (primeira execução no servidor)")
+        if relatorio['primeira_tela'] is not None:
+            st.caption(f"Primeira tela: {relatorio['primeira_tela']:.2f}s")
+        if carregador.pronto():
+            st.caption(f"Modelo de IA: {carregador.segundos:.1f}s em segundo plano (carga + aquecimento)")
+        else:
+            st.caption(f"Modelo de IA: carregando há {time.perf_counter() - carregador.inicio:.0f}s...")
+        espera = st.session_state.get('segundos_espera_modelo')
+        if espera is not None:
+            st.caption(f"Espera desta sessão pelo modelo: {espera:.2f}s")
+
+
+def obter_prefiltro():
+    """
+    Retorna o pré-filtro de NLP conforme a configuração da sessão.
+
+    Returns:
+        PrefiltroNomes reaproveitado entre execuções, ou None se desligado
+    """
+    config = st.session_state.config_execucao
+    if not config['usar_prefiltro'] or config['url_servico']:
+        st.session_state.prefiltro = None
+        return None
+
+    prefiltro = st.session_state.prefiltro
+    if prefiltro is None or prefiltro.limiar != config['limiar_prefiltro']:
+        prefiltro = PrefiltroNomes(limiar=config['limiar_prefiltro'])
+        st.session_state.prefiltro = prefiltro
+    return prefiltro
+
+
+def obter_detector_analise():
+    """
+    Retorna o detector usado na análise (com pré-filtro, se habilitado).
+
+    Returns:
+        PIIDetector da sessão ou DetectorComPrefiltro envolvendo-o
+    """
+    prefiltro = obter_prefiltro()
+    if prefiltro is None:
+        return obter_detector()
+    return DetectorComPrefiltro(obter_detector(), prefiltro)
+
+
+def obter_motor_paralelo():
+    """
+    Retorna o motor multiprocesso (ou o cliente do serviço de detecção)
+    conforme a configuração da sessão.
+
+    Returns:
+        VisaoMotor do pool compartilhado ou ClienteServico reaproveitado entre execuções, ou None se sequencial
+    """
+    config = st.session_state.config_execucao
+    motor = st.session_state.motor_paralelo
+    prefiltro = obter_prefiltro()
+
+    if config['url_servico']:
+        if not isinstance(motor, ClienteServico) or (motor.url, motor.chunk_size) != (
+                config['url_servico'], config['chunk_size']):
+            if motor is not None:
+                motor.encerrar()
+            motor = ClienteServico(config['url_servico'], chunk_size=config['chunk_size'])
+            st.session_state.motor_paralelo = motor
+        return motor
+
+    if config['n_workers'] <= 1:
+        if motor is not None:
+            motor.encerrar()
+            st.session_state.motor_paralelo = None
+        return None
+
+    # Pool do servidor; a visão da sessão recebe as contagens do seu pré-filtro
+    pool = obter_pool_paralelo(config['n_workers'], config['chunk_size'],
+                               prefiltro.limiar if prefiltro is not None else None)
+    if not isinstance(motor, VisaoMotor) or motor.motor is not pool or motor.prefiltro is not prefiltro:
+        if motor is not None:
+            motor.encerrar()
+        motor = VisaoMotor(pool, prefiltro)
+        st.session_state.motor_paralelo = motor
+
+    return motor
+
+
+def assinatura_analise() -> str:
+    """
+    Versão e configuração do detector da sessão.
+
+    Chave do cache e coluna `assinatura_deteccao` da análise. Muda com o
+    pré-filtro (resultados com e sem NLP não se misturam) e com o serviço
+    de detecção, que pode ter outra configuração.
+    """
+    assinatura = assinatura_detector(obter_detector_analise())
+    url_servico = st.session_state.config_execucao['url_servico']
+    if url_servico:
+        assinatura += f";servico={url_servico}"
+    return assinatura
+
+
+def obter_cache():
+    """
+    Retorna o cache persistente de resultados, se habilitado.
+
+    Returns:
+        CacheResultados da sessão, ou None se o cache estiver desligado
+    """
+    config = st.session_state.config_execucao
+    if not config['usar_cache']:
+        return None
+
+    assinatura = assinatura_analise()
+    cache = st.session_state.cache_resultados
+    if cache is None or cache.assinatura != assinatura:
+        if cache is not None:
+            cache.fechar()
+        cache = CacheResultados(CAMINHO_CACHE, assinatura, tamanho_maximo_mb=config['cache_max_mb'])
+        st.session_state.cache_resultados = cache
+
+    cache.tamanho_maximo = int(config['cache_max_mb'] * 1024 * 1024)
+    return cache
+
+
+def exibir_estatisticas_cache():
+    """Mostra quantos textos da última análise vieram do cache."""
+    estatisticas = st.session_state.get('estatisticas_cache')
+    if estatisticas:
+        st.caption(
+            f"♻️ Cache: {estatisticas['hits']:,} de {estatisticas['textos_distintos']:,} textos distintos "
+            f"reaproveitados ({estatisticas['taxa_acerto']*100:.1f}% de acerto)"
+        )
+
+
+def configurar_incremental(coluna_texto: str):
+    """
+    Oferece a reanálise incremental quando há uma análise anterior compatível.
+
+    A análise anterior é a última feita na sessão (guardada ao clicar em
+    "Nova Análise") ou um arquivo `analise_pii_*` (Excel, CSV, Parquet ou
+    Feather) exportado antes.
+
+    Returns:
+        DataFrame da análise anterior a reaproveitar, ou None
+    """
+    with st.expander("♻️ Reanálise Incremental (arquivo atualizado)", expanded=False):
+        arquivo_anterior = st.file_uploader(
+            "Análise anterior (opcional - analise_pii_* exportada pelo sistema):",
+            type=['xlsx', 'csv', 'parquet', 'feather', 'arrow'],
+            key="upload_analise_anterior"
+        )
+        identificacao = None
+        if arquivo_anterior is not None:
+            identificacao = (arquivo_anterior.name, arquivo_anterior.size, coluna_texto)
+        if identificacao is not None and st.session_state.get('arquivo_anterior_lido') != identificacao:
+            try:
+                # Só o texto e as colunas de resultado são usados (em Parquet/Feather, só elas são lidas)
+                arquivo_anterior.seek(0)
+                try:
+                    st.session_state.analise_anterior = ler_analise_anterior(arquivo_anterior, coluna_texto)
+                except ValueError:
+                    st.session_state.analise_anterior = None
+                st.session_state.arquivo_anterior_lido = identificacao
+            except Exception as e:
+                st.error(f"❌ Erro ao ler análise anterior: {str(e)}")
+
+        df_anterior = st.session_state.analise_anterior
+        if not analise_compativel(df_anterior, coluna_texto):
+            st.caption("Nenhuma análise anterior com a coluna selecionada e as colunas de resultado.")
+            return None
+        motivo = motivo_incompatibilidade(df_anterior, coluna_texto, assinatura_analise())
+        if motivo:
+            st.caption(f"A análise anterior não pode ser reaproveitada: {motivo}.")
+            return None
+
+        usar = st.checkbox(
+            f"Analisar apenas linhas novas ou alteradas (análise anterior: {len(df_anterior):,} registros)",
+            value=True,
+            help="Linhas cujo texto já existe na análise anterior reaproveitam o resultado sem passar pelo detector"
+        )
+        return df_anterior if usar else None
+
+
+def exibir_estatisticas_prefiltro():
+    """Mostra quantos textos da última análise dispensaram o NLP."""
+    estatisticas = st.session_state.get('estatisticas_prefiltro')
+    if estatisticas:
+        st.caption(
+            f"🧠 Pré-filtro: {estatisticas['dispensados']:,} de {estatisticas['avaliados']:,} textos "
+            f"dispensaram o NLP ({estatisticas['taxa_dispensa']*100:.1f}%)"
+        )
+
+
+def exibir_estatisticas_incremental():
+    """Mostra quantas linhas a última análise reaproveitou da análise anterior."""
+    estatisticas = st.session_state.get('estatisticas_incremental')
+    if estatisticas:
+        st.caption(
+            f"♻️ Incremental: {estatisticas['analisados']:,} linhas novas/alteradas analisadas, "
+            f"{estatisticas['reaproveitados']:,} reaproveitadas da análise anterior"
+        )
+
+
+def exibir_perfil_pipeline():
+    """Perfil por fase da última análise (opção "Perfil por fase" em Opções de Execução)."""
+    perfil = st.session_state.get('perfil_pipeline')
+    if perfil is None:
+        return
+
+    resumo = perfil.resumo()
+    st.markdown("### ⏱️ Perfil por Fase do Pipeline")
+    if not resumo['fases']:
+        st.info("Nenhum texto passou pelo detector nesta análise (todos vieram do cache). "
+                "Desligue o cache para medir o arquivo inteiro.")
+        return
+
+    st.dataframe(
+        pd.DataFrame([
+            {'Fase': fase, 'Tempo (s)': dados['segundos'], 'Chamadas': dados['chamadas'], 'Itens': dados['itens'],
+             'ms/item': dados['ms_por_item'], '%': dados['percentual'], '% de': dados['percentual_de']}
+            for fase, dados in resumo['fases'].items()
+        ]),
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption("`fase4_spacy`: tempo dentro do spaCy; `regras`: restante da chamada (FASES 1, 2, 3, 3.5 e 5). "
+               "O % das fases principais é sobre o tempo do detector; o das subfases, sobre a sua fase. "
+               "`reproducao/*`: FASE 1 e 2 reexecutadas à parte para contar candidatos (sem %).")
+
+    candidatos = resumo['candidatos']
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Candidatos FASE 1 (aprox.)", f"{candidatos['fase1_total']:,}")
+    col2.metric("Numéricos antes da imunidade (aprox.)", f"{candidatos['numericos']:,}")
+    col3.metric("Após a lista de imunidade (aprox.)", f"{candidatos['apos_imunidade']:,}",
+                delta=f"-{candidatos['descartados_imunidade']:,} descartados", delta_color="off")
+    st.caption(candidatos['observacao'])
+
+    st.download_button(
+        label="⬇️ Exportar perfil (JSON)",
+        data=perfil.exportar_json(),
+        file_name=f"perfil_pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        mime="application/json"
+    )
+
+
+def calculado_de(origem, df: pd.DataFrame) -> bool:
+    """
+    Indica se um valor derivado da análise (resumo, índice) foi calculado deste DataFrame.
+
+    A origem é guardada como referência fraca: comparar só o `id` não basta,
+    porque o CPython reaproveita o endereço de um DataFrame liberado.
+    """
+    return origem is not None and origem() is df
+
+
+def obter_resumo() -> ResumoAnalise:
+    """
+    Resumo da análise atual, lido por métricas, gráficos e relatórios.
+
+    Calculado ao fim de `analisar_arquivo`; só é refeito se `df_analisado`
+    for substituído por outro DataFrame (ex: "Restaurar Original").
+    """
+    df = st.session_state.df_analisado
+    if st.session_state.resumo_analise is None or not calculado_de(st.session_state.resumo_origem, df):
+        st.session_state.resumo_analise = ResumoAnalise.calcular(df)
+        st.session_state.resumo_origem = weakref.ref(df)
+    return st.session_state.resumo_analise
+
+
+def definir_mascaramento(modo: str = None, coluna: str = None, textos: list = None):
+    """
+    Guarda o resultado do mascaramento (None = descarta o anterior).
+
+    Só a coluna de texto mascarada é guardada; o arquivo mascarado é a visão
+    do original com essa coluna substituída (`obter_df_mascarado`).
+
+    Args:
+        modo: Modo aplicado ('PARCIAL' ou 'PROTECAO_TOTAL'); None descarta o mascaramento
+        coluna: Coluna substituída (None = arquivo mascarado igual ao original)
+        textos: Textos mascarados, na ordem das linhas
+    """
+    st.session_state.mascaramento = None if modo is None else {'modo': modo, 'coluna': coluna, 'textos': textos}
+    st.session_state.visao_mascarada = None
+
+
+def obter_df_mascarado() -> pd.DataFrame:
+    """
+    Arquivo mascarado (só colunas originais), montado na primeira vez que é pedido.
+
+    A mesma visão é reaproveitada enquanto o mascaramento não muda, para o
+    gerador de exportações reconhecer o conteúdo sem recalcular o hash.
+    """
+    mascaramento = st.session_state.mascaramento
+    if mascaramento is None:
+        return None
+    if st.session_state.visao_mascarada is None:
+        substituicoes = {mascaramento['coluna']: mascaramento['textos']} if mascaramento['coluna'] else None
+        st.session_state.visao_mascarada = montar_visao(st.session_state.df_original, substituicoes=substituicoes)
+    return st.session_state.visao_mascarada
+
+
+def obter_indice() -> IndiceResultados:
+    """
+    Índice do explorador de resultados (bitmaps por tipo + índice invertido).
+
+    Montado ao fim de `analisar_arquivo`; só é refeito se `df_analisado`
+    for substituído por outro DataFrame.
+    """
+    df = st.session_state.df_analisado
+    if st.session_state.indice_resultados is None or not calculado_de(st.session_state.indice_origem, df):
+        st.session_state.indice_resultados = IndiceResultados.construir(df, st.session_state.coluna_texto)
+        st.session_state.indice_origem = weakref.ref(df)
+    return st.session_state.indice_resultados
+
+
+def exibir_explorador(prefixo: str):
+    """
+    Explorador paginado dos resultados: filtros por tipo, busca e só a página visível.
+
+    Os filtros são um E bit a bit entre os bitmaps do índice e a busca consulta
+    o índice invertido; apenas as linhas da página são enviadas ao navegador.
+
+    Args:
+        prefixo: Prefixo das chaves dos widgets (a página pode aparecer mais de uma vez)
+    """
+    df = st.session_state.df_analisado
+    indice = obter_indice()
+
+    filtros = [('pii', "Apenas com PII"), ('cpf', "Com CPF"), ('email', "Com E-mail"), ('nome', "Com Nome"),
+               ('telefone', "Com Telefone"), ('rg', "Com RG"), ('endereco', "Com Endereço")]
+    colunas_filtro = st.columns(len(filtros))
+    tipos = []
+    for coluna, (tipo, rotulo) in zip(colunas_filtro, filtros):
+        with coluna:
+            if st.checkbox(rotulo, value=(tipo == 'pii'), key=f"{prefixo}_filtro_{tipo}"):
+                tipos.append(tipo)
+
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        busca = st.text_input("🔍 Buscar no texto e nos dados detectados:", key=f"{prefixo}_busca",
+                              placeholder="Ex: maria silva, 123.456.789-09, @gmail")
+    with col2:
+        tamanho = st.selectbox("Linhas por página:", [25, 50, 100, 250], index=1, key=f"{prefixo}_tamanho")
+
+    inicio = time.perf_counter()
+    posicoes = indice.filtrar(tipos, busca)
+    milissegundos = (time.perf_counter() - inicio) * 1000
+
+    if len(posicoes) == 0:
+        st.info("Nenhum registro encontrado com esses filtros.")
+        return
+
+    paginas = (len(posicoes) - 1) // tamanho + 1
+    numero = st.number_input(f"Página (de {paginas:,}):", min_value=1, max_value=paginas, value=1, step=1,
+                             key=f"{prefixo}_pagina") if paginas > 1 else 1
+    numero = min(int(numero), paginas)
+
+    # Só as linhas da página visível são materializadas
+    pagina = df.iloc[indice.pagina(posicoes, numero - 1, tamanho)]
+    colunas_exibir = [col for col in df.columns if not col.startswith('pii_') or col.endswith('_lista')]
+    st.dataframe(pagina[colunas_exibir], use_container_width=True, height=400)
+    st.caption(f"{len(posicoes):,} registros encontrados em {milissegundos:.1f} ms · "
+               f"página {numero:,} de {paginas:,}")
+
+
+def exibir_consulta_titular():
+    """Consulta do Art. 18 da LGPD: em quais arquivos analisados aparece um CPF, e-mail, telefone ou nome."""
+    with st.expander("🔎 Consulta de Titular (Art. 18)", expanded=False):
+        valor = st.text_input("CPF, e-mail, telefone ou nome:", key="consulta_titular",
+                              help="Busca em todos os arquivos já analisados com a indexação de titulares ligada")
+        tipo = st.selectbox("Tipo:", ['automático', 'cpf', 'email', 'telefone', 'nome', 'rg'],
+                            key="consulta_titular_tipo")
+        if not valor.strip():
+            return
+
+        inicio = time.perf_counter()
+        encontrados = obter_indice_titulares().buscar(valor, None if tipo == 'automático' else tipo)
+        milissegundos = (time.perf_counter() - inicio) * 1000
+
+        if not encontrados:
+            st.info(f"Nenhum registro encontrado ({milissegundos:.1f} ms)")
+            return
+        st.caption(f"{len(encontrados):,} registros em "
+                   f"{len({(item['conjunto'], item['impressao']) for item in encontrados}):,} arquivos "
+                   f"({milissegundos:.1f} ms)")
+        st.dataframe(pd.DataFrame([
+            {'Arquivo': item['conjunto'], 'Versão': item['impressao'][:8], 'Linha': item['linha'] + 1,
+             'Tipo': item['tipo']}
+            for item in encontrados
+        ]), use_container_width=True, hide_index=True)
+
+
+def _leitura_adiada() -> bool:
+    """Se o download_button aceita uma função que só lê o arquivo no clique (Streamlit recente)."""
+    try:
+        from streamlit.runtime.media_file_manager import MediaFileManager
+    except ImportError:
+        return False
+    return hasattr(MediaFileManager, 'add_deferred')
+
+
+def descartar_exportacoes_sessao():
+    """Apaga os arquivos de download pedidos nesta sessão (contêm o texto original e a PII)."""
+    if st.session_state.get('exportacoes_sessao'):
+        obter_gerador_exportacoes().remover(st.session_state.exportacoes_sessao)
+        st.session_state.exportacoes_sessao = set()
+
+
+def exibir_exportacao(rotulo: str, df: pd.DataFrame, nome: str, formato: str, gerar, nome_download: str,
+                      principal: bool = False):
+    """
+    Botão de download de um arquivo gerado sob demanda, em segundo plano.
+
+    Nada é gerado ao desenhar a página: o primeiro clique ("Preparar") agenda
+    a geração, e o arquivo fica em cache enquanto o conteúdo de `df` não mudar.
+
+    Args:
+        rotulo: Texto do botão de download
+        df: DataFrame exportado (o hash do conteúdo identifica o arquivo)
+        nome: Nome da exportação (parte da chave do cache)
+        formato: Extensão / formato do arquivo ('xlsx', 'csv', 'parquet', 'feather')
+        gerar: Função gerar(destino) que grava o arquivo
+        nome_download: Nome sugerido ao navegador
+        principal: Botão em destaque (type="primary")
+    """
+    gerador = obter_gerador_exportacoes()
+    chave = gerador.chave(df, nome, formato)
+    estado = gerador.estado(chave)
+    tipo = "primary" if principal else "secondary"
+
+    if estado == 'pronto':
+        st.session_state.exportacoes_sessao.add(chave)
+        caminho = gerador.caminho(chave)
+        opcoes = dict(label=rotulo, file_name=nome_download, mime=TIPOS_MIME[formato], type=tipo,
+                      use_container_width=True, key=f"baixar_{nome}_{formato}")
+        if _leitura_adiada():
+            # O arquivo só é lido quando o usuário clica, não a cada reexecução da página
+            st.download_button(data=caminho.read_bytes, **opcoes)
+        else:
+            with open(caminho, 'rb') as arquivo:
+                st.download_button(data=arquivo, **opcoes)
+    elif estado == 'gerando':
+        st.button(f"⏳ Gerando {nome_download.rsplit('.', 1)[-1].upper()}... (clique para atualizar)",
+                  use_container_width=True, key=f"atualizar_{nome}_{formato}")
+    else:
+        if estado == 'erro':
+            st.error(f"❌ Erro ao gerar o arquivo: {gerador.erro(chave)}")
+        if st.button(f"⚙️ Preparar: {rotulo}", type=tipo, use_container_width=True, key=f"preparar_{nome}_{formato}"):
+            gerador.descartar_erro(chave)
+            gerador.solicitar(chave, gerar)
+            st.session_state.exportacoes_sessao.add(chave)
+            st.rerun()
+
+
+def criar_progresso(etapa: str, total: int, progress_bar, status_text) -> Progresso:
+    """
+    Cria o acompanhamento de uma etapa ligado à barra e ao texto de status.
+
+    A tela mostra registros/s, ETA e memória; os mesmos números (e o tempo
+    por estágio) vão para o log estruturado da execução em ./output/logs.
+    """
+    def exibir(progresso):
+        progress_bar.progress(min(progresso.fracao, 1.0))
+        status_text.text(progresso.descricao())
+
+    log = st.session_state.get('log_execucao')
+    if log is None:
+        log = st.session_state.log_execucao = LogExecucao.nova(DIRETORIO_LOGS)
+    return Progresso(etapa, total, exibir=exibir, log=log)
+
+
+def exibir_instrumentacao():
+    """Mostra registros/s e tempo por estágio das últimas etapas (análise e mascaramento)."""
+    for etapa, resumo in st.session_state.get('instrumentacao', {}).items():
+        estagios = sorted(resumo['estagios'].items(), key=lambda item: -item[1])
+        st.caption(
+            f"⏱️ {etapa}: {resumo['processados']:,} registros em {resumo['segundos']:.1f}s "
+            f"({resumo['registros_por_s']:,.1f} reg/s)"
+            + (f" · {resumo['memoria_mb']:,.0f} MB" if resumo['memoria_mb'] is not None else '')
+            + (" · " + ", ".join(f"{estagio} {segundos:.1f}s" for estagio, segundos in estagios)
+               if estagios else '')
+        )
+    log = st.session_state.get('log_execucao')
+    if log is not None and st.session_state.get('instrumentacao'):
+        st.caption(f"📝 Log da execução: `{log.caminho}`")
+
+
+def mascarar_coluna_texto(textos: list, modo: str, tipos_pii: list = None) -> list:
+    """
+    Mascara os textos reaproveitando os spans da última análise.
+
+    Usa `st.session_state.spans_deteccao` (gerado por `analisar_arquivo`)
+    para aplicar o mascaramento sem rodar o pipeline de detecção de novo.
+    Se não houver spans compatíveis, cai no `apply_masking_batch`.
+
+    Args:
+        textos: Lista de textos originais (mesma ordem da análise)
+        modo: 'PARCIAL' ou 'PROTECAO_TOTAL'
+        tipos_pii: Tipos a mascarar ['cpf', 'email', etc.] ou ['todos']
+
+    Returns:
+        Lista de textos mascarados
+    """
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+
+    detector = obter_detector()
+    if st.session_state.get('perfil_pipeline') is not None:
+        detector = DetectorPerfilado(detector, st.session_state.perfil_pipeline, reproduzir_fases=False)
+
+    acompanhamento = criar_progresso('Mascaramento', len(textos), progress_bar, status_text)
+    estatisticas = {}
+    textos_mascarados = mascarar_textos(
+        detector,
+        textos,
+        modo,
+        tipos_pii,
+        spans_lista=st.session_state.get('spans_deteccao'),
+        motor=obter_motor_paralelo(),
+        progresso=acompanhamento,
+        instrumentacao=acompanhamento,
+        estatisticas=estatisticas
+    )
+    st.session_state.instrumentacao['Mascaramento'] = acompanhamento.finalizar()
+
+    progress_bar.empty()
+    status_text.empty()
+    if estatisticas.get('textos_detector'):
+        st.caption(f"ℹ️ {estatisticas['textos_detector']:,} textos com valores não localizados pelos spans "
+                   f"({estatisticas['nao_localizados']:,}) foram mascarados pelo detector")
+
+    return textos_mascarados
+
+
 def anonimizar_dados(df: pd.DataFrame, tipos_pii: list, modo: str, coluna_texto: str = None) -> pd.DataFrame:
     """
     Anonimiza dados pessoais conforme LGPD usando modos da classe PIIDetector.
@@ -246,84 +1063,18 @@ def anonimizar_dados(df: pd.DataFrame, tipos_pii: list, modo: str, coluna_texto:
     Returns:
         DataFrame anonimizado
     """
-    df_anonimizado = df.copy()
-    detector = st.session_state.detector
+    # Visão sem cópia: só as colunas mascaradas abaixo passam a ter dados próprios
+    df_anonimizado = montar_visao(df)
+    detector = obter_detector()
 
     # Se coluna_texto foi fornecida, aplica mascaramento direto no texto
+    # (reaproveita os spans da análise, sem nova passada de NLP)
     if coluna_texto and coluna_texto in df_anonimizado.columns:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
         textos = df_anonimizado[coluna_texto].fillna("").astype(str).tolist()
-        total = len(textos)
-
-        # Aplica mascaramento em batch
-        textos_mascarados = []
-        batch_size = 100
-
-        for i in range(0, total, batch_size):
-            batch = textos[i:i+batch_size]
-            mascarados = detector.apply_masking_batch(batch, mode=modo)
-            textos_mascarados.extend(mascarados)
-
-            progress = min((i + batch_size) / total, 1.0)
-            progress_bar.progress(progress)
-            status_text.text(f'Mascarando: {i+batch_size}/{total} registros')
-
-        df_anonimizado[coluna_texto] = textos_mascarados
-        progress_bar.empty()
-        status_text.empty()
+        df_anonimizado[coluna_texto] = mascarar_coluna_texto(textos, modo, tipos_pii)
 
     # Também atualiza as colunas de PII detectadas
-    if modo == 'PROTECAO_TOTAL':
-        # Substitui todas as listas de PII por [INFORMAÇÃO PROTEGIDA LGPD]
-        if 'todos' in tipos_pii or len(tipos_pii) > 0:
-            for tipo in ['cpf', 'rg', 'email', 'telefone', 'nome']:
-                if 'todos' in tipos_pii or tipo in tipos_pii:
-                    if f'pii_{tipo}_lista' in df_anonimizado.columns:
-                        # Substitui valores não vazios
-                        mask = df_anonimizado[f'pii_{tipo}_lista'] != ''
-                        df_anonimizado.loc[mask, f'pii_{tipo}_lista'] = '[INFORMAÇÃO PROTEGIDA LGPD]'
-
-    elif modo == 'PARCIAL':
-        # Mascara individualmente cada PII
-        for idx, row in df_anonimizado.iterrows():
-            if 'todos' in tipos_pii or 'cpf' in tipos_pii:
-                # CPF VALIDADO - mascara separadamente
-                if row.get('pii_cpf_validado_lista') and row['pii_cpf_validado_lista'] != '':
-                    cpfs = str(row['pii_cpf_validado_lista']).split(';')
-                    cpfs_mascarados = [detector._mascara_cpf_parcial(c) for c in cpfs if c]
-                    df_anonimizado.at[idx, 'pii_cpf_validado_lista'] = ';'.join(cpfs_mascarados)
-
-                # CPF NÃO VALIDADO - mascara separadamente
-                if row.get('pii_cpf_nao_validado_lista') and row['pii_cpf_nao_validado_lista'] != '':
-                    cpfs = str(row['pii_cpf_nao_validado_lista']).split(';')
-                    cpfs_mascarados = [detector._mascara_cpf_parcial(c) for c in cpfs if c]
-                    df_anonimizado.at[idx, 'pii_cpf_nao_validado_lista'] = ';'.join(cpfs_mascarados)
-
-            if 'todos' in tipos_pii or 'rg' in tipos_pii:
-                if row.get('pii_rg_lista') and row['pii_rg_lista'] != '':
-                    rgs = str(row['pii_rg_lista']).split(';')
-                    rgs_mascarados = [detector._mascara_rg_parcial(r) for r in rgs if r]
-                    df_anonimizado.at[idx, 'pii_rg_lista'] = ';'.join(rgs_mascarados)
-
-            if 'todos' in tipos_pii or 'email' in tipos_pii:
-                if row.get('pii_email_lista') and row['pii_email_lista'] != '':
-                    emails = str(row['pii_email_lista']).split(';')
-                    emails_mascarados = [detector._mascara_email_parcial(e) for e in emails if e]
-                    df_anonimizado.at[idx, 'pii_email_lista'] = ';'.join(emails_mascarados)
-
-            if 'todos' in tipos_pii or 'telefone' in tipos_pii:
-                if row.get('pii_telefone_lista') and row['pii_telefone_lista'] != '':
-                    tels = str(row['pii_telefone_lista']).split(';')
-                    tels_mascarados = [detector._mascara_telefone_parcial(t) for t in tels if t]
-                    df_anonimizado.at[idx, 'pii_telefone_lista'] = ';'.join(tels_mascarados)
-
-            if 'todos' in tipos_pii or 'nome' in tipos_pii:
-                if row.get('pii_nome_lista') and row['pii_nome_lista'] != '':
-                    nomes = str(row['pii_nome_lista']).split(';')
-                    nomes_mascarados = [detector._mascara_nome_parcial(n) for n in nomes if n]
-                    df_anonimizado.at[idx, 'pii_nome_lista'] = ';'.join(nomes_mascarados)
+    anonimizar_listas(df_anonimizado, tipos_pii, modo, detector)
 
     # Registra ação no histórico
     st.session_state.historico_acoes.append({
@@ -337,7 +1088,7 @@ def anonimizar_dados(df: pd.DataFrame, tipos_pii: list, modo: str, coluna_texto:
     return df_anonimizado
 
 
-def analisar_arquivo(df: pd.DataFrame, coluna_texto: str) -> pd.DataFrame:
+def analisar_arquivo(df: pd.DataFrame, coluna_texto: str, df_anterior: pd.DataFrame = None) -> pd.DataFrame:
     """
     Analisa o arquivo e detecta PII usando detector híbrido.
 
@@ -345,84 +1096,123 @@ def analisar_arquivo(df: pd.DataFrame, coluna_texto: str) -> pd.DataFrame:
     - verificado: dados validados matematicamente
     - suspeito: padrão correto mas falhou validação
     - score_risco: 0.0 a 1.0
+
+    Com `df_anterior`, apenas as linhas novas ou alteradas passam pelo detector.
+
+    `df` (o original da sessão) não é alterado: o resultado fica em
+    `st.session_state.resultado_analise` e o retorno é a visão original + resultado.
     """
-    detector = st.session_state.detector
+    detector = obter_detector_analise()
+    motor = obter_motor_paralelo()
+    # Um arquivo mascarado anterior não corresponde mais a esta análise
+    definir_mascaramento(None)
+
+    # Perfil por fase (opt-in): só quando o detector roda neste processo
+    st.session_state.perfil_pipeline = None
+    if st.session_state.config_execucao['perfilar'] and motor is None:
+        st.session_state.perfil_pipeline = PerfilPipeline()
+        detector = DetectorPerfilado(detector, st.session_state.perfil_pipeline)
 
     # Cria barra de progresso
     progress_bar = st.progress(0)
     status_text = st.empty()
 
     textos = df[coluna_texto].fillna("").astype(str).tolist()
-    total = len(textos)
 
-    # Processa em lotes
-    batch_size = 100
-    all_results = []
-
-    for i in range(0, total, batch_size):
-        batch = textos[i:i+batch_size]
-        results = detector.detect_pii_batch(batch, batch_size=50)
-        all_results.extend(results)
-
-        progress = min((i + batch_size) / total, 1.0)
-        progress_bar.progress(progress)
-        status_text.text(f'Analisando: {i+batch_size}/{total} registros (Pipeline Híbrido)')
+    # Nova análise, novo log da execução (o mascaramento seguinte grava no mesmo)
+    st.session_state.log_execucao = LogExecucao.nova(DIRETORIO_LOGS)
+    st.session_state.log_execucao.registrar(
+        'configuracao', coluna=coluna_texto, registros=len(textos), incremental=df_anterior is not None,
+        **st.session_state.config_execucao
+    )
+    st.session_state.instrumentacao = {}
+    # No modo incremental o total (linhas novas/alteradas) vem do primeiro callback
+    acompanhamento = criar_progresso('Análise', None if df_anterior is not None else len(textos),
+                                     progress_bar, status_text)
+
+    # Processa em lotes (no pool de processos, se configurado)
+    cache = obter_cache()
+    hits_antes, misses_antes = (cache.hits, cache.misses) if cache else (0, 0)
+    prefiltro = obter_prefiltro()
+    avaliados_antes, dispensados_antes = (prefiltro.avaliados, prefiltro.dispensados) if prefiltro else (0, 0)
+
+    if df_anterior is not None:
+        # A reanálise recebe só a coluna de texto (as colunas de resultado não vão para o original)
+        df_resultado, spans_lista, st.session_state.estatisticas_incremental = analisar_incremental(
+            pd.DataFrame({coluna_texto: textos}), coluna_texto, df_anterior, detector, motor=motor,
+            progresso=acompanhamento, cache=cache, batch_size=st.session_state.config_execucao['batch_size'],
+            instrumentacao=acompanhamento, assinatura=assinatura_analise()
+        )
+    else:
+        # Resultados acumulados em colunas compactas (sem manter um dicionário por linha)
+        colunas, spans_lista = detectar_colunar(detector, textos, motor=motor,
+                                                progresso=acompanhamento, cache=cache,
+                                                batch_size=st.session_state.config_execucao['batch_size'],
+                                                instrumentacao=acompanhamento)
+        st.session_state.estatisticas_incremental = None
+
+    # Taxa de acerto do cache nesta análise
+    if cache is not None:
+        hits, misses = cache.hits - hits_antes, cache.misses - misses_antes
+        st.session_state.estatisticas_cache = {
+            'hits': hits,
+            'misses': misses,
+            'taxa_acerto': hits / (hits + misses) if hits + misses else 0.0,
+            'textos_distintos': hits + misses,
+        }
+    else:
+        st.session_state.estatisticas_cache = None
+
+    # Textos que dispensaram o NLP nesta análise
+    if prefiltro is not None:
+        avaliados, dispensados = prefiltro.avaliados - avaliados_antes, prefiltro.dispensados - dispensados_antes
+        st.session_state.estatisticas_prefiltro = {
+            'avaliados': avaliados,
+            'dispensados': dispensados,
+            'taxa_dispensa': dispensados / avaliados if avaliados else 0.0,
+        }
+    else:
+        st.session_state.estatisticas_prefiltro = None
 
     progress_bar.empty()
     status_text.empty()
 
-    # Adiciona resultados ao DataFrame (nova estrutura)
-    df['contém_pii'] = [r['contem_pii'] for r in all_results]
-    df['score_risco'] = [r['score_risco'] for r in all_results]
-
-    # ===================================================================
-    # IMPORTANTE: APENAS CPF TEM DUAS CATEGORIAS DIFERENTES!
-    # - CPF VALIDADO: Validado matematicamente (Módulo 11) - CPF real
-    # - CPF NÃO VALIDADO: Padrão correto mas falhou validação - Erro de digitação
-    # ===================================================================
-
-    # CPF - DUAS CATEGORIAS SEPARADAS (ÚNICA SEPARAÇÃO NO SISTEMA)
-    df['cpf_validado'] = [len(r['entidades']['cpf']['verificado']) for r in all_results]
-    df['cpf_nao_validado'] = [len(r['entidades']['cpf']['suspeito']) for r in all_results]
-
-    # RG (verificado + suspeito somados)
-    df['rg_verificado'] = [len(r['entidades']['rg']['verificado']) for r in all_results]
-    df['rg_suspeito'] = [len(r['entidades']['rg']['suspeito']) for r in all_results]
-    df['rg_detectado'] = df['rg_verificado'] + df['rg_suspeito']
-
-    # E-mail (verificado + suspeito somados)
-    df['email_verificado'] = [len(r['entidades']['email']['verificado']) for r in all_results]
-    df['email_suspeito'] = [len(r['entidades']['email']['suspeito']) for r in all_results]
-    df['email_detectado'] = df['email_verificado'] + df['email_suspeito']
-
-    # Telefone (verificado + suspeito somados)
-    df['telefone_verificado'] = [len(r['entidades']['telefone']['verificado']) for r in all_results]
-    df['telefone_suspeito'] = [len(r['entidades']['telefone']['suspeito']) for r in all_results]
-    df['telefone_detectado'] = df['telefone_verificado'] + df['telefone_suspeito']
-
-    # Nome (NLP)
-    df['nome_detectado'] = [len(r['entidades']['nlp_contexto']['pessoas']) for r in all_results]
-
-    # Endereço
-    df['endereco_detectado'] = [len(r['entidades']['endereco']['detectado']) for r in all_results]
-
-    # ===================================================================
-    # LISTAS DETALHADAS - CPF TEM DUAS COLUNAS SEPARADAS!
-    # ===================================================================
-
-    # CPF - DUAS COLUNAS SEPARADAS
-    df['pii_cpf_validado_lista'] = [';'.join(r['entidades']['cpf']['verificado']) for r in all_results]
-    df['pii_cpf_nao_validado_lista'] = [';'.join(r['entidades']['cpf']['suspeito']) for r in all_results]
-
-    # Outros - UMA COLUNA SÓ (verificado + suspeito juntos)
-    df['pii_rg_lista'] = [';'.join(r['entidades']['rg']['verificado'] + r['entidades']['rg']['suspeito']) for r in all_results]
-    df['pii_email_lista'] = [';'.join(r['entidades']['email']['verificado'] + r['entidades']['email']['suspeito']) for r in all_results]
-    df['pii_telefone_lista'] = [';'.join(r['entidades']['telefone']['verificado'] + r['entidades']['telefone']['suspeito']) for r in all_results]
-    df['pii_nome_lista'] = [';'.join(r['entidades']['nlp_contexto']['pessoas']) for r in all_results]
-    df['pii_endereco_lista'] = [';'.join(r['entidades']['endereco']['detectado']) for r in all_results]
-
-    df['data_analise'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
+    # Guarda os spans de cada entidade para o mascaramento não re-detectar
+    st.session_state.spans_deteccao = spans_lista
+
+    if df_anterior is None:
+        with acompanhamento.medir('montagem'):
+            df_resultado = montar_colunas_resultado(pd.DataFrame(index=pd.RangeIndex(len(textos))), colunas,
+                                                    assinatura_analise())
+
+    st.session_state.resultado_analise = separar_resultado(df_resultado)
+    df = montar_visao(df, st.session_state.resultado_analise)
+
+    # Agregados do dashboard, calculados uma vez por análise
+    with acompanhamento.medir('resumo'):
+        st.session_state.resumo_analise = ResumoAnalise.calcular(df)
+        st.session_state.resumo_origem = weakref.ref(df)
+    st.session_state.log_execucao.registrar('resumo', **st.session_state.resumo_analise.como_dict())
+
+    # Bitmaps por tipo e índice invertido do explorador de resultados
+    with acompanhamento.medir('indice'):
+        indice = IndiceResultados.construir(df, coluna_texto)
+        st.session_state.indice_resultados = indice
+        st.session_state.indice_origem = weakref.ref(df)
+    st.session_state.log_execucao.registrar('indice', termos=len(indice.vocabulario),
+                                            memoria_bytes=indice.memoria_bytes())
+
+    # Índice persistente de titulares (consultas do Art. 18), com hashes em vez dos valores
+    if st.session_state.config_execucao.get('indice_titulares'):
+        with acompanhamento.medir('titulares'):
+            entradas = obter_indice_titulares().indexar(
+                st.session_state.nome_arquivo or 'sem_nome', df, impressao=st.session_state.impressao_arquivo,
+                substituir=st.session_state.config_execucao.get('substituir_titulares', False))
+        st.session_state.log_execucao.registrar('titulares', conjunto=st.session_state.nome_arquivo,
+                                                entradas=entradas)
+    st.session_state.instrumentacao['Análise'] = acompanhamento.finalizar()
+    if st.session_state.perfil_pipeline is not None:
+        st.session_state.log_execucao.registrar('perfil', **st.session_state.perfil_pipeline.resumo())
     return df
 
 
@@ -439,16 +1229,18 @@ def pagina_upload():
         st.info("📋 **Instruções:** Faça upload do arquivo Excel contendo os dados para análise. O sistema processará automaticamente após o carregamento.")
 
         uploaded_file = st.file_uploader(
-            "Selecione o arquivo Excel (.xlsx ou .xls)",
-            type=['xlsx', 'xls'],
+            "Selecione o arquivo (Excel, CSV, Parquet ou Feather)",
+            type=EXTENSOES_ENTRADA,
             help="Arquivo deve conter uma coluna com os textos das solicitações"
         )
 
         # AUTO-PROCESSAMENTO: Quando arquivo é carregado, processa imediatamente
         if uploaded_file is not None:
             try:
-                df = pd.read_excel(uploaded_file)
+                df = ler_tabela(uploaded_file)
                 st.session_state.df_original = df
+                st.session_state.nome_arquivo = uploaded_file.name
+                st.session_state.impressao_arquivo = impressao_arquivo(uploaded_file)
                 st.session_state.passo_atual = 2
                 st.success(f"✅ Arquivo carregado: {len(df)} registros")
                 st.rerun()  # Recarrega para mostrar próximo passo
@@ -484,6 +1276,9 @@ def pagina_upload():
                 help="Escolha a coluna que contém o texto a ser analisado para PII"
             )
 
+            configurar_execucao()
+            df_anterior = configurar_incremental(coluna_selecionada)
+
             # CTA DESTACADO NO TOPO
             st.markdown("---")
             col_btn1, col_btn2, col_btn3 = st.columns([3, 1, 1])
@@ -491,7 +1286,7 @@ def pagina_upload():
             with col_btn1:
                 if st.button("🚀 INICIAR ANÁLISE DE PII", type="primary", use_container_width=True, key="btn_principal"):
                     with st.spinner('🔍 Analisando dados pessoais com Pipeline Híbrido (Regex + Validação + NLP)...'):
-                        df_analisado = analisar_arquivo(df.copy(), coluna_selecionada)
+                        df_analisado = analisar_arquivo(df, coluna_selecionada, df_anterior)
                         st.session_state.df_analisado = df_analisado
                         st.session_state.coluna_texto = coluna_selecionada
                         st.session_state.passo_atual = 3
@@ -501,7 +1296,7 @@ def pagina_upload():
                         <div class="success-modal">
                             <h2>✅ Análise Concluída com Sucesso!</h2>
                             <p><strong>{len(df_analisado)}</strong> registros processados</p>
-                            <p><strong>{df_analisado['contém_pii'].sum()}</strong> registros com dados pessoais detectados</p>
+                            <p><strong>{obter_resumo().com_pii}</strong> registros com dados pessoais detectados</p>
                             <p>➡️ Próximo passo: Navegue para "Mascaramento" ou veja "Resultados"</p>
                         </div>
                         """, unsafe_allow_html=True)
@@ -512,7 +1307,10 @@ def pagina_upload():
             with col_btn2:
                 if st.button("🗑️ Limpar", use_container_width=True):
                     st.session_state.df_original = None
+                    st.session_state.resultado_analise = None
                     st.session_state.df_analisado = None
+                    st.session_state.spans_deteccao = None
+                    definir_mascaramento(None)
                     st.session_state.coluna_texto = None
                     st.session_state.passo_atual = 1
                     st.rerun()
@@ -524,35 +1322,38 @@ def pagina_upload():
         else:
             st.markdown("## ✅ Análise Concluída")
 
-            df_analisado = st.session_state.df_analisado
+            resumo = obter_resumo()
 
             # Métricas de resumo
             col1, col2, col3, col4 = st.columns(4)
 
-            total_registros = len(df_analisado)
-            registros_com_pii = df_analisado['contém_pii'].sum()
-            percentual_pii = (registros_com_pii / total_registros * 100) if total_registros > 0 else 0
-            score_medio = df_analisado['score_risco'].mean() if 'score_risco' in df_analisado.columns else 0.0
-
             with col1:
-                st.metric("Total de Registros", f"{total_registros:,}")
+                st.metric("Total de Registros", f"{resumo.total:,}")
             with col2:
-                st.metric("Com PII", f"{registros_com_pii:,}", delta=f"{percentual_pii:.1f}%", delta_color="inverse")
+                st.metric("Com PII", f"{resumo.com_pii:,}", delta=f"{resumo.percentual_pii:.1f}%", delta_color="inverse")
             with col3:
-                cor_score = "🔴" if score_medio > 0.7 else "🟡" if score_medio > 0.4 else "🟢"
-                st.metric("Score Risco Médio", f"{cor_score} {score_medio:.2f}")
+                st.metric("Score Risco Médio", f"{resumo.emoji_risco()} {resumo.score_medio:.2f}")
             with col4:
-                cpf_verificados = df_analisado['cpf_verificado'].sum() if 'cpf_verificado' in df_analisado.columns else 0
-                st.metric("CPF Verificados", f"{cpf_verificados:,}")
+                st.metric("CPF Verificados", f"{resumo.por_tipo['cpf_validado']:,}")
 
             st.success("✅ Dados analisados com sucesso! Navegue para outras abas para ver detalhes ou aplicar mascaramento.")
+            exibir_estatisticas_cache()
+            exibir_estatisticas_prefiltro()
+            exibir_estatisticas_incremental()
+            exibir_instrumentacao()
 
             # Botão para reprocessar
             col_action1, col_action2 = st.columns([1, 3])
             with col_action1:
                 if st.button("🔄 Nova Análise", use_container_width=True):
+                    descartar_exportacoes_sessao()
+                    # Mantém a análise para reanálise incremental do arquivo atualizado
+                    st.session_state.analise_anterior = st.session_state.df_analisado
                     st.session_state.df_original = None
+                    st.session_state.resultado_analise = None
                     st.session_state.df_analisado = None
+                    st.session_state.spans_deteccao = None
+                    definir_mascaramento(None)
                     st.session_state.passo_atual = 1
                     st.rerun()
 
@@ -648,6 +1449,12 @@ def pagina_mascaramento():
             help="Se marcado, aplica mascaramento diretamente no texto da solicitação",
             disabled=(coluna_texto is None)
         )
+        formato_saida = st.selectbox(
+            "Formato do arquivo:",
+            options=list(FORMATOS_SAIDA),
+            format_func=FORMATOS_SAIDA.get,
+            help="Parquet e Feather gravam e abrem muito mais rápido que Excel em arquivos grandes"
+        )
 
     # Botões de ação
     st.markdown("---")
@@ -657,65 +1464,60 @@ def pagina_mascaramento():
         if st.button("🛡️ APLICAR MASCARAMENTO", type="primary", use_container_width=True, key="btn_mascarar"):
             if tipos_mascarar:
                 with st.spinner(f'🔒 Aplicando mascaramento {modo_mascaramento}...'):
-                    # IMPORTANTE: Pega o DataFrame ORIGINAL (não o analisado)
-                    df_original_para_mascarar = st.session_state.df_original.copy()
-
-                    # Aplica mascaramento APENAS na coluna de texto
-                    if coluna_texto and aplicar_no_texto and coluna_texto in df_original_para_mascarar.columns:
-                        detector = st.session_state.detector
-                        textos = df_original_para_mascarar[coluna_texto].fillna("").astype(str).tolist()
-
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-
-                        textos_mascarados = []
-                        batch_size = 100
-                        total = len(textos)
-
-                        for i in range(0, total, batch_size):
-                            batch = textos[i:i+batch_size]
-                            mascarados = detector.apply_masking_batch(batch, mode=modo_mascaramento)
-                            textos_mascarados.extend(mascarados)
-
-                            progress = min((i + batch_size) / total, 1.0)
-                            progress_bar.progress(progress)
-                            status_text.text(f'Mascarando: {i+batch_size}/{total} registros')
-
-                        df_original_para_mascarar[coluna_texto] = textos_mascarados
-                        progress_bar.empty()
-                        status_text.empty()
-
-                    # Salva o arquivo mascarado (SÓ com colunas originais)
-                    st.session_state.df_mascarado_limpo = df_original_para_mascarar
+                    # IMPORTANTE: Parte do DataFrame ORIGINAL (não o analisado), sem alterá-lo
+                    df_original = st.session_state.df_original
+
+                    # Aplica mascaramento APENAS na coluna de texto (guardada como uma coluna de substituição)
+                    if coluna_texto and aplicar_no_texto and coluna_texto in df_original.columns:
+                        textos = df_original[coluna_texto].fillna("").astype(str).tolist()
+                        definir_mascaramento(modo_mascaramento, coluna_texto,
+                                             mascarar_coluna_texto(textos, modo_mascaramento, tipos_mascarar))
+                    else:
+                        definir_mascaramento(modo_mascaramento)
+
+                    # Arquivo mascarado (SÓ com colunas originais)
+                    df_original_para_mascarar = obter_df_mascarado()
                     st.session_state.passo_atual = 4
 
                     # Exporta automaticamente
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    arquivo_saida = f"dados_mascarados_{modo_mascaramento}_{timestamp}.xlsx"
+                    arquivo_saida = f"dados_mascarados_{modo_mascaramento}_{timestamp}.{formato_saida}"
 
                     output_dir = Path("./output")
                     output_dir.mkdir(exist_ok=True)
                     arquivo_path = output_dir / arquivo_saida
 
-                    df_original_para_mascarar.to_excel(arquivo_path, index=False)
-                    st.session_state.arquivo_mascarado_path = str(arquivo_path.absolute())
-
-                    # MODAL DE SUCESSO DESTACADO COM CAMINHO DO ARQUIVO
-                    st.markdown(f"""
-                    <div class="success-modal">
-                        <h2>✅ Mascaramento Concluído!</h2>
-                        <p><strong>Modo:</strong> {modo_mascaramento}</p>
-                        <p><strong>{len(df_original_para_mascarar)}</strong> registros processados</p>
-                        <p style="font-size: 14px; background: rgba(255,255,255,0.2); padding: 10px; border-radius: 5px; margin-top: 10px;">
-                        📁 Arquivo salvo em:<br>
-                        <code>{st.session_state.arquivo_mascarado_path}</code>
-                        </p>
-                        <p>➡️ Próximo passo: Baixe o arquivo abaixo ou veja "Resultados"</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    inicio_exportacao = time.perf_counter()
+                    try:
+                        salvar_streaming(df_original_para_mascarar, arquivo_path, formato_saida)
+                    except erros_escrita() as erro:
+                        arquivo_path.unlink(missing_ok=True)
+                        st.error(f"❌ Erro ao salvar o arquivo mascarado ({type(erro).__name__}): {erro}")
+                    else:
+                        st.session_state.arquivo_mascarado_path = str(arquivo_path.absolute())
+                        if st.session_state.log_execucao is not None:
+                            st.session_state.log_execucao.registrar(
+                                'exportacao', arquivo=st.session_state.arquivo_mascarado_path,
+                                registros=len(df_original_para_mascarar),
+                                segundos=round(time.perf_counter() - inicio_exportacao, 3)
+                            )
+
+                        # MODAL DE SUCESSO DESTACADO COM CAMINHO DO ARQUIVO
+                        st.markdown(f"""
+                        <div class="success-modal">
+                            <h2>✅ Mascaramento Concluído!</h2>
+                            <p><strong>Modo:</strong> {modo_mascaramento}</p>
+                            <p><strong>{len(df_original_para_mascarar)}</strong> registros processados</p>
+                            <p style="font-size: 14px; background: rgba(255,255,255,0.2); padding: 10px; border-radius: 5px; margin-top: 10px;">
+                            📁 Arquivo salvo em:<br>
+                            <code>{st.session_state.arquivo_mascarado_path}</code>
+                            </p>
+                            <p>➡️ Próximo passo: Baixe o arquivo abaixo ou veja "Resultados"</p>
+                        </div>
+                        """, unsafe_allow_html=True)
 
-                    st.balloons()
-                    st.rerun()
+                        st.balloons()
+                        st.rerun()
             else:
                 st.warning("⚠️ Selecione pelo menos um tipo de dado.")
 
@@ -728,7 +1530,7 @@ def pagina_mascaramento():
 
                 if coluna_texto and coluna_texto in registro_exemplo:
                     texto_original = str(registro_exemplo[coluna_texto])
-                    detector = st.session_state.detector
+                    detector = obter_detector()
                     texto_mascarado = detector.apply_masking(texto_original, mode=modo_mascaramento)
 
                     col_prev1, col_prev2 = st.columns(2)
@@ -746,32 +1548,33 @@ def pagina_mascaramento():
     with col_btn3:
         if st.button("↩️ Restaurar Original", use_container_width=True):
             if st.checkbox("⚠️ Confirmar restauração", key="confirm_restore"):
-                st.session_state.df_analisado = st.session_state.df_original.copy()
+                # O original nunca é alterado: basta descartar o texto mascarado
+                definir_mascaramento(None)
+                st.session_state.arquivo_mascarado_path = None
                 st.success("✅ Dados originais restaurados!")
                 st.rerun()
 
     # DOWNLOAD IMEDIATO (se já mascarou)
-    if st.session_state.arquivo_mascarado_path and st.session_state.get('df_mascarado_limpo') is not None:
+    if st.session_state.arquivo_mascarado_path and st.session_state.mascaramento is not None:
         st.markdown("---")
         st.markdown("### 💾 Download do Arquivo Mascarado")
 
-        # Cria buffer para download (usa DataFrame limpo - só colunas originais)
-        buffer = io.BytesIO()
-        st.session_state.df_mascarado_limpo.to_excel(buffer, index=False, engine='openpyxl')
-        buffer.seek(0)
+        # Baixa o arquivo já salvo em ./output (só colunas originais), sem gerá-lo de novo a cada clique
+        formato_saida = identificar_formato(st.session_state.arquivo_mascarado_path)
 
         col_download1, col_download2 = st.columns([2, 2])
         with col_download1:
             st.download_button(
                 label="⬇️ BAIXAR ARQUIVO MASCARADO",
-                data=buffer,
-                file_name=f"dados_mascarados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                data=Path(st.session_state.arquivo_mascarado_path).read_bytes(),
+                file_name=f"dados_mascarados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato_saida}",
+                mime=TIPOS_MIME[formato_saida],
                 type="primary",
                 use_container_width=True
             )
         with col_download2:
             st.info(f"📁 Arquivo também salvo em:\n`{st.session_state.arquivo_mascarado_path}`")
+        exibir_instrumentacao()
 
 
 def pagina_resultados():
@@ -803,37 +1606,29 @@ def pagina_resultados():
 
     col1, col2, col3, col4, col5, col6 = st.columns(6)
 
-    total_registros = len(df)
-    registros_com_pii = df['contém_pii'].sum()
-    percentual_pii = (registros_com_pii / total_registros * 100) if total_registros > 0 else 0
-
-    # Score de risco médio
-    score_medio = df['score_risco'].mean() if 'score_risco' in df.columns else 0.0
+    # Totais pré-calculados ao fim da análise (não varrem o DataFrame a cada interação)
+    resumo = obter_resumo()
 
     with col1:
-        st.metric("Total de Registros", f"{total_registros:,}")
+        st.metric("Total de Registros", f"{resumo.total:,}")
     with col2:
-        st.metric("Registros com PII", f"{registros_com_pii:,}",
-                 delta=f"{percentual_pii:.1f}%", delta_color="inverse")
+        st.metric("Registros com PII", f"{resumo.com_pii:,}",
+                 delta=f"{resumo.percentual_pii:.1f}%", delta_color="inverse")
     with col3:
         # Score de risco com cor
-        cor_score = "🔴" if score_medio > 0.7 else "🟡" if score_medio > 0.4 else "🟢"
-        st.metric("Score Risco Médio", f"{cor_score} {score_medio:.2f}",
+        st.metric("Score Risco Médio", f"{resumo.emoji_risco()} {resumo.score_medio:.2f}",
                  help="0.0 = sem risco | 1.0 = risco máximo")
     with col4:
         # CPF validados (alta confiança)
-        cpf_validados = df['cpf_validado'].sum() if 'cpf_validado' in df.columns else 0
-        st.metric("✅ CPF Validado", f"{cpf_validados:,}",
+        st.metric("✅ CPF Validado", f"{resumo.por_tipo['cpf_validado']:,}",
                  help="Validado matematicamente - CPF Real")
     with col5:
         # CPF NÃO validados (erro de digitação)
-        cpf_nao_validados = df['cpf_nao_validado'].sum() if 'cpf_nao_validado' in df.columns else 0
-        st.metric("⚠️ CPF Não Validado", f"{cpf_nao_validados:,}",
+        st.metric("⚠️ CPF Não Validado", f"{resumo.por_tipo['cpf_nao_validado']:,}",
                  help="Erro de digitação - Ainda é risco!")
     with col6:
         # Endereços detectados
-        enderecos = df['endereco_detectado'].sum() if 'endereco_detectado' in df.columns else 0
-        st.metric("Endereços", f"{enderecos:,}",
+        st.metric("Endereços", f"{resumo.por_tipo['endereco_detectado']:,}",
                  help="Endereços residenciais identificados")
 
     # Gráficos
@@ -849,19 +1644,13 @@ def pagina_resultados():
         # Explicação visível para o usuário
         st.info("ℹ️ **ATENÇÃO:** CPF aparece em DUAS categorias diferentes no gráfico abaixo")
 
-        tipos_pii = {
-            '✅ CPF Validado': df['cpf_validado'].sum() if 'cpf_validado' in df.columns else 0,
-            '⚠️ CPF Não Validado': df['cpf_nao_validado'].sum() if 'cpf_nao_validado' in df.columns else 0,
-            'RG': df['rg_detectado'].sum() if 'rg_detectado' in df.columns else 0,
-            'E-mail': df['email_detectado'].sum() if 'email_detectado' in df.columns else 0,
-            'Telefone': df['telefone_detectado'].sum() if 'telefone_detectado' in df.columns else 0,
-            'Nome': df['nome_detectado'].sum() if 'nome_detectado' in df.columns else 0,
-            'Endereço': df['endereco_detectado'].sum() if 'endereco_detectado' in df.columns else 0
-        }
+        tipos_pii = resumo.tipos_grafico()
 
         # Cores personalizadas: CPF validado/RG/Endereço=VERMELHO, CPF não validado/Nome=LARANJA, Email/Telefone=AMARELO
         cores = ['#ff0000', '#ff9900', '#ff0000', '#ffcc00', '#ffcc00', '#ff9900', '#ff0000']
 
+        import plotly.graph_objects as go
+
         fig_tipos = go.Figure(data=[
             go.Bar(
                 x=list(tipos_pii.keys()),
@@ -898,7 +1687,7 @@ def pagina_resultados():
         fig_pizza = go.Figure(data=[
             go.Pie(
                 labels=['Com PII', 'Sem PII'],
-                values=[registros_com_pii, total_registros - registros_com_pii],
+                values=[resumo.com_pii, resumo.sem_pii],
                 marker_colors=['#ff4b4b', '#00cc44'],
                 hole=0.4
             )
@@ -909,123 +1698,119 @@ def pagina_resultados():
         )
         st.plotly_chart(fig_pizza, use_container_width=True)
 
+        # Histograma do score de risco (faixas de 0,1), colorido pelo nível de risco
+        faixas = [f"{inicio:.1f}-{fim:.1f}" for inicio, fim, _ in resumo.histograma_score]
+        fig_score = go.Figure(data=[
+            go.Bar(
+                x=faixas,
+                y=[quantidade for _, _, quantidade in resumo.histograma_score],
+                marker_color=['#ff0000' if inicio >= 0.7 else '#ffcc00' if inicio >= 0.4 else '#00cc44'
+                              for inicio, _, _ in resumo.histograma_score],
+                hovertemplate='<b>Score %{x}</b><br>Registros: %{y}<extra></extra>'
+            )
+        ])
+        fig_score.update_layout(
+            title="Distribuição do Score de Risco",
+            xaxis_title="Score de risco",
+            yaxis_title="Registros",
+            height=350,
+            showlegend=False
+        )
+        st.plotly_chart(fig_score, use_container_width=True)
+        st.caption(" | ".join(f"{nivel}: {quantidade:,} registros" for nivel, quantidade in resumo.faixas_risco.items()))
+
     # Exportação de dados
     st.markdown("## 💾 Exportar Dados")
 
-    col_export1, col_export2 = st.columns(2)
+    col_export1, col_export2, col_export3 = st.columns(3)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    # Aba com estatísticas - APENAS CPF SEPARADO (valores do resumo, sem varrer o DataFrame)
+    stats = {
+        'Métrica': [
+            'Total de Registros',
+            'Com PII',
+            '% PII',
+            '',  # linha vazia
+            '=== CPF (DUAS CATEGORIAS) ===',
+            '✅ CPF VALIDADO (Validado Matematicamente - CPF Real)',
+            '⚠️ CPF NÃO VALIDADO (Erro de Digitação - Ainda é Risco)',
+            '',  # linha vazia
+            '=== OUTROS DADOS (UMA CATEGORIA) ===',
+            'RG',
+            'Email',
+            'Telefone',
+            'Nome',
+            'Endereço'
+        ],
+        'Valor': [
+            resumo.total,
+            resumo.com_pii,
+            f"{resumo.percentual_pii:.1f}%",
+            '',  # linha vazia
+            '',
+            resumo.por_tipo['cpf_validado'],
+            resumo.por_tipo['cpf_nao_validado'],
+            '',  # linha vazia
+            '',
+            resumo.por_tipo['rg_detectado'],
+            resumo.por_tipo['email_detectado'],
+            resumo.por_tipo['telefone_detectado'],
+            resumo.por_tipo['nome_detectado'],
+            resumo.por_tipo['endereco_detectado']
+        ],
+        'Explicação': [
+            'Total de linhas analisadas',
+            'Registros que contêm algum dado pessoal',
+            'Percentual com PII',
+            '',
+            '',
+            'CPF validado pelo algoritmo Módulo 11 da Receita Federal',
+            'CPF com formato correto mas falhou validação - pode ser erro de digitação',
+            '',
+            '',
+            'Documentos de identidade detectados',
+            'Endereços de e-mail detectados',
+            'Números de telefone detectados',
+            'Nomes de pessoas detectados',
+            'Endereços residenciais detectados'
+        ]
+    }
+    abas = [
+        ('Dados Completos', df, None),
+        ('Com PII', df, lambda bloco: bloco[bloco['contém_pii'] == True]),
+        ('Estatísticas', pd.DataFrame(stats), None),
+    ]
 
     with col_export1:
         # Excel completo
-        buffer_excel = io.BytesIO()
-        with pd.ExcelWriter(buffer_excel, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Dados Completos', index=False)
-
-            # Aba com apenas registros com PII
-            df_pii = df[df['contém_pii'] == True]
-            df_pii.to_excel(writer, sheet_name='Com PII', index=False)
-
-            # Aba com estatísticas - APENAS CPF SEPARADO
-            stats = {
-                'Métrica': [
-                    'Total de Registros',
-                    'Com PII',
-                    '% PII',
-                    '',  # linha vazia
-                    '=== CPF (DUAS CATEGORIAS) ===',
-                    '✅ CPF VALIDADO (Validado Matematicamente - CPF Real)',
-                    '⚠️ CPF NÃO VALIDADO (Erro de Digitação - Ainda é Risco)',
-                    '',  # linha vazia
-                    '=== OUTROS DADOS (UMA CATEGORIA) ===',
-                    'RG',
-                    'Email',
-                    'Telefone',
-                    'Nome',
-                    'Endereço'
-                ],
-                'Valor': [
-                    len(df),
-                    df['contém_pii'].sum(),
-                    f"{(df['contém_pii'].sum()/len(df)*100):.1f}%",
-                    '',  # linha vazia
-                    '',
-                    df['cpf_validado'].sum(),
-                    df['cpf_nao_validado'].sum(),
-                    '',  # linha vazia
-                    '',
-                    df['rg_detectado'].sum(),
-                    df['email_detectado'].sum(),
-                    df['telefone_detectado'].sum(),
-                    df['nome_detectado'].sum(),
-                    df['endereco_detectado'].sum()
-                ],
-                'Explicação': [
-                    'Total de linhas analisadas',
-                    'Registros que contêm algum dado pessoal',
-                    'Percentual com PII',
-                    '',
-                    '',
-                    'CPF validado pelo algoritmo Módulo 11 da Receita Federal',
-                    'CPF com formato correto mas falhou validação - pode ser erro de digitação',
-                    '',
-                    '',
-                    'Documentos de identidade detectados',
-                    'Endereços de e-mail detectados',
-                    'Números de telefone detectados',
-                    'Nomes de pessoas detectados',
-                    'Endereços residenciais detectados'
-                ]
-            }
-            pd.DataFrame(stats).to_excel(writer, sheet_name='Estatísticas', index=False)
-
-        buffer_excel.seek(0)
-
-        st.download_button(
-            label="📊 Baixar Excel Completo",
-            data=buffer_excel,
-            file_name=f"analise_pii_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
+        exibir_exportacao(
+            "📊 Baixar Excel Completo", df, 'analise_pii_relatorio', 'xlsx',
+            lambda destino: salvar_excel_abas(destino, abas),
+            f"analise_pii_{timestamp}.xlsx"
         )
 
     with col_export2:
         # CSV simplificado
-        csv = df.to_csv(index=False, encoding='utf-8-sig')
-
-        st.download_button(
-            label="📄 Baixar CSV Simplificado",
-            data=csv,
-            file_name=f"analise_pii_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-            use_container_width=True
+        exibir_exportacao(
+            "📄 Baixar CSV Simplificado", df, 'analise_pii', 'csv',
+            lambda destino: salvar_streaming(df, destino, 'csv'),
+            f"analise_pii_{timestamp}.csv"
+        )
+
+    with col_export3:
+        # Parquet (colunar: abre rápido em pandas/Power BI e serve de análise anterior na reanálise)
+        exibir_exportacao(
+            "📦 Baixar Parquet", df, 'analise_pii', 'parquet',
+            lambda destino: salvar_streaming(df, destino, 'parquet'),
+            f"analise_pii_{timestamp}.parquet"
         )
 
     # Tabela de registros com PII (colapsável)
     st.markdown("## ⚠️ Registros com Dados Pessoais")
-    df_com_pii = df[df['contém_pii'] == True].copy()
-
-    if len(df_com_pii) > 0:
-        with st.expander(f"📋 Ver {len(df_com_pii)} registros com PII", expanded=False):
-            # Filtros
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                filtro_cpf = st.checkbox("Apenas com CPF", value=False)
-            with col2:
-                filtro_email = st.checkbox("Apenas com E-mail", value=False)
-            with col3:
-                filtro_nome = st.checkbox("Apenas com Nome", value=False)
-
-            df_filtrado = df_com_pii.copy()
-            if filtro_cpf:
-                # Filtra CPF (validado OU não validado)
-                df_filtrado = df_filtrado[(df_filtrado['cpf_validado'] > 0) | (df_filtrado['cpf_nao_validado'] > 0)]
-            if filtro_email:
-                df_filtrado = df_filtrado[df_filtrado['email_detectado'] > 0]
-            if filtro_nome:
-                df_filtrado = df_filtrado[df_filtrado['nome_detectado'] > 0]
-
-            # Seleciona colunas para exibir
-            colunas_exibir = [col for col in df_filtrado.columns if not col.startswith('pii_') or col.endswith('_lista')]
-            st.dataframe(df_filtrado[colunas_exibir], use_container_width=True, height=400)
+    if resumo.com_pii > 0:
+        with st.expander(f"📋 Explorar {resumo.com_pii:,} registros com PII", expanded=False):
+            exibir_explorador('resultados')
     else:
         st.success("✅ Nenhum registro com dados pessoais detectado!")
 
@@ -1040,22 +1825,17 @@ def pagina_relatorio():
         st.info("💡 Navegue para 'Upload e Análise' → Faça upload → Clique em 'Iniciar Análise'")
         return
 
-    df = st.session_state.df_analisado
+    resumo = obter_resumo()
 
     st.markdown("## 📄 Relatório Executivo")
 
-    # Dados do relatório
-    total = len(df)
-    com_pii = df['contém_pii'].sum()
-    sem_pii = total - com_pii
-
     st.markdown(f"""
     ### Resumo da Análise
 
     **Data do Relatório:** {datetime.now().strftime('%d/%m/%Y %H:%M')}
-    **Total de Registros Analisados:** {total:,}
-    **Registros com Dados Pessoais:** {com_pii:,} ({(com_pii/total*100):.1f}%)
-    **Registros sem Dados Pessoais:** {sem_pii:,} ({(sem_pii/total*100):.1f}%)
+    **Total de Registros Analisados:** {resumo.total:,}
+    **Registros com Dados Pessoais:** {resumo.com_pii:,} ({resumo.percentual_pii:.1f}%)
+    **Registros sem Dados Pessoais:** {resumo.sem_pii:,} ({resumo.percentual_sem_pii:.1f}%)
 
     ### Detalhamento por Tipo de Dado
 
@@ -1063,17 +1843,17 @@ def pagina_relatorio():
 
     | Tipo de Dado | Quantidade | Status LGPD | Explicação |
     |--------------|------------|-------------|------------|
-    | **✅ CPF Validado** | {df['cpf_validado'].sum():,} | ⚠️ Sensível | Validado matematicamente - CPF real |
-    | **⚠️ CPF Não Validado** | {df['cpf_nao_validado'].sum():,} | ⚠️ Sensível | Erro de digitação - Ainda é risco! |
-    | RG | {df['rg_detectado'].sum():,} | ⚠️ Sensível | Documento de identidade |
-    | E-mail | {df['email_detectado'].sum():,} | ℹ️ Pessoal | Endereço eletrônico |
-    | Telefone | {df['telefone_detectado'].sum():,} | ℹ️ Pessoal | Número de contato |
-    | Nome | {df['nome_detectado'].sum():,} | ℹ️ Pessoal | Identificação pessoal |
+    | **✅ CPF Validado** | {resumo.por_tipo['cpf_validado']:,} | ⚠️ Sensível | Validado matematicamente - CPF real |
+    | **⚠️ CPF Não Validado** | {resumo.por_tipo['cpf_nao_validado']:,} | ⚠️ Sensível | Erro de digitação - Ainda é risco! |
+    | RG | {resumo.por_tipo['rg_detectado']:,} | ⚠️ Sensível | Documento de identidade |
+    | E-mail | {resumo.por_tipo['email_detectado']:,} | ℹ️ Pessoal | Endereço eletrônico |
+    | Telefone | {resumo.por_tipo['telefone_detectado']:,} | ℹ️ Pessoal | Número de contato |
+    | Nome | {resumo.por_tipo['nome_detectado']:,} | ℹ️ Pessoal | Identificação pessoal |
 
     ### Recomendações de Conformidade
 
     {
-    '🔴 **AÇÃO URGENTE:** Alto volume de dados sensíveis (CPF/RG) detectado. Revisar necessidade de coleta.' if (df['cpf_validado'].sum() + df['cpf_nao_validado'].sum()) > total * 0.3
+    '🔴 **AÇÃO URGENTE:** Alto volume de dados sensíveis (CPF/RG) detectado. Revisar necessidade de coleta.' if resumo.cpfs > resumo.total * 0.3
     else '🟢 **CONFORME:** Volume de dados pessoais dentro do esperado.'
     }
 
@@ -1091,6 +1871,8 @@ def pagina_relatorio():
     else:
         st.markdown("*Nenhuma ação de tratamento registrada.*")
 
+    exibir_perfil_pipeline()
+
     # Botão de exportação do relatório
     st.markdown("### 💾 Exportar Relatório")
 
@@ -1110,8 +1892,6 @@ def main():
         st.markdown("### 📊 Status do Sistema")
 
         if st.session_state.get('df_analisado') is not None:
-            df = st.session_state.df_analisado
-
             # Card de status com métricas
             st.markdown("""
             <div class="success-zone" style="padding: 15px; margin-bottom: 10px;">
@@ -1120,30 +1900,27 @@ def main():
             """, unsafe_allow_html=True)
 
             # Métricas resumidas
-            total = len(df)
-            com_pii = df['contém_pii'].sum()
-            score_medio = df['score_risco'].mean() if 'score_risco' in df.columns else 0.0
+            resumo = obter_resumo()
 
-            st.metric("📄 Total de Registros", f"{total:,}")
-            st.metric("⚠️ Com Dados Pessoais", f"{com_pii:,}",
-                     delta=f"{(com_pii/total*100):.1f}%", delta_color="inverse")
+            st.metric("📄 Total de Registros", f"{resumo.total:,}")
+            st.metric("⚠️ Com Dados Pessoais", f"{resumo.com_pii:,}",
+                     delta=f"{resumo.percentual_pii:.1f}%", delta_color="inverse")
 
             # Score de risco com cor
-            cor_score = "🔴" if score_medio > 0.7 else "🟡" if score_medio > 0.4 else "🟢"
-            st.metric("🎯 Score de Risco", f"{cor_score} {score_medio:.2f}")
+            st.metric("🎯 Score de Risco", f"{resumo.emoji_risco()} {resumo.score_medio:.2f}")
 
             st.markdown("---")
 
             # Detalhamento por tipo
             st.markdown("### 📋 Dados Detectados")
 
-            cpf_val = df['cpf_validado'].sum() if 'cpf_validado' in df.columns else 0
-            cpf_nval = df['cpf_nao_validado'].sum() if 'cpf_nao_validado' in df.columns else 0
-            rg = df['rg_detectado'].sum() if 'rg_detectado' in df.columns else 0
-            email = df['email_detectado'].sum() if 'email_detectado' in df.columns else 0
-            tel = df['telefone_detectado'].sum() if 'telefone_detectado' in df.columns else 0
-            nome = df['nome_detectado'].sum() if 'nome_detectado' in df.columns else 0
-            end = df['endereco_detectado'].sum() if 'endereco_detectado' in df.columns else 0
+            cpf_val = resumo.por_tipo['cpf_validado']
+            cpf_nval = resumo.por_tipo['cpf_nao_validado']
+            rg = resumo.por_tipo['rg_detectado']
+            email = resumo.por_tipo['email_detectado']
+            tel = resumo.por_tipo['telefone_detectado']
+            nome = resumo.por_tipo['nome_detectado']
+            end = resumo.por_tipo['endereco_detectado']
 
             # Cores para cada tipo
             st.markdown(f"""
@@ -1189,6 +1966,10 @@ def main():
 
         st.markdown("---")
 
+        exibir_consulta_titular()
+
+        st.markdown("---")
+
         # Informações do sistema
         st.markdown("### ℹ️ Sobre")
         st.markdown("""
@@ -1205,8 +1986,11 @@ def main():
 
         st.markdown("---")
 
+        exibir_relatorio_inicializacao()
+
         # Botão de reset
         if st.button("🔄 Reiniciar Sistema", use_container_width=True):
+            descartar_exportacoes_sessao()
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
@@ -1224,15 +2008,17 @@ def main():
         st.info("📋 Faça upload do arquivo Excel para iniciar a análise")
 
         uploaded_file = st.file_uploader(
-            "Selecione o arquivo Excel (.xlsx ou .xls)",
-            type=['xlsx', 'xls'],
+            "Selecione o arquivo (Excel, CSV, Parquet ou Feather)",
+            type=EXTENSOES_ENTRADA,
             help="Arquivo deve conter uma coluna com os textos das solicitações"
         )
 
         if uploaded_file is not None:
             try:
-                df = pd.read_excel(uploaded_file)
+                df = ler_tabela(uploaded_file)
                 st.session_state.df_original = df
+                st.session_state.nome_arquivo = uploaded_file.name
+                st.session_state.impressao_arquivo = impressao_arquivo(uploaded_file)
                 st.success(f"✅ Arquivo carregado: {len(df)} registros")
                 st.rerun()
             except Exception as e:
@@ -1240,6 +2026,11 @@ def main():
     else:
         st.success(f"✅ Arquivo carregado com {len(st.session_state.df_original)} registros")
 
+    # Tempo até a tela de upload na primeira execução do app neste servidor
+    relatorio = obter_relatorio_inicializacao()
+    if relatorio['primeira_tela'] is None:
+        relatorio['primeira_tela'] = time.perf_counter() - _INICIO_SCRIPT
+
     st.markdown("---")
 
     # SEÇÃO 2: ANÁLISE (só aparece se tiver arquivo)
@@ -1263,9 +2054,12 @@ def main():
                 index=0
             )
 
+            configurar_execucao()
+            df_anterior = configurar_incremental(coluna_selecionada)
+
             if st.button("🚀 ANALISAR DADOS", type="primary", use_container_width=True):
                 with st.spinner('🔍 Analisando dados pessoais...'):
-                    df_analisado = analisar_arquivo(df.copy(), coluna_selecionada)
+                    df_analisado = analisar_arquivo(df, coluna_selecionada, df_anterior)
                     st.session_state.df_analisado = df_analisado
                     st.session_state.coluna_texto = coluna_selecionada
                     st.success("✅ Análise concluída!")
@@ -1273,26 +2067,24 @@ def main():
                     st.rerun()
         else:
             st.success("✅ Análise concluída")
+            exibir_estatisticas_cache()
+            exibir_estatisticas_prefiltro()
+            exibir_estatisticas_incremental()
+            exibir_instrumentacao()
 
-            df_analisado = st.session_state.df_analisado
+            resumo = obter_resumo()
 
             # Métricas resumidas
             col1, col2, col3, col4 = st.columns(4)
 
-            total_registros = len(df_analisado)
-            registros_com_pii = df_analisado['contém_pii'].sum()
-            cpf_validados = df_analisado['cpf_validado'].sum() if 'cpf_validado' in df_analisado.columns else 0
-            score_medio = df_analisado['score_risco'].mean() if 'score_risco' in df_analisado.columns else 0.0
-
             with col1:
-                st.metric("Total", f"{total_registros:,}")
+                st.metric("Total", f"{resumo.total:,}")
             with col2:
-                st.metric("Com PII", f"{registros_com_pii:,}")
+                st.metric("Com PII", f"{resumo.com_pii:,}")
             with col3:
-                st.metric("CPF Validado", f"{cpf_validados:,}")
+                st.metric("CPF Validado", f"{resumo.por_tipo['cpf_validado']:,}")
             with col4:
-                cor_score = "🔴" if score_medio > 0.7 else "🟡" if score_medio > 0.4 else "🟢"
-                st.metric("Risco", f"{cor_score} {score_medio:.2f}")
+                st.metric("Risco", f"{resumo.emoji_risco()} {resumo.score_medio:.2f}")
 
         st.markdown("---")
 
@@ -1300,7 +2092,7 @@ def main():
     if st.session_state.df_analisado is not None:
         st.markdown("## 📊 3. Visualização dos Dados Detectados")
 
-        df = st.session_state.df_analisado
+        resumo = obter_resumo()
 
         # Aviso sobre CPF separado
         st.markdown("""
@@ -1315,18 +2107,12 @@ def main():
 
         with col1:
             # Gráfico de barras
-            tipos_pii = {
-                '✅ CPF Validado': df['cpf_validado'].sum() if 'cpf_validado' in df.columns else 0,
-                '⚠️ CPF Não Validado': df['cpf_nao_validado'].sum() if 'cpf_nao_validado' in df.columns else 0,
-                'RG': df['rg_detectado'].sum() if 'rg_detectado' in df.columns else 0,
-                'E-mail': df['email_detectado'].sum() if 'email_detectado' in df.columns else 0,
-                'Telefone': df['telefone_detectado'].sum() if 'telefone_detectado' in df.columns else 0,
-                'Nome': df['nome_detectado'].sum() if 'nome_detectado' in df.columns else 0,
-                'Endereço': df['endereco_detectado'].sum() if 'endereco_detectado' in df.columns else 0
-            }
+            tipos_pii = resumo.tipos_grafico()
 
             cores = ['#ff0000', '#ff9900', '#ff0000', '#ffcc00', '#ffcc00', '#ff9900', '#ff0000']
 
+            import plotly.graph_objects as go
+
             fig_tipos = go.Figure(data=[
                 go.Bar(
                     x=list(tipos_pii.keys()),
@@ -1345,13 +2131,10 @@ def main():
 
         with col2:
             # Gráfico pizza
-            total_registros = len(df)
-            registros_com_pii = df['contém_pii'].sum()
-
             fig_pizza = go.Figure(data=[
                 go.Pie(
                     labels=['Com PII', 'Sem PII'],
-                    values=[registros_com_pii, total_registros - registros_com_pii],
+                    values=[resumo.com_pii, resumo.sem_pii],
                     marker_colors=['#ff4b4b', '#00cc44'],
                     hole=0.4
                 )
@@ -1359,19 +2142,21 @@ def main():
             fig_pizza.update_layout(title="Distribuição", height=400)
             st.plotly_chart(fig_pizza, use_container_width=True)
 
+        with st.expander("🔎 Explorar registros analisados", expanded=False):
+            exibir_explorador('visualizacao')
+
         st.markdown("---")
 
     # SEÇÃO 4: RELATÓRIO LGPD (sempre aparece após análise)
     if st.session_state.df_analisado is not None:
         st.markdown("## 📋 4. Relatório de Conformidade LGPD")
 
-        df = st.session_state.df_analisado
-
         # Dados do relatório
-        total = len(df)
-        com_pii = df['contém_pii'].sum()
-        sem_pii = total - com_pii
-        score_medio = df['score_risco'].mean() if 'score_risco' in df.columns else 0.0
+        resumo = obter_resumo()
+        total = resumo.total
+        com_pii = resumo.com_pii
+        sem_pii = resumo.sem_pii
+        score_medio = resumo.score_medio
 
         # Cabeçalho do relatório em card bonito
         st.markdown(f"""
@@ -1393,7 +2178,7 @@ def main():
                 <h2 style="color: #2e7d32; margin: 0;">{:,}</h2>
                 <p style="margin: 5px 0 0 0; font-size: 14px; color: #558b2f;">{:.1f}%</p>
             </div>
-            """.format(sem_pii, (sem_pii/total*100)), unsafe_allow_html=True)
+            """.format(sem_pii, resumo.percentual_sem_pii), unsafe_allow_html=True)
 
         with col2:
             st.markdown("""
@@ -1403,7 +2188,7 @@ def main():
                 <h2 style="color: #f57c00; margin: 0;">{:,}</h2>
                 <p style="margin: 5px 0 0 0; font-size: 14px; color: #e65100;">{:.1f}%</p>
             </div>
-            """.format(com_pii, (com_pii/total*100)), unsafe_allow_html=True)
+            """.format(com_pii, resumo.percentual_pii), unsafe_allow_html=True)
 
         with col3:
             cor_bg = "#ffebee" if score_medio > 0.7 else "#fff8e1" if score_medio > 0.4 else "#e8f5e9"
@@ -1424,13 +2209,13 @@ def main():
         st.markdown("### 📊 Detalhamento por Tipo de Dado Pessoal")
 
         # Tabela bonita com os dados
-        cpf_val = df['cpf_validado'].sum() if 'cpf_validado' in df.columns else 0
-        cpf_nval = df['cpf_nao_validado'].sum() if 'cpf_nao_validado' in df.columns else 0
-        rg = df['rg_detectado'].sum() if 'rg_detectado' in df.columns else 0
-        email = df['email_detectado'].sum() if 'email_detectado' in df.columns else 0
-        tel = df['telefone_detectado'].sum() if 'telefone_detectado' in df.columns else 0
-        nome = df['nome_detectado'].sum() if 'nome_detectado' in df.columns else 0
-        endereco = df['endereco_detectado'].sum() if 'endereco_detectado' in df.columns else 0
+        cpf_val = resumo.por_tipo['cpf_validado']
+        cpf_nval = resumo.por_tipo['cpf_nao_validado']
+        rg = resumo.por_tipo['rg_detectado']
+        email = resumo.por_tipo['email_detectado']
+        tel = resumo.por_tipo['telefone_detectado']
+        nome = resumo.por_tipo['nome_detectado']
+        endereco = resumo.por_tipo['endereco_detectado']
 
         st.markdown("""
         <div class="warning-zone">
@@ -1540,6 +2325,8 @@ def main():
             </div>
             """, unsafe_allow_html=True)
 
+        exibir_perfil_pipeline()
+
         st.markdown("---")
 
     # SEÇÃO 5: MASCARAMENTO (opcional - só aparece se já analisou)
@@ -1588,52 +2375,53 @@ def main():
                 options=['todos', 'cpf', 'rg', 'email', 'telefone', 'nome'],
                 default=['todos']
             )
+            formato_saida = st.selectbox(
+                "Formato do arquivo:",
+                options=list(FORMATOS_SAIDA),
+                format_func=FORMATOS_SAIDA.get,
+                key="formato_saida_mascarado"
+            )
 
         if st.button("🛡️ APLICAR MASCARAMENTO E BAIXAR", type="primary", use_container_width=True):
             if tipos_mascarar:
                 with st.spinner(f'🔒 Aplicando mascaramento...'):
-                    df_original_para_mascarar = st.session_state.df_original.copy()
-
-                    if coluna_texto and coluna_texto in df_original_para_mascarar.columns:
-                        detector = st.session_state.detector
-                        textos = df_original_para_mascarar[coluna_texto].fillna("").astype(str).tolist()
-
-                        progress_bar = st.progress(0)
-                        textos_mascarados = []
-                        batch_size = 100
-                        total = len(textos)
-
-                        for i in range(0, total, batch_size):
-                            batch = textos[i:i+batch_size]
-                            mascarados = detector.apply_masking_batch(batch, mode=modo_mascaramento)
-                            textos_mascarados.extend(mascarados)
-                            progress_bar.progress(min((i + batch_size) / total, 1.0))
-
-                        df_original_para_mascarar[coluna_texto] = textos_mascarados
-                        progress_bar.empty()
-
-                    st.session_state.df_mascarado_limpo = df_original_para_mascarar
-
-                    # Cria arquivo para download
-                    buffer = io.BytesIO()
-                    df_original_para_mascarar.to_excel(buffer, index=False, engine='openpyxl')
-                    buffer.seek(0)
-
-                    st.success("✅ Mascaramento concluído!")
-
-                    st.download_button(
-                        label="⬇️ BAIXAR ARQUIVO MASCARADO",
-                        data=buffer,
-                        file_name=f"dados_mascarados_{modo_mascaramento}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        type="primary",
-                        use_container_width=True
+                    df_original = st.session_state.df_original
+
+                    if coluna_texto and coluna_texto in df_original.columns:
+                        textos = df_original[coluna_texto].fillna("").astype(str).tolist()
+                        definir_mascaramento(modo_mascaramento, coluna_texto,
+                                             mascarar_coluna_texto(textos, modo_mascaramento, tipos_mascarar))
+                    else:
+                        definir_mascaramento(modo_mascaramento)
+                    df_original_para_mascarar = obter_df_mascarado()
+
+                    # Gera o arquivo (streaming, em cache pelo conteúdo) já no clique: o usuário pediu para baixar
+                    gerador = obter_gerador_exportacoes()
+                    chave = gerador.chave(df_original_para_mascarar, 'dados_mascarados', formato_saida)
+                    gerador.solicitar(
+                        chave, lambda destino: salvar_streaming(df_original_para_mascarar, destino, formato_saida)
                     )
-
-                    st.balloons()
+                    st.session_state.exportacoes_sessao.add(chave)
+                    try:
+                        gerador.aguardar(chave)
+                    except Exception:
+                        pass   # o erro aparece no botão de download abaixo
+
+                st.success("✅ Mascaramento concluído!")
+                st.balloons()
             else:
                 st.warning("⚠️ Selecione pelo menos um tipo de dado.")
 
+        if st.session_state.mascaramento is not None:
+            df_mascarado = obter_df_mascarado()
+            exibir_exportacao(
+                "⬇️ BAIXAR ARQUIVO MASCARADO", df_mascarado, 'dados_mascarados', formato_saida,
+                lambda destino: salvar_streaming(df_mascarado, destino, formato_saida),
+                f"dados_mascarados_{st.session_state.mascaramento['modo']}_"
+                f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato_saida}",
+                principal=True
+            )
+
         st.markdown("---")
 
     # SEÇÃO 6: EXPORTAÇÃO (sempre visível se há análise)
@@ -1641,63 +2429,62 @@ def main():
         st.markdown("## 💾 6. Exportar Relatórios e Dados")
 
         df = st.session_state.df_analisado
+        resumo = obter_resumo()
 
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        stats = {
+            'Métrica': [
+                'Total de Registros',
+                'Com PII',
+                '✅ CPF VALIDADO',
+                '⚠️ CPF NÃO VALIDADO',
+                'RG',
+                'Email',
+                'Telefone',
+                'Nome',
+                'Endereço'
+            ],
+            'Valor': [
+                resumo.total,
+                resumo.com_pii,
+                resumo.por_tipo['cpf_validado'],
+                resumo.por_tipo['cpf_nao_validado'],
+                resumo.por_tipo['rg_detectado'],
+                resumo.por_tipo['email_detectado'],
+                resumo.por_tipo['telefone_detectado'],
+                resumo.por_tipo['nome_detectado'],
+                resumo.por_tipo['endereco_detectado']
+            ]
+        }
+        abas = [
+            ('Dados Completos', df, None),
+            ('Com PII', df, lambda bloco: bloco[bloco['contém_pii'] == True]),
+            ('Estatísticas', pd.DataFrame(stats), None),
+        ]
 
+        # Arquivos gerados só ao clicar, em segundo plano, e reaproveitados enquanto a análise não mudar
         with col1:
             # Excel completo
-            buffer_excel = io.BytesIO()
-            with pd.ExcelWriter(buffer_excel, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Dados Completos', index=False)
-
-                df_pii = df[df['contém_pii'] == True]
-                df_pii.to_excel(writer, sheet_name='Com PII', index=False)
-
-                stats = {
-                    'Métrica': [
-                        'Total de Registros',
-                        'Com PII',
-                        '✅ CPF VALIDADO',
-                        '⚠️ CPF NÃO VALIDADO',
-                        'RG',
-                        'Email',
-                        'Telefone',
-                        'Nome',
-                        'Endereço'
-                    ],
-                    'Valor': [
-                        len(df),
-                        df['contém_pii'].sum(),
-                        df['cpf_validado'].sum(),
-                        df['cpf_nao_validado'].sum(),
-                        df['rg_detectado'].sum(),
-                        df['email_detectado'].sum(),
-                        df['telefone_detectado'].sum(),
-                        df['nome_detectado'].sum(),
-                        df['endereco_detectado'].sum()
-                    ]
-                }
-                pd.DataFrame(stats).to_excel(writer, sheet_name='Estatísticas', index=False)
-
-            buffer_excel.seek(0)
-
-            st.download_button(
-                label="📊 Baixar Excel Completo",
-                data=buffer_excel,
-                file_name=f"analise_pii_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
+            exibir_exportacao(
+                "📊 Baixar Excel Completo", df, 'analise_pii_completa', 'xlsx',
+                lambda destino: salvar_excel_abas(destino, abas),
+                f"analise_pii_{timestamp}.xlsx"
             )
 
         with col2:
-            csv = df.to_csv(index=False, encoding='utf-8-sig')
+            exibir_exportacao(
+                "📄 Baixar CSV", df, 'analise_pii', 'csv',
+                lambda destino: salvar_streaming(df, destino, 'csv'),
+                f"analise_pii_{timestamp}.csv"
+            )
 
-            st.download_button(
-                label="📄 Baixar CSV",
-                data=csv,
-                file_name=f"analise_pii_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
+        with col3:
+            exibir_exportacao(
+                "📦 Baixar Parquet", df, 'analise_pii', 'parquet',
+                lambda destino: salvar_streaming(df, destino, 'parquet'),
+                f"analise_pii_{timestamp}.parquet"
             )
 
 
@@ -0,0 +1,786 @@
+"""
+Benchmarks de Performance - Sistema de Gestão de PII
+====================================================
+
+Mede o desempenho de partes do pipeline e confere que as versões
+otimizadas produzem exatamente o mesmo resultado das versões anteriores.
+
+Exemplos:
+    python benchmark.py listas --registros 100000
+    python benchmark.py colunas --registros 200000
+    python benchmark.py prefiltro --arquivo manifestacoes.xlsx --coluna texto --limiares 1 2 3
+    python benchmark.py lote-nlp --registros 5000 --batch-sizes 50 128 256 512
+    python benchmark.py extracao --registros 500 --caracteres 20000
+    python benchmark.py hierarquia --casos 20000 --numeros 5000
+    python benchmark.py suite --tamanhos 100 1000 10000 100000 --densidade 0.3
+    python benchmark.py suite --tamanhos 1000 10000 --linha-base output/benchmark_20250101_020000.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from processamento import (
+    COLUNAS_RESULTADO, anonimizar_listas, detectar_colunar, detectar_textos, extrair_spans, montar_colunas_resultado
+)
+from progresso import memoria_processo_mb
+
+
+def cronometrar(funcao, *args, repeticoes: int = 3):
+    """
+    Executa a função algumas vezes e devolve o melhor tempo.
+
+    Returns:
+        Tupla (melhor tempo em segundos, resultado da última execução)
+    """
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+# =====================================================================
+# LISTAS DE PII - MODO PARCIAL (iterrows x colunar)
+# =====================================================================
+
+def _anonimizar_listas_iterrows(df: pd.DataFrame, tipos_pii: list, detector) -> pd.DataFrame:
+    """Implementação anterior do modo PARCIAL (linha a linha), usada como referência."""
+    df_anonimizado = df.copy()
+
+    for idx, row in df_anonimizado.iterrows():
+        if 'todos' in tipos_pii or 'cpf' in tipos_pii:
+            if row.get('pii_cpf_validado_lista') and row['pii_cpf_validado_lista'] != '':
+                cpfs = str(row['pii_cpf_validado_lista']).split(';')
+                cpfs_mascarados = [detector._mascara_cpf_parcial(c) for c in cpfs if c]
+                df_anonimizado.at[idx, 'pii_cpf_validado_lista'] = ';'.join(cpfs_mascarados)
+
+            if row.get('pii_cpf_nao_validado_lista') and row['pii_cpf_nao_validado_lista'] != '':
+                cpfs = str(row['pii_cpf_nao_validado_lista']).split(';')
+                cpfs_mascarados = [detector._mascara_cpf_parcial(c) for c in cpfs if c]
+                df_anonimizado.at[idx, 'pii_cpf_nao_validado_lista'] = ';'.join(cpfs_mascarados)
+
+        if 'todos' in tipos_pii or 'rg' in tipos_pii:
+            if row.get('pii_rg_lista') and row['pii_rg_lista'] != '':
+                rgs = str(row['pii_rg_lista']).split(';')
+                rgs_mascarados = [detector._mascara_rg_parcial(r) for r in rgs if r]
+                df_anonimizado.at[idx, 'pii_rg_lista'] = ';'.join(rgs_mascarados)
+
+        if 'todos' in tipos_pii or 'email' in tipos_pii:
+            if row.get('pii_email_lista') and row['pii_email_lista'] != '':
+                emails = str(row['pii_email_lista']).split(';')
+                emails_mascarados = [detector._mascara_email_parcial(e) for e in emails if e]
+                df_anonimizado.at[idx, 'pii_email_lista'] = ';'.join(emails_mascarados)
+
+        if 'todos' in tipos_pii or 'telefone' in tipos_pii:
+            if row.get('pii_telefone_lista') and row['pii_telefone_lista'] != '':
+                tels = str(row['pii_telefone_lista']).split(';')
+                tels_mascarados = [detector._mascara_telefone_parcial(t) for t in tels if t]
+                df_anonimizado.at[idx, 'pii_telefone_lista'] = ';'.join(tels_mascarados)
+
+        if 'todos' in tipos_pii or 'nome' in tipos_pii:
+            if row.get('pii_nome_lista') and row['pii_nome_lista'] != '':
+                nomes = str(row['pii_nome_lista']).split(';')
+                nomes_mascarados = [detector._mascara_nome_parcial(n) for n in nomes if n]
+                df_anonimizado.at[idx, 'pii_nome_lista'] = ';'.join(nomes_mascarados)
+
+    return df_anonimizado
+
+
+def _gerar_listas(registros: int, semente: int = 42) -> pd.DataFrame:
+    """Gera colunas `pii_*_lista` sintéticas (com repetições, como nas bases reais)."""
+    rng = random.Random(semente)
+    nomes = ['Maria Silva', 'João Souza', 'Ana Oliveira', 'Pedro Santos', 'Paulo Henrique']
+
+    def talvez(gerador, chance=0.3, maximo=3):
+        if rng.random() > chance:
+            return ''
+        return ';'.join(gerador() for _ in range(rng.randint(1, maximo)))
+
+    def cpf():
+        d = [rng.randint(0, 9) for _ in range(11)]
+        return f"{d[0]}{d[1]}{d[2]}.{d[3]}{d[4]}{d[5]}.{d[6]}{d[7]}{d[8]}-{d[9]}{d[10]}"
+
+    return pd.DataFrame({
+        'pii_cpf_validado_lista': [talvez(cpf) for _ in range(registros)],
+        'pii_cpf_nao_validado_lista': [talvez(cpf, 0.1) for _ in range(registros)],
+        'pii_rg_lista': [talvez(lambda: f"{rng.randint(1, 9)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}", 0.1)
+                         for _ in range(registros)],
+        'pii_email_lista': [talvez(lambda: f"{rng.choice(['ana', 'joao', 'maria'])}{rng.randint(1, 50)}@email.com")
+                            for _ in range(registros)],
+        'pii_telefone_lista': [talvez(lambda: f"(61) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}", 0.2)
+                               for _ in range(registros)],
+        'pii_nome_lista': [talvez(lambda: rng.choice(nomes), 0.4) for _ in range(registros)],
+    })
+
+
+def benchmark_listas(args):
+    """Compara o modo PARCIAL de `anonimizar_listas` com o loop iterrows anterior."""
+    from detector import PIIDetector
+    detector = PIIDetector()
+
+    df = _gerar_listas(args.registros)
+    tipos = ['todos']
+
+    tempo_antigo, esperado = cronometrar(_anonimizar_listas_iterrows, df, tipos, detector, repeticoes=1)
+    tempo_novo, obtido = cronometrar(lambda: anonimizar_listas(df.copy(), tipos, 'PARCIAL', detector),
+                                     repeticoes=args.repeticoes)
+
+    identico = esperado.equals(obtido)
+    print(f'Registros:          {args.registros:,}')
+    print(f'iterrows (antigo):  {tempo_antigo:.3f}s')
+    print(f'colunar (novo):     {tempo_novo:.3f}s')
+    print(f'Speedup:            {tempo_antigo / tempo_novo:.1f}x')
+    print(f'Resultado idêntico: {"SIM" if identico else "NÃO"}')
+    return 0 if identico else 1
+
+
+# =====================================================================
+# COLUNAS DE RESULTADO (list comprehensions x colunar)
+# =====================================================================
+
+def _montar_colunas_listas(df: pd.DataFrame, all_results: list) -> pd.DataFrame:
+    """Implementação anterior de `montar_colunas_resultado` (uma list comprehension por coluna)."""
+    df['contém_pii'] = [r['contem_pii'] for r in all_results]
+    df['score_risco'] = [r['score_risco'] for r in all_results]
+    df['cpf_validado'] = [len(r['entidades']['cpf']['verificado']) for r in all_results]
+    df['cpf_nao_validado'] = [len(r['entidades']['cpf']['suspeito']) for r in all_results]
+    df['rg_verificado'] = [len(r['entidades']['rg']['verificado']) for r in all_results]
+    df['rg_suspeito'] = [len(r['entidades']['rg']['suspeito']) for r in all_results]
+    df['rg_detectado'] = df['rg_verificado'] + df['rg_suspeito']
+    df['email_verificado'] = [len(r['entidades']['email']['verificado']) for r in all_results]
+    df['email_suspeito'] = [len(r['entidades']['email']['suspeito']) for r in all_results]
+    df['email_detectado'] = df['email_verificado'] + df['email_suspeito']
+    df['telefone_verificado'] = [len(r['entidades']['telefone']['verificado']) for r in all_results]
+    df['telefone_suspeito'] = [len(r['entidades']['telefone']['suspeito']) for r in all_results]
+    df['telefone_detectado'] = df['telefone_verificado'] + df['telefone_suspeito']
+    df['nome_detectado'] = [len(r['entidades']['nlp_contexto']['pessoas']) for r in all_results]
+    df['endereco_detectado'] = [len(r['entidades']['endereco']['detectado']) for r in all_results]
+    df['pii_cpf_validado_lista'] = [';'.join(r['entidades']['cpf']['verificado']) for r in all_results]
+    df['pii_cpf_nao_validado_lista'] = [';'.join(r['entidades']['cpf']['suspeito']) for r in all_results]
+    df['pii_rg_lista'] = [';'.join(r['entidades']['rg']['verificado'] + r['entidades']['rg']['suspeito']) for r in all_results]
+    df['pii_email_lista'] = [';'.join(r['entidades']['email']['verificado'] + r['entidades']['email']['suspeito']) for r in all_results]
+    df['pii_telefone_lista'] = [';'.join(r['entidades']['telefone']['verificado'] + r['entidades']['telefone']['suspeito']) for r in all_results]
+    df['pii_nome_lista'] = [';'.join(r['entidades']['nlp_contexto']['pessoas']) for r in all_results]
+    df['pii_endereco_lista'] = [';'.join(r['entidades']['endereco']['detectado']) for r in all_results]
+    return df
+
+
+class _DetectorSintetico:
+    """Detector de mentira: devolve entidades pré-sorteadas, sem custo de NLP."""
+
+    def __init__(self, entidades_por_texto: dict):
+        self.entidades_por_texto = entidades_por_texto
+
+    def detect_pii_batch(self, textos, batch_size=50):
+        resultados = []
+        for texto in textos:
+            cpfs, emails, nomes = self.entidades_por_texto[texto]
+            entidades = {
+                'cpf': {'verificado': list(cpfs), 'suspeito': []},
+                'rg': {'verificado': [], 'suspeito': []},
+                'email': {'verificado': list(emails), 'suspeito': []},
+                'telefone': {'verificado': [], 'suspeito': []},
+                'nlp_contexto': {'pessoas': list(nomes)},
+                'endereco': {'detectado': []},
+            }
+            total = len(cpfs) + len(emails) + len(nomes)
+            resultados.append({'contem_pii': total > 0, 'score_risco': min(1.0, 0.2 * total),
+                               'entidades': entidades})
+        return resultados
+
+
+def _gerar_textos(registros: int, semente: int = 42):
+    """Gera textos sintéticos (com repetições) e as entidades de cada um."""
+    rng = random.Random(semente)
+    listas = _gerar_listas(registros, semente)
+    textos = []
+    entidades = {}
+    for i, (cpfs, emails, nomes) in enumerate(zip(listas['pii_cpf_validado_lista'], listas['pii_email_lista'],
+                                                   listas['pii_nome_lista'])):
+        partes = (cpfs.split(';') if cpfs else [], emails.split(';') if emails else [],
+                  nomes.split(';') if nomes else [])
+        protocolo = rng.randint(0, registros // 2)
+        texto = f"Manifestação {protocolo}: " + ' / '.join(v for lista in partes for v in lista)
+        textos.append(texto)
+        entidades.setdefault(texto, partes)
+    return textos, entidades
+
+
+def _medir(funcao):
+    """Executa a função medindo tempo e pico de memória (tracemalloc)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    decorrido = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return decorrido, pico / (1024 * 1024), resultado
+
+
+def benchmark_colunas(args):
+    """Compara a montagem colunar das colunas de resultado com a anterior (lista de dicionários)."""
+    textos, entidades = _gerar_textos(args.registros)
+    detector = _DetectorSintetico(entidades)
+    base = pd.DataFrame({'texto': textos})
+
+    def antigo():
+        all_results = detectar_textos(detector, textos)
+        spans = [extrair_spans(texto, resultado) for texto, resultado in zip(textos, all_results)]
+        return _montar_colunas_listas(base.copy(), all_results), spans
+
+    def novo():
+        colunas, spans = detectar_colunar(detector, textos)
+        return montar_colunas_resultado(base.copy(), colunas), spans
+
+    tempo_antigo, pico_antigo, (esperado, spans_esperados) = _medir(antigo)
+    tempo_novo, pico_novo, (obtido, spans_obtidos) = _medir(novo)
+
+    colunas = [coluna for coluna in COLUNAS_RESULTADO if coluna != 'data_analise']
+    identico = esperado[colunas].equals(obtido[colunas]) and spans_esperados == spans_obtidos
+    print(f'Registros:          {args.registros:,}')
+    print(f'listas (antigo):    {tempo_antigo:.3f}s, pico {pico_antigo:.1f} MB')
+    print(f'colunar (novo):     {tempo_novo:.3f}s, pico {pico_novo:.1f} MB')
+    print(f'Resultado idêntico: {"SIM" if identico else "NÃO"}')
+    return 0 if identico else 1
+
+
+# =====================================================================
+# PRÉ-FILTRO DE NOMES (recall contra o pipeline completo)
+# =====================================================================
+
+_MODELOS_ADMINISTRATIVOS = [
+    'Solicito informações sobre o andamento do processo SEI {n}.',
+    'Buraco na via em frente à quadra {n}, favor providenciar reparo.',
+    'A iluminação pública da Rua {n} está apagada há uma semana.',
+    'Reclamação sobre a demora no atendimento da Secretaria de Saúde do DF.',
+    'Gostaria de saber o horário de funcionamento da Administração Regional.',
+    'ok',
+    'Protocolo {n}',
+]
+
+_MODELOS_COM_NOME = [
+    'Meu nome é {nome} e gostaria de registrar uma reclamação ({n}).',
+    'O servidor {nome} foi muito atencioso no atendimento do dia {n}.',
+    'Sou {nome}, moradora da quadra {n}, e não recebi resposta.',
+    'Fui atendido por {nome} e o problema não foi resolvido.',
+    'minha mãe {nome_minusculo} precisa de consulta urgente',
+]
+
+
+def _gerar_manifestacoes(registros: int, semente: int = 42) -> list:
+    """Gera manifestações sintéticas, parte administrativa e parte com nomes."""
+    rng = random.Random(semente)
+    nomes = ['Maria Silva', 'João Souza', 'Ana Oliveira', 'Pedro Santos', 'Cleide Arruda', 'Wanderson Queiroz']
+    textos = []
+    for _ in range(registros):
+        nome = rng.choice(nomes)
+        modelo = rng.choice(_MODELOS_COM_NOME if rng.random() < 0.3 else _MODELOS_ADMINISTRATIVOS)
+        textos.append(modelo.format(n=rng.randint(1, 9999), nome=nome, nome_minusculo=nome.lower()))
+    return textos
+
+
+def _ler_textos(args) -> list:
+    """Textos de `--arquivo/--coluna` ou, na falta, manifestações sintéticas."""
+    if not args.arquivo:
+        return _gerar_manifestacoes(args.registros)
+    caminho = args.arquivo
+    df = pd.read_csv(caminho) if caminho.lower().endswith('.csv') else pd.read_excel(caminho)
+    return df[args.coluna].fillna("").astype(str).tolist()[:args.registros]
+
+
+def benchmark_prefiltro(args):
+    """Mede recall de nomes e textos dispensados do pré-filtro, por limiar, contra o pipeline completo."""
+    from detector import PIIDetector
+    from prefiltro import PrefiltroNomes, DetectorComPrefiltro
+
+    textos = _ler_textos(args)
+    detector = PIIDetector()
+    tempo_completo, completos = cronometrar(detector.detect_pii_batch, textos, repeticoes=1)
+    nomes_completo = [set(r['entidades']['nlp_contexto']['pessoas']) for r in completos]
+    textos_com_nome = sum(1 for nomes in nomes_completo if nomes)
+    total_nomes = sum(len(nomes) for nomes in nomes_completo)
+
+    print(f'Registros:               {len(textos):,}')
+    print(f'Pipeline completo:       {tempo_completo:.2f}s ({textos_com_nome:,} textos com nome, {total_nomes:,} nomes)')
+    print()
+    print(f'{"limiar":>6} {"dispensados":>12} {"tempo":>8} {"recall textos":>14} {"recall nomes":>13} {"outros tipos":>13}')
+
+    aprovados = []
+    for limiar in args.limiares:
+        prefiltro = PrefiltroNomes(limiar=limiar)
+        filtrado = DetectorComPrefiltro(detector, prefiltro)
+        tempo, resultados = cronometrar(filtrado.detect_pii_batch, textos, repeticoes=1)
+
+        textos_recuperados = 0
+        nomes_recuperados = 0
+        divergencias = 0
+        for completo, obtido, nomes in zip(completos, resultados, nomes_completo):
+            nomes_obtidos = set(obtido['entidades']['nlp_contexto']['pessoas'])
+            nomes_recuperados += len(nomes & nomes_obtidos)
+            if nomes and nomes_obtidos:
+                textos_recuperados += 1
+
+            # Demais entidades (regex, validação, endereço) não podem mudar
+            outros = {tipo: valor for tipo, valor in completo['entidades'].items() if tipo != 'nlp_contexto'}
+            outros_obtidos = {tipo: valor for tipo, valor in obtido['entidades'].items() if tipo != 'nlp_contexto'}
+            if outros != outros_obtidos:
+                divergencias += 1
+
+        recall_textos = textos_recuperados / textos_com_nome if textos_com_nome else 1.0
+        recall_nomes = nomes_recuperados / total_nomes if total_nomes else 1.0
+        estatisticas = prefiltro.estatisticas()
+        print(f'{limiar:>6} {estatisticas["taxa_dispensa"]*100:>11.1f}% {tempo:>7.2f}s '
+              f'{recall_textos*100:>13.2f}% {recall_nomes*100:>12.2f}% {divergencias:>13,}')
+
+        if recall_nomes >= args.recall_minimo:
+            aprovados.append(limiar)
+
+    print()
+    if not aprovados:
+        print(f'Nenhum limiar atinge recall de nomes >= {args.recall_minimo*100:.1f}%')
+        return 1
+    print(f'Maior limiar com recall de nomes >= {args.recall_minimo*100:.1f}%: {max(aprovados)}')
+    return 0
+
+
+# =====================================================================
+# LOTE DO NLP (fatias 100/50 x fatias grandes com batch_size ajustável)
+# =====================================================================
+
+def _detectar_fatias_antigo(detector, textos: list) -> list:
+    """Laço anterior: fatias fixas de 100 textos, `detect_pii_batch(batch, batch_size=50)`."""
+    resultados = []
+    for i in range(0, len(textos), 100):
+        resultados.extend(detector.detect_pii_batch(textos[i:i+100], batch_size=50))
+    return resultados
+
+
+def benchmark_lote_nlp(args):
+    """
+    Compara o laço de fatias 100/50 com `detectar_textos` em diferentes
+    batch_size do nlp.pipe, com o pipeline completo e com os componentes de
+    PIPES_NAO_USADOS desligados. A referência é sempre o pipeline completo.
+    """
+    from detector import PIIDetector
+    from processamento import desabilitar_pipes_nao_usados
+
+    # Textos distintos, para que a deduplicação não interfira na medição
+    textos = list(dict.fromkeys(_ler_textos(args)))
+    detector = PIIDetector()
+
+    tempo_antigo, esperado = cronometrar(_detectar_fatias_antigo, detector, textos, repeticoes=args.repeticoes)
+    print(f'Registros distintos:    {len(textos):,}')
+    print(f'fatias 100/50 (antigo): {tempo_antigo:.2f}s ({len(textos) / tempo_antigo:.1f} reg/s)')
+
+    identico = True
+    reduzido_identico = True
+    for pipeline in ('completo', 'reduzido'):
+        if pipeline == 'reduzido':
+            desligados = desabilitar_pipes_nao_usados(detector)
+            print(f'Componentes desligados: {", ".join(desligados) or "nenhum"}')
+        for batch_size in args.batch_sizes:
+            tempo, obtido = cronometrar(lambda: detectar_textos(detector, textos, batch_size=batch_size),
+                                        repeticoes=args.repeticoes)
+            igual = obtido == esperado
+            if pipeline == 'completo':
+                identico = identico and igual
+            else:
+                reduzido_identico = reduzido_identico and igual
+            print(f'{pipeline:<8} batch_size={batch_size:<5} {tempo:.2f}s ({len(textos) / tempo:.1f} reg/s, '
+                  f'{tempo_antigo / tempo:.2f}x){"" if igual else "  RESULTADO DIFERENTE"}')
+
+    print(f'Pipeline reduzido igual ao completo: {"SIM" if reduzido_identico else "NÃO (não use --desligar-pipes)"}')
+    print(f'Lotes iguais às fatias 100/50: {"SIM" if identico else "NÃO"}')
+    return 0 if identico else 1
+
+
+# =====================================================================
+# EXTRAÇÃO FASE 1 (um padrão por tipo x varreduras com atalhos)
+# =====================================================================
+
+def _gerar_textos_longos(registros: int, caracteres: int, semente: int = 42) -> list:
+    """Gera manifestações longas com PII e números administrativos espalhados."""
+    rng = random.Random(semente)
+    trechos = [
+        'Venho por meio desta solicitar providências quanto ao atendimento prestado. ',
+        'Conforme processo SEI 00123-{a}/2024-{b}, a demanda segue sem resposta. ',
+        'Meu CPF é {cpf} e meu RG {rg}, caso precisem confirmar o cadastro. ',
+        'Podem entrar em contato pelo e-mail usuario{a}@email.com.br ou pelo telefone (61) 9{a}-{b}. ',
+        'Moro na Rua das Flores, {b}. ',
+        'A Lei 12.527/2011, art. 5º, garante o acesso à informação. ',
+        'Segue o número de protocolo {a}{b} para referência. ',
+    ]
+    textos = []
+    for _ in range(registros):
+        partes = []
+        tamanho = 0
+        while tamanho < caracteres:
+            trecho = rng.choice(trechos).format(
+                a=rng.randint(1000, 9999), b=rng.randint(1000, 9999),
+                cpf=f'{rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(10, 99)}',
+                rg=f'{rng.randint(1, 9)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}',
+            )
+            partes.append(trecho)
+            tamanho += len(trecho)
+        textos.append(''.join(partes))
+    return textos
+
+
+def benchmark_extracao(args):
+    """Compara a FASE 1 de referência (um padrão por tipo + hierarquia) com o `ExtratorCombinado`."""
+    from extracao import ExtratorCombinado, extrair_separado
+
+    textos = _gerar_textos_longos(args.registros, args.caracteres)
+    # Sobreposições entre tipos (um candidato dentro de outro de tipo diferente)
+    textos += ['ligue 98765432', '(61) 33456789', 'tel 61 98765432', 'rua das flores 12345678, casa',
+               '12.345.678-9 e 123.456.789-09', 'Quadra 3 61 98765-4321.', 'a@b.com 98765-4321']
+    extrator = ExtratorCombinado()
+    separados = extrator.compilar_separados()
+
+    tempo_antigo, esperado = cronometrar(lambda: [extrair_separado(t, separados) for t in textos],
+                                         repeticoes=args.repeticoes)
+    tempo_novo, obtido = cronometrar(lambda: [extrator.extrair(t) for t in textos], repeticoes=args.repeticoes)
+
+    iguais = sum(1 for a, b in zip(esperado, obtido) if a == b)
+    candidatos = sum(len(spans) for spans in esperado)
+    print(f'Registros:             {args.registros:,} (~{args.caracteres:,} caracteres cada)')
+    print(f'Candidatos (FASE 1):   {candidatos:,}')
+    print(f'um padrão por tipo:    {tempo_antigo:.3f}s')
+    print(f'com atalhos:           {tempo_novo:.3f}s')
+    print(f'Speedup:               {tempo_antigo / tempo_novo:.1f}x')
+    print(f'Textos com resultado idêntico: {iguais:,}/{len(textos):,}')
+    return 0 if iguais == len(textos) else 1
+
+
+# =====================================================================
+# CONTEXTO FASE 2 (janela por candidato x índice por texto)
+# =====================================================================
+
+# =====================================================================
+# HIERARQUIA EXCLUSIVA (comparação com todos os aceitos x intervalos)
+# =====================================================================
+
+def _caso_aleatorio(rng, tipos_spans: list) -> list:
+    """Spans aleatórios com muitas sobreposições (inclusive parciais e de tamanho zero)."""
+    limite = rng.randint(1, 60)
+    spans = []
+    for _ in range(rng.randint(0, 25)):
+        inicio = rng.randint(0, limite)
+        fim = inicio + rng.choice([0, 1, 1, 2, 3, 5, 8, 13])
+        tipo = rng.choice(tipos_spans)
+        spans.append((inicio, fim, tipo, f'{tipo}{inicio}-{fim}'))
+    return spans
+
+
+def _sem_sobreposicao(spans: list) -> bool:
+    return all(b[1] <= a[0] or b[0] >= a[1] for i, a in enumerate(spans) for b in spans[i + 1:])
+
+
+def benchmark_hierarquia(args):
+    """Compara a hierarquia exclusiva e a resolução de spans com as versões anteriores."""
+    from hierarquia import (
+        ORDEM_HIERARQUIA, aplicar_hierarquia_exclusiva, aplicar_hierarquia_referencia, resolver_sobreposicoes,
+        resolver_sobreposicoes_referencia
+    )
+    from processamento import PRIORIDADE_TIPOS
+
+    # 1. Casos aleatórios de spans: mesmo resultado da referência e sem sobreposições
+    #    (a hierarquia por tipos tem diferenças intencionais, conferidas em tests/test_hierarquia.py)
+    rng = random.Random(args.semente)
+    falhas = 0
+    for _ in range(args.casos):
+        spans = _caso_aleatorio(rng, PRIORIDADE_TIPOS)
+        obtido = resolver_sobreposicoes(spans, PRIORIDADE_TIPOS)
+        if obtido != resolver_sobreposicoes_referencia(spans, PRIORIDADE_TIPOS) or not _sem_sobreposicao(obtido):
+            falhas += 1
+
+    # 2. Planilha colada no texto: muitos números, com sobreposições parciais entre tipos
+    spans = []
+    posicao = 0
+    for _ in range(args.numeros):
+        digitos = ''.join(rng.choice('0123456789') for _ in range(11))
+        spans.append((posicao, posicao + 14, 'cpf', digitos))
+        spans.append((posicao + 3, posicao + 14, 'telefone', digitos[2:]))
+        spans.append((posicao + 1, posicao + 12, 'rg', digitos[:9]))
+        posicao += rng.choice([12, 16, 20])
+
+    tempo_antigo, esperado = cronometrar(resolver_sobreposicoes_referencia, spans, PRIORIDADE_TIPOS,
+                                         repeticoes=args.repeticoes)
+    tempo_novo, obtido = cronometrar(resolver_sobreposicoes, spans, PRIORIDADE_TIPOS, repeticoes=args.repeticoes)
+
+    # 3. Hierarquia por tipos com os mesmos números em várias categorias (a referência altera a entrada)
+    numeros = [span[3] for span in spans[::3]]
+    entidades = {tipo: rng.sample(numeros, len(numeros) // 2) for tipo in ORDEM_HIERARQUIA}
+    tempo_hierarquia_antigo, _ = cronometrar(
+        lambda: aplicar_hierarquia_referencia({tipo: list(valores) for tipo, valores in entidades.items()}),
+        repeticoes=args.repeticoes)
+    tempo_hierarquia_novo, _ = cronometrar(aplicar_hierarquia_exclusiva, entidades, repeticoes=args.repeticoes)
+
+    print(f'Casos aleatórios:      {args.casos:,} ({falhas:,} divergentes)')
+    print(f'Spans (planilha):      {len(spans):,} -> {len(obtido):,} aceitos')
+    print(f'comparação com todos:  {tempo_antigo:.3f}s')
+    print(f'intervalos ordenados:  {tempo_novo:.3f}s')
+    print(f'Speedup:               {tempo_antigo / tempo_novo:.1f}x')
+    print(f'Resultado idêntico:    {"SIM" if esperado == obtido else "NÃO"}')
+    print(f'Hierarquia ({sum(map(len, entidades.values())):,} valores): list.remove '
+          f'{tempo_hierarquia_antigo:.3f}s, chaves {tempo_hierarquia_novo:.3f}s '
+          f'({tempo_hierarquia_antigo / tempo_hierarquia_novo:.1f}x)')
+    return 0 if falhas == 0 and esperado == obtido else 1
+
+
+# =====================================================================
+# SUÍTE REPRODUTÍVEL (throughput, latência e memória por tamanho)
+# =====================================================================
+
+class _PicoMemoria:
+    """Amostra a memória residente do processo em uma thread e guarda o pico."""
+
+    def __init__(self, intervalo: float = 0.02):
+        self.intervalo = intervalo
+        self.inicial_mb = None
+        self.pico_mb = None
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self._registrar()
+
+    def _registrar(self):
+        atual = memoria_processo_mb()
+        if atual is not None:
+            self.pico_mb = atual if self.pico_mb is None else max(self.pico_mb, atual)
+
+    def __enter__(self):
+        self.inicial_mb = memoria_processo_mb()
+        self._registrar()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        self._registrar()
+
+
+def _percentis(valores: list, percentis=(50, 95, 99)) -> dict:
+    """Percentis pelo posto mais próximo (sem interpolação), em ms."""
+    if not valores:
+        return {f'p{p}': None for p in percentis}
+    ordenados = sorted(valores)
+    return {f'p{p}': round(ordenados[min(len(ordenados) - 1, max(0, -(-p * len(ordenados) // 100) - 1))], 3)
+            for p in percentis}
+
+
+def _executar_tamanho(detector, textos: list, args) -> dict:
+    """Análise (núcleo de `analisar_arquivo`), mascaramento e latência por texto para um tamanho."""
+    from processamento import mascarar_textos
+
+    df = pd.DataFrame({'texto': textos})
+
+    # Análise: detecção colunar + colunas de resultado (sem cache, como o app com o cache desligado)
+    with _PicoMemoria() as memoria_analise:
+        inicio = time.perf_counter()
+        colunas, spans_lista = detectar_colunar(detector, textos, batch_size=args.batch_size)
+        montar_colunas_resultado(df, colunas)
+        tempo_analise = time.perf_counter() - inicio
+
+    # Mascaramento: caminho do app, a partir dos spans da análise
+    with _PicoMemoria() as memoria_mascaramento:
+        inicio = time.perf_counter()
+        mascarar_textos(detector, textos, 'PARCIAL', ['todos'], spans_lista=spans_lista)
+        tempo_mascaramento = time.perf_counter() - inicio
+
+    # Latência por texto (uma chamada ao detector por manifestação, como no serviço)
+    latencias = []
+    for texto in textos[:args.amostra_latencia]:
+        inicio = time.perf_counter()
+        detector.detect_pii_batch([texto])
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+    def arredondar(valor):
+        return None if valor is None else round(valor, 1)
+
+    return {
+        'registros': len(textos),
+        'com_pii': int(df['contém_pii'].sum()),
+        'analise': {
+            'segundos': round(tempo_analise, 3),
+            'registros_por_s': round(len(textos) / tempo_analise, 1) if tempo_analise > 0 else None,
+            'pico_rss_mb': arredondar(memoria_analise.pico_mb),
+            'acrescimo_rss_mb': (arredondar(memoria_analise.pico_mb - memoria_analise.inicial_mb)
+                                 if memoria_analise.pico_mb is not None else None),
+        },
+        'mascaramento': {
+            'segundos': round(tempo_mascaramento, 3),
+            'registros_por_s': round(len(textos) / tempo_mascaramento, 1) if tempo_mascaramento > 0 else None,
+            'pico_rss_mb': arredondar(memoria_mascaramento.pico_mb),
+        },
+        'latencia_ms': {'amostra': len(latencias), **_percentis(latencias)},
+    }
+
+
+def _comparar_linha_base(resultado: dict, caminho: str, tolerancia: float) -> list:
+    """Regressões de throughput (queda) e de pico de memória (aumento) acima da tolerância."""
+    with open(caminho, encoding='utf-8') as arquivo:
+        base = {item['registros']: item for item in json.load(arquivo)['tamanhos']}
+
+    regressoes = []
+    for item in resultado['tamanhos']:
+        anterior = base.get(item['registros'])
+        if anterior is None:
+            continue
+        for etapa in ('analise', 'mascaramento'):
+            antes, agora = anterior[etapa]['registros_por_s'], item[etapa]['registros_por_s']
+            if antes and agora and agora < antes * (1 - tolerancia):
+                regressoes.append(f"{item['registros']:,} registros, {etapa}: {antes:,.1f} -> {agora:,.1f} reg/s")
+        antes, agora = anterior['analise']['pico_rss_mb'], item['analise']['pico_rss_mb']
+        if antes and agora and agora > antes * (1 + tolerancia):
+            regressoes.append(f"{item['registros']:,} registros, pico de memória: {antes:,.0f} -> {agora:,.0f} MB")
+    return regressoes
+
+
+def benchmark_suite(args):
+    """
+    Suíte reprodutível: manifestações sintéticas (gerar_manifestacoes.py) em
+    vários tamanhos, medindo throughput, latência por texto e pico de RSS.
+    """
+    from gerar_manifestacoes import gerar_manifestacoes
+    from cache import assinatura_detector
+    from compartilhado import TEXTO_AQUECIMENTO
+    from paralelo import criar_detector
+
+    prefiltro = None
+    if args.prefiltro:
+        from prefiltro import PrefiltroNomes
+        prefiltro = PrefiltroNomes()
+
+    inicio = time.perf_counter()
+    detector = criar_detector(prefiltro)
+    segundos_carga = time.perf_counter() - inicio
+    detector.detect_pii_batch([TEXTO_AQUECIMENTO])
+
+    resultado = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'parametros': {'tamanhos': args.tamanhos, 'densidade': args.densidade, 'semente': args.semente,
+                       'batch_size': args.batch_size, 'prefiltro': args.prefiltro},
+        'ambiente': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                     'cpus': os.cpu_count(), 'detector': assinatura_detector(detector)},
+        'segundos_carga_modelo': round(segundos_carga, 2),
+        'tamanhos': [],
+    }
+
+    print(f'Modelo carregado em {segundos_carga:.1f}s; densidade de PII {args.densidade:.0%}, semente {args.semente}')
+    print(f'{"Registros":>10} | {"Análise":>12} | {"Mascaramento":>13} | {"Latência p50/p95/p99 (ms)":>26} | '
+          f'{"Pico RSS":>9}')
+    for tamanho in args.tamanhos:
+        textos = gerar_manifestacoes(tamanho, args.densidade, args.semente)['texto'].tolist()
+        item = _executar_tamanho(detector, textos, args)
+        resultado['tamanhos'].append(item)
+        latencia = item['latencia_ms']
+        pico = item['analise']['pico_rss_mb']
+        print(f"{tamanho:>10,} | {item['analise']['registros_por_s']:>8,.1f} r/s | "
+              f"{item['mascaramento']['registros_por_s']:>9,.1f} r/s | "
+              f"{latencia['p50']:>8.2f} {latencia['p95']:>8.2f} {latencia['p99']:>8.2f} | "
+              + (f'{pico:>6,.0f} MB' if pico is not None else '     n/d'))
+
+    saida = args.saida or os.path.join('output', f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(saida) or '.', exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f'Resultados gravados em {os.path.abspath(saida)}')
+
+    if args.linha_base:
+        regressoes = _comparar_linha_base(resultado, args.linha_base, args.tolerancia)
+        for regressao in regressoes:
+            print(f'REGRESSÃO: {regressao}')
+        print(f'Comparação com {args.linha_base}: {len(regressoes)} regressão(ões) '
+              f'(tolerância {args.tolerancia:.0%})')
+        return 1 if regressoes else 0
+    return 0
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Define os benchmarks disponíveis."""
+    parser = argparse.ArgumentParser(description='Benchmarks do Sistema de Gestão de PII.')
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_listas = sub.add_parser('listas', help='Mascaramento PARCIAL das colunas pii_*_lista')
+    p_listas.add_argument('--registros', type=int, default=20000)
+    p_listas.add_argument('--repeticoes', type=int, default=3)
+    p_listas.set_defaults(funcao=benchmark_listas)
+
+    p_colunas = sub.add_parser('colunas', help='Montagem das colunas de resultado (dicionários x colunar)')
+    p_colunas.add_argument('--registros', type=int, default=100000)
+    p_colunas.set_defaults(funcao=benchmark_colunas)
+
+    p_prefiltro = sub.add_parser('prefiltro', help='Recall do pré-filtro de nomes contra o pipeline completo')
+    p_prefiltro.add_argument('--arquivo', default=None, help='Planilha/CSV real (padrão: textos sintéticos)')
+    p_prefiltro.add_argument('--coluna', default='texto')
+    p_prefiltro.add_argument('--registros', type=int, default=2000)
+    p_prefiltro.add_argument('--limiares', type=int, nargs='+', default=[1, 2, 3])
+    p_prefiltro.add_argument('--recall-minimo', type=float, default=0.99,
+                             help='Recall de nomes exigido (sai com código 1 se nenhum limiar atingir)')
+    p_prefiltro.set_defaults(funcao=benchmark_prefiltro)
+
+    p_lote = sub.add_parser('lote-nlp', help='Fatias 100/50 x batch_size ajustável do nlp.pipe')
+    p_lote.add_argument('--arquivo', default=None, help='Planilha/CSV real (padrão: textos sintéticos)')
+    p_lote.add_argument('--coluna', default='texto')
+    p_lote.add_argument('--registros', type=int, default=5000)
+    p_lote.add_argument('--batch-sizes', type=int, nargs='+', default=[50, 128, 256, 512])
+    p_lote.add_argument('--repeticoes', type=int, default=1)
+    p_lote.set_defaults(funcao=benchmark_lote_nlp)
+
+    p_extracao = sub.add_parser('extracao', help='FASE 1: um padrão por tipo x varreduras com atalhos')
+    p_extracao.add_argument('--registros', type=int, default=500)
+    p_extracao.add_argument('--caracteres', type=int, default=20000)
+    p_extracao.add_argument('--repeticoes', type=int, default=3)
+    p_extracao.set_defaults(funcao=benchmark_extracao)
+
+
+    p_hierarquia = sub.add_parser('hierarquia', help='Hierarquia exclusiva e sobreposição de spans (casos aleatórios)')
+    p_hierarquia.add_argument('--casos', type=int, default=20000)
+    p_hierarquia.add_argument('--numeros', type=int, default=3000, help='Números na planilha colada')
+    p_hierarquia.add_argument('--semente', type=int, default=13)
+    p_hierarquia.add_argument('--repeticoes', type=int, default=3)
+    p_hierarquia.set_defaults(funcao=benchmark_hierarquia)
+
+    p_suite = sub.add_parser('suite', help='Suíte reprodutível: throughput, latência e pico de RSS por tamanho')
+    p_suite.add_argument('--tamanhos', type=int, nargs='+', default=[100, 1000, 10000])
+    p_suite.add_argument('--densidade', type=float, default=0.3, help='Fração de manifestações com PII')
+    p_suite.add_argument('--semente', type=int, default=42)
+    p_suite.add_argument('--batch-size', type=int, default=50)
+    p_suite.add_argument('--amostra-latencia', type=int, default=200,
+                         help='Textos detectados um a um para os percentis de latência')
+    p_suite.add_argument('--prefiltro', action='store_true', help='Usa o pré-filtro de nomes')
+    p_suite.add_argument('--saida', default=None, help='JSON de resultados (padrão: output/benchmark_<timestamp>.json)')
+    p_suite.add_argument('--linha-base', default=None,
+                         help='JSON de uma execução anterior; sai com código 1 se houver regressão')
+    p_suite.add_argument('--tolerancia', type=float, default=0.2,
+                         help='Variação aceita contra a linha de base (padrão: 0.2 = 20%%)')
+    p_suite.set_defaults(funcao=benchmark_suite)
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = criar_parser().parse_args(argv)
+    return args.funcao(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Consulta de Titular (Art. 18 da LGPD) - Sistema de Gestão de PII
+================================================================
+
+Responde a pedidos de titulares ("em quais manifestações aparecem os meus
+dados?") consultando o índice de titulares alimentado pelo app e por
+`processar_lote.py --indice-titulares`, sem reanalisar os arquivos.
+
+O índice guarda apenas hashes com chave secreta (HMAC): a consulta precisa
+do mesmo arquivo de chave (`<indice>.chave`) ou da variável de ambiente
+INDICE_TITULARES_CHAVE usada na indexação.
+
+Exemplos:
+    python consultar_titular.py 123.456.789-09
+    python consultar_titular.py maria.silva@email.com "(61) 99999-8888"
+    python consultar_titular.py "Maria da Silva" --tipo nome --indice cache/indice_titulares.sqlite
+    python consultar_titular.py 123.456.789-09 --json
+    python consultar_titular.py --conjuntos
+    python consultar_titular.py --remover manifestacoes_2024_01.xlsx --versao 3f2a9c1b
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from titulares import COLUNAS_TITULAR, IndiceTitulares
+
+INDICE_PADRAO = './cache/indice_titulares.sqlite'
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Define os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description='Consulta em quais arquivos analisados aparece um titular.')
+    parser.add_argument('valores', nargs='*', help='CPF, e-mail, telefone, RG ou nome (qualquer formatação)')
+    parser.add_argument('--tipo', choices=list(COLUNAS_TITULAR), default=None,
+                        help='Tipo dos valores (padrão: deduzido de cada valor)')
+    parser.add_argument('--indice', default=INDICE_PADRAO, help=f'Arquivo do índice (padrão: {INDICE_PADRAO})')
+    parser.add_argument('--json', action='store_true', help='Saída em JSON')
+    parser.add_argument('--conjuntos', action='store_true', help='Lista os arquivos indexados')
+    parser.add_argument('--remover', default=None, metavar='ARQUIVO',
+                        help='Apaga do índice as versões do arquivo com este nome')
+    parser.add_argument('--versao', default=None,
+                        help='Com --remover, apaga só a versão cuja impressão começa com este prefixo '
+                             '(veja --conjuntos)')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Executa as consultas e imprime os registros encontrados."""
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if not args.valores and not args.conjuntos and not args.remover:
+        parser.error('informe ao menos um valor, --conjuntos ou --remover')
+    if args.versao and not args.remover:
+        parser.error('--versao só é usada com --remover')
+    if not os.path.exists(args.indice):
+        print(f'Índice {args.indice} não encontrado', file=sys.stderr)
+        return 2
+
+    try:
+        indice = IndiceTitulares(args.indice)
+    except ValueError as erro:
+        print(erro, file=sys.stderr)
+        return 2
+
+    try:
+        if args.remover:
+            versoes = [conjunto['impressao'] for conjunto in indice.conjuntos()
+                       if conjunto['nome'] == args.remover and conjunto['impressao'].startswith(args.versao or '')]
+            if args.versao and len(versoes) > 1:
+                print(f'A versão {args.versao} é ambígua: {", ".join(v[:12] for v in versoes)}', file=sys.stderr)
+                return 2
+            for impressao in versoes:
+                indice.remover_conjunto(args.remover, impressao)
+            print(f'{len(versoes)} versão(ões) de {args.remover} removida(s) do índice')
+            return 0 if versoes else 1
+
+        if args.conjuntos:
+            conjuntos = indice.conjuntos()
+            if args.json:
+                print(json.dumps(conjuntos, ensure_ascii=False, indent=2))
+            for conjunto in [] if args.json else conjuntos:
+                indexado = datetime.fromtimestamp(conjunto['indexado_em']).strftime('%d/%m/%Y %H:%M')
+                print(f"{conjunto['nome']} [{conjunto['impressao'][:8]}]: {conjunto['registros']:,} registros, "
+                      f"{conjunto['entidades']:,} entidades (indexado em {indexado})")
+            return 0
+
+        resultado = {}
+        for valor in args.valores:
+            inicio = time.perf_counter()
+            encontrados = indice.buscar(valor, args.tipo)
+            resultado[valor] = encontrados
+            if args.json:
+                continue
+            print(f'{valor}: {len(encontrados)} registro(s) ({(time.perf_counter() - inicio) * 1000:.1f} ms)')
+            for item in encontrados:
+                identificador = f" [{item['identificador']}]" if item['identificador'] else ''
+                print(f"  {item['conjunto']} [{item['impressao'][:8]}], linha {item['linha'] + 1}{identificador} "
+                      f"({item['tipo']})")
+        if args.json:
+            print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return 0
+    finally:
+        indice.fechar()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Expurgo do Cache de Resultados - Sistema de Gestão de PII
+=========================================================
+
+O cache de resultados (`--cache` no lote, opção "cache" no app) guarda,
+cifrados, os resultados da detecção de cada texto, inclusive os valores
+de PII encontrados. As entradas vencem após o prazo de retenção
+(`--validade-dias`, padrão 30) e são apagadas ao abrir o cache; este
+script apaga as vencidas (ou todas) sem precisar de uma análise, para uso
+em agendamentos (cron / Agendador de Tarefas), e compacta o arquivo.
+
+Exemplos:
+    python expurgar_cache.py
+    python expurgar_cache.py --validade-dias 7
+    python expurgar_cache.py --cache cache/resultados_pii.sqlite --tudo
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from cache import VALIDADE_PADRAO_DIAS, CacheResultados
+
+CACHE_PADRAO = './cache/resultados_pii.sqlite'
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Define os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description='Apaga do cache de resultados as entradas vencidas (ou todas).')
+    parser.add_argument('--cache', default=CACHE_PADRAO, help=f'Arquivo do cache (padrão: {CACHE_PADRAO})')
+    parser.add_argument('--validade-dias', type=float, default=VALIDADE_PADRAO_DIAS,
+                        help=f'Prazo de retenção: apaga as entradas mais antigas (padrão: {VALIDADE_PADRAO_DIAS})')
+    parser.add_argument('--tudo', action='store_true', help='Apaga todas as entradas')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Expurga o cache e informa quantas entradas foram apagadas."""
+    args = criar_parser().parse_args(argv)
+    if not os.path.exists(args.cache):
+        print(f'Cache {args.cache} não encontrado', file=sys.stderr)
+        return 2
+
+    # A assinatura do detector não importa aqui: o expurgo vale para todas as entradas.
+    # Aberto sem prazo (nada é apagado ao abrir) para contar as entradas antes
+    cache = CacheResultados(args.cache, assinatura='', validade_dias=None)
+    try:
+        antes = cache.estatisticas()
+        cache.validade_dias = args.validade_dias
+        if args.tudo:
+            cache.limpar()
+        else:
+            cache.expurgar()
+        depois = cache.estatisticas()
+    finally:
+        cache.fechar()
+
+    print(f"{antes['entradas'] - depois['entradas']:,} entradas apagadas; restam {depois['entradas']:,} "
+          f"({depois['tamanho_mb']:.1f} MB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
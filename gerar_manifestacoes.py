@@ -0,0 +1,235 @@
+"""
+Gerador de Manifestações Sintéticas - Sistema de Gestão de PII
+==============================================================
+
+Gera manifestações de ouvidoria fictícias em português, com densidade de
+dados pessoais controlada, para testes e para os benchmarks
+(`python benchmark.py suite`). Os textos misturam:
+
+- CPFs válidos (dígitos verificadores pelo Módulo 11) e inválidos
+- RGs, e-mails, telefones com DDD e sem DDD (com palavra de contexto)
+- números que NÃO são PII: processos SEI, leis, protocolos, páginas
+- endereços do DF (Rua, Quadra, Conjunto) e nomes de pessoas
+
+Com `--gabarito`, cada linha traz também a quantidade de cada tipo
+inserida no texto (colunas `esperado_*`). Mesma semente, mesmos textos.
+
+Exemplos:
+    python gerar_manifestacoes.py
+    python gerar_manifestacoes.py --registros 100000 --densidade 0.3 --saida manifestacoes_100k.csv
+    python gerar_manifestacoes.py --registros 1000 --gabarito --semente 7
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+PRIMEIROS_NOMES = [
+    'Maria', 'José', 'Ana', 'João', 'Francisca', 'Antônio', 'Adriana', 'Carlos', 'Juliana', 'Paulo',
+    'Márcia', 'Pedro', 'Fernanda', 'Lucas', 'Patrícia', 'Luiz', 'Aline', 'Marcos', 'Sandra', 'Rafael',
+    'Cleide', 'Wanderson', 'Raimunda', 'Gabriel', 'Tereza', 'Rodrigo', 'Vanessa', 'Edilson',
+]
+
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+    'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Araújo', 'Arruda', 'Queiroz',
+]
+
+ASSUNTOS = [
+    'Saúde', 'Transporte', 'Iluminação Pública', 'Educação', 'Segurança', 'Limpeza Urbana',
+    'Obras', 'Atendimento', 'Meio Ambiente', 'Habitação',
+]
+
+REGIOES = ['Ceilândia', 'Taguatinga', 'Samambaia', 'Gama', 'Planaltina', 'Sobradinho', 'Guará', 'Asa Sul']
+
+# Trechos sem dado pessoal (inclusive números que a lista de imunidade deve descartar)
+TRECHOS_ADMINISTRATIVOS = [
+    'Solicito informações sobre o andamento do processo SEI {sei}.',
+    'Conforme a Lei 12.527/2011, art. 5º, peço acesso à informação.',
+    'O buraco na via principal de {regiao} continua sem reparo há {dias} dias.',
+    'A iluminação pública da quadra {quadra} está apagada desde a semana passada.',
+    'Segue o número de protocolo {protocolo} para referência.',
+    'Reclamação sobre a demora no atendimento da Secretaria de {assunto}.',
+    'O Decreto {decreto} não vem sendo cumprido pela Administração Regional.',
+    'Vide página {pagina} do Diário Oficial do DF, edição de {ano}.',
+    'Gostaria de saber o horário de funcionamento da Administração Regional de {regiao}.',
+    'Já registrei outras {dias} manifestações sobre o mesmo assunto sem resposta.',
+]
+
+# Trechos com dado pessoal: (modelo, tipo contado no gabarito)
+TRECHOS_PII = [
+    ('Meu nome é {nome} e moro em {regiao}.', 'nome'),
+    ('Sou {nome}, moradora de {regiao}, e não recebi resposta.', 'nome'),
+    ('Meu CPF é {cpf_valido}, caso precisem confirmar o cadastro.', 'cpf_validado'),
+    ('Informo o CPF {cpf_valido} do titular.', 'cpf_validado'),
+    ('CPF do requerente: {cpf_invalido}.', 'cpf_nao_validado'),
+    ('Meu RG é {rg} SSP/DF.', 'rg'),
+    ('Podem responder pelo e-mail {email}.', 'email'),
+    ('Meu telefone é {telefone_ddd}.', 'telefone'),
+    ('Contato: {telefone_ddd}, falar com {nome}.', 'telefone'),
+    ('Meu celular {telefone_sem_ddd}, pode ligar a qualquer hora.', 'telefone'),
+    ('WhatsApp: {telefone_sem_ddd}.', 'telefone'),
+    ('Moro na {endereco}.', 'endereco'),
+]
+
+TIPOS_GABARITO = ['cpf_validado', 'cpf_nao_validado', 'rg', 'email', 'telefone', 'nome', 'endereco']
+
+
+def digitos_verificadores_cpf(base: str) -> str:
+    """Dois dígitos verificadores (Módulo 11) para os 9 primeiros dígitos do CPF."""
+    digitos = [int(d) for d in base]
+    for tamanho in (9, 10):
+        soma = sum(d * (tamanho + 1 - i) for i, d in enumerate(digitos[:tamanho]))
+        resto = soma % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    return f'{digitos[9]}{digitos[10]}'
+
+
+def gerar_cpf(rng: random.Random, valido: bool = True) -> str:
+    """CPF formatado; com `valido=False`, os dígitos verificadores estão errados."""
+    base = ''.join(str(rng.randint(0, 9)) for _ in range(9))
+    while len(set(base)) == 1:   # sequências repetidas não são CPF
+        base = ''.join(str(rng.randint(0, 9)) for _ in range(9))
+    dv = digitos_verificadores_cpf(base)
+    if not valido:
+        dv = f'{(int(dv[0]) + rng.randint(1, 9)) % 10}{dv[1]}'
+    return f'{base[:3]}.{base[3:6]}.{base[6:]}-{dv}'
+
+
+def _nome(rng: random.Random) -> str:
+    return f'{rng.choice(PRIMEIROS_NOMES)} {rng.choice(SOBRENOMES)}'
+
+
+def _valores(rng: random.Random) -> dict:
+    """Valores sorteados para preencher os modelos de trecho."""
+    nome = _nome(rng)
+    usuario = nome.lower().replace(' ', '.').translate(str.maketrans('áâãéêíóôõúç', 'aaaeeiooouc'))
+    return {
+        'nome': nome,
+        'regiao': rng.choice(REGIOES),
+        'assunto': rng.choice(ASSUNTOS),
+        'cpf_valido': gerar_cpf(rng, valido=True),
+        'cpf_invalido': gerar_cpf(rng, valido=False),
+        'rg': f'{rng.randint(1, 9)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}',
+        'email': f'{usuario}{rng.randint(1, 99)}@{rng.choice(["gmail.com", "hotmail.com", "email.com.br"])}',
+        'telefone_ddd': f'(61) 9{rng.randint(6000, 9999)}-{rng.randint(1000, 9999)}',
+        'telefone_sem_ddd': f'9{rng.randint(6000, 9999)}-{rng.randint(1000, 9999)}',
+        'endereco': rng.choice([
+            f'Rua das Flores, {rng.randint(1, 999)}',
+            f'Quadra {rng.randint(1, 30)} Conjunto {rng.choice("ABCDEFGH")}, casa {rng.randint(1, 40)}',
+            f'Avenida Central, {rng.randint(1, 2000)}',
+        ]),
+        'sei': f'{rng.randint(10000, 99999)}-{rng.randint(10000000, 99999999)}/{rng.randint(2019, 2025)}-'
+               f'{rng.randint(10, 99)}',
+        'protocolo': f'{rng.randint(2019, 2025)}{rng.randint(100000, 999999)}',
+        'decreto': f'{rng.randint(30000, 45000)}/{rng.randint(2010, 2024)}',
+        'quadra': rng.randint(100, 916),
+        'dias': rng.randint(2, 90),
+        'pagina': rng.randint(1, 120),
+        'ano': rng.randint(2015, 2025),
+    }
+
+
+def gerar_manifestacao(rng: random.Random, densidade: float, max_pii: int = 3) -> tuple:
+    """
+    Uma manifestação (1 a 4 trechos administrativos + os de PII) e a contagem de PII inserida.
+
+    Args:
+        rng: Gerador de números aleatórios (controla a reprodutibilidade)
+        densidade: Probabilidade de a manifestação conter dado pessoal
+        max_pii: Máximo de trechos com dado pessoal por manifestação
+
+    Returns:
+        Tupla (texto, {tipo: quantidade})
+    """
+    valores = _valores(rng)
+    trechos = [rng.choice(TRECHOS_ADMINISTRATIVOS).format(**valores) for _ in range(rng.randint(1, 4))]
+    gabarito = dict.fromkeys(TIPOS_GABARITO, 0)
+
+    if rng.random() < densidade:
+        for _ in range(rng.randint(1, max_pii)):
+            modelo, tipo = rng.choice(TRECHOS_PII)
+            # Cada trecho com PII recebe valores novos (sem repetir o mesmo CPF no texto)
+            trecho = modelo.format(**{**_valores(rng), 'regiao': valores['regiao']})
+            trechos.insert(rng.randint(0, len(trechos)), trecho)
+            gabarito[tipo] += 1
+            if '{nome}' in modelo and tipo != 'nome':
+                gabarito['nome'] += 1
+
+    texto = ' '.join(trechos)
+    return texto, gabarito
+
+
+def gerar_manifestacoes(registros: int, densidade: float = 0.3, semente: int = 42, gabarito: bool = False,
+                        max_pii: int = 3) -> pd.DataFrame:
+    """
+    Gera o DataFrame de manifestações (mesma semente, mesmos textos).
+
+    Args:
+        registros: Quantidade de manifestações
+        densidade: Fração das manifestações com dado pessoal (0 a 1)
+        semente: Semente do gerador aleatório
+        gabarito: Inclui as colunas `esperado_<tipo>` com a PII inserida
+        max_pii: Máximo de trechos com dado pessoal por manifestação
+
+    Returns:
+        DataFrame com protocolo, data, assunto, texto (e o gabarito)
+    """
+    rng = random.Random(semente)
+    inicio = date(2024, 1, 1)
+    linhas = []
+    for i in range(registros):
+        texto, esperado = gerar_manifestacao(rng, densidade, max_pii)
+        linha = {
+            'protocolo': f'OUV-{inicio.year}-{i + 1:07d}',
+            'data': (inicio + timedelta(days=rng.randint(0, 364))).isoformat(),
+            'assunto': rng.choice(ASSUNTOS),
+            'texto': texto,
+        }
+        if gabarito:
+            linha.update({f'esperado_{tipo}': quantidade for tipo, quantidade in esperado.items()})
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Define os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description='Gera manifestações sintéticas com densidade de PII controlada.')
+    parser.add_argument('--registros', type=int, default=1000, help='Quantidade de manifestações (padrão: 1000)')
+    parser.add_argument('--densidade', type=float, default=0.3,
+                        help='Fração das manifestações com dado pessoal, 0 a 1 (padrão: 0.3)')
+    parser.add_argument('--max-pii', type=int, default=3, help='Máximo de dados pessoais por manifestação')
+    parser.add_argument('--semente', type=int, default=42, help='Semente do gerador (padrão: 42)')
+    parser.add_argument('--gabarito', action='store_true', help='Inclui colunas esperado_<tipo> com a PII inserida')
+    parser.add_argument('--saida', default=None,
+                        help='Arquivo .xlsx ou .csv (padrão: manifestacoes_ouvidoria_<timestamp>.xlsx)')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Gera e grava o arquivo de manifestações."""
+    args = criar_parser().parse_args(argv)
+    if not 0 <= args.densidade <= 1:
+        print('--densidade deve estar entre 0 e 1', file=sys.stderr)
+        return 2
+
+    df = gerar_manifestacoes(args.registros, args.densidade, args.semente, args.gabarito, args.max_pii)
+    saida = args.saida or f"manifestacoes_ouvidoria_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    pasta = os.path.dirname(saida)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    if saida.lower().endswith('.csv'):
+        df.to_csv(saida, index=False)
+    else:
+        df.to_excel(saida, index=False)
+
+    print(f'{len(df):,} manifestações gravadas em {os.path.abspath(saida)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
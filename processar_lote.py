@@ -0,0 +1,397 @@
+"""
+Processamento em Lote (sem interface) - Sistema de Gestão de PII
+================================================================
+
+Executa o mesmo pipeline do app (detecção + colunas de resultado +
+mascaramento) a partir da linha de comando, para uso em agendamentos
+noturnos (cron / Agendador de Tarefas) com grandes volumes.
+
+Não importa streamlit nem plotly, para iniciar rápido.
+
+Exemplos:
+    python processar_lote.py manifestacoes.xlsx --coluna texto
+    python processar_lote.py dados.csv --coluna texto --modo PROTECAO_TOTAL --tipos cpf email
+    python processar_lote.py dados.xlsx --coluna texto --workers 8 --log output/lote.log
+    python processar_lote.py grande.xlsx --coluna texto --streaming --tamanho-bloco 5000
+    python processar_lote.py dados.xlsx --coluna texto --prefiltro --limiar-prefiltro 1
+    python processar_lote.py versao2.xlsx --coluna texto --anterior output/analise_pii_20250101_020000.xlsx
+    python processar_lote.py dados.xlsx --coluna texto --servico http://127.0.0.1:8765
+    python processar_lote.py amostra.xlsx --coluna texto --perfil output/perfil.json
+    python processar_lote.py dados.parquet --coluna texto --colunas protocolo --formato parquet
+    python processar_lote.py dados.xlsx --coluna texto --indice-titulares cache/indice_titulares.sqlite --coluna-id protocolo
+
+Além do log de texto, cada execução grava um log estruturado (JSON por
+linha) com registros/s, ETA, memória e tempo por estágio em
+<saida>/execucao_<timestamp>.jsonl (ou em --log-execucao).
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from processamento import (
+    detectar_colunar, desabilitar_pipes_nao_usados, mascarar_textos, montar_colunas_resultado
+)
+from arquivos import erros_escrita, erros_leitura, ler_em_blocos, ler_tabela, EscritorStreaming
+from incremental import analisar_incremental, ler_analise_anterior, motivo_incompatibilidade
+from progresso import LogExecucao, Progresso, medir
+from visoes import ativar_copy_on_write, montar_visao
+
+logger = logging.getLogger('processar_lote')
+
+
+def configurar_log(arquivo_log: str = None):
+    """Configura o log no console e, opcionalmente, em arquivo."""
+    handlers = [logging.StreamHandler()]
+    if arquivo_log:
+        Path(arquivo_log).parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(logging.FileHandler(arquivo_log, encoding='utf-8'))
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s %(message)s',
+        handlers=handlers
+    )
+
+
+def processar_bloco(detector, df: pd.DataFrame, args, motor=None, progresso=None, cache=None,
+                    df_anterior: pd.DataFrame = None, instrumentacao=None, estatisticas_mascaramento: dict = None,
+                    assinatura: str = ''):
+    """
+    Analisa e mascara um bloco de registros.
+
+    Args:
+        detector: Instância de PIIDetector
+        df: Bloco de linhas do arquivo de entrada
+        args: Argumentos de linha de comando (coluna, modo, tipos, batch_size)
+        motor: MotorParalelo opcional
+        progresso: Callback opcional progresso(processados, total) da detecção
+        cache: CacheResultados opcional
+        df_anterior: Análise anterior; só linhas novas/alteradas passam pelo detector
+        instrumentacao: Progresso opcional que acumula o tempo por estágio
+        estatisticas_mascaramento: Dicionário opcional que soma os valores não
+            localizados no texto (ver `mascarar_textos`)
+        assinatura: Assinatura do detector, gravada na coluna `assinatura_deteccao`
+
+    Returns:
+        Tupla (df_analisado, df_mascarado, linhas_reaproveitadas)
+    """
+    textos = df[args.coluna].fillna("").astype(str).tolist()
+    # Antes das colunas de resultado: o arquivo mascarado tem só as colunas de entrada
+    df_entrada = montar_visao(df)
+
+    # ANÁLISE (incremental: reaproveita as linhas cujo texto não mudou)
+    if df_anterior is not None:
+        df_analisado, spans_lista, estatisticas = analisar_incremental(
+            df, args.coluna, df_anterior, detector, motor=motor, progresso=progresso, cache=cache,
+            batch_size=args.batch_size, instrumentacao=instrumentacao, assinatura=assinatura
+        )
+        reaproveitadas = estatisticas['reaproveitados']
+    else:
+        colunas, spans_lista = detectar_colunar(detector, textos, motor=motor, progresso=progresso, cache=cache,
+                                                batch_size=args.batch_size, instrumentacao=instrumentacao)
+        with medir(instrumentacao, 'montagem'):
+            df_analisado = montar_colunas_resultado(df, colunas, assinatura)
+        reaproveitadas = 0
+
+    # MASCARAMENTO (a partir dos spans, sem nova detecção): visão da entrada com o texto substituído
+    textos_mascarados = mascarar_textos(detector, textos, args.modo, args.tipos, spans_lista=spans_lista,
+                                        instrumentacao=instrumentacao, estatisticas=estatisticas_mascaramento)
+    df_mascarado = montar_visao(df_entrada, substituicoes={args.coluna: textos_mascarados})
+
+    return df_analisado, df_mascarado, reaproveitadas
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Define os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(
+        description='Detecção e mascaramento de PII em lote (sem interface Streamlit).'
+    )
+    parser.add_argument('entrada', help='Arquivo de entrada (.xlsx, .xls, .csv, .parquet, .feather ou .arrow)')
+    parser.add_argument('--coluna', required=True, help='Coluna com os textos a analisar')
+    parser.add_argument('--colunas', nargs='+', default=None,
+                        help='Demais colunas da entrada a carregar e levar à saída (padrão: todas); '
+                             'em Parquet/Feather as outras nem são lidas do disco')
+    parser.add_argument('--modo', choices=['PARCIAL', 'PROTECAO_TOTAL'], default='PARCIAL',
+                        help='Modo de mascaramento (padrão: PARCIAL)')
+    parser.add_argument('--tipos', nargs='+', default=['todos'],
+                        choices=['todos', 'cpf', 'rg', 'email', 'telefone', 'nome'],
+                        help='Tipos de dados para mascarar (padrão: todos)')
+    parser.add_argument('--saida', default='./output', help='Diretório de saída (padrão: ./output)')
+    parser.add_argument('--formato', choices=['xlsx', 'csv', 'parquet', 'feather'], default='xlsx',
+                        help='Formato dos arquivos gerados (padrão: xlsx)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processos paralelos de detecção (padrão: 1 = sequencial)')
+    parser.add_argument('--batch-size', type=int, default=50,
+                        help='Textos por lote do nlp.pipe (spaCy) dentro do detector (padrão: 50)')
+    parser.add_argument('--servico', default=None,
+                        help='Usa um serviço de detecção em execução (ex: http://127.0.0.1:8765) no lugar dos processos')
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help='Registros por bloco enviado a cada processo (padrão: 500)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Lê e grava em blocos, com memória estável para arquivos muito grandes')
+    parser.add_argument('--tamanho-bloco', type=int, default=5000,
+                        help='Linhas lidas por bloco no modo --streaming (padrão: 5000)')
+    parser.add_argument('--cache', default=None,
+                        help='Arquivo SQLite de cache de resultados (ex: ./cache/resultados_pii.sqlite)')
+    parser.add_argument('--cache-max-mb', type=float, default=512,
+                        help='Tamanho máximo do cache em MB (padrão: 512)')
+    parser.add_argument('--cache-validade-dias', type=float, default=30,
+                        help='Retenção do cache: entradas mais antigas são ignoradas e apagadas (padrão: 30); '
+                             'para expurgar sem analisar, use expurgar_cache.py')
+    parser.add_argument('--prefiltro', action='store_true',
+                        help='Pula o NLP (spaCy) em textos sem indício de nome de pessoa')
+    parser.add_argument('--limiar-prefiltro', type=int, default=1,
+                        help='Sinais de nome exigidos para enviar o texto ao NLP (padrão: 1)')
+    parser.add_argument('--desligar-pipes', action='store_true',
+                        help='Desliga componentes do spaCy que a detecção não deveria usar (parser, lemmatizer...); '
+                             'confira antes com: python benchmark.py lote-nlp')
+    parser.add_argument('--anterior', default=None,
+                        help='Análise anterior (analise_pii_*.xlsx/.csv/.parquet/.feather) para processar '
+                             'só linhas novas ou alteradas')
+    parser.add_argument('--indice-titulares', default=None,
+                        help='Índice SQLite de titulares (Art. 18 LGPD) a alimentar com as entidades detectadas '
+                             '(ex: ./cache/indice_titulares.sqlite); consulte com consultar_titular.py')
+    parser.add_argument('--coluna-id', default=None,
+                        help='Coluna com o identificador do registro (ex: protocolo) guardado no índice de titulares')
+    parser.add_argument('--substituir-titulares', action='store_true',
+                        help='Apaga do índice de titulares as versões anteriores (outro conteúdo) de um arquivo '
+                             'com o mesmo nome; sem a opção, elas continuam consultáveis')
+    parser.add_argument('--log', default=None, help='Arquivo de log de progresso/throughput')
+    parser.add_argument('--perfil', default=None,
+                        help='Grava em JSON o perfil por fase do detector (tempo do spaCy x regras, candidatos '
+                             'antes/depois da lista de imunidade); só sem --workers/--servico')
+    parser.add_argument('--log-execucao', default=None,
+                        help='Log estruturado (JSON por linha) da execução '
+                             '(padrão: <saida>/execucao_<timestamp>.jsonl)')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Executa análise e mascaramento de um arquivo."""
+    ativar_copy_on_write()
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+    if args.servico and args.prefiltro:
+        parser.error('com --servico, o pré-filtro é configurado no próprio serviço (servico_deteccao.py --prefiltro)')
+    if args.perfil and (args.servico or args.workers > 1):
+        parser.error('--perfil mede o detector deste processo: use sem --servico e com --workers 1')
+    if (args.coluna_id or args.substituir_titulares) and not args.indice_titulares:
+        parser.error('--coluna-id e --substituir-titulares só são usadas com --indice-titulares')
+    configurar_log(args.log)
+
+    caminho_entrada = Path(args.entrada)
+    inicio_total = time.perf_counter()
+
+    colunas = list(dict.fromkeys([*args.colunas, args.coluna, *filter(None, [args.coluna_id])])) \
+        if args.colunas else None
+
+    logger.info(f'Lendo {caminho_entrada}' + (' em blocos (streaming)' if args.streaming else ''))
+    try:
+        if args.streaming:
+            # O 1º bloco é lido já aqui: arquivo ausente ou corrompido falha antes do modelo
+            blocos = ler_em_blocos(caminho_entrada, args.tamanho_bloco, colunas)
+            primeiro = next(blocos, None)
+            blocos = itertools.chain([primeiro], blocos) if primeiro is not None else []
+            total = None
+        else:
+            primeiro = ler_tabela(caminho_entrada, colunas)
+            blocos = [primeiro]
+            total = len(primeiro)
+            logger.info(f'{total} registros carregados')
+    except erros_leitura() as erro:
+        logger.error(f'Erro ao ler {caminho_entrada} ({type(erro).__name__}): {erro}')
+        return 2
+
+    if primeiro is not None:
+        if args.coluna not in primeiro.columns:
+            logger.error(f"Coluna '{args.coluna}' não encontrada. "
+                         f"Disponíveis: {', '.join(map(str, primeiro.columns))}")
+            return 2
+        if args.coluna_id and args.coluna_id not in primeiro.columns:
+            logger.error(f"Coluna de identificador '{args.coluna_id}' não encontrada")
+            return 2
+
+    df_anterior = None
+    if args.anterior:
+        # Da análise anterior só interessam o texto e as colunas de resultado
+        try:
+            df_anterior = ler_analise_anterior(Path(args.anterior), args.coluna)
+        except ValueError as erro:
+            logger.error(f"Análise anterior {args.anterior} sem a coluna '{args.coluna}' ou sem todas as colunas "
+                         f"de resultado (gerada por uma versão anterior do sistema?): {erro}")
+            return 2
+
+    # Carrega o modelo só depois de validar os argumentos e as colunas da entrada
+    inicio_modelo = time.perf_counter()
+    from detector import PIIDetector
+    detector = PIIDetector()
+    desligados = desabilitar_pipes_nao_usados(detector) if args.desligar_pipes else []
+    logger.info(f'Modelo carregado em {time.perf_counter() - inicio_modelo:.1f}s'
+                + (f" (componentes desligados: {', '.join(desligados)})" if desligados else ''))
+
+    prefiltro = None
+    if args.prefiltro:
+        from prefiltro import PrefiltroNomes, DetectorComPrefiltro
+        prefiltro = PrefiltroNomes(limiar=args.limiar_prefiltro)
+        detector = DetectorComPrefiltro(detector, prefiltro)
+
+    indice_titulares = None
+    if args.indice_titulares:
+        from titulares import IndiceTitulares, impressao_arquivo
+        indice_titulares = IndiceTitulares(args.indice_titulares)
+        conjunto_titulares = indice_titulares.iniciar_conjunto(
+            caminho_entrada.name, impressao_arquivo(caminho_entrada), substituir=args.substituir_titulares)
+    entradas_titulares = 0
+
+    # Versão/configuração do detector: chave do cache e coluna `assinatura_deteccao` da análise
+    from cache import assinatura_detector
+    assinatura = assinatura_detector(detector) + (f';servico={args.servico}' if args.servico else '')
+    if df_anterior is not None:
+        motivo = motivo_incompatibilidade(df_anterior, args.coluna, assinatura)
+        if motivo:
+            logger.error(f'Análise anterior {args.anterior} não reaproveitável: {motivo}')
+            return 2
+        logger.info(f'Análise anterior: {len(df_anterior)} registros (modo incremental)')
+
+    cache = None
+    if args.cache:
+        from cache import CacheResultados
+        cache = CacheResultados(args.cache, assinatura, tamanho_maximo_mb=args.cache_max_mb,
+                                validade_dias=args.cache_validade_dias)
+
+    perfil = None
+    if args.perfil:
+        from perfil import DetectorPerfilado, PerfilPipeline
+        perfil = PerfilPipeline()
+        detector = DetectorPerfilado(detector, perfil)
+
+    motor = None
+    if args.servico:
+        from servico import ClienteServico
+        motor = ClienteServico(args.servico, chunk_size=args.chunk_size)
+        saude = motor.saude()
+        logger.info(f"Serviço de detecção: {args.servico} ({saude['detectores']} detector(es))")
+    elif args.workers > 1:
+        from paralelo import MotorParalelo
+        motor = MotorParalelo(n_workers=args.workers, chunk_size=args.chunk_size, prefiltro=prefiltro,
+                              desligar_pipes=args.desligar_pipes).iniciar()
+        logger.info(f'Motor paralelo: {motor.n_workers} processos, blocos de {motor.chunk_size}')
+
+    output_dir = Path(args.saida)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    arquivo_analise = output_dir / f'analise_pii_{timestamp}.{args.formato}'
+    arquivo_mascarado = output_dir / f'dados_mascarados_{args.modo}_{timestamp}.{args.formato}'
+
+    log_execucao = LogExecucao(args.log_execucao or output_dir / f'execucao_{timestamp}.jsonl')
+    log_execucao.registrar('configuracao', entrada=str(caminho_entrada), coluna=args.coluna, modo=args.modo,
+                           streaming=args.streaming, workers=args.workers, servico=args.servico,
+                           prefiltro=args.prefiltro, cache=args.cache, incremental=args.anterior is not None)
+    acompanhamento = Progresso('Processamento', total=total, logger=logger, log=log_execucao)
+    processados = 0
+    com_pii = 0
+    reaproveitados = 0
+    estatisticas_mascaramento = {}
+
+    concluido = False
+    try:
+        with EscritorStreaming(arquivo_analise, args.formato) as escritor_analise, \
+                EscritorStreaming(arquivo_mascarado, args.formato) as escritor_mascarado:
+            for bloco in blocos:
+                df_analisado, df_mascarado, reaproveitadas = processar_bloco(
+                    detector, bloco, args, motor,
+                    progresso=lambda n, _total: acompanhamento(processados + n),
+                    cache=cache,
+                    df_anterior=df_anterior,
+                    instrumentacao=acompanhamento,
+                    estatisticas_mascaramento=estatisticas_mascaramento,
+                    assinatura=assinatura
+                )
+
+                with acompanhamento.medir('escrita'):
+                    try:
+                        escritor_analise.escrever(df_analisado)
+                        escritor_mascarado.escrever(df_mascarado)
+                    except erros_escrita() as erro:
+                        logger.error(f'Erro ao gravar a saída em {output_dir} ({type(erro).__name__}): {erro}')
+                        return 2
+
+                if indice_titulares is not None:
+                    with acompanhamento.medir('titulares'):
+                        entradas_titulares += indice_titulares.adicionar(
+                            conjunto_titulares, df_analisado, inicio=processados, coluna_id=args.coluna_id)
+
+                processados += len(bloco)
+                acompanhamento(processados)
+                com_pii += int(df_analisado['contém_pii'].sum())
+                reaproveitados += reaproveitadas
+                del df_analisado, df_mascarado
+        concluido = True
+    finally:
+        if motor is not None:
+            motor.encerrar()
+        if not concluido:
+            # Saída com erro: não deixa análise/arquivo mascarado parciais em disco
+            arquivo_analise.unlink(missing_ok=True)
+            arquivo_mascarado.unlink(missing_ok=True)
+
+    acompanhamento.finalizar()
+    decorrido = time.perf_counter() - inicio_total
+    if cache is not None:
+        estatisticas = cache.estatisticas()
+        log_execucao.registrar('cache', **estatisticas)
+        logger.info(f"Cache: {estatisticas['hits']} hits / {estatisticas['misses']} misses "
+                    f"({estatisticas['taxa_acerto']*100:.1f}% de acerto, {estatisticas['entradas']} entradas, "
+                    f"{estatisticas['tamanho_mb']:.1f} MB)")
+        cache.fechar()
+    if indice_titulares is not None:
+        log_execucao.registrar('titulares', conjunto=caminho_entrada.name, entradas=entradas_titulares)
+        logger.info(f'Índice de titulares: {entradas_titulares} entradas de {caminho_entrada.name} '
+                    f'em {Path(args.indice_titulares).absolute()}')
+        indice_titulares.fechar()
+    if prefiltro is not None:
+        estatisticas = prefiltro.estatisticas()
+        log_execucao.registrar('prefiltro', **estatisticas)
+        logger.info(f"Pré-filtro: {estatisticas['dispensados']}/{estatisticas['avaliados']} textos dispensaram o NLP "
+                    f"({estatisticas['taxa_dispensa']*100:.1f}%)")
+    if perfil is not None:
+        perfil.exportar_json(args.perfil)
+        resumo_perfil = perfil.resumo()
+        log_execucao.registrar('perfil', **resumo_perfil)
+        logger.info('Perfil por fase: ' + ', '.join(
+            f"{fase} {dados['segundos']:.1f}s" for fase, dados in resumo_perfil['fases'].items()
+        ) + f' (salvo em {Path(args.perfil).absolute()})')
+        candidatos = resumo_perfil['candidatos']
+        logger.info(f"Candidatos numéricos (aprox.): {candidatos['numericos']} antes e "
+                    f"{candidatos['apos_imunidade']} depois da lista de imunidade - {candidatos['observacao']}")
+    if df_anterior is not None:
+        logger.info(f'Incremental: {processados - reaproveitados} linhas novas/alteradas analisadas, '
+                    f'{reaproveitados} reaproveitadas da análise anterior')
+    if estatisticas_mascaramento.get('textos_detector'):
+        log_execucao.registrar('mascaramento', **estatisticas_mascaramento)
+        logger.warning(f"Mascaramento: {estatisticas_mascaramento['nao_localizados']} valores detectados não "
+                       f"localizados no texto; {estatisticas_mascaramento['textos_detector']} textos mascarados "
+                       f"pelo detector (apply_masking_batch)")
+    logger.info(f'Registros com PII: {com_pii}/{processados}')
+    logger.info(f'Análise salva em {arquivo_analise.absolute()}')
+    logger.info(f'Arquivo mascarado salvo em {arquivo_mascarado.absolute()}')
+    logger.info(f'Log da execução em {log_execucao.caminho.absolute()}')
+    logger.info(f'Concluído em {decorrido:.1f}s ({processados / decorrido if decorrido > 0 else 0:.1f} reg/s)')
+    log_execucao.registrar('concluido', segundos=round(decorrido, 3), processados=processados, com_pii=com_pii)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Serviço de Detecção (HTTP) - Sistema de Gestão de PII
+=====================================================
+
+Sobe um serviço local com detectores aquecidos, para que o app e outros
+sistemas (ex: entrada de manifestações da ouvidoria) usem a detecção sem
+carregar o modelo spaCy cada um. Detalhes em src/servico.py.
+
+Não importa streamlit nem plotly, para iniciar rápido.
+
+Exemplos:
+    python servico_deteccao.py
+    python servico_deteccao.py --host 0.0.0.0 --porta 8765 --detectores 2
+    python servico_deteccao.py --max-lote 512 --espera-ms 20 --max-pendentes 50000 --prefiltro
+
+Uso pelo app: em "Opções de Execução", informe http://127.0.0.1:8765 em "Serviço de detecção".
+Uso pelo lote: python processar_lote.py dados.xlsx --coluna texto --servico http://127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from paralelo import criar_detector
+from servico import ServicoDeteccao
+
+logger = logging.getLogger('servico_deteccao')
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Define os argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description='Serviço HTTP de detecção e mascaramento de PII.')
+    parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta (padrão: 127.0.0.1)')
+    parser.add_argument('--porta', type=int, default=8765, help='Porta (padrão: 8765)')
+    parser.add_argument('--detectores', type=int, default=1,
+                        help='Detectores aquecidos, em threads deste processo (cada um carrega o modelo spaCy; '
+                             'o GIL limita o ganho: para usar vários núcleos, suba vários serviços; padrão: 1)')
+    parser.add_argument('--max-lote', type=int, default=256,
+                        help='Máximo de textos reunidos em uma chamada ao detector (padrão: 256)')
+    parser.add_argument('--espera-ms', type=float, default=10,
+                        help='Espera máxima por outros pedidos para completar o lote (padrão: 10 ms)')
+    parser.add_argument('--max-pendentes', type=int, default=20000,
+                        help='Textos na fila a partir dos quais o serviço responde 503 (padrão: 20000)')
+    parser.add_argument('--desligar-pipes', action='store_true',
+                        help='Desliga componentes do spaCy que a detecção não deveria usar (parser, lemmatizer...)')
+    parser.add_argument('--prefiltro', action='store_true',
+                        help='Só envia ao spaCy os textos com sinais de nome')
+    parser.add_argument('--limiar-prefiltro', type=int, default=1,
+                        help='Sinais de nome mínimos para usar o NLP (padrão: 1)')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Carrega os detectores e atende até Ctrl+C."""
+    args = criar_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    prefiltro = None
+    if args.prefiltro:
+        from prefiltro import PrefiltroNomes
+        prefiltro = PrefiltroNomes(limiar=args.limiar_prefiltro)
+
+    servico = ServicoDeteccao(
+        lambda: criar_detector(prefiltro, args.desligar_pipes),
+        n_detectores=args.detectores,
+        max_lote=args.max_lote,
+        espera_ms=args.espera_ms,
+        max_pendentes=args.max_pendentes,
+    )
+
+    async def executar():
+        inicio = time.perf_counter()
+        logger.info(f'Carregando {args.detectores} detector(es)...')
+        servidor = await servico.iniciar(args.host, args.porta)
+        logger.info(f'Detectores prontos em {time.perf_counter() - inicio:.1f}s; '
+                    f'atendendo em http://{args.host}:{args.porta}')
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await servico.encerrar()
+            logger.info(f'Serviço encerrado: {servico.estatisticas()}')
+
+    try:
+        asyncio.run(executar())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
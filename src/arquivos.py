@@ -0,0 +1,512 @@
+"""
+Leitura e Escrita em Blocos (Streaming)
+=======================================
+
+Lê planilhas Excel, CSV, Parquet e Arrow IPC (Feather) em blocos de
+tamanho limitado e grava a saída em modo streaming, para que o consumo de
+memória fique estável mesmo em arquivos com centenas de milhares de
+registros.
+
+- .xlsx: openpyxl em modo read-only / write-only
+- .csv: pandas com `chunksize` / gravação incremental em modo append
+- .xls: formato legado sem leitura incremental (lido de uma vez e fatiado)
+- .parquet / .feather / .arrow: pyarrow (opcional), com o arquivo mapeado
+  em memória e leitura só das colunas pedidas (`colunas`); a gravação
+  acrescenta um row group / record batch por bloco; se um bloco traz
+  decimais ou letras numa coluna que era inteira, a coluna é alargada
+  (float/texto) e o já gravado é reescrito, sem conversão com perda
+
+Parquet e Feather evitam o custo de interpretar e gerar XML do Excel, que
+domina a E/S em arquivos grandes. O Feather é gravado sem compressão, para
+que a leitura mapeada não copie os dados.
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# Extensão -> formato
+FORMATOS_ARQUIVO = {
+    '.xlsx': 'xlsx', '.xlsm': 'xlsx', '.xls': 'xls', '.csv': 'csv',
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.feather': 'feather', '.arrow': 'feather', '.ipc': 'feather',
+}
+
+# Valores lidos como NaN nas colunas numéricas quando `ler_tabela` recebe `como_texto`
+_VALORES_NA = ['', 'nan', 'NaN', 'NA', 'N/A', 'null', 'NULL', 'None']
+
+# Extensões aceitas no upload do app
+EXTENSOES_ENTRADA = ['xlsx', 'xls', 'csv', 'parquet', 'feather', 'arrow']
+
+# Formatos de saída -> tipo MIME (download no app)
+TIPOS_MIME = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'feather': 'application/vnd.apache.arrow.file',
+}
+
+
+def _pyarrow():
+    """Importa o pyarrow (dependência opcional, só para Parquet/Feather)."""
+    try:
+        import pyarrow
+    except ImportError as erro:
+        raise ImportError('Parquet e Feather exigem o pacote pyarrow: pip install pyarrow') from erro
+    return pyarrow
+
+
+def erros_leitura() -> tuple:
+    """
+    Exceções de um arquivo ausente, ilegível ou sem as colunas pedidas.
+
+    Além de ValueError (colunas faltando, CSV malformado), o arquivo pode
+    não existir (OSError), não ser um .xlsx válido (BadZipFile,
+    InvalidFileException), ter colunas ausentes no Parquet (KeyError) ou
+    dados Arrow corrompidos (ArrowInvalid, se o pyarrow estiver instalado).
+    """
+    from zipfile import BadZipFile
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    erros = (ValueError, OSError, KeyError, BadZipFile, InvalidFileException, ImportError)
+    try:
+        import pyarrow
+    except ImportError:
+        return erros
+    return erros + (pyarrow.ArrowInvalid,)
+
+
+def erros_escrita() -> tuple:
+    """
+    Exceções ao gravar a saída: disco cheio/sem permissão (OSError), blocos
+    com colunas diferentes (ValueError) ou valores que o Arrow não converte.
+    """
+    erros = (ValueError, OSError, ImportError)
+    try:
+        import pyarrow
+    except ImportError:
+        return erros
+    return erros + (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, pyarrow.ArrowNotImplementedError)
+
+
+def identificar_formato(origem, formato: str = None) -> str:
+    """
+    Formato do arquivo ('xlsx', 'xls', 'csv', 'parquet' ou 'feather').
+
+    Args:
+        origem: Caminho ou arquivo enviado (com atributo `name`, ex: upload do Streamlit)
+        formato: Formato explícito (tem precedência sobre a extensão)
+    """
+    if formato:
+        return formato
+    sufixo = Path(str(getattr(origem, 'name', origem))).suffix.lower()
+    return FORMATOS_ARQUIVO.get(sufixo, 'xlsx')
+
+
+def _fonte_arrow(origem):
+    """Arquivo mapeado em memória (caminho) ou leitor sem cópia sobre os bytes (upload/buffer)."""
+    pa = _pyarrow()
+    if isinstance(origem, (str, Path)):
+        return pa.memory_map(str(origem), 'r')
+    return pa.BufferReader(origem.getbuffer())
+
+
+def _para_pandas(tabela, inicio: int = 0) -> pd.DataFrame:
+    """Converte uma tabela Arrow, numerando as linhas a partir de `inicio`."""
+    df = tabela.to_pandas(split_blocks=True)
+    df.index = range(inicio, inicio + len(df))
+    return df
+
+
+def _projetar(dados, colunas: list):
+    """Seleciona `colunas` de uma tabela/record batch Arrow (ValueError se faltar alguma)."""
+    if colunas is None:
+        return dados
+    faltando = [coluna for coluna in colunas if coluna not in dados.schema.names]
+    if faltando:
+        raise ValueError(f"Colunas não encontradas: {', '.join(map(str, faltando))}")
+    return dados.select(colunas)
+
+
+def ler_tabela(origem, colunas: list = None, formato: str = None, como_texto: list = None) -> pd.DataFrame:
+    """
+    Lê o arquivo inteiro, opcionalmente só com algumas colunas.
+
+    Em Parquet/Feather as colunas não pedidas nem são lidas do disco.
+
+    Args:
+        origem: Caminho do arquivo ou arquivo enviado (io.BytesIO com `name`)
+        colunas: Colunas a carregar (None = todas)
+        formato: Formato explícito (padrão: extensão de `origem`)
+        como_texto: Colunas lidas como texto em CSV/Excel, sem converter números
+            ('12345678909' não vira 12345678909.0) nem células vazias em NaN
+
+    Raises:
+        ValueError: Se alguma coluna pedida não existir no arquivo
+    """
+    formato = identificar_formato(origem, formato)
+
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+        with _fonte_arrow(origem) as fonte:
+            return _para_pandas(pq.read_table(fonte, columns=colunas))
+
+    if formato == 'feather':
+        with _fonte_arrow(origem) as fonte:
+            return _para_pandas(_projetar(_pyarrow().ipc.open_file(fonte).read_all(), colunas))
+
+    opcoes = {}
+    if como_texto:
+        # Só as colunas de texto deixam de reconhecer vazios como NaN; as demais mantêm o padrão
+        opcoes = {'dtype': {coluna: str for coluna in como_texto}, 'keep_default_na': False,
+                  'na_values': {coluna: _VALORES_NA for coluna in colunas or [] if coluna not in como_texto}}
+    if formato == 'csv':
+        return pd.read_csv(origem, usecols=colunas, **opcoes)
+    return pd.read_excel(origem, usecols=colunas, **opcoes)
+
+
+def _blocos_arrow(lotes, tamanho_bloco: int):
+    """Reagrupa record batches Arrow em DataFrames de `tamanho_bloco` linhas."""
+    pa = _pyarrow()
+    inicio = 0
+    pendentes = []
+    linhas = 0
+
+    for lote in lotes:
+        pendentes.append(lote)
+        linhas += lote.num_rows
+        while linhas >= tamanho_bloco:
+            tabela = pa.Table.from_batches(pendentes)
+            yield _para_pandas(tabela.slice(0, tamanho_bloco), inicio)
+            inicio += tamanho_bloco
+            resto = tabela.slice(tamanho_bloco)
+            pendentes = resto.to_batches()
+            linhas = resto.num_rows
+
+    if linhas:
+        yield _para_pandas(pa.Table.from_batches(pendentes), inicio)
+
+
+def ler_em_blocos(caminho, tamanho_bloco: int = 5000, colunas: list = None):
+    """
+    Lê o arquivo em blocos de até `tamanho_bloco` linhas.
+
+    Args:
+        caminho: Caminho do arquivo (.xlsx, .xls, .csv, .parquet, .feather ou .arrow)
+        tamanho_bloco: Quantidade máxima de linhas por bloco
+        colunas: Colunas a carregar (None = todas)
+
+    Yields:
+        DataFrames com as linhas de cada bloco (índice contínuo entre blocos)
+    """
+    caminho = Path(caminho)
+    formato = identificar_formato(caminho)
+
+    if formato == 'csv':
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco, usecols=colunas)
+        return
+
+    if formato == 'xls':
+        df = pd.read_excel(caminho, usecols=colunas)
+        for i in range(0, len(df), tamanho_bloco):
+            yield df.iloc[i:i+tamanho_bloco]
+        return
+
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+        with _fonte_arrow(caminho) as fonte:
+            arquivo = pq.ParquetFile(fonte)
+            yield from _blocos_arrow(arquivo.iter_batches(batch_size=tamanho_bloco, columns=colunas), tamanho_bloco)
+        return
+
+    if formato == 'feather':
+        with _fonte_arrow(caminho) as fonte:
+            leitor = _pyarrow().ipc.open_file(fonte)
+            lotes = (_projetar(leitor.get_batch(i), colunas) for i in range(leitor.num_record_batches))
+            yield from _blocos_arrow(lotes, tamanho_bloco)
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = workbook.active.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+
+        nomes = [str(c) if c is not None else f'Unnamed: {i}' for i, c in enumerate(cabecalho)]
+        indices = None
+        if colunas is not None:
+            faltando = [coluna for coluna in colunas if coluna not in nomes]
+            if faltando:
+                raise ValueError(f"Colunas não encontradas: {', '.join(map(str, faltando))}")
+            indices = [nomes.index(coluna) for coluna in colunas]
+        colunas = nomes if indices is None else [nomes[i] for i in indices]
+        inicio = 0
+        bloco = []
+
+        for linha in linhas:
+            if indices is not None:
+                linha = tuple(linha[i] if i < len(linha) else None for i in indices)
+            bloco.append(linha)
+            if len(bloco) >= tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=colunas, index=range(inicio, inicio + len(bloco)))
+                inicio += len(bloco)
+                bloco = []
+
+        if bloco:
+            yield pd.DataFrame(bloco, columns=colunas, index=range(inicio, inicio + len(bloco)))
+    finally:
+        workbook.close()
+
+
+def _tabela_arrow(df: pd.DataFrame):
+    """
+    Converte um bloco para Arrow, com os tipos inferidos do próprio bloco.
+
+    Colunas de texto com valores de tipos misturados (comum em planilhas)
+    são gravadas como texto.
+    """
+    pa = _pyarrow()
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for coluna in df.columns:
+            if df[coluna].dtype != object:
+                continue
+            try:
+                pa.array(df[coluna], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[coluna] = df[coluna].map(lambda valor: None if pd.isna(valor) else str(valor))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _tipo_comum(pa, gravado, novo):
+    """
+    Tipo Arrow que representa sem perda os valores dos dois tipos.
+
+    Inteiros de larguras diferentes viram int64, inteiros e decimais viram
+    float64; qualquer outra divergência (ex: código numérico nos primeiros
+    blocos e alfanumérico depois) vira texto.
+    """
+    if gravado == novo or pa.types.is_null(novo):
+        return gravado
+    if pa.types.is_null(gravado):
+        return novo
+    if pa.types.is_integer(gravado) and pa.types.is_integer(novo):
+        return pa.int64()
+    if all(pa.types.is_integer(tipo) or pa.types.is_floating(tipo) for tipo in (gravado, novo)):
+        return pa.float64()
+    if pa.types.is_large_string(gravado) or pa.types.is_large_string(novo):
+        return pa.large_string()
+    return pa.string()
+
+
+def _esquema_comum(pa, esquema, novo, como_texto: bool = False):
+    """
+    Esquema que acomoda os blocos já gravados (`esquema`) e o bloco `novo`.
+
+    Args:
+        como_texto: Colunas divergentes viram texto direto (quando a
+            conversão numérica falhou, ex: inteiro acima de 2^53 em float64)
+    """
+    if esquema.names != novo.names:
+        raise ValueError(f'Bloco com colunas diferentes das já gravadas: {novo.names} (esperado: {esquema.names})')
+    return pa.schema([
+        campo if campo.type == campo_novo.type or pa.types.is_null(campo_novo.type)
+        else campo.with_type(pa.string() if como_texto else _tipo_comum(pa, campo.type, campo_novo.type))
+        for campo, campo_novo in zip(esquema, novo)
+    ])
+
+
+class EscritorStreaming:
+    """
+    Grava DataFrames em blocos sem manter o arquivo inteiro em memória.
+
+    Uso:
+        with EscritorStreaming('saida.xlsx') as escritor:
+            for bloco in blocos:
+                escritor.escrever(bloco)
+    """
+
+    def __init__(self, destino, formato: str = None, nome_aba: str = 'Sheet1'):
+        """
+        Args:
+            destino: Caminho do arquivo ou buffer (io.BytesIO)
+            formato: 'xlsx', 'csv', 'parquet' ou 'feather' (padrão: extensão do destino)
+            nome_aba: Nome da aba no Excel
+        """
+        self.destino = destino
+        self.formato = identificar_formato(destino, formato)
+        self.nome_aba = nome_aba
+        self.linhas_escritas = 0
+        self._workbook = None
+        self._aba = None
+        self._escritor_arrow = None
+        self._esquema = None
+        self._cabecalho_escrito = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def escrever(self, df: pd.DataFrame):
+        """Acrescenta as linhas do bloco ao arquivo de saída."""
+        if self.formato == 'csv':
+            df.to_csv(
+                self.destino,
+                mode='a' if self._cabecalho_escrito else 'w',
+                header=not self._cabecalho_escrito,
+                index=False,
+                encoding='utf-8' if self._cabecalho_escrito else 'utf-8-sig'
+            )
+        elif self.formato in ('parquet', 'feather'):
+            self._escrever_arrow(df)
+        else:
+            if self._workbook is None:
+                from openpyxl import Workbook
+                self._workbook = Workbook(write_only=True)
+                self._aba = self._workbook.create_sheet(self.nome_aba)
+
+            if not self._cabecalho_escrito:
+                self._aba.append([str(c) for c in df.columns])
+
+            # Valores ausentes viram células vazias (como no to_excel)
+            valores = df.astype(object).where(df.notna(), None)
+            for linha in valores.itertuples(index=False, name=None):
+                self._aba.append(linha)
+
+        self._cabecalho_escrito = True
+        self.linhas_escritas += len(df)
+
+    def nova_aba(self, nome_aba: str):
+        """Passa a gravar os blocos seguintes em uma nova aba (só Excel)."""
+        if self.formato != 'xlsx':
+            raise ValueError(f'Abas só existem no formato xlsx (formato atual: {self.formato})')
+        if self._workbook is None:
+            from openpyxl import Workbook
+            self._workbook = Workbook(write_only=True)
+        self._aba = self._workbook.create_sheet(nome_aba)
+        self._cabecalho_escrito = False
+
+    def _escrever_arrow(self, df: pd.DataFrame):
+        """
+        Acrescenta o bloco como row group (Parquet) ou record batch (Feather).
+
+        O esquema vem do 1º bloco. Se um bloco seguinte não cabe nele (ex:
+        coluna inteira que passa a ter decimais ou letras), a coluna é
+        alargada e o que já foi gravado é reescrito no esquema novo; nenhum
+        valor é convertido com perda.
+        """
+        pa = _pyarrow()
+        tabela = _tabela_arrow(df.rename(columns=str))
+
+        if self._esquema is None:
+            # Colunas só com vazios no 1º bloco ficam como texto nos seguintes
+            self._esquema = pa.schema([
+                campo.with_type(pa.string()) if pa.types.is_null(campo.type) else campo
+                for campo in tabela.schema
+            ])
+            self._abrir_arrow(self.destino)
+        else:
+            esquema = _esquema_comum(pa, self._esquema, tabela.schema)
+            if esquema != self._esquema:
+                self._reescrever_arrow(esquema)
+
+        try:
+            tabela = tabela.cast(self._esquema)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            self._reescrever_arrow(_esquema_comum(pa, self._esquema, tabela.schema, como_texto=True))
+            tabela = tabela.cast(self._esquema)
+        self._escritor_arrow.write_table(tabela)
+
+    def _abrir_arrow(self, destino):
+        pa = _pyarrow()
+        if self.formato == 'parquet':
+            import pyarrow.parquet as pq
+            self._escritor_arrow = pq.ParquetWriter(destino, self._esquema)
+        else:
+            opcoes = pa.ipc.IpcWriteOptions(compression=None)
+            self._escritor_arrow = pa.ipc.new_file(destino, self._esquema, options=opcoes)
+
+    def _lotes_gravados(self, fonte):
+        """Record batches já gravados em `fonte` (arquivo mapeado ou buffer)."""
+        if self.formato == 'parquet':
+            import pyarrow.parquet as pq
+            yield from pq.ParquetFile(fonte).iter_batches()
+        else:
+            leitor = _pyarrow().ipc.open_file(fonte)
+            for i in range(leitor.num_record_batches):
+                yield leitor.get_batch(i)
+
+    def _reescrever_arrow(self, esquema):
+        """Regrava no `esquema` alargado os blocos já escritos e segue gravando nele."""
+        pa = _pyarrow()
+        self._escritor_arrow.close()
+        if isinstance(self.destino, (str, Path)):
+            # O já gravado é movido para um temporário e copiado de volta no esquema novo
+            anterior = Path(f'{self.destino}.anterior')
+            os.replace(self.destino, anterior)
+            fonte = pa.memory_map(str(anterior), 'r')
+        else:
+            dados = self.destino.getvalue()
+            self.destino.seek(0)
+            self.destino.truncate()
+            anterior, fonte = None, pa.BufferReader(dados)
+
+        esquema_gravado = self._esquema
+        try:
+            while True:
+                self._esquema = esquema
+                self._abrir_arrow(self.destino)
+                try:
+                    for lote in self._lotes_gravados(fonte):
+                        self._escritor_arrow.write_table(pa.Table.from_batches([lote]).cast(esquema))
+                    return
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    # Ex: inteiro acima de 2^53 não cabe em float64: as colunas alargadas viram texto
+                    self._escritor_arrow.close()
+                    if anterior is None:
+                        self.destino.seek(0)
+                        self.destino.truncate()
+                    esquema = _esquema_comum(pa, esquema_gravado, esquema, como_texto=True)
+        finally:
+            fonte.close()
+            if anterior is not None:
+                anterior.unlink(missing_ok=True)
+
+    def fechar(self):
+        """Finaliza o arquivo (no Excel, grava o workbook em disco/buffer)."""
+        if self.formato in ('parquet', 'feather'):
+            if self._escritor_arrow is not None:
+                self._escritor_arrow.close()
+                self._escritor_arrow = None
+        elif self.formato != 'csv':
+            if self._workbook is None:
+                from openpyxl import Workbook
+                self._workbook = Workbook(write_only=True)
+                self._workbook.create_sheet(self.nome_aba)
+            self._workbook.save(self.destino)
+            self._workbook = None
+
+
+def salvar_streaming(df: pd.DataFrame, destino, formato: str = None, tamanho_bloco: int = 5000):
+    """
+    Grava um DataFrame inteiro usando o escritor streaming, bloco a bloco.
+
+    Args:
+        df: DataFrame a gravar
+        destino: Caminho do arquivo ou buffer (io.BytesIO)
+        formato: 'xlsx', 'csv', 'parquet' ou 'feather' (padrão: extensão do destino)
+        tamanho_bloco: Linhas convertidas por vez
+    """
+    with EscritorStreaming(destino, formato) as escritor:
+        for i in range(0, len(df), tamanho_bloco):
+            escritor.escrever(df.iloc[i:i+tamanho_bloco])
+        if len(df) == 0:
+            escritor.escrever(df)
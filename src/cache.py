@@ -0,0 +1,367 @@
+"""
+Cache Persistente de Resultados de Detecção
+===========================================
+
+Guarda em SQLite o resultado completo de `detect_pii` por texto, com
+chave de conteúdo (hash do texto + assinatura do detector). Textos
+repetidos entre execuções (extrações mensais sobrepostas, modelos de
+manifestação) não passam de novo pelo pipeline.
+
+- Chave: HMAC-SHA256 (chave secreta) de assinatura do detector + texto
+- Remoção LRU quando o tamanho total passa do limite configurado; o total
+  é mantido em uma tabela de metadados a cada gravação, sem somar a tabela
+- Estatísticas de acerto (hits / misses) por instância
+
+O resultado contém os valores de PII encontrados (CPFs, nomes...), por
+isso nada é guardado em claro:
+
+- o valor é cifrado com AES-256-GCM (pacote `cryptography`), com uma
+  chave derivada do próprio texto e de uma chave secreta
+  (`resultados_pii.chave` ao lado do banco, permissão 0600, ou a variável
+  CACHE_RESULTADOS_CHAVE em hexadecimal): quem tem o banco sem os textos
+  originais e sem a chave não lê os resultados; entradas adulteradas ou
+  trocadas de linha falham na autenticação e contam como ausentes
+- retenção: entradas com mais de `validade_dias` (padrão 30) são
+  ignoradas e apagadas; `python expurgar_cache.py` apaga as vencidas
+  (ou todas, com --tudo) e compacta o arquivo
+- apagamentos com `secure_delete`: o conteúdo removido é sobrescrito
+
+Bancos de versões anteriores (em claro ou em outro formato de cifragem) são esvaziados ao abrir.
+"""
+
+import hashlib
+import hmac
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from chaves import carregar_chave
+from compartilhado import DetectorCompartilhado
+from prefiltro import DetectorComPrefiltro
+
+# Limite de parâmetros por consulta IN (...) no SQLite
+_LOTE_SQL = 500
+
+VARIAVEL_CHAVE = 'CACHE_RESULTADOS_CHAVE'
+
+# Formato das entradas (3 = valores cifrados com AES-GCM, com data de criação)
+FORMATO = '3'
+
+VALIDADE_PADRAO_DIAS = 30
+
+_TAMANHO_NONCE = 12
+
+
+def assinatura_detector(detector) -> str:
+    """
+    Identifica versão e configuração do detector para compor a chave.
+
+    Combina o hash do código-fonte do módulo do detector (muda a cada
+    alteração de regras) com o nome/versão do modelo spaCy carregado, os
+    componentes desligados e, se houver, a configuração do pré-filtro de NLP.
+
+    Args:
+        detector: Instância de PIIDetector (ou DetectorComPrefiltro)
+
+    Returns:
+        String curta que muda sempre que o detector muda
+    """
+    configuracao = None
+    if isinstance(detector, DetectorComPrefiltro):
+        configuracao = detector.configuracao
+        detector = detector.detector
+    if isinstance(detector, DetectorCompartilhado):
+        detector = detector.detector
+
+    partes = [type(detector).__name__, str(getattr(detector, 'versao', ''))]
+
+    try:
+        with open(inspect.getsourcefile(type(detector)), 'rb') as arquivo:
+            partes.append(hashlib.sha256(arquivo.read()).hexdigest())
+    except (TypeError, OSError):
+        pass
+
+    nlp = getattr(detector, 'nlp', None)
+    meta = getattr(nlp, 'meta', None) or {}
+    partes.append(f"{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}")
+    desligados = getattr(nlp, 'disabled', None)
+    if desligados:
+        partes.append('sem=' + ','.join(sorted(desligados)))
+    if configuracao:
+        partes.append(configuracao)
+
+    return hashlib.sha256('|'.join(partes).encode('utf-8')).hexdigest()[:16]
+
+
+class CacheResultados:
+    """
+    Cache em disco (SQLite) dos resultados de `detect_pii_batch`.
+
+    Uso:
+        cache = CacheResultados('./cache/resultados_pii.sqlite', assinatura_detector(detector))
+        resultados = cache.buscar(textos)   # {texto: resultado}
+        cache.salvar({texto: resultado})
+    """
+
+    def __init__(self, caminho: str, assinatura: str, tamanho_maximo_mb: float = 512,
+                 validade_dias: float = VALIDADE_PADRAO_DIAS, chave: bytes = None):
+        """
+        Args:
+            caminho: Arquivo SQLite do cache
+            assinatura: Assinatura do detector (`assinatura_detector`)
+            tamanho_maximo_mb: Tamanho máximo dos resultados armazenados
+            validade_dias: Dias até uma entrada vencer (None = sem prazo)
+            chave: Chave secreta (None = `carregar_chave` ao lado do banco)
+        """
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.assinatura = assinatura
+        self.tamanho_maximo = int(tamanho_maximo_mb * 1024 * 1024)
+        self.validade_dias = validade_dias
+        self._chave = chave if chave is not None else carregar_chave(self.caminho.with_suffix('.chave'), VARIAVEL_CHAVE)
+        self.hits = 0
+        self.misses = 0
+
+        # Streamlit executa cada rerun em uma thread diferente
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute('PRAGMA secure_delete=ON')
+        self._conexao.execute('CREATE TABLE IF NOT EXISTS meta (nome TEXT PRIMARY KEY, valor TEXT NOT NULL)')
+        self._descartar_formato_antigo()
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS resultados (
+                chave TEXT PRIMARY KEY,
+                valor BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                criado_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )
+        """)
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON resultados (ultimo_acesso)')
+        self._conexao.execute('CREATE INDEX IF NOT EXISTS idx_criado_em ON resultados (criado_em)')
+        self._conexao.execute(
+            "INSERT OR IGNORE INTO meta (nome, valor) VALUES ('tamanho_total', "
+            "(SELECT CAST(COALESCE(SUM(tamanho), 0) AS TEXT) FROM resultados))")
+        self._conexao.commit()
+        with self._lock:
+            self._expurgar_vencidas()
+            self._conexao.commit()
+
+    def _descartar_formato_antigo(self):
+        """Apaga as entradas de versões anteriores (em claro ou em outro formato) e compacta o arquivo."""
+        formato = self._conexao.execute("SELECT valor FROM meta WHERE nome = 'formato'").fetchone()
+        if formato is not None and formato[0] == FORMATO:
+            return
+        self._conexao.execute('DROP TABLE IF EXISTS resultados')
+        self._conexao.execute("DELETE FROM meta WHERE nome = 'tamanho_total'")
+        self._conexao.execute("INSERT OR REPLACE INTO meta (nome, valor) VALUES ('formato', ?)", (FORMATO,))
+        self._conexao.commit()
+        self._conexao.execute('VACUUM')
+
+    def chave(self, texto: str) -> str:
+        """
+        Calcula a chave de conteúdo de um texto.
+
+        O texto não é reescrito (acentos, espaços, caixa): os resultados
+        guardam trechos literais do texto, usados depois para localizar
+        os spans de mascaramento.
+        """
+        return hmac.new(self._chave, f'{self.assinatura}\0{texto}'.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def _chave_valor(self, texto: str) -> bytes:
+        """Chave de cifragem da entrada: só quem tem o texto (e a chave secreta) a obtém."""
+        return hmac.new(self._chave, f'valor\0{self.assinatura}\0{texto}'.encode('utf-8'), hashlib.sha256).digest()
+
+    def _cifrar(self, texto: str, chave: str, conteudo: bytes) -> bytes:
+        """nonce + AES-GCM(conteúdo), com a chave da entrada (`chave(texto)`) como dado autenticado."""
+        nonce = os.urandom(_TAMANHO_NONCE)
+        return nonce + AESGCM(self._chave_valor(texto)).encrypt(nonce, conteudo, chave.encode('ascii'))
+
+    def _decifrar(self, texto: str, chave: str, valor: bytes):
+        """Conteúdo original, ou None se a entrada estiver corrompida ou adulterada."""
+        try:
+            return AESGCM(self._chave_valor(texto)).decrypt(
+                valor[:_TAMANHO_NONCE], valor[_TAMANHO_NONCE:], chave.encode('ascii'))
+        except (InvalidTag, ValueError):
+            return None
+
+    def _limite_validade(self) -> float:
+        """Data de criação mínima de uma entrada válida (0 = sem prazo)."""
+        return time.time() - self.validade_dias * 86400 if self.validade_dias else 0.0
+
+    def buscar(self, textos: list) -> dict:
+        """
+        Busca resultados já calculados (e ainda no prazo de validade).
+
+        Args:
+            textos: Textos distintos a consultar
+
+        Returns:
+            Dicionário {texto: resultado} apenas com os encontrados
+        """
+        chaves = {self.chave(texto): texto for texto in textos}
+        encontrados = {}
+        limite = self._limite_validade()
+
+        with self._lock:
+            lista_chaves = list(chaves)
+            for i in range(0, len(lista_chaves), _LOTE_SQL):
+                lote = lista_chaves[i:i+_LOTE_SQL]
+                linhas = self._conexao.execute(
+                    f"SELECT chave, valor FROM resultados WHERE chave IN ({','.join('?' * len(lote))}) "
+                    "AND criado_em >= ?",
+                    [*lote, limite]
+                ).fetchall()
+                for chave, valor in linhas:
+                    conteudo = self._decifrar(chaves[chave], chave, valor)
+                    if conteudo is not None:
+                        encontrados[chaves[chave]] = json.loads(conteudo)
+
+            if encontrados:
+                agora = time.time()
+                self._conexao.executemany(
+                    'UPDATE resultados SET ultimo_acesso = ? WHERE chave = ?',
+                    [(agora, self.chave(texto)) for texto in encontrados]
+                )
+                self._conexao.commit()
+
+        self.hits += len(encontrados)
+        self.misses += len(textos) - len(encontrados)
+        return encontrados
+
+    def salvar(self, resultados: dict):
+        """
+        Armazena novos resultados e aplica a remoção LRU se necessário.
+
+        Args:
+            resultados: Dicionário {texto: resultado}
+        """
+        agora = time.time()
+        registros = []
+        for texto, resultado in resultados.items():
+            conteudo = json.dumps(resultado, ensure_ascii=False, default=list).encode('utf-8')
+            chave = self.chave(texto)
+            valor = self._cifrar(texto, chave, conteudo)
+            registros.append((chave, valor, len(valor), agora, agora))
+        if not registros:
+            return
+
+        with self._lock:
+            # Trava de escrita antes de ler os tamanhos substituídos: o total fica
+            # correto com outras conexões (sessões, processos) gravando no mesmo banco
+            self._conexao.execute('BEGIN IMMEDIATE')
+            try:
+                substituidos = 0
+                for i in range(0, len(registros), _LOTE_SQL):
+                    lote = [registro[0] for registro in registros[i:i + _LOTE_SQL]]
+                    substituidos += self._conexao.execute(
+                        f"SELECT COALESCE(SUM(tamanho), 0) FROM resultados WHERE chave IN ({','.join('?' * len(lote))})",
+                        lote
+                    ).fetchone()[0]
+                self._conexao.executemany(
+                    'INSERT OR REPLACE INTO resultados (chave, valor, tamanho, criado_em, ultimo_acesso) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    registros
+                )
+                self._somar_total(sum(registro[2] for registro in registros) - substituidos)
+                self._remover_excedente()
+                self._conexao.commit()
+            except BaseException:
+                self._conexao.rollback()
+                raise
+
+    def _somar_total(self, diferenca: int):
+        self._conexao.execute(
+            "UPDATE meta SET valor = CAST(CAST(valor AS INTEGER) + ? AS TEXT) WHERE nome = 'tamanho_total'",
+            (diferenca,))
+
+    def tamanho_total(self) -> int:
+        """Bytes armazenados, lidos do total mantido a cada gravação."""
+        linha = self._conexao.execute("SELECT valor FROM meta WHERE nome = 'tamanho_total'").fetchone()
+        return int(linha[0]) if linha else 0
+
+    def _remover_excedente(self):
+        """Remove as entradas menos usadas até caber no limite de tamanho."""
+        total = self.tamanho_total()
+        if total <= self.tamanho_maximo:
+            return
+
+        excedente = total - self.tamanho_maximo
+        removidas = []
+        liberado = 0
+        for chave, tamanho in self._conexao.execute(
+                'SELECT chave, tamanho FROM resultados ORDER BY ultimo_acesso ASC'):
+            removidas.append((chave,))
+            liberado += tamanho
+            if liberado >= excedente:
+                break
+
+        self._conexao.executemany('DELETE FROM resultados WHERE chave = ?', removidas)
+        self._somar_total(-liberado)
+
+    def _expurgar_vencidas(self) -> int:
+        """Apaga as entradas fora do prazo de validade (chamado com o lock)."""
+        limite = self._limite_validade()
+        if not limite:
+            return 0
+        removidas, liberado = self._conexao.execute(
+            'SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM resultados WHERE criado_em < ?', (limite,)
+        ).fetchone()
+        if removidas:
+            self._conexao.execute('DELETE FROM resultados WHERE criado_em < ?', (limite,))
+            self._somar_total(-liberado)
+        return removidas
+
+    def expurgar(self) -> int:
+        """
+        Apaga as entradas vencidas e compacta o arquivo.
+
+        Returns:
+            Entradas apagadas
+        """
+        with self._lock:
+            removidas = self._expurgar_vencidas()
+            self._conexao.commit()
+            self._conexao.execute('VACUUM')
+        return removidas
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna números de uso do cache.
+
+        Returns:
+            Dicionário com hits, misses, taxa_acerto, entradas e tamanho_mb
+        """
+        with self._lock:
+            entradas = self._conexao.execute('SELECT COUNT(*) FROM resultados').fetchone()[0]
+            tamanho = self.tamanho_total()
+
+        consultas = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'taxa_acerto': self.hits / consultas if consultas else 0.0,
+            'entradas': entradas,
+            'tamanho_mb': tamanho / (1024 * 1024),
+        }
+
+    def limpar(self):
+        """Apaga todos os resultados armazenados e compacta o arquivo."""
+        with self._lock:
+            self._conexao.execute('DELETE FROM resultados')
+            self._conexao.execute("UPDATE meta SET valor = '0' WHERE nome = 'tamanho_total'")
+            self._conexao.commit()
+            self._conexao.execute('VACUUM')
+
+    def fechar(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conexao.close()
@@ -0,0 +1,41 @@
+"""
+Chaves Secretas Locais
+======================
+
+Chaves de 32 bytes usadas pelo índice de titulares (HMAC das entidades) e
+pelo cache de resultados (HMAC das chaves de entrada e cifragem AES-GCM
+dos resultados). Cada banco tem a sua chave, lida de uma variável de
+ambiente (hexadecimal) ou de um arquivo ao lado do banco, criado na
+primeira vez com permissão 0600.
+"""
+
+import os
+import secrets
+from pathlib import Path
+
+
+def carregar_chave(caminho_chave, variavel: str) -> bytes:
+    """
+    Chave secreta: a variável de ambiente (hex) ou o arquivo, criado na primeira vez.
+
+    Perder a chave torna o banco inútil (as consultas não casam mais e os
+    valores cifrados não são mais lidos): guarde uma cópia em local seguro,
+    separada do banco.
+
+    Args:
+        caminho_chave: Arquivo da chave (permissão 0600)
+        variavel: Variável de ambiente que, se definida, tem precedência sobre o arquivo
+    """
+    if os.environ.get(variavel):
+        return bytes.fromhex(os.environ[variavel])
+
+    caminho_chave = Path(caminho_chave)
+    if caminho_chave.exists():
+        return bytes.fromhex(caminho_chave.read_text(encoding='ascii').strip())
+
+    chave = secrets.token_bytes(32)
+    caminho_chave.parent.mkdir(parents=True, exist_ok=True)
+    descritor = os.open(str(caminho_chave), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descritor, 'w', encoding='ascii') as arquivo:
+        arquivo.write(chave.hex())
+    return chave
@@ -0,0 +1,180 @@
+"""
+Resultados em Formato Colunar
+=============================
+
+Guarda os resultados de `detect_pii` em estrutura compacta por coluna,
+em vez de manter um dicionário aninhado por linha até o fim da análise:
+
+- contagens em arrays tipados (`array('i')`)
+- valores das entidades em um buffer único por coluna de lista, com
+  offsets indicando o trecho de cada linha
+
+O DataFrame de resultado é montado de uma vez a partir dessas colunas.
+"""
+
+from array import array
+
+import numpy as np
+
+# ===================================================================
+# IMPORTANTE: APENAS CPF TEM DUAS CATEGORIAS DIFERENTES!
+# - CPF VALIDADO: Validado matematicamente (Módulo 11) - CPF real
+# - CPF NÃO VALIDADO: Padrão correto mas falhou validação - Erro de digitação
+# ===================================================================
+
+# Coluna de contagem -> (entidade, categoria) em `resultado['entidades']`
+CONTAGENS = {
+    'cpf_validado': ('cpf', 'verificado'),
+    'cpf_nao_validado': ('cpf', 'suspeito'),
+    'rg_verificado': ('rg', 'verificado'),
+    'rg_suspeito': ('rg', 'suspeito'),
+    'email_verificado': ('email', 'verificado'),
+    'email_suspeito': ('email', 'suspeito'),
+    'telefone_verificado': ('telefone', 'verificado'),
+    'telefone_suspeito': ('telefone', 'suspeito'),
+    'nome_detectado': ('nlp_contexto', 'pessoas'),
+    'endereco_detectado': ('endereco', 'detectado'),
+}
+
+# Colunas somadas (verificado + suspeito) -> parcelas
+SOMAS = {
+    'rg_detectado': ('rg_verificado', 'rg_suspeito'),
+    'email_detectado': ('email_verificado', 'email_suspeito'),
+    'telefone_detectado': ('telefone_verificado', 'telefone_suspeito'),
+}
+
+# Coluna de lista -> categorias concatenadas (CPF tem duas colunas separadas;
+# os outros tipos juntam verificado + suspeito em uma coluna só)
+LISTAS = {
+    'pii_cpf_validado_lista': [('cpf', 'verificado')],
+    'pii_cpf_nao_validado_lista': [('cpf', 'suspeito')],
+    'pii_rg_lista': [('rg', 'verificado'), ('rg', 'suspeito')],
+    'pii_email_lista': [('email', 'verificado'), ('email', 'suspeito')],
+    'pii_telefone_lista': [('telefone', 'verificado'), ('telefone', 'suspeito')],
+    'pii_nome_lista': [('nlp_contexto', 'pessoas')],
+    'pii_endereco_lista': [('endereco', 'detectado')],
+}
+
+# Ordem das colunas no DataFrame (a mesma das versões anteriores)
+ORDEM_COLUNAS = [
+    'contém_pii', 'score_risco',
+    'cpf_validado', 'cpf_nao_validado',
+    'rg_verificado', 'rg_suspeito', 'rg_detectado',
+    'email_verificado', 'email_suspeito', 'email_detectado',
+    'telefone_verificado', 'telefone_suspeito', 'telefone_detectado',
+    'nome_detectado', 'endereco_detectado',
+    *LISTAS,
+]
+
+
+class ResultadosColunares:
+    """
+    Acumula resultados de detecção linha a linha em colunas compactas.
+
+    Uso:
+        colunas = ResultadosColunares()
+        for resultado in resultados:
+            colunas.adicionar(resultado)
+        colunas.para_dataframe(df)
+    """
+
+    def __init__(self):
+        self._contem = array('b')
+        self._score = array('d')
+        self._contagens = {coluna: array('i') for coluna in CONTAGENS}
+        self._valores = {coluna: [] for coluna in LISTAS}
+        self._offsets = {coluna: array('q', [0]) for coluna in LISTAS}
+
+        # Métodos `append`/`extend` pré-resolvidos: `adicionar` roda uma vez por linha
+        self._acrescentar_contagens = [
+            (self._contagens[coluna].append, entidade, categoria)
+            for coluna, (entidade, categoria) in CONTAGENS.items()
+        ]
+        self._acrescentar_listas = [
+            (self._valores[coluna], self._offsets[coluna].append, categorias)
+            for coluna, categorias in LISTAS.items()
+        ]
+
+    @classmethod
+    def de_resultados(cls, resultados) -> 'ResultadosColunares':
+        """Converte uma lista de resultados de `detect_pii_batch`."""
+        colunas = cls()
+        for resultado in resultados:
+            colunas.adicionar(resultado)
+        return colunas
+
+    def __len__(self):
+        return len(self._score)
+
+    def adicionar(self, resultado: dict):
+        """Acrescenta uma linha a partir do dicionário de `detect_pii`."""
+        entidades = resultado['entidades']
+        self._contem.append(bool(resultado['contem_pii']))
+        self._score.append(resultado['score_risco'])
+
+        for acrescentar, entidade, categoria in self._acrescentar_contagens:
+            acrescentar(len(entidades[entidade][categoria]))
+
+        for valores, acrescentar_offset, categorias in self._acrescentar_listas:
+            for entidade, categoria in categorias:
+                valores += entidades[entidade][categoria]
+            acrescentar_offset(len(valores))
+
+    def repetir(self, linha: int):
+        """Acrescenta uma cópia de uma linha já adicionada (texto repetido)."""
+        self._contem.append(self._contem[linha])
+        self._score.append(self._score[linha])
+
+        for coluna in CONTAGENS:
+            self._contagens[coluna].append(self._contagens[coluna][linha])
+
+        for coluna in LISTAS:
+            valores = self._valores[coluna]
+            offsets = self._offsets[coluna]
+            valores.extend(valores[offsets[linha]:offsets[linha + 1]])
+            offsets.append(len(valores))
+
+    def valores(self, coluna: str, linha: int) -> list:
+        """Valores de uma coluna de lista (ex: 'pii_email_lista') em uma linha."""
+        offsets = self._offsets[coluna]
+        return self._valores[coluna][offsets[linha]:offsets[linha + 1]]
+
+    def colunas(self) -> dict:
+        """
+        Monta as colunas de resultado.
+
+        Returns:
+            Dicionário {nome_coluna: array/lista} na ordem de ORDEM_COLUNAS
+        """
+        dados = {
+            'contém_pii': np.frombuffer(self._contem, dtype=np.int8).astype(bool),
+            'score_risco': np.frombuffer(self._score, dtype=np.float64).copy(),
+        }
+        for coluna, contagens in self._contagens.items():
+            dados[coluna] = np.frombuffer(contagens, dtype=np.int32).astype(np.int64)
+        for coluna, (verificado, suspeito) in SOMAS.items():
+            dados[coluna] = dados[verificado] + dados[suspeito]
+
+        for coluna in LISTAS:
+            valores = self._valores[coluna]
+            offsets = self._offsets[coluna]
+            dados[coluna] = [
+                ';'.join(valores[inicio:fim]) if fim > inicio else ''
+                for inicio, fim in zip(offsets, offsets[1:])
+            ]
+
+        return {coluna: dados[coluna] for coluna in ORDEM_COLUNAS}
+
+    def para_dataframe(self, df):
+        """
+        Adiciona as colunas de resultado ao DataFrame (modificado no lugar).
+
+        Args:
+            df: DataFrame com uma linha por resultado
+
+        Returns:
+            O mesmo DataFrame
+        """
+        for coluna, valores in self.colunas().items():
+            df[coluna] = valores
+        return df
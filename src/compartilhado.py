@@ -0,0 +1,179 @@
+"""
+Detector Compartilhado entre Sessões
+====================================
+
+No Streamlit cada aba do navegador é uma sessão, executada em uma thread
+do mesmo processo. Em vez de um `PIIDetector` (e um modelo spaCy) por
+sessão, o app guarda um único `DetectorCompartilhado` por processo
+(`st.cache_resource`):
+
+- as chamadas ao detector são serializadas por uma trava reentrante
+  (`trava`): o spaCy não garante `nlp.pipe` concorrente no mesmo objeto, e
+  o pré-filtro liga/desliga componentes do `nlp` compartilhado
+- `aquecer()` roda uma detecção de exemplo logo após a carga, para que a
+  primeira análise não pague a inicialização preguiçosa do modelo
+- `estatisticas()` mede carga, aquecimento, sessões atendidas, tempo de
+  espera pela trava e memória do processo
+- `CarregadorEmSegundoPlano` faz a carga em uma thread, para que a tela
+  inicial apareça enquanto o modelo ainda está sendo carregado
+"""
+
+import inspect
+import threading
+import time
+
+from progresso import memoria_processo_mb
+
+TEXTO_AQUECIMENTO = (
+    'Prezados, meu nome é Maria da Silva, CPF 123.456.789-09, telefone (61) 98765-4321, '
+    'e-mail maria.silva@email.com, moro na Rua das Flores, 123.'
+)
+
+
+class DetectorCompartilhado:
+    """
+    Envolve um detector usado por várias threads (sessões do Streamlit).
+
+    Métodos do detector (`detect_pii_batch`, `apply_masking`, mascaradores
+    parciais...) são executados sob a trava; demais atributos (`nlp`,
+    padrões compilados) são repassados diretamente.
+
+    Uso:
+        compartilhado = DetectorCompartilhado.carregar(criar_detector)
+        compartilhado.detect_pii_batch(textos)
+    """
+
+    def __init__(self, detector, segundos_carga: float = 0.0):
+        self.detector = detector
+        self.trava = threading.RLock()
+        # Métricas têm trava própria: consultá-las não espera uma análise em andamento
+        self._trava_metricas = threading.Lock()
+        self.segundos_carga = segundos_carga
+        self.segundos_aquecimento = 0.0
+        self.memoria_antes_mb = None
+        self.memoria_depois_mb = None
+        self.sessoes = 0
+        self._metricas = {'chamadas': 0, 'segundos_espera': 0.0, 'segundos_uso': 0.0, 'espera_maxima': 0.0}
+
+    @classmethod
+    def carregar(cls, fabrica, aquecer: bool = True) -> 'DetectorCompartilhado':
+        """
+        Cria o detector com `fabrica()` medindo tempo e memória da carga.
+
+        Args:
+            fabrica: Função sem argumentos que devolve um detector pronto
+            aquecer: Roda uma detecção de exemplo logo após a carga
+        """
+        memoria_antes = memoria_processo_mb()
+        inicio = time.perf_counter()
+        compartilhado = cls(fabrica(), time.perf_counter() - inicio)
+        compartilhado.memoria_antes_mb = memoria_antes
+        if aquecer:
+            compartilhado.aquecer()
+        compartilhado.memoria_depois_mb = memoria_processo_mb()
+        return compartilhado
+
+    def aquecer(self, texto: str = TEXTO_AQUECIMENTO):
+        """Executa detecção e mascaramento de exemplo (carrega o que o modelo inicializa sob demanda)."""
+        inicio = time.perf_counter()
+        with self.trava:
+            self.detector.detect_pii_batch([texto])
+            self.detector.apply_masking_batch([texto], mode='PARCIAL')
+        self.segundos_aquecimento = time.perf_counter() - inicio
+
+    def registrar_sessao(self):
+        """Conta as sessões que passaram a usar este detector (para as estatísticas)."""
+        with self._trava_metricas:
+            self.sessoes += 1
+
+    def __getattr__(self, nome):
+        atributo = getattr(self.detector, nome)
+        if not inspect.ismethod(atributo):
+            return atributo
+
+        def sincronizado(*args, **kwargs):
+            pedido = time.perf_counter()
+            with self.trava:
+                inicio = time.perf_counter()
+                try:
+                    return atributo(*args, **kwargs)
+                finally:
+                    fim = time.perf_counter()
+                    with self._trava_metricas:
+                        metricas = self._metricas
+                        metricas['chamadas'] += 1
+                        metricas['segundos_espera'] += inicio - pedido
+                        metricas['segundos_uso'] += fim - inicio
+                        metricas['espera_maxima'] = max(metricas['espera_maxima'], inicio - pedido)
+
+        sincronizado.__name__ = nome
+        sincronizado.__doc__ = atributo.__doc__
+        return sincronizado
+
+    def estatisticas(self) -> dict:
+        """
+        Returns:
+            Dicionário com tempos de carga/aquecimento, sessões, uso da trava e memória
+        """
+        with self._trava_metricas:
+            metricas = dict(self._metricas)
+            sessoes = self.sessoes
+        memoria_modelo = None
+        if self.memoria_antes_mb is not None and self.memoria_depois_mb is not None:
+            memoria_modelo = self.memoria_depois_mb - self.memoria_antes_mb
+        return {
+            'segundos_carga': self.segundos_carga,
+            'segundos_aquecimento': self.segundos_aquecimento,
+            'sessoes': sessoes,
+            **metricas,
+            'memoria_modelo_mb': memoria_modelo,
+            'memoria_processo_mb': memoria_processo_mb(),
+        }
+
+
+class CarregadorEmSegundoPlano:
+    """
+    Executa uma carga demorada (ex: o modelo spaCy) em uma thread separada.
+
+    Uso:
+        carregador = CarregadorEmSegundoPlano(lambda: DetectorCompartilhado.carregar(criar_detector))
+        ...                          # a interface continua respondendo
+        detector = carregador.obter()  # espera, se ainda não terminou
+    """
+
+    def __init__(self, fabrica):
+        self._fabrica = fabrica
+        self._pronto = threading.Event()
+        self._resultado = None
+        self._erro = None
+        self.inicio = time.perf_counter()
+        self.segundos = None
+        self._thread = threading.Thread(target=self._carregar, name='carga-modelo', daemon=True)
+        self._thread.start()
+
+    def _carregar(self):
+        try:
+            self._resultado = self._fabrica()
+        except BaseException as erro:   # repassado a quem chamar `obter`
+            self._erro = erro
+        finally:
+            self.segundos = time.perf_counter() - self.inicio
+            self._pronto.set()
+
+    def pronto(self) -> bool:
+        """Indica se a carga terminou (com sucesso ou erro)."""
+        return self._pronto.is_set()
+
+    def obter(self, timeout: float = None):
+        """
+        Aguarda a carga e devolve o resultado.
+
+        Raises:
+            TimeoutError: Se a carga não terminar em `timeout` segundos
+            Exception: O erro ocorrido durante a carga
+        """
+        if not self._pronto.wait(timeout):
+            raise TimeoutError('carga ainda em andamento')
+        if self._erro is not None:
+            raise self._erro
+        return self._resultado
@@ -0,0 +1,89 @@
+"""
+Verificações de Contexto (FASE 2)
+=================================
+
+A FASE 2 verifica o contexto de cada número candidato recortando janelas
+do texto: a lista de imunidade olha as 3 últimas palavras dos 50
+caracteres anteriores (`verificar_contexto_negativo`) e o telefone sem
+DDD procura palavras indicativas em 100 caracteres para cada lado
+(`validar_telefone_sem_ddd`). As funções são as da METODOLOGIA_TECNICA.md;
+o perfil por fase (`perfil.py`) as reexecuta para contar os candidatos
+descartados pela lista de imunidade.
+
+Um índice das palavras de contexto montado uma vez por texto foi medido
+e descartado: mesmo em listas de contatos com muitos telefones sem DDD,
+montá-lo em Python custa mais que recortar as janelas, que são poucas
+chamadas em C (`lower()`, `split()`, buscas de substring).
+"""
+
+# Palavras que IMUNIZAM o número seguinte
+PALAVRAS_PROIBIDAS = frozenset({
+    'lei', 'decreto', 'processo', 'sei', 'protocolo', 'portaria',
+    'diário', 'oficial', 'dodf', 'edital', 'licitação', 'contrato',
+    'n°', 'nº', 'art', 'artigo', 'inc', 'inciso',
+    'parágrafo', '§', 'norma', 'resolução', 'instrução',
+    'ofício', 'memorando', 'despacho', 'parecer', 'nota', 'técnica',
+    'página', 'pág', 'folha', 'fls', 'ano', 'exercício', 'gdf'
+})
+
+# Palavras que indicam telefone sem DDD
+PALAVRAS_TELEFONE_CONTEXTO = frozenset({
+    'celular', 'cel', 'telefone', 'tel', 'fone', 'contato',
+    'whatsapp', 'zap', 'ligar', 'ligue', 'chamar',
+    'número', 'mobile', 'cell', 'phone', 'liga', 'chama'
+})
+
+JANELA_IMUNIDADE = 50
+PALAVRAS_IMUNIDADE = 3
+JANELA_TELEFONE = 100
+
+
+def verificar_contexto_negativo(texto: str, posicao: int) -> bool:
+    """
+    Analisa 50 caracteres ANTES do número.
+    Se encontrar palavra proibida, DESCARTA.
+    """
+    inicio = max(0, posicao - JANELA_IMUNIDADE)
+    contexto = texto[inicio:posicao].lower()
+    palavras = contexto.split()[-PALAVRAS_IMUNIDADE:]  # Últimas 3 palavras
+
+    for palavra in palavras:
+        if palavra in PALAVRAS_PROIBIDAS:
+            return True  # DESCARTAR
+
+    return False  # ACEITAR
+
+
+def validar_telefone_sem_ddd(digitos: str, texto: str, posicao: int) -> bool:
+    """
+    Valida telefone SEM DDD usando contexto.
+    Só aceita se houver palavra indicativa próxima.
+    """
+    # 1. Validações numéricas básicas
+    if digitos[0] != '9':  # Celular começa com 9
+        return False
+    if digitos[1] not in ['6', '7', '8', '9']:  # Segundo dígito válido
+        return False
+
+    # 2. Extrai contexto (100 caracteres antes e depois)
+    inicio = max(0, posicao - JANELA_TELEFONE)
+    fim = min(len(texto), posicao + JANELA_TELEFONE)
+    contexto = texto[inicio:fim].lower()
+
+    # 3. Verifica presença de palavra-chave
+    return any(palavra in contexto for palavra in PALAVRAS_TELEFONE_CONTEXTO)
+
+
+def verificar_contexto(texto: str, candidatos: list) -> list:
+    """
+    Verificações de contexto da FASE 2 para todos os candidatos de um texto.
+
+    Args:
+        texto: Texto analisado
+        candidatos: Lista de (posicao, digitos)
+
+    Returns:
+        Lista de (contexto_negativo, telefone_sem_ddd_valido) na ordem dos candidatos
+    """
+    return [(verificar_contexto_negativo(texto, posicao), validar_telefone_sem_ddd(digitos, texto, posicao))
+            for posicao, digitos in candidatos]
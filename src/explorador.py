@@ -0,0 +1,238 @@
+"""
+Explorador de Resultados: Filtros por Bitmap e Busca por Índice Invertido
+=========================================================================
+
+A tabela "Registros com Dados Pessoais" copiava as linhas com PII, aplicava
+os filtros (CPF, e-mail, nome) com máscaras booleanas sobre o DataFrame e
+enviava o resultado inteiro ao navegador, que trava acima de ~50 mil linhas.
+
+`IndiceResultados` é montado uma vez ao fim da análise:
+
+- um bitmap por tipo de dado (bits empacotados com `np.packbits`, 1 bit por
+  linha): qualquer combinação de filtros é um E bit a bit
+- um índice invertido em memória (formato CSR: vocabulário ordenado,
+  offsets e posições das linhas) com os termos do texto e das colunas
+  `pii_*_lista`; termos normalizados (minúsculas, sem acento) e, nos
+  valores de PII, também a sequência só de dígitos (CPF/telefone sem
+  pontuação). O último termo da busca casa por prefixo
+
+O explorador consulta o índice e devolve só as posições da página visível.
+
+Uso:
+    indice = IndiceResultados.construir(df_analisado, 'texto')
+    posicoes = indice.filtrar(['cpf', 'email'], busca='maria silva')
+    pagina = indice.pagina(posicoes, numero=0, tamanho=50)
+    df_analisado.iloc[pagina]
+"""
+
+import bisect
+import re
+import unicodedata
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# Tipo do filtro -> colunas de contagem (a linha entra se alguma for > 0)
+FILTROS = {
+    'pii': ('contém_pii',),
+    'cpf': ('cpf_validado', 'cpf_nao_validado'),
+    'rg': ('rg_detectado',),
+    'email': ('email_detectado',),
+    'telefone': ('telefone_detectado',),
+    'nome': ('nome_detectado',),
+    'endereco': ('endereco_detectado',),
+}
+
+COLUNAS_LISTA_BUSCA = (
+    'pii_cpf_validado_lista', 'pii_cpf_nao_validado_lista', 'pii_rg_lista', 'pii_email_lista',
+    'pii_telefone_lista', 'pii_nome_lista', 'pii_endereco_lista',
+)
+
+_TERMO = re.compile(r'\w+')
+_NAO_DIGITO = re.compile(r'\D')
+
+# Termos com menos de 2 caracteres não são indexados (artigos, iniciais, dígitos soltos)
+TAMANHO_MINIMO_TERMO = 2
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos ('José' -> 'jose')."""
+    if texto.isascii():
+        return texto.lower()
+    decomposto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+
+
+def termos(texto: str) -> set:
+    """Termos distintos de um texto, normalizados."""
+    return {termo for termo in _TERMO.findall(normalizar(texto)) if len(termo) >= TAMANHO_MINIMO_TERMO}
+
+
+def termos_pii(valores: str) -> set:
+    """Termos de uma célula `pii_*_lista` ('a;b'), mais os dígitos corridos de cada valor."""
+    resultado = set()
+    for valor in valores.split(';'):
+        if not valor:
+            continue
+        resultado |= termos(valor)
+        digitos = _NAO_DIGITO.sub('', valor)
+        if len(digitos) >= TAMANHO_MINIMO_TERMO:
+            resultado.add(digitos)
+    return resultado
+
+
+def _bitmap(df: pd.DataFrame, colunas: tuple) -> np.ndarray:
+    presente = np.zeros(len(df), dtype=bool)
+    for coluna in colunas:
+        if coluna in df.columns:
+            presente |= pd.to_numeric(df[coluna], errors='coerce').fillna(0).to_numpy() > 0
+    return np.packbits(presente)
+
+
+class IndiceResultados:
+    """Bitmaps por tipo e índice invertido de um DataFrame analisado."""
+
+    def __init__(self, linhas: int, bitmaps: dict, vocabulario: list, offsets: np.ndarray, posicoes: np.ndarray):
+        self.linhas = linhas
+        self.bitmaps = bitmaps
+        self.vocabulario = vocabulario
+        self._offsets = offsets
+        self._posicoes = posicoes
+
+    @classmethod
+    def construir(cls, df: pd.DataFrame, coluna_texto: str = None) -> 'IndiceResultados':
+        """
+        Monta bitmaps e índice invertido.
+
+        Args:
+            df: DataFrame com as colunas de `montar_colunas_resultado`
+            coluna_texto: Coluna de texto a indexar para a busca (None = só as listas de PII)
+        """
+        linhas = len(df)
+        bitmaps = {tipo: _bitmap(df, colunas) for tipo, colunas in FILTROS.items()}
+
+        # Pares (termo, linha) acumulados em arrays compactos, sem uma lista por termo
+        ids = {}
+        termos_linha = array('i')
+        linhas_termo = array('i')
+
+        def indexar(linha: int, encontrados: set):
+            for termo in encontrados:
+                identificador = ids.get(termo)
+                if identificador is None:
+                    identificador = ids[termo] = len(ids)
+                termos_linha.append(identificador)
+                linhas_termo.append(linha)
+
+        fontes = []
+        if coluna_texto is not None and coluna_texto in df.columns:
+            fontes.append((df[coluna_texto], termos))
+        fontes += [(df[coluna], termos_pii) for coluna in COLUNAS_LISTA_BUSCA if coluna in df.columns]
+
+        for serie, extrair in fontes:
+            for linha, valor in enumerate(serie.tolist()):
+                if isinstance(valor, str) and valor:
+                    indexar(linha, extrair(valor))
+
+        # CSR: termos em ordem alfabética, linhas de cada termo em ordem crescente e sem repetição
+        vocabulario = sorted(ids)
+        ordem_alfabetica = np.empty(len(ids), dtype=np.int32)
+        ordem_alfabetica[[ids[termo] for termo in vocabulario]] = np.arange(len(vocabulario), dtype=np.int32)
+
+        chaves = ordem_alfabetica[np.frombuffer(termos_linha, dtype=np.int32)] if len(termos_linha) else \
+            np.empty(0, dtype=np.int32)
+        posicoes = np.frombuffer(linhas_termo, dtype=np.int32) if len(linhas_termo) else np.empty(0, dtype=np.int32)
+        ordem = np.lexsort((posicoes, chaves))
+        chaves, posicoes = chaves[ordem], posicoes[ordem]
+        # O mesmo termo no texto e em uma lista de PII da mesma linha conta uma vez
+        distintos = np.ones(len(chaves), dtype=bool)
+        distintos[1:] = (chaves[1:] != chaves[:-1]) | (posicoes[1:] != posicoes[:-1])
+        chaves, posicoes = chaves[distintos], posicoes[distintos]
+
+        offsets = np.zeros(len(vocabulario) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(chaves, minlength=len(vocabulario)), out=offsets[1:])
+        return cls(linhas, bitmaps, vocabulario, offsets, posicoes)
+
+    def _linhas_do_termo(self, indice: int) -> np.ndarray:
+        return self._posicoes[self._offsets[indice]:self._offsets[indice + 1]]
+
+    def buscar(self, consulta: str) -> np.ndarray:
+        """
+        Linhas que contêm todos os termos da consulta (o último casa por prefixo).
+
+        Returns:
+            Posições das linhas em ordem crescente
+        """
+        consulta_termos = _TERMO.findall(normalizar(consulta))
+        # CPF/telefone digitados com pontuação ('123.456.789-09'): busca pelos dígitos corridos,
+        # que também são indexados nos valores de PII
+        if len(consulta_termos) > 1 and all(termo.isdigit() for termo in consulta_termos):
+            consulta_termos = [''.join(consulta_termos)]
+        # Termos curtos não são indexados; só o último (prefixo) pode ter 1 caractere
+        consulta_termos = [termo for termo in consulta_termos[:-1] if len(termo) >= TAMANHO_MINIMO_TERMO] + \
+            consulta_termos[-1:]
+        if not consulta_termos:
+            return np.arange(self.linhas, dtype=np.int32)
+
+        resultado = None
+        for posicao, termo in enumerate(consulta_termos):
+            if posicao == len(consulta_termos) - 1:
+                linhas = self._linhas_prefixo(termo)
+            else:
+                indice = bisect.bisect_left(self.vocabulario, termo)
+                encontrado = indice < len(self.vocabulario) and self.vocabulario[indice] == termo
+                linhas = self._linhas_do_termo(indice) if encontrado else np.empty(0, dtype=np.int32)
+            resultado = linhas if resultado is None else np.intersect1d(resultado, linhas, assume_unique=True)
+            if len(resultado) == 0:
+                break
+        return resultado
+
+    def _linhas_prefixo(self, prefixo: str) -> np.ndarray:
+        """União das linhas de todos os termos que começam com `prefixo`."""
+        inicio = bisect.bisect_left(self.vocabulario, prefixo)
+        fim = bisect.bisect_left(self.vocabulario, prefixo + '\U0010ffff')
+        if inicio == fim:
+            return np.empty(0, dtype=np.int32)
+        if fim - inicio == 1:
+            return self._linhas_do_termo(inicio)
+        # Termos vizinhos no vocabulário ocupam um trecho contínuo de `posicoes`
+        return np.unique(self._posicoes[self._offsets[inicio]:self._offsets[fim]])
+
+    def filtrar(self, tipos: list = None, busca: str = '') -> np.ndarray:
+        """
+        Linhas que têm todos os `tipos` e casam com a `busca`.
+
+        Args:
+            tipos: Chaves de FILTROS (ex: ['pii', 'cpf']); None/vazio = sem filtro de tipo
+            busca: Texto livre (vazio = sem busca)
+
+        Returns:
+            Posições das linhas (int32, ordem crescente)
+        """
+        posicoes = None
+        if tipos:
+            bits = self.bitmaps[tipos[0]]
+            for tipo in tipos[1:]:
+                bits = bits & self.bitmaps[tipo]
+            posicoes = np.flatnonzero(np.unpackbits(bits, count=self.linhas)).astype(np.int32)
+
+        if busca and busca.strip():
+            encontradas = self.buscar(busca)
+            posicoes = encontradas if posicoes is None else np.intersect1d(posicoes, encontradas, assume_unique=True)
+
+        return np.arange(self.linhas, dtype=np.int32) if posicoes is None else posicoes
+
+    def contar(self, tipo: str) -> int:
+        """Linhas com o tipo (contagem de bits do bitmap)."""
+        return int(np.unpackbits(self.bitmaps[tipo], count=self.linhas).sum())
+
+    @staticmethod
+    def pagina(posicoes: np.ndarray, numero: int, tamanho: int) -> np.ndarray:
+        """Posições da página `numero` (a partir de 0)."""
+        return posicoes[numero * tamanho:(numero + 1) * tamanho]
+
+    def memoria_bytes(self) -> int:
+        """Memória aproximada do índice (bitmaps + CSR, sem o vocabulário)."""
+        return (sum(bits.nbytes for bits in self.bitmaps.values())
+                + self._offsets.nbytes + self._posicoes.nbytes)
@@ -0,0 +1,245 @@
+"""
+Exportações Sob Demanda, em Segundo Plano e com Cache
+=====================================================
+
+O app montava os arquivos de download (Excel de 3 abas, CSV, arquivo
+mascarado) em `io.BytesIO` a cada reexecução do script, mesmo sem
+ninguém clicar em baixar — dezenas de segundos por clique com 100 mil
+linhas. `GeradorExportacoes`:
+
+- só gera um arquivo quando pedido (`solicitar`), em uma thread de fundo,
+  enquanto a interface continua respondendo
+- grava com o escritor streaming de `arquivos.py`, bloco a bloco, direto
+  em disco (memória constante, sem o arquivo inteiro em um buffer)
+- identifica cada arquivo pelo hash do conteúdo do DataFrame
+  (`assinatura_conteudo`): enquanto os dados não mudam, o mesmo arquivo
+  é reaproveitado — entre reexecuções, sessões e reinícios do app
+
+Os arquivos trazem o texto original e os valores de PII encontrados, por
+isso têm prazo: vencem em `validade_horas` (padrão 24) e são apagados ao
+iniciar o gerador, a cada nova geração e quando consultados já vencidos;
+são gravados com permissão 0600;
+a sessão apaga os que pediu ao recomeçar ("Nova Análise" / "Reiniciar
+Sistema", `remover`).
+
+Uso:
+    gerador = GeradorExportacoes('./output/exportacoes')
+    chave = gerador.chave(df, 'analise_csv', 'csv')
+    gerador.solicitar(chave, lambda destino: salvar_streaming(df, destino, 'csv'))
+    if gerador.estado(chave) == 'pronto':
+        caminho = gerador.caminho(chave)
+"""
+
+import hashlib
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from arquivos import EscritorStreaming
+
+TAMANHO_BLOCO = 5000
+
+VALIDADE_PADRAO_HORAS = 24
+
+
+def assinatura_conteudo(df: pd.DataFrame) -> str:
+    """
+    Hash do conteúdo do DataFrame (colunas, tipos e valores de todas as linhas).
+
+    Returns:
+        Hex de 32 caracteres (blake2b de 128 bits)
+    """
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(repr([(str(coluna), str(tipo)) for coluna, tipo in df.dtypes.items()]).encode('utf-8'))
+    resumo.update(len(df).to_bytes(8, 'little'))
+    for inicio in range(0, len(df), TAMANHO_BLOCO * 10):
+        bloco = df.iloc[inicio:inicio + TAMANHO_BLOCO * 10]
+        resumo.update(pd.util.hash_pandas_object(bloco, index=False).to_numpy().tobytes())
+    return resumo.hexdigest()
+
+
+def salvar_excel_abas(destino, abas: list, tamanho_bloco: int = TAMANHO_BLOCO):
+    """
+    Grava um Excel de várias abas em modo streaming.
+
+    Args:
+        destino: Caminho do arquivo ou buffer
+        abas: Lista de (nome da aba, DataFrame, filtro) — `filtro(bloco)`
+            opcional devolve as linhas do bloco a gravar (ex: só com PII),
+            sem copiar o DataFrame inteiro
+        tamanho_bloco: Linhas convertidas por vez
+    """
+    with EscritorStreaming(destino, 'xlsx', nome_aba=abas[0][0]) as escritor:
+        for posicao, (nome, df, filtro) in enumerate(abas):
+            if posicao > 0:
+                escritor.nova_aba(nome)
+            escreveu = False
+            for inicio in range(0, len(df), tamanho_bloco):
+                bloco = df.iloc[inicio:inicio + tamanho_bloco]
+                if filtro is not None:
+                    bloco = filtro(bloco)
+                if len(bloco) or not escreveu:
+                    escritor.escrever(bloco)
+                    escreveu = True
+            if not escreveu:
+                escritor.escrever(df.iloc[0:0])
+
+
+class GeradorExportacoes:
+    """
+    Gera arquivos de exportação em segundo plano, com cache em disco pelo conteúdo.
+
+    Compartilhado pelas sessões do app (os mesmos dados geram o mesmo arquivo).
+    """
+
+    def __init__(self, diretorio, max_threads: int = 2, max_arquivos: int = 50,
+                 validade_horas: float = VALIDADE_PADRAO_HORAS):
+        """
+        Args:
+            diretorio: Onde os arquivos gerados ficam guardados
+            max_threads: Exportações geradas ao mesmo tempo
+            max_arquivos: Arquivos mantidos em cache (os mais antigos são apagados)
+            validade_horas: Horas até um arquivo gerado vencer e ser apagado
+        """
+        self.max_arquivos = max_arquivos
+        self.validade_horas = validade_horas
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='exportacao')
+        self._trava = threading.Lock()
+        self._tarefas = {}
+        self._assinaturas = {}
+        self._limpar()
+
+    def assinatura(self, df: pd.DataFrame) -> str:
+        """
+        `assinatura_conteudo(df)`, calculada uma vez por objeto DataFrame.
+
+        O DataFrame da sessão não é alterado depois de guardado; enquanto o
+        mesmo objeto existir, o hash é reaproveitado sem varrer as linhas.
+        """
+        identificador = id(df)
+        with self._trava:
+            item = self._assinaturas.get(identificador)
+            if item is not None and item[0]() is df:
+                return item[1]
+
+        assinatura = assinatura_conteudo(df)
+
+        def descartar(_referencia, identificador=identificador):
+            with self._trava:
+                self._assinaturas.pop(identificador, None)
+
+        with self._trava:
+            self._assinaturas[identificador] = (weakref.ref(df, descartar), assinatura)
+        return assinatura
+
+    def chave(self, df: pd.DataFrame, nome: str, extensao: str) -> str:
+        """Nome do arquivo em cache para a exportação `nome` deste conteúdo."""
+        return f'{nome}_{self.assinatura(df)}.{extensao}'
+
+    def caminho(self, chave: str) -> Path:
+        return self.diretorio / chave
+
+    def solicitar(self, chave: str, gerar):
+        """
+        Agenda a geração, se o arquivo ainda não existe nem está sendo gerado.
+
+        Args:
+            chave: Retorno de `chave()`
+            gerar: Função gerar(destino) que grava o arquivo em `destino`
+        """
+        with self._trava:
+            tarefa = self._tarefas.get(chave)
+            if self._disponivel(chave) or (tarefa is not None and not tarefa.done()):
+                return
+            self._tarefas[chave] = self._executor.submit(self._gerar, chave, gerar)
+
+    def _gerar(self, chave: str, gerar):
+        destino = self.caminho(chave)
+        # Grava em um temporário: um arquivo pela metade nunca aparece como pronto
+        temporario = destino.with_name(f'.{destino.name}.tmp')
+        try:
+            gerar(temporario)
+            os.chmod(temporario, 0o600)
+            temporario.replace(destino)
+        finally:
+            temporario.unlink(missing_ok=True)
+        self._limpar()
+
+    def _vencido(self, arquivo: Path) -> bool:
+        return time.time() - arquivo.stat().st_mtime > self.validade_horas * 3600
+
+    def _disponivel(self, chave: str) -> bool:
+        """Se o arquivo de `chave` existe e está no prazo (um arquivo vencido é apagado)."""
+        caminho = self.caminho(chave)
+        try:
+            if not self._vencido(caminho):
+                return True
+        except FileNotFoundError:
+            return False
+        caminho.unlink(missing_ok=True)
+        return False
+
+    def _limpar(self):
+        """Apaga os arquivos vencidos e mantém só os `max_arquivos` gerados mais recentemente."""
+        arquivos = sorted((arquivo for arquivo in self.diretorio.iterdir()
+                           if arquivo.is_file() and not arquivo.name.startswith('.')),
+                          key=lambda arquivo: arquivo.stat().st_mtime, reverse=True)
+        for posicao, arquivo in enumerate(arquivos):
+            if posicao >= self.max_arquivos or self._vencido(arquivo):
+                arquivo.unlink(missing_ok=True)
+
+    def remover(self, chaves) -> int:
+        """
+        Apaga os arquivos de `chaves` (ex: os pedidos por uma sessão que recomeçou).
+
+        Returns:
+            Arquivos apagados
+        """
+        removidos = 0
+        for chave in chaves:
+            caminho = self.caminho(chave)
+            if caminho.exists():
+                caminho.unlink(missing_ok=True)
+                removidos += 1
+        return removidos
+
+    def estado(self, chave: str) -> str:
+        """'pronto', 'gerando', 'erro' ou 'ausente' (nunca pedido ou vencido)."""
+        if self._disponivel(chave):
+            return 'pronto'
+        with self._trava:
+            tarefa = self._tarefas.get(chave)
+        if tarefa is None:
+            return 'ausente'
+        if not tarefa.done():
+            return 'gerando'
+        return 'erro' if tarefa.exception() is not None else 'ausente'
+
+    def erro(self, chave: str):
+        """Exceção da última tentativa de gerar `chave` (None se não houve erro)."""
+        with self._trava:
+            tarefa = self._tarefas.get(chave)
+        if tarefa is None or not tarefa.done():
+            return None
+        return tarefa.exception()
+
+    def descartar_erro(self, chave: str):
+        """Esquece uma tentativa com erro, para permitir pedir de novo."""
+        with self._trava:
+            tarefa = self._tarefas.get(chave)
+            if tarefa is not None and tarefa.done():
+                del self._tarefas[chave]
+
+    def aguardar(self, chave: str, timeout: float = None):
+        """Espera a geração de `chave` terminar (repassa o erro, se houver)."""
+        with self._trava:
+            tarefa = self._tarefas.get(chave)
+        if tarefa is not None:
+            tarefa.result(timeout)
@@ -0,0 +1,134 @@
+"""
+Extração Rápida da FASE 1 (varreduras por tipo com atalhos)
+===========================================================
+
+A FASE 1 ("rede de arrasto", ver METODOLOGIA_TECNICA.md) procura CPF,
+RG, e-mail, telefone e endereço com um padrão compilado por tipo - uma
+varredura completa do texto para cada um - e resolve as sobreposições
+pela hierarquia exclusiva da FASE 3.5 (CPF > RG > Email > Telefone >
+Endereço).
+
+Os padrões não podem ser unidos em uma única alternância: o `finditer`
+da expressão combinada consome o trecho casado e esconde candidatos de
+outros tipos que começam dentro dele (ex: em '(61) 33456789' o telefone
+esconderia o RG '33456789', que a hierarquia escolhe). `ExtratorCombinado`
+mantém uma varredura por tipo, com o mesmo resultado de `extrair_separado`,
+e economiza onde o resultado não muda:
+
+- cada padrão começa com um lookahead de um caractere (`PRIMEIROS_CARACTERES`):
+  posições que não podem iniciar o padrão são descartadas sem executá-lo
+- tipos que exigem um caractere ausente do texto (`LITERAIS_OBRIGATORIOS`,
+  ex: '@' no e-mail) nem são varridos
+
+`extrair_separado` é a referência (padrões sem atalhos); os testes e
+`python benchmark.py extracao` conferem a concordância.
+"""
+
+import re
+
+from hierarquia import resolver_sobreposicoes
+
+# Padrões da FASE 1, na ordem da hierarquia exclusiva
+PADROES_FASE1 = {
+    'cpf': r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b',
+    'rg': r'\b\d{1,2}\.?\d{3}\.?\d{3}(?:-?[\dXx])?\b',
+    'email': r'\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b',
+    'telefone': r'(?:\(\d{2}\)\s?|\b\d{2}\s)?\b9?\d{4}-?\d{4}\b',
+    'endereco': r'(?i:\b(?:rua|avenida|av\.|quadra|qd\.?|conjunto|cj\.?|sqs|sqn|shis|shin)\s'
+                r'[A-Za-zÀ-ÿ0-9 ]{1,40}?(?:,\s*\d{1,5})?)(?=[,.;\n]|$)',
+}
+
+
+# Classe de caracteres com que cada padrão pode começar. Vira um lookahead
+# de um caractere: nas demais posições o padrão falha sem ser executado.
+PRIMEIROS_CARACTERES = {
+    'cpf': r'\d',
+    'rg': r'\d',
+    'telefone': r'[\d(]',
+    'endereco': r'[RrAaQqCcSs]',
+}
+
+# Caractere que todo valor do tipo contém: sem ele no texto, o tipo não é varrido
+LITERAIS_OBRIGATORIOS = {
+    'email': '@',
+}
+
+
+def extrair_separado(texto: str, padroes_compilados: dict) -> list:
+    """
+    Referência: uma varredura por tipo e resolução das sobreposições.
+
+    Args:
+        texto: Texto analisado
+        padroes_compilados: Dicionário {tipo: re.Pattern} em ordem de prioridade
+
+    Returns:
+        Lista ordenada de tuplas (inicio, fim, tipo, valor)
+    """
+    candidatos = [
+        (match.start(), match.end(), tipo, match.group())
+        for tipo, padrao in padroes_compilados.items()
+        for match in padrao.finditer(texto)
+    ]
+    return resolver_sobreposicoes(candidatos, list(padroes_compilados))
+
+
+class ExtratorCombinado:
+    """
+    Encontra os candidatos da FASE 1 com o mesmo resultado de `extrair_separado`.
+
+    Uso:
+        extrator = ExtratorCombinado()
+        extrator.extrair(texto)            # [(inicio, fim, tipo, valor), ...]
+        extrator.extrair_por_tipo(texto)   # {'cpf': [...], 'rg': [...], ...}
+    """
+
+    def __init__(self, padroes: dict = None, primeiros_caracteres: dict = None, literais: dict = None):
+        """
+        Args:
+            padroes: Dicionário {tipo: regex} em ordem de prioridade (padrão: PADROES_FASE1)
+            primeiros_caracteres: Dicionário {tipo: classe de caracteres} com que cada
+                padrão pode começar (padrão: PRIMEIROS_CARACTERES)
+            literais: Dicionário {tipo: caractere presente em todo valor do tipo}
+                (padrão: LITERAIS_OBRIGATORIOS)
+        """
+        self.padroes = dict(padroes or PADROES_FASE1)
+        self.tipos = list(self.padroes)
+        if primeiros_caracteres is None:
+            primeiros_caracteres = PRIMEIROS_CARACTERES if padroes is None else {}
+        if literais is None:
+            literais = LITERAIS_OBRIGATORIOS if padroes is None else {}
+
+        self._varreduras = []
+        for tipo, padrao in self.padroes.items():
+            inicio = primeiros_caracteres.get(tipo)
+            compilado = re.compile((f'(?={inicio})' if inicio else '') + padrao)
+            self._varreduras.append((tipo, compilado, literais.get(tipo)))
+
+    def compilar_separados(self) -> dict:
+        """Padrões compilados um a um, sem atalhos (para `extrair_separado`)."""
+        return {tipo: re.compile(padrao) for tipo, padrao in self.padroes.items()}
+
+    def extrair(self, texto: str) -> list:
+        """
+        Varre o texto uma vez por tipo e resolve as sobreposições.
+
+        Returns:
+            Lista ordenada de tuplas (inicio, fim, tipo, valor), sem sobreposições
+        """
+        candidatos = []
+        for tipo, padrao, literal in self._varreduras:
+            if literal is not None and literal not in texto:
+                continue
+            candidatos.extend((match.start(), match.end(), tipo, match.group()) for match in padrao.finditer(texto))
+        return resolver_sobreposicoes(candidatos, self.tipos)
+
+    def extrair_por_tipo(self, texto: str) -> dict:
+        """
+        Returns:
+            Dicionário {tipo: [valores]} na ordem de prioridade
+        """
+        valores = {tipo: [] for tipo in self.tipos}
+        for _, _, tipo, valor in self.extrair(texto):
+            valores[tipo].append(valor)
+        return valores
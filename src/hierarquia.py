@@ -0,0 +1,204 @@
+"""
+Hierarquia Exclusiva (FASE 3.5) em O(n log n)
+=============================================
+
+Cada dado encontrado no texto pertence a UMA categoria apenas, pela
+ordem CPF > RG > Email > Telefone (ver METODOLOGIA_TECNICA.md, seção 3).
+A versão documentada normaliza cada valor com `re.sub` e remove os
+rejeitados com `list.remove` enquanto percorre a lista; os spans, por sua
+vez, eram comparados com todos os já aceitos. Em manifestações com
+planilhas coladas (centenas de números) as duas coisas ficam quadráticas.
+
+Aqui:
+
+- `aplicar_hierarquia_exclusiva` monta listas novas a partir de um
+  conjunto de chaves de dígitos normalizadas, sem remover nada no lugar
+- `IntervalosAceitos` guarda os spans aceitos ordenados por início; a
+  sobreposição de um novo span é decidida olhando só os vizinhos (busca
+  binária), já que os aceitos nunca se sobrepõem entre si
+- `resolver_sobreposicoes` usa essa estrutura para a resolução por
+  prioridade de tipos (inclusive sobreposições parciais)
+
+As versões anteriores ficam como referência: `tests/test_hierarquia.py`
+confere as diferenças intencionais e a concordância fora delas, e
+`python benchmark.py hierarquia` mede o tempo das duas.
+"""
+
+import re
+from bisect import bisect_right
+
+# Ordem de prioridade da hierarquia exclusiva (chaves de `entidades`)
+ORDEM_HIERARQUIA = ['cpf_validado', 'cpf_nao_validado', 'rg', 'email', 'telefone']
+
+# Compilado uma vez (a versão documentada chama `re.sub` com o padrão em string)
+_NAO_DIGITO = re.compile(r'\D')
+
+
+# =====================================================================
+# REFERÊNCIA (versões anteriores)
+# =====================================================================
+
+def aplicar_hierarquia_referencia(entidades):
+    """
+    Cópia literal da versão documentada (METODOLOGIA_TECNICA.md, seção 3.2).
+
+    Altera `entidades` no lugar (passe uma cópia, ex: `copy.deepcopy`). As
+    diferenças da versão nova estão em `aplicar_hierarquia_exclusiva`.
+    """
+    padroes_classificados = set()
+
+    # Normaliza para comparação (remove formatação)
+    def normalizar(valor):
+        return re.sub(r'[^\d]', '', valor)
+
+    # Processa em ordem de prioridade
+    for tipo in ['cpf_validado', 'cpf_nao_validado', 'rg', 'email', 'telefone']:
+        for dado in entidades[tipo]:
+            norm = normalizar(dado)
+            if norm not in padroes_classificados:
+                # Aceita
+                padroes_classificados.add(norm)
+            else:
+                # Rejeita (já foi classificado em categoria superior)
+                entidades[tipo].remove(dado)
+
+    return entidades
+
+
+def resolver_sobreposicoes_referencia(candidatos: list, tipos: list) -> list:
+    """Comparação de cada candidato com todos os já aceitos (O(n²))."""
+    prioridade = {tipo: i for i, tipo in enumerate(tipos)}
+    aceitos = []
+    for span in sorted(candidatos, key=lambda s: (prioridade[s[2]], s[0] - s[1], s[0])):
+        if all(span[1] <= outro[0] or span[0] >= outro[1] for outro in aceitos):
+            aceitos.append(span)
+    return sorted(aceitos)
+
+
+# =====================================================================
+# HIERARQUIA POR CHAVES
+# =====================================================================
+
+def chave_hierarquia(valor: str) -> str:
+    """
+    Chave de comparação entre categorias: só os dígitos do valor.
+
+    Valores sem nenhum dígito (e-mails como 'joao@email.com') usam o
+    próprio valor; do contrário todos teriam a mesma chave vazia e só o
+    primeiro sobreviveria.
+    """
+    digitos = _NAO_DIGITO.sub('', valor)
+    return digitos or valor
+
+
+def aplicar_hierarquia_exclusiva(entidades: dict) -> dict:
+    """
+    Aplica a hierarquia CPF > RG > Email > Telefone.
+
+    Diferenças intencionais em relação a `aplicar_hierarquia_referencia`:
+
+    1. Não altera `entidades`: devolve listas novas; tipos ausentes contam
+       como listas vazias (a referência levanta KeyError)
+    2. Todo valor rejeitado sai da lista. Na referência, `list.remove`
+       durante o `for` pula o elemento seguinte ao removido, que fica na
+       lista mesmo que sua chave já tenha sido classificada
+    3. O valor rejeitado é o que sai. Na referência, `list.remove(dado)`
+       tira a primeira ocorrência igual, que pode ser a aceita: em
+       ['x', 'y', 'x'] o resultado é ['y', 'x'] em vez de ['x', 'y']
+    4. Valores sem nenhum dígito (e-mails) têm o próprio valor como chave.
+       Na referência todos têm a chave vazia e só o primeiro deles (de
+       qualquer tipo) sobrevive
+
+    Sem esses casos (todo valor com dígitos, nenhum rejeitado seguido de
+    outro valor do mesmo tipo), o resultado é igual ao da referência.
+
+    Args:
+        entidades: Dicionário {tipo: [valores]} com as chaves de ORDEM_HIERARQUIA
+            (chaves ausentes são tratadas como listas vazias)
+
+    Returns:
+        Novo dicionário {tipo: [valores aceitos]}, na ordem original de cada lista
+    """
+    classificados = set()
+    adicionar = classificados.add
+    resultado = {}
+    for tipo in ORDEM_HIERARQUIA:
+        aceitos = []
+        for dado in entidades.get(tipo, ()):
+            chave = chave_hierarquia(dado)
+            if chave not in classificados:
+                adicionar(chave)
+                aceitos.append(dado)
+        resultado[tipo] = aceitos
+    return resultado
+
+
+# =====================================================================
+# SOBREPOSIÇÃO DE SPANS
+# =====================================================================
+
+class IntervalosAceitos:
+    """
+    Conjunto de spans sem sobreposição, ordenados por (inicio, fim).
+
+    Uso:
+        aceitos = IntervalosAceitos()
+        if aceitos.tentar_adicionar(span):   # span = (inicio, fim, ...)
+            ...
+    """
+
+    def __init__(self):
+        self._chaves = []   # (inicio, fim) de cada span, ordenados
+        self.spans = []     # spans na mesma ordem
+
+    def __len__(self):
+        return len(self.spans)
+
+    def sobrepoe(self, inicio: int, fim: int) -> bool:
+        """
+        Indica se [inicio, fim) se sobrepõe a algum span aceito.
+
+        Como os aceitos não se sobrepõem entre si, basta olhar o último que
+        começa até `inicio` e o primeiro que começa depois dele.
+        """
+        i = bisect_right(self._chaves, (inicio, fim))
+        if i > 0:
+            anterior = self._chaves[i - 1]
+            if not (fim <= anterior[0] or inicio >= anterior[1]):
+                return True
+        if i < len(self._chaves):
+            seguinte = self._chaves[i]
+            if not (fim <= seguinte[0] or inicio >= seguinte[1]):
+                return True
+        return False
+
+    def tentar_adicionar(self, span: tuple) -> bool:
+        """Aceita o span se não houver sobreposição. Retorna se foi aceito."""
+        inicio, fim = span[0], span[1]
+        if self.sobrepoe(inicio, fim):
+            return False
+        i = bisect_right(self._chaves, (inicio, fim))
+        self._chaves.insert(i, (inicio, fim))
+        self.spans.insert(i, span)
+        return True
+
+
+def resolver_sobreposicoes(candidatos: list, tipos: list) -> list:
+    """
+    Remove candidatos sobrepostos pela ordem de prioridade dos tipos.
+
+    Maior prioridade primeiro; no mesmo tipo, o span mais longo vence (e,
+    empatado, o que começa antes).
+
+    Args:
+        candidatos: Tuplas (inicio, fim, tipo, valor)
+        tipos: Tipos em ordem de prioridade
+
+    Returns:
+        Lista ordenada por posição, sem sobreposições
+    """
+    prioridade = {tipo: i for i, tipo in enumerate(tipos)}
+    aceitos = IntervalosAceitos()
+    for span in sorted(candidatos, key=lambda s: (prioridade[s[2]], s[0] - s[1], s[0])):
+        aceitos.tentar_adicionar(span)
+    return sorted(aceitos.spans)
@@ -0,0 +1,205 @@
+"""
+Reanálise Incremental
+=====================
+
+Quando chega uma nova versão de uma planilha já analisada, apenas as
+linhas novas ou alteradas passam pelo detector. Cada linha é identificada
+pela impressão digital (hash) do texto analisado; linhas cujo texto já
+existe na análise anterior reaproveitam diretamente as colunas de
+resultado (`contém_pii`, `score_risco`, `*_detectado`, `pii_*_lista`...).
+
+Salvaguardas:
+
+- a análise anterior só é reaproveitada se foi gerada pelo mesmo detector,
+  com a mesma configuração (coluna `assinatura_deteccao`)
+- arquivos CSV/Excel são lidos com as colunas de texto como texto
+  (`ler_analise_anterior`): um CPF só com dígitos não vira número
+- uma linha reaproveitada cujos valores não são localizados no texto
+  volta para o detector, em vez de ficar sem mascaramento
+"""
+
+import hashlib
+
+import pandas as pd
+
+from arquivos import ler_tabela
+from processamento import (
+    COLUNAS_RESULTADO, detectar_colunar, extrair_spans, montar_colunas_resultado, spans_completos
+)
+from progresso import medir
+
+# Colunas de listas de PII (lidas como texto e usadas para reconstruir os spans)
+COLUNAS_LISTA = [coluna for coluna in COLUNAS_RESULTADO if coluna.startswith('pii_')]
+
+
+def impressao_texto(texto: str) -> bytes:
+    """Impressão digital de 128 bits do texto de uma linha."""
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=16).digest()
+
+
+def motivo_incompatibilidade(df_anterior: pd.DataFrame, coluna_texto: str, assinatura: str = None) -> str:
+    """
+    Explica por que a análise anterior não pode ser reaproveitada.
+
+    Args:
+        df_anterior: Análise anterior (ou None)
+        coluna_texto: Coluna com os textos
+        assinatura: Assinatura do detector atual (None = não verifica)
+
+    Returns:
+        Mensagem, ou None se a análise for compatível
+    """
+    if df_anterior is None:
+        return 'nenhuma análise anterior carregada'
+    faltando = [coluna for coluna in [coluna_texto, *COLUNAS_RESULTADO] if coluna not in df_anterior.columns]
+    if faltando:
+        return f"faltam as colunas {', '.join(map(str, faltando))}"
+    if assinatura is not None:
+        anteriores = set(df_anterior['assinatura_deteccao'].fillna('').astype(str).unique())
+        if anteriores - {assinatura}:
+            return 'gerada por outra versão ou configuração do detector'
+    return None
+
+
+def analise_compativel(df_anterior: pd.DataFrame, coluna_texto: str, assinatura: str = None) -> bool:
+    """Verifica se a análise anterior tem o texto, as colunas de resultado e a mesma assinatura."""
+    return motivo_incompatibilidade(df_anterior, coluna_texto, assinatura) is None
+
+
+def ler_analise_anterior(origem, coluna_texto: str) -> pd.DataFrame:
+    """
+    Lê de uma análise exportada só o texto e as colunas de resultado.
+
+    Texto e listas de PII são lidos como texto em CSV/Excel, sem conversão
+    de números ('12345678909' continuaria sendo 12345678909.0) nem de
+    células vazias em NaN.
+
+    Args:
+        origem: Caminho ou arquivo enviado (analise_pii_*)
+        coluna_texto: Coluna com os textos
+
+    Raises:
+        ValueError: Se faltar alguma coluna
+    """
+    return ler_tabela(origem, [coluna_texto, *COLUNAS_RESULTADO],
+                      como_texto=[coluna_texto, *COLUNAS_LISTA, 'assinatura_deteccao'])
+
+
+def resultado_de_colunas(linha: dict) -> dict:
+    """
+    Reconstrói o dicionário de entidades a partir das colunas `pii_*_lista`.
+
+    Usado para calcular os spans de mascaramento de linhas reaproveitadas,
+    sem rodar o detector.
+
+    Args:
+        linha: Dicionário com as colunas `pii_*_lista` de uma linha
+
+    Returns:
+        Dicionário no formato de `detect_pii` (apenas 'entidades')
+    """
+    def lista(coluna):
+        valor = linha.get(coluna)
+        if not isinstance(valor, str) or not valor:
+            return []
+        return [item for item in valor.split(';') if item]
+
+    return {
+        'entidades': {
+            'cpf': {'verificado': lista('pii_cpf_validado_lista'), 'suspeito': lista('pii_cpf_nao_validado_lista')},
+            'rg': {'verificado': lista('pii_rg_lista'), 'suspeito': []},
+            'email': {'verificado': lista('pii_email_lista'), 'suspeito': []},
+            'telefone': {'verificado': lista('pii_telefone_lista'), 'suspeito': []},
+            'nlp_contexto': {'pessoas': lista('pii_nome_lista')},
+            'endereco': {'detectado': lista('pii_endereco_lista')},
+        }
+    }
+
+
+def analisar_incremental(df: pd.DataFrame, coluna_texto: str, df_anterior: pd.DataFrame, detector,
+                         motor=None, progresso=None, cache=None, coluna_anterior: str = None,
+                         batch_size: int = 50, instrumentacao=None, assinatura: str = ''):
+    """
+    Analisa apenas as linhas novas ou alteradas em relação a uma análise anterior.
+
+    Args:
+        df: Nova versão da planilha (recebe as colunas de resultado)
+        coluna_texto: Coluna com os textos
+        df_anterior: DataFrame já analisado (com as colunas de resultado)
+        detector: Instância de PIIDetector
+        motor: MotorParalelo opcional
+        progresso: Callback opcional progresso(processados, total) da detecção
+        cache: CacheResultados opcional
+        coluna_anterior: Coluna de texto na análise anterior (padrão: coluna_texto)
+        batch_size: Lote do `nlp.pipe` dentro do detector
+        instrumentacao: Progresso opcional (tempo por estágio, ver progresso.py)
+        assinatura: Assinatura do detector atual (`cache.assinatura_detector`),
+            gravada nas linhas analisadas e exigida na análise anterior
+
+    Returns:
+        Tupla (df_analisado, spans_lista, estatisticas) onde estatisticas
+        tem 'reaproveitados', 'analisados' e 'nao_localizados' (linhas
+        reaproveitáveis que voltaram ao detector)
+
+    Raises:
+        ValueError: Se a análise anterior não for compatível (colunas ou assinatura)
+    """
+    coluna_anterior = coluna_anterior or coluna_texto
+    motivo = motivo_incompatibilidade(df_anterior, coluna_anterior, assinatura)
+    if motivo:
+        raise ValueError(f'Análise anterior não reaproveitável: {motivo}')
+    textos = df[coluna_texto].fillna("").astype(str).tolist()
+
+    # Primeira ocorrência de cada texto na análise anterior
+    posicao_anterior = {}
+    for posicao, texto in enumerate(df_anterior[coluna_anterior].fillna("").astype(str).tolist()):
+        posicao_anterior.setdefault(impressao_texto(texto), posicao)
+
+    origem = [posicao_anterior.get(impressao_texto(texto)) for texto in textos]
+
+    # Spans reconstruídos a partir das listas anteriores; se algum valor não
+    # for localizado no texto, a linha volta para o detector
+    spans_lista = [None] * len(textos)
+    reaproveitadas = []
+    nao_localizadas = 0
+    with medir(instrumentacao, 'reaproveitamento'):
+        candidatas = [i for i, pos in enumerate(origem) if pos is not None]
+        listas = df_anterior[COLUNAS_LISTA].iloc[[origem[i] for i in candidatas]]
+        valores_lista = zip(*(listas[coluna].fillna('').astype(str).tolist() for coluna in COLUNAS_LISTA))
+        for i, valores in zip(candidatas, valores_lista):
+            spans = extrair_spans(textos[i], resultado_de_colunas(dict(zip(COLUNAS_LISTA, valores))))
+            if spans_completos(spans):
+                spans_lista[i] = spans
+                reaproveitadas.append(i)
+            else:
+                origem[i] = None
+                nao_localizadas += 1
+    novas = [i for i, pos in enumerate(origem) if pos is None]
+
+    # Detecção apenas das linhas novas/alteradas
+    textos_novos = [textos[i] for i in novas]
+    colunas_novas, spans_novos = detectar_colunar(detector, textos_novos, motor=motor, progresso=progresso,
+                                                  cache=cache, batch_size=batch_size,
+                                                  instrumentacao=instrumentacao)
+    with medir(instrumentacao, 'montagem'):
+        df_novos = montar_colunas_resultado(pd.DataFrame(index=range(len(novas))), colunas_novas, assinatura)
+    for i, spans in zip(novas, spans_novos):
+        spans_lista[i] = spans
+
+    # Colunas de resultado das linhas reaproveitadas, copiadas da análise anterior
+    df_reaproveitado = df_anterior[COLUNAS_RESULTADO].iloc[[origem[i] for i in reaproveitadas]].copy()
+
+    # Listas vazias voltam como NaN quando a análise anterior vem de Parquet/Feather com nulos
+    df_reaproveitado[COLUNAS_LISTA] = df_reaproveitado[COLUNAS_LISTA].fillna('').astype(str)
+
+    resultado = pd.concat([
+        df_reaproveitado.set_axis(reaproveitadas, axis=0),
+        df_novos[COLUNAS_RESULTADO].set_axis(novas, axis=0),
+    ]).sort_index()
+
+    for coluna in COLUNAS_RESULTADO:
+        df[coluna] = resultado[coluna].to_numpy()
+
+    estatisticas = {'reaproveitados': len(reaproveitadas), 'analisados': len(novas),
+                    'nao_localizados': nao_localizadas}
+    return df, spans_lista, estatisticas
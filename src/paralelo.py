@@ -0,0 +1,205 @@
+"""
+Motor Paralelo de Detecção
+==========================
+
+Executa `detect_pii_batch` e `apply_masking_batch` em um pool de
+processos. Cada worker carrega seu próprio `PIIDetector` (e o modelo
+spaCy) uma única vez, recebe blocos de textos e devolve os resultados,
+que são remontados na mesma ordem da entrada.
+
+Com o pré-filtro de nomes, cada worker tem a sua cópia e devolve, junto
+com os resultados do bloco, quantos textos avaliou e dispensou; o motor
+soma essas contagens no pré-filtro do processo principal, sem reavaliar
+os textos. `VisaoMotor` permite que várias sessões do app usem o mesmo
+pool, cada uma com as suas contagens.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Detector do processo worker (criado uma vez no initializer)
+_detector_worker = None
+
+
+def criar_detector(prefiltro=None, desligar_pipes: bool = False):
+    """
+    Carrega um PIIDetector pronto para análise (opcionalmente com o
+    pré-filtro de nomes e com os componentes do spaCy de PIPES_NAO_USADOS
+    desligados).
+    """
+    from detector import PIIDetector
+    detector = PIIDetector()
+    if desligar_pipes:
+        from processamento import desabilitar_pipes_nao_usados
+        desabilitar_pipes_nao_usados(detector)
+    if prefiltro is not None:
+        from prefiltro import DetectorComPrefiltro
+        detector = DetectorComPrefiltro(detector, prefiltro)
+    return detector
+
+
+def _inicializar_worker(prefiltro=None, desligar_pipes: bool = False):
+    """Carrega o PIIDetector uma única vez em cada processo worker."""
+    global _detector_worker
+    _detector_worker = criar_detector(prefiltro, desligar_pipes)
+
+
+def _detectar_bloco(textos: list, batch_size: int) -> tuple:
+    """
+    Roda a detecção de um bloco de textos no worker.
+
+    Returns:
+        Tupla (resultados, contagem do pré-filtro (avaliados, dispensados) ou None)
+    """
+    prefiltro = getattr(_detector_worker, 'prefiltro', None)
+    if prefiltro is None:
+        return _detector_worker.detect_pii_batch(textos, batch_size=batch_size), None
+
+    # Um worker atende um bloco por vez: a diferença dos contadores é a deste bloco
+    avaliados, dispensados = prefiltro.avaliados, prefiltro.dispensados
+    resultados = _detector_worker.detect_pii_batch(textos, batch_size=batch_size)
+    return resultados, (prefiltro.avaliados - avaliados, prefiltro.dispensados - dispensados)
+
+
+def _mascarar_bloco(textos: list, modo: str) -> list:
+    """Roda o mascaramento de um bloco de textos no worker."""
+    return _detector_worker.apply_masking_batch(textos, mode=modo)
+
+
+class MotorParalelo:
+    """
+    Pool de processos com um PIIDetector aquecido por worker.
+
+    Uso:
+        with MotorParalelo(n_workers=8, chunk_size=500) as motor:
+            resultados = motor.detect_pii_batch(textos)
+    """
+
+    def __init__(self, n_workers: int = None, chunk_size: int = 500, prefiltro=None, desligar_pipes: bool = False):
+        """
+        Args:
+            n_workers: Número de processos (padrão: número de núcleos)
+            chunk_size: Quantidade de textos enviada a cada worker por vez
+            prefiltro: PrefiltroNomes opcional aplicado antes do spaCy em cada worker
+            desligar_pipes: Desliga nos workers os componentes de PIPES_NAO_USADOS
+        """
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.prefiltro = prefiltro
+        self.desligar_pipes = desligar_pipes
+        self._executor = None
+
+    def iniciar(self):
+        """Sobe o pool de processos (idempotente)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_inicializar_worker,
+                initargs=(self.prefiltro, self.desligar_pipes)
+            )
+        return self
+
+    def encerrar(self):
+        """Finaliza os workers e libera os modelos carregados."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.encerrar()
+
+    def _executar(self, funcao, textos: list, argumento, progresso=None, receber=None) -> list:
+        """
+        Distribui os blocos entre os workers e junta os resultados em ordem.
+
+        Args:
+            funcao: Função executada no worker para cada bloco
+            textos: Lista completa de textos
+            argumento: Segundo argumento repassado à função do worker
+            progresso: Callback opcional progresso(processados, total)
+            receber: Função opcional que converte o retorno de cada bloco na lista de resultados
+
+        Returns:
+            Lista de resultados na mesma ordem de `textos`
+        """
+        self.iniciar()
+        total = len(textos)
+        futuros = [
+            self._executor.submit(funcao, textos[i:i+self.chunk_size], argumento)
+            for i in range(0, total, self.chunk_size)
+        ]
+
+        resultados = []
+        for futuro in futuros:
+            bloco = futuro.result()
+            resultados.extend(receber(bloco) if receber is not None else bloco)
+            if progresso:
+                progresso(len(resultados), total)
+
+        return resultados
+
+    def detect_pii_batch(self, textos: list, batch_size: int = 50, progresso=None, prefiltro=None) -> list:
+        """
+        Equivalente paralelo de `PIIDetector.detect_pii_batch`.
+
+        Args:
+            textos: Lista de textos
+            batch_size: Tamanho de lote repassado ao detector de cada worker
+            progresso: Callback opcional progresso(processados, total)
+            prefiltro: PrefiltroNomes que recebe as contagens dos workers (padrão: o do motor)
+
+        Returns:
+            Lista de resultados na ordem da entrada
+        """
+        prefiltro = prefiltro if prefiltro is not None else self.prefiltro
+
+        def receber(retorno):
+            resultados, contagem = retorno
+            if contagem is not None and prefiltro is not None:
+                prefiltro.registrar(*contagem)
+            return resultados
+
+        return self._executar(_detectar_bloco, textos, batch_size, progresso, receber)
+
+    def apply_masking_batch(self, textos: list, mode: str = 'PARCIAL', progresso=None) -> list:
+        """
+        Equivalente paralelo de `PIIDetector.apply_masking_batch`.
+
+        Args:
+            textos: Lista de textos
+            mode: 'PARCIAL' ou 'PROTECAO_TOTAL'
+            progresso: Callback opcional progresso(processados, total)
+
+        Returns:
+            Lista de textos mascarados na ordem da entrada
+        """
+        return self._executar(_mascarar_bloco, textos, mode, progresso)
+
+
+class VisaoMotor:
+    """
+    Um MotorParalelo compartilhado (ex: entre as sessões do app) visto por um usuário.
+
+    As contagens do pré-filtro vão para o PrefiltroNomes do usuário, e
+    `encerrar` não derruba o pool, que continua atendendo as outras sessões.
+    """
+
+    def __init__(self, motor: MotorParalelo, prefiltro=None):
+        self.motor = motor
+        self.prefiltro = prefiltro
+
+    def __getattr__(self, nome):
+        return getattr(self.motor, nome)
+
+    def detect_pii_batch(self, textos: list, batch_size: int = 50, progresso=None) -> list:
+        return self.motor.detect_pii_batch(textos, batch_size=batch_size, progresso=progresso,
+                                           prefiltro=self.prefiltro)
+
+    def apply_masking_batch(self, textos: list, mode: str = 'PARCIAL', progresso=None) -> list:
+        return self.motor.apply_masking_batch(textos, mode=mode, progresso=progresso)
+
+    def encerrar(self):
+        """O pool pertence a quem o criou; a visão não o encerra."""
@@ -0,0 +1,251 @@
+"""
+Perfil por Fase do Pipeline (opcional)
+======================================
+
+A METODOLOGIA_TECNICA.md descreve as fases do pipeline (regex, contexto,
+validação, hierarquia, spaCy e score), mas o detector não expõe tempos:
+não dá para saber se, nos nossos dados, o gargalo é a análise de contexto
+ou o spaCy. `DetectorPerfilado` envolve o detector (mesma interface) e,
+enquanto ligado, coleta:
+
+- tempo, chamadas e textos de `detect_pii_batch` e `apply_masking_batch`
+- tempo dentro do spaCy (FASE 4), medindo `nlp.pipe` / `nlp(...)` do
+  detector durante a chamada; o restante da chamada são as fases de
+  regras (1, 2, 3, 3.5 e 5)
+- opcionalmente (`reproduzir_fases`), a FASE 1 e a FASE 2 reexecutadas
+  sobre os mesmos textos com `extracao.py` e `contexto.py`: tempo de cada
+  uma e contagem de candidatos numéricos (CPF, RG, telefone) antes e
+  depois da lista de imunidade
+
+A reprodução custa uma passada extra de regex pelos textos, por isso o
+perfil é opt-in. As contagens de candidatos são uma aproximação: vêm dos
+padrões de `extracao.py` e de `contexto.py`, não dos contadores internos
+do detector, e o resumo as marca assim (`candidatos['aproximado']`).
+
+O resumo (`PerfilPipeline.resumo`) é exportável em JSON. O percentual de
+uma fase principal é sobre o tempo total do detector; o de uma subfase
+(`detect_pii_batch/fase4_spacy`, `.../regras`) é sobre a fase principal.
+
+Uso:
+    perfil = PerfilPipeline()
+    detector = DetectorPerfilado(detector, perfil)
+    detector.detect_pii_batch(textos)
+    perfil.exportar_json('perfil.json')
+"""
+
+import json
+import re
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from contexto import verificar_contexto
+from extracao import ExtratorCombinado
+
+# Tipos da FASE 1 que passam pela lista de imunidade (números)
+TIPOS_NUMERICOS = ('cpf', 'rg', 'telefone')
+
+_NAO_DIGITO = re.compile(r'\D')
+
+NOTA_CANDIDATOS = ('Aproximação: FASE 1 e FASE 2 reexecutadas à parte com ExtratorCombinado (extracao.py) '
+                   'e verificar_contexto (contexto.py), não contadas dentro do detector')
+
+
+class PerfilPipeline:
+    """Acumula tempos, chamadas e contagens por fase."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.fases = {}
+        self.candidatos = {'fase1': {}, 'numericos': 0, 'descartados_imunidade': 0, 'apos_imunidade': 0}
+
+    def registrar(self, fase: str, segundos: float, chamadas: int = 1, itens: int = 0):
+        """Soma uma medição à fase."""
+        with self._trava:
+            dados = self.fases.setdefault(fase, {'segundos': 0.0, 'chamadas': 0, 'itens': 0})
+            dados['segundos'] += segundos
+            dados['chamadas'] += chamadas
+            dados['itens'] += itens
+
+    def contar_candidatos(self, por_tipo: dict, numericos: int, descartados: int):
+        """Soma candidatos da FASE 1 e o resultado da lista de imunidade."""
+        with self._trava:
+            fase1 = self.candidatos['fase1']
+            for tipo, quantidade in por_tipo.items():
+                fase1[tipo] = fase1.get(tipo, 0) + quantidade
+            self.candidatos['numericos'] += numericos
+            self.candidatos['descartados_imunidade'] += descartados
+            self.candidatos['apos_imunidade'] = self.candidatos['numericos'] - self.candidatos['descartados_imunidade']
+
+    def limpar(self):
+        with self._trava:
+            self.fases = {}
+            self.candidatos = {'fase1': {}, 'numericos': 0, 'descartados_imunidade': 0, 'apos_imunidade': 0}
+
+    def resumo(self) -> dict:
+        """
+        Returns:
+            Dicionário com as fases ({segundos, chamadas, itens, ms_por_item,
+            percentual, percentual_de}) e as contagens aproximadas de candidatos
+        """
+        with self._trava:
+            fases = {fase: dict(dados) for fase, dados in self.fases.items()}
+            candidatos = json.loads(json.dumps(self.candidatos))
+
+        # Fases principais: percentual do tempo total do detector; subfases ('metodo/...'):
+        # percentual da fase principal. A reprodução é medida à parte e não entra
+        total = sum(fases.get(fase, {}).get('segundos', 0.0) for fase in ('detect_pii_batch', 'apply_masking_batch'))
+        for fase, dados in fases.items():
+            dados['ms_por_item'] = round(dados['segundos'] * 1000 / dados['itens'], 4) if dados['itens'] else None
+            pai, _, subfase = fase.partition('/')
+            if pai == 'reproducao':
+                referencia, segundos_referencia = None, 0.0
+            elif subfase:
+                referencia, segundos_referencia = pai, fases.get(pai, {}).get('segundos', 0.0)
+            else:
+                referencia, segundos_referencia = 'detector', total
+            dados['percentual'] = (round(dados['segundos'] / segundos_referencia * 100, 1)
+                                   if segundos_referencia else None)
+            dados['percentual_de'] = referencia if segundos_referencia else None
+        for dados in fases.values():
+            dados['segundos'] = round(dados['segundos'], 4)
+        candidatos['fase1_total'] = sum(candidatos['fase1'].values())
+        candidatos['aproximado'] = True
+        candidatos['observacao'] = NOTA_CANDIDATOS
+        return {'fases': fases, 'candidatos': candidatos}
+
+    def exportar_json(self, caminho=None) -> str:
+        """Serializa o resumo; com `caminho`, grava também no arquivo."""
+        conteudo = json.dumps(self.resumo(), ensure_ascii=False, indent=2)
+        if caminho is not None:
+            Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+            Path(caminho).write_text(conteudo, encoding='utf-8')
+        return conteudo
+
+
+class _NLPCronometrado:
+    """Repassa tudo ao `nlp` original, medindo o tempo gasto em `pipe` e `__call__`."""
+
+    def __init__(self, nlp):
+        self._nlp = nlp
+        self.segundos = 0.0
+        self.documentos = 0
+
+    def __getattr__(self, nome):
+        return getattr(self._nlp, nome)
+
+    def __call__(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return self._nlp(*args, **kwargs)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+            self.documentos += 1
+
+    def pipe(self, *args, **kwargs):
+        # O tempo do spaCy é gasto a cada `next` do gerador, não na chamada
+        documentos = iter(self._nlp.pipe(*args, **kwargs))
+        while True:
+            inicio = time.perf_counter()
+            try:
+                documento = next(documentos)
+            except StopIteration:
+                self.segundos += time.perf_counter() - inicio
+                return
+            self.segundos += time.perf_counter() - inicio
+            self.documentos += 1
+            yield documento
+
+
+def _detector_base(detector):
+    """Desce pelos envoltórios (`.detector`) até o detector que tem o `nlp`."""
+    vistos = set()
+    while id(detector) not in vistos and 'detector' in vars(detector):
+        vistos.add(id(detector))
+        detector = vars(detector)['detector']
+    return detector
+
+
+class DetectorPerfilado:
+    """
+    Envolve um detector (PIIDetector, DetectorComPrefiltro ou DetectorCompartilhado)
+    coletando o perfil por fase em `perfil`.
+
+    Atributos não definidos aqui são repassados ao detector original.
+    """
+
+    def __init__(self, detector, perfil: PerfilPipeline = None, reproduzir_fases: bool = True):
+        self.detector = detector
+        self.perfil = perfil if perfil is not None else PerfilPipeline()
+        self.reproduzir_fases = reproduzir_fases
+        self._extrator = ExtratorCombinado() if reproduzir_fases else None
+        # O `nlp` cronometrado é trocado no detector compartilhado: com um
+        # DetectorCompartilhado, nenhuma outra sessão o usa durante a chamada
+        self._trava = getattr(detector, 'trava', None)
+
+    def __getattr__(self, nome):
+        return getattr(self.detector, nome)
+
+    def _medir_chamada(self, metodo: str, textos: list, chamada):
+        base = _detector_base(self.detector)
+        nlp = vars(base).get('nlp')
+        cronometrado = _NLPCronometrado(nlp) if nlp is not None else None
+
+        with self._trava if self._trava is not None else nullcontext():
+            if cronometrado is not None:
+                base.nlp = cronometrado
+            inicio = time.perf_counter()
+            try:
+                resultado = chamada()
+            finally:
+                segundos = time.perf_counter() - inicio
+                if cronometrado is not None:
+                    base.nlp = nlp
+
+        self.perfil.registrar(metodo, segundos, itens=len(textos))
+        if cronometrado is not None:
+            self.perfil.registrar(f'{metodo}/fase4_spacy', cronometrado.segundos, itens=cronometrado.documentos)
+            self.perfil.registrar(f'{metodo}/regras', max(segundos - cronometrado.segundos, 0.0), itens=len(textos))
+        return resultado
+
+    def _reproduzir(self, textos: list):
+        """Reexecuta FASE 1 e FASE 2 (extracao.py / contexto.py) para contar candidatos."""
+        por_tipo = {}
+        candidatos_por_texto = []
+        inicio = time.perf_counter()
+        for texto in textos:
+            candidatos = self._extrator.extrair(texto)
+            for _, _, tipo, _ in candidatos:
+                por_tipo[tipo] = por_tipo.get(tipo, 0) + 1
+            candidatos_por_texto.append(candidatos)
+        self.perfil.registrar('reproducao/fase1_extracao', time.perf_counter() - inicio, itens=len(textos))
+
+        numericos = 0
+        descartados = 0
+        inicio = time.perf_counter()
+        for texto, candidatos in zip(textos, candidatos_por_texto):
+            posicoes = [(inicio_span, _NAO_DIGITO.sub('', valor))
+                        for inicio_span, _, tipo, valor in candidatos if tipo in TIPOS_NUMERICOS]
+            posicoes = [(posicao, digitos) for posicao, digitos in posicoes if len(digitos) >= 2]
+            numericos += len(posicoes)
+            descartados += sum(1 for negativo, _ in verificar_contexto(texto, posicoes) if negativo)
+        self.perfil.registrar('reproducao/fase2_contexto', time.perf_counter() - inicio, itens=numericos)
+
+        self.perfil.contar_candidatos(por_tipo, numericos, descartados)
+
+    def detect_pii(self, texto: str) -> dict:
+        return self.detect_pii_batch([texto])[0]
+
+    def detect_pii_batch(self, textos: list, batch_size: int = 50) -> list:
+        """`detect_pii_batch` do detector original, com perfil por fase."""
+        resultados = self._medir_chamada('detect_pii_batch', textos,
+                                         lambda: self.detector.detect_pii_batch(textos, batch_size=batch_size))
+        if self.reproduzir_fases:
+            self._reproduzir(textos)
+        return resultados
+
+    def apply_masking_batch(self, textos: list, mode: str = 'PARCIAL') -> list:
+        """`apply_masking_batch` do detector original, com perfil por fase."""
+        return self._medir_chamada('apply_masking_batch', textos,
+                                   lambda: self.detector.apply_masking_batch(textos, mode=mode))
@@ -0,0 +1,255 @@
+"""
+Pré-filtro de Nomes (antes do spaCy)
+====================================
+
+A FASE 4 (spaCy NLP) é a etapa mais cara do pipeline, mas boa parte das
+manifestações (textos curtos, puramente administrativos) não tem como
+conter um nome de pessoa. O pré-filtro decide, em camadas baratas,
+quais textos precisam passar pelo NLP:
+
+1. Nome brasileiro conhecido (gazetteer) -> sempre candidato, em textos
+   de qualquer tamanho ("Maria Silva" tem 11 caracteres)
+2. Tamanho: sem nome conhecido, textos com menos de `min_caracteres`
+   são dispensados
+3. Demais sinais de nome, palavra a palavra:
+   - palavra capitalizada fora do início de frase (exceto termos
+     institucionais/geográficos comuns e siglas)
+   - palavras de contexto ("nome", "sou", "sr", "sra", "mãe"...)
+
+Um texto é candidato quando soma pelo menos `limiar` sinais. Os demais
+passam pelo detector com os componentes do spaCy desligados (FASES 1-3
+e 5 continuam iguais). O limiar deve ser ajustado com
+`python benchmark.py prefiltro`, que mede o recall contra o pipeline completo.
+"""
+
+import hashlib
+import re
+import threading
+import unicodedata
+from pathlib import Path
+
+# Palavras (com ou sem acento) em qualquer caixa
+_PALAVRA = re.compile(r"[^\W\d_]+")
+
+# Pontuação que inicia uma nova frase
+_FIM_FRASE = re.compile(r"[.!?;:\n]")
+
+# Primeiros nomes e sobrenomes mais frequentes no Brasil (IBGE), sem acentos e em
+# minúsculas. Ficam de fora os que também são palavras comuns (dias, nascimento, clara...)
+NOMES_BRASILEIROS = frozenset("""
+    maria jose ana joao antonio francisco carlos paulo pedro lucas luiz marcos luis gabriel rafael
+    daniel marcelo bruno eduardo felipe raimundo rodrigo manoel manuel mateus matheus andre fernando
+    fabio leonardo gustavo guilherme leandro tiago thiago anderson ricardo marcio jorge sebastiao
+    alexandre roberto edson diego vitor victor sergio claudio renato vinicius adriano joaquim raul
+    igor henrique samuel rogerio julio caio otavio davi david arthur artur heitor enzo miguel bernardo
+    benicio lorenzo theo nicolas murilo emanuel caua joaquim wesley wellington welington
+    cristiano everton jefferson jeferson juliano luciano mauricio miguel nelson osvaldo oswaldo
+    reinaldo ronaldo sandro silvio valdir vanderlei wagner washington willian william wilson
+    francisca antonia adriana juliana marcia fernanda patricia aline sandra camila amanda bruna
+    jessica leticia julia luciana vanessa mariana gabriela vera vitoria larissa claudia beatriz
+    luana rita sonia renata eliane josefa simone natalia cristiane carla debora rosangela jaqueline
+    daniela aparecida marlene terezinha raimunda andreia andrea fabiana lucia raquel
+    angela rafaela joana luzia elaine daiane regina alessandra sabrina tatiane tatiana helena
+    alice laura manuela valentina sophia sofia isabela isabella heloisa lorena livia cecilia
+    eloa giovanna giovana lara mirella yasmin yasmim carolina priscila kelly michele michelle
+    cristina silvia monica denise edna fatima gloria ines irene ivone jane joyce karina karla
+    lidiane luiza luisa marta neide paula pamela roberta rosana rosilene sueli suely tereza teresa
+    thais valeria vania viviane zilda ana eva rui ivo ari noe
+    silva oliveira souza sousa rodrigues ferreira alves pereira gomes ribeiro martins carvalho
+    almeida lopes soares fernandes vieira barbosa andrade moreira nunes mendes cardoso goncalves
+    teixeira
+""".split())
+
+# Termos capitalizados comuns em manifestações que não são nomes de pessoa
+TERMOS_INSTITUCIONAIS = frozenset("""
+    secretaria governo distrito federal brasilia df gdf lei decreto portaria ouvidoria administracao
+    regional departamento diretoria coordenacao gerencia hospital escola policia civil militar
+    detran caesb ceb neoenergia novacap metro sus ubs upa ministerio publico tribunal justica
+    saude educacao seguranca transporte mobilidade meio ambiente obras desenvolvimento social
+    prefeitura estado municipio uniao rua avenida av quadra qd bloco bl conjunto cj lote lt setor
+    asa sul norte leste oeste plano piloto taguatinga ceilandia samambaia gama sobradinho
+    planaltina guara aguas claras recanto emas riacho fundo santa brazlandia paranoa itapoa
+    estrutural vicente pires jardim botanico lago cruzeiro sudoeste octogonal candangolandia
+    nucleo bandeirante park way varjao fercal arniqueira sol nascente por do
+    janeiro fevereiro marco abril maio junho julho agosto setembro outubro novembro dezembro
+    segunda terca quarta quinta sexta sabado domingo feira
+    protocolo processo artigo art inciso paragrafo sei nup oficio memorando
+    prezados prezado prezada bom boa dia tarde noite obrigado obrigada atenciosamente
+    solicito solicita solicitamos gostaria venho informo favor por o a os as um uma eu nos
+    de da do das dos em no na nos nas e ou que para com sem sobre ao aos pelo pela
+""".split())
+
+# Palavras que costumam anteceder ou acompanhar um nome
+PALAVRAS_CONTEXTO = frozenset("""
+    nome chamo sou sr sra srta dr dra senhor senhora servidor servidora paciente filho filha mae pai
+    esposa esposo marido irmao irma avo neto neta tio tia cunhado cunhada vizinho vizinha
+    requerente interessado interessada titular responsavel
+""".split())
+
+
+def normalizar_palavra(palavra: str) -> str:
+    """Minúsculas e sem acentos ('João' -> 'joao')."""
+    decomposta = unicodedata.normalize('NFKD', palavra.lower())
+    return ''.join(c for c in decomposta if not unicodedata.combining(c))
+
+
+class PrefiltroNomes:
+    """
+    Decide quais textos podem conter nomes de pessoa.
+
+    Uso:
+        prefiltro = PrefiltroNomes(limiar=1)
+        candidatos = prefiltro.selecionar(textos)   # [True, False, ...]
+    """
+
+    def __init__(self, limiar: int = 1, min_caracteres: int = 12, arquivo_nomes: str = None):
+        """
+        Args:
+            limiar: Sinais mínimos para enviar o texto ao NLP (maior = dispensa mais textos)
+            min_caracteres: Textos menores que isso só vão ao NLP com um nome do gazetteer
+            arquivo_nomes: Arquivo opcional com nomes extras (um por linha)
+        """
+        self.limiar = limiar
+        self.min_caracteres = min_caracteres
+        self.nomes = set(NOMES_BRASILEIROS)
+        if arquivo_nomes:
+            texto = Path(arquivo_nomes).read_text(encoding='utf-8')
+            self.nomes.update(normalizar_palavra(nome) for nome in texto.split())
+        self.avaliados = 0
+        self.dispensados = 0
+        # O mesmo pré-filtro atende várias threads (sessões do app, detectores do serviço)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Enviado aos processos do MotorParalelo: a trava não é serializável
+        estado = self.__dict__.copy()
+        del estado['_lock']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._lock = threading.Lock()
+
+    @property
+    def configuracao(self) -> str:
+        """Identifica os parâmetros do pré-filtro (entra na chave do cache)."""
+        nomes = hashlib.sha256(' '.join(sorted(self.nomes)).encode('utf-8')).hexdigest()[:8]
+        return f'prefiltro:v2;limiar={self.limiar};min={self.min_caracteres};nomes={nomes}'
+
+    def pontuacao(self, texto: str) -> int:
+        """
+        Conta os sinais de nome no texto.
+
+        Returns:
+            Número de sinais; um nome do gazetteer já basta para atingir o limiar
+            (em textos curtos, é o único sinal considerado)
+        """
+        curto = len(texto) < self.min_caracteres
+        pontos = 0
+        fim_anterior = 0
+        for match in _PALAVRA.finditer(texto):
+            palavra = match.group()
+            inicio_frase = fim_anterior == 0 or _FIM_FRASE.search(texto, fim_anterior, match.start()) is not None
+            fim_anterior = match.end()
+
+            chave = normalizar_palavra(palavra)
+            if chave in self.nomes:
+                return max(self.limiar, 1)
+            if curto:
+                continue
+            if chave in PALAVRAS_CONTEXTO:
+                pontos += 1
+            elif (palavra[0].isupper() and not inicio_frase and chave not in TERMOS_INSTITUCIONAIS
+                  and not (palavra.isupper() and len(palavra) <= 3)):
+                pontos += 1
+
+            if pontos >= self.limiar:
+                return pontos
+
+        return pontos
+
+    def candidato(self, texto: str) -> bool:
+        """Indica se o texto precisa passar pelo NLP."""
+        return self.pontuacao(texto) >= max(self.limiar, 1)
+
+    def selecionar(self, textos: list) -> list:
+        """
+        Avalia uma lista de textos e atualiza as estatísticas.
+
+        Returns:
+            Lista de booleanos (True = enviar ao NLP) na ordem de `textos`
+        """
+        candidatos = [self.candidato(texto) for texto in textos]
+        self.registrar(len(candidatos), candidatos.count(False))
+        return candidatos
+
+    def registrar(self, avaliados: int, dispensados: int):
+        """Soma contagens feitas em outro lugar (ex: cópias do pré-filtro nos processos do MotorParalelo)."""
+        with self._lock:
+            self.avaliados += avaliados
+            self.dispensados += dispensados
+
+    def estatisticas(self) -> dict:
+        """
+        Returns:
+            Dicionário com avaliados, dispensados e taxa_dispensa
+        """
+        with self._lock:
+            avaliados, dispensados = self.avaliados, self.dispensados
+        return {
+            'avaliados': avaliados,
+            'dispensados': dispensados,
+            'taxa_dispensa': dispensados / avaliados if avaliados else 0.0,
+        }
+
+
+class DetectorComPrefiltro:
+    """
+    Envolve um PIIDetector e só envia ao spaCy os textos candidatos.
+
+    Tem a mesma interface do detector (`detect_pii_batch`, `apply_masking_batch`,
+    mascaradores parciais...); atributos não definidos aqui são repassados
+    ao detector original.
+    """
+
+    def __init__(self, detector, prefiltro: PrefiltroNomes):
+        self.detector = detector
+        self.prefiltro = prefiltro
+        # Os componentes do spaCy são desligados no objeto `nlp` compartilhado:
+        # com um DetectorCompartilhado, a trava é a mesma de todas as sessões
+        self._lock = getattr(detector, 'trava', None) or threading.Lock()
+
+    def __getattr__(self, nome):
+        return getattr(self.detector, nome)
+
+    @property
+    def configuracao(self) -> str:
+        return self.prefiltro.configuracao
+
+    def _detectar_sem_nlp(self, textos: list, batch_size: int) -> list:
+        """Detecta com todos os componentes do spaCy desligados (só tokenização)."""
+        nlp = getattr(self.detector, 'nlp', None)
+        if nlp is None or not nlp.pipe_names:
+            return self.detector.detect_pii_batch(textos, batch_size=batch_size)
+        with nlp.select_pipes(disable=nlp.pipe_names):
+            return self.detector.detect_pii_batch(textos, batch_size=batch_size)
+
+    def detect_pii(self, texto: str) -> dict:
+        return self.detect_pii_batch([texto])[0]
+
+    def detect_pii_batch(self, textos: list, batch_size: int = 50) -> list:
+        """
+        Equivalente a `PIIDetector.detect_pii_batch`, pulando o NLP dos não candidatos.
+
+        Returns:
+            Lista de resultados na ordem de `textos`
+        """
+        candidatos = self.prefiltro.selecionar(textos)
+        com_nlp = [texto for texto, candidato in zip(textos, candidatos) if candidato]
+        sem_nlp = [texto for texto, candidato in zip(textos, candidatos) if not candidato]
+
+        with self._lock:
+            resultados_com = iter(self.detector.detect_pii_batch(com_nlp, batch_size=batch_size) if com_nlp else [])
+            resultados_sem = iter(self._detectar_sem_nlp(sem_nlp, batch_size) if sem_nlp else [])
+
+        return [next(resultados_com) if candidato else next(resultados_sem) for candidato in candidatos]
@@ -0,0 +1,599 @@
+"""
+Processamento de Resultados - Detecção, Spans e Mascaramento
+============================================================
+
+Núcleo do pipeline sem dependência de interface (usado pelo app
+Streamlit e pelo processamento em lote via linha de comando):
+
+- Detecção em lotes com `PIIDetector.detect_pii_batch`
+- Montagem das colunas de resultado (contagens e listas de PII) a
+  partir da estrutura colunar de `colunar.py`
+- Spans de caracteres por entidade e mascaramento PARCIAL ou
+  PROTECAO_TOTAL a partir deles, sem rodar novamente o pipeline
+  de detecção (regex + contexto + spaCy)
+
+Equivalência com `PIIDetector.apply_masking_batch` (caminho anterior):
+
+- valores detectados que não aparecem literalmente no texto são procurados
+  com tolerância a pontuação, espaços e maiúsculas; os que ainda assim não
+  são localizados marcam o texto, que é mascarado pelo próprio detector
+  (`apply_masking_batch`), e entram na contagem `nao_localizados`
+- endereços no modo PARCIAL usam `_mascara_endereco_parcial` do detector
+  quando existir; sem ele, o texto também vai para o detector
+- diferença intencional: o caminho por spans respeita `tipos_pii` (só os
+  tipos escolhidos são mascarados no texto), enquanto `apply_masking_batch`
+  mascara todos os tipos; os textos que caem no detector continuam com
+  todos os tipos mascarados
+"""
+
+import re
+from datetime import datetime
+
+from colunar import ORDEM_COLUNAS, ResultadosColunares
+from hierarquia import resolver_sobreposicoes
+from progresso import medir
+
+TAG_PROTECAO = "[INFORMAÇÃO PROTEGIDA LGPD]"
+
+# Ordem de prioridade usada quando dois spans se sobrepõem
+# (mesma hierarquia exclusiva da FASE 3.5: CPF > RG > Email > Telefone)
+PRIORIDADE_TIPOS = ['cpf', 'rg', 'email', 'telefone', 'nome', 'endereco']
+
+# Chamadas ao detector por análise: só para atualizar o progresso, o
+# `nlp.pipe` dentro do detector já processa em lotes de `batch_size`
+ATUALIZACOES_PROGRESSO = 20
+LIMITE_FATIA = 2000
+
+# Componentes do spaCy que a FASE 4 não deveria precisar (usa tokenização, tagger e NER).
+# Desligá-los é opcional (`--desligar-pipes`): o código do detector pode ler frases,
+# dependências ou lemas; confira antes com `python benchmark.py lote-nlp`, que compara
+# os resultados do pipeline completo e do reduzido
+PIPES_NAO_USADOS = ('parser', 'senter', 'lemmatizer', 'textcat', 'textcat_multilabel', 'entity_linker')
+
+# Colunas adicionadas por `montar_colunas_resultado` ('assinatura_deteccao' identifica a
+# versão/configuração do detector, ver `cache.assinatura_detector`)
+COLUNAS_RESULTADO = ORDEM_COLUNAS + ['data_analise', 'assinatura_deteccao']
+
+# Colunas de listas mascaradas no modo PARCIAL: (tipo, coluna, método do PIIDetector)
+COLUNAS_LISTA_PARCIAL = [
+    ('cpf', 'pii_cpf_validado_lista', '_mascara_cpf_parcial'),
+    ('cpf', 'pii_cpf_nao_validado_lista', '_mascara_cpf_parcial'),
+    ('rg', 'pii_rg_lista', '_mascara_rg_parcial'),
+    ('email', 'pii_email_lista', '_mascara_email_parcial'),
+    ('telefone', 'pii_telefone_lista', '_mascara_telefone_parcial'),
+    ('nome', 'pii_nome_lista', '_mascara_nome_parcial'),
+]
+
+# Métodos de mascaramento parcial do PIIDetector por tipo
+# ('_mascara_endereco_parcial' é opcional: sem ele o texto é mascarado pelo detector)
+MASCARADORES_PARCIAIS = {
+    'cpf': '_mascara_cpf_parcial',
+    'rg': '_mascara_rg_parcial',
+    'email': '_mascara_email_parcial',
+    'telefone': '_mascara_telefone_parcial',
+    'nome': '_mascara_nome_parcial',
+    'endereco': '_mascara_endereco_parcial',
+}
+
+# Início/fim dos spans de valores detectados que não foram localizados no texto
+NAO_LOCALIZADO = -1
+
+# Trechos de um valor para a busca tolerante: cada dígito ou cada palavra
+_TRECHO_VALOR = re.compile(r'\d|[^\W\d_]+')
+
+
+def valores_por_tipo(resultado: dict) -> dict:
+    """
+    Agrupa os valores detectados por tipo de mascaramento.
+
+    Args:
+        resultado: Dicionário retornado por `detect_pii`/`detect_pii_batch`
+
+    Returns:
+        Dicionário {tipo: [valores]} na ordem de PRIORIDADE_TIPOS
+    """
+    entidades = resultado['entidades']
+    return {
+        'cpf': entidades['cpf']['verificado'] + entidades['cpf']['suspeito'],
+        'rg': entidades['rg']['verificado'] + entidades['rg']['suspeito'],
+        'email': entidades['email']['verificado'] + entidades['email']['suspeito'],
+        'telefone': entidades['telefone']['verificado'] + entidades['telefone']['suspeito'],
+        'nome': entidades['nlp_contexto']['pessoas'],
+        'endereco': entidades['endereco']['detectado'],
+    }
+
+
+def _padrao_tolerante(valor: str):
+    """
+    Padrão que acha o valor com outra pontuação, espaçamento ou caixa.
+
+    Ex: '12345678909' casa com '123.456.789-09' e 'MARIA  SILVA' com 'Maria Silva'.
+    Entre dois trechos (dígitos ou palavras) aceita até 3 caracteres que não
+    sejam letra ou dígito. Retorna None se o valor não tiver letras nem dígitos.
+    """
+    trechos = _TRECHO_VALOR.findall(valor)
+    if not trechos:
+        return None
+    antes = r'(?<!\d)' if trechos[0].isdigit() else r'(?<![^\W\d_])'
+    depois = r'(?!\d)' if trechos[-1].isdigit() else r'(?![^\W\d_])'
+    return re.compile(antes + r'[\W_]{0,3}'.join(map(re.escape, trechos)) + depois, re.IGNORECASE)
+
+
+def extrair_spans(texto: str, resultado: dict) -> list:
+    """
+    Calcula os spans de caracteres de cada entidade detectada no texto.
+
+    Se o detector já devolver `resultado['spans']`, eles são usados
+    diretamente. Caso contrário, cada valor detectado é localizado no
+    texto (todas as ocorrências, como o `replace` do mascaramento); o que
+    não aparece literalmente é procurado com `_padrao_tolerante`.
+    Spans sobrepostos são resolvidos pela prioridade dos tipos.
+
+    Valores que não são localizados de nenhuma forma viram spans
+    (NAO_LOCALIZADO, NAO_LOCALIZADO, tipo, valor) no início da lista:
+    o mascaramento manda esses textos para o detector (`spans_completos`).
+
+    Args:
+        texto: Texto original analisado
+        resultado: Dicionário retornado por `detect_pii_batch`
+
+    Returns:
+        Lista ordenada de tuplas (inicio, fim, tipo, valor)
+    """
+    nao_localizados = []
+    if 'spans' in resultado:
+        candidatos = [tuple(span) for span in resultado['spans']]
+    else:
+        candidatos = []
+        for tipo, valores in valores_por_tipo(resultado).items():
+            for valor in set(valores):
+                if not valor:
+                    continue
+                # Busca literal (equivale a re.finditer(re.escape(valor)), sem compilar um padrão por valor)
+                inicio = texto.find(valor)
+                if inicio == -1:
+                    padrao = _padrao_tolerante(valor)
+                    ocorrencias = [(m.start(), m.end()) for m in padrao.finditer(texto)] if padrao else []
+                    if ocorrencias:
+                        candidatos.extend((ini, fim, tipo, valor) for ini, fim in ocorrencias)
+                    else:
+                        nao_localizados.append((NAO_LOCALIZADO, NAO_LOCALIZADO, tipo, valor))
+                    continue
+                while inicio != -1:
+                    candidatos.append((inicio, inicio + len(valor), tipo, valor))
+                    inicio = texto.find(valor, inicio + len(valor))
+
+    # Maior prioridade primeiro; no mesmo tipo, o span mais longo vence
+    return sorted(nao_localizados) + resolver_sobreposicoes(candidatos, PRIORIDADE_TIPOS)
+
+
+def spans_completos(spans: list) -> bool:
+    """Verifica se todos os valores detectados foram localizados no texto."""
+    return not spans or spans[0][0] != NAO_LOCALIZADO
+
+
+def _tipo_selecionado(tipo: str, tipos_pii: list) -> bool:
+    """Verifica se o tipo deve ser mascarado ('endereco' só entra em 'todos')."""
+    return 'todos' in tipos_pii or tipo in tipos_pii
+
+
+def mascarar_valor(valor: str, tipo: str, modo: str, detector) -> str:
+    """
+    Mascara um único valor conforme o modo.
+
+    Args:
+        valor: Valor detectado (ex: '123.456.789-09')
+        tipo: Tipo da entidade ('cpf', 'rg', 'email', 'telefone', 'nome', 'endereco')
+        modo: 'PARCIAL' ou 'PROTECAO_TOTAL'
+        detector: Instância de PIIDetector (fornece os mascaradores parciais)
+
+    Returns:
+        Valor mascarado
+    """
+    if modo == 'PROTECAO_TOTAL':
+        return TAG_PROTECAO
+
+    return getattr(detector, MASCARADORES_PARCIAIS[tipo])(valor)
+
+
+def _requer_detector(spans: list, modo: str, detector, tipos_pii: list) -> bool:
+    """
+    Verifica se o texto precisa ser mascarado pelo próprio detector.
+
+    Acontece quando algum valor de um tipo selecionado não foi localizado
+    no texto, ou quando há endereço no modo PARCIAL e o detector não tem
+    um mascarador parcial de endereço.
+    """
+    sem_mascarador_endereco = modo == 'PARCIAL' and not hasattr(detector, MASCARADORES_PARCIAIS['endereco'])
+    for inicio, _fim, tipo, _valor in spans:
+        if not _tipo_selecionado(tipo, tipos_pii):
+            continue
+        if inicio == NAO_LOCALIZADO or (tipo == 'endereco' and sem_mascarador_endereco):
+            return True
+    return False
+
+
+def _aplicar_spans(texto: str, spans: list, modo: str, detector, tipos_pii: list) -> str:
+    partes = []
+    cursor = 0
+
+    for inicio, fim, tipo, valor in spans:
+        if inicio == NAO_LOCALIZADO or not _tipo_selecionado(tipo, tipos_pii):
+            continue
+        partes.append(texto[cursor:inicio])
+        partes.append(mascarar_valor(texto[inicio:fim], tipo, modo, detector))
+        cursor = fim
+
+    partes.append(texto[cursor:])
+    return ''.join(partes)
+
+
+def mascarar_texto_por_spans(texto: str, spans: list, modo: str, detector, tipos_pii: list = None) -> str:
+    """
+    Aplica o mascaramento no texto usando spans já calculados.
+
+    Textos com valores não localizados (ou endereço sem mascarador
+    parcial) são mascarados por `detector.apply_masking`.
+
+    Args:
+        texto: Texto original
+        spans: Lista de (inicio, fim, tipo, valor) de `extrair_spans`
+        modo: 'PARCIAL' ou 'PROTECAO_TOTAL'
+        detector: Instância de PIIDetector
+        tipos_pii: Tipos a mascarar ['cpf', 'email', etc.] ou ['todos']
+
+    Returns:
+        Texto mascarado
+    """
+    tipos_pii = tipos_pii or ['todos']
+    if _requer_detector(spans, modo, detector, tipos_pii):
+        return detector.apply_masking(texto, mode=modo)
+    return _aplicar_spans(texto, spans, modo, detector, tipos_pii)
+
+
+def mascarar_textos_por_spans(textos: list, spans_lista: list, modo: str, detector, tipos_pii: list = None,
+                              estatisticas: dict = None) -> list:
+    """
+    Versão em lote de `mascarar_texto_por_spans`.
+
+    Os textos que precisam do detector são mascarados juntos, em uma
+    única chamada a `apply_masking_batch`.
+
+    Args:
+        textos: Lista de textos originais
+        spans_lista: Lista de spans por texto (mesma ordem de `textos`)
+        modo: 'PARCIAL' ou 'PROTECAO_TOTAL'
+        detector: Instância de PIIDetector
+        tipos_pii: Tipos a mascarar ou ['todos']
+        estatisticas: Dicionário opcional onde são somados 'nao_localizados'
+            (valores não achados no texto) e 'textos_detector' (textos
+            mascarados por `apply_masking_batch`)
+
+    Returns:
+        Lista de textos mascarados
+    """
+    tipos_pii = tipos_pii or ['todos']
+    mascarados = []
+    pelo_detector = []
+    nao_localizados = 0
+
+    for i, (texto, spans) in enumerate(zip(textos, spans_lista)):
+        if not spans_completos(spans):
+            nao_localizados += sum(1 for span in spans if span[0] == NAO_LOCALIZADO)
+        if _requer_detector(spans, modo, detector, tipos_pii):
+            pelo_detector.append(i)
+            mascarados.append(None)
+        else:
+            mascarados.append(_aplicar_spans(texto, spans, modo, detector, tipos_pii))
+
+    if pelo_detector:
+        for i, mascarado in zip(pelo_detector, detector.apply_masking_batch([textos[i] for i in pelo_detector],
+                                                                            mode=modo)):
+            mascarados[i] = mascarado
+
+    if estatisticas is not None:
+        estatisticas['nao_localizados'] = estatisticas.get('nao_localizados', 0) + nao_localizados
+        estatisticas['textos_detector'] = estatisticas.get('textos_detector', 0) + len(pelo_detector)
+
+    return mascarados
+
+
+def desabilitar_pipes_nao_usados(detector) -> list:
+    """
+    Desliga os componentes do spaCy de PIPES_NAO_USADOS (opcional, ver acima).
+
+    A assinatura do detector (`cache.assinatura_detector`) inclui os
+    componentes desligados: cache e reanálise incremental não misturam
+    resultados do pipeline completo e do reduzido.
+
+    Args:
+        detector: Instância de PIIDetector (com o atributo `nlp`)
+
+    Returns:
+        Nomes dos componentes desligados
+    """
+    nlp = getattr(detector, 'nlp', None)
+    if nlp is None:
+        return []
+
+    desligados = [nome for nome in nlp.pipe_names if nome in PIPES_NAO_USADOS]
+    for nome in desligados:
+        nlp.disable_pipe(nome)
+    return desligados
+
+
+def detectar_textos(detector, textos: list, batch_size: int = 50, motor=None, progresso=None, cache=None,
+                    tamanho_fatia: int = None, instrumentacao=None) -> list:
+    """
+    Roda `detect_pii_batch` sobre todos os textos.
+
+    Textos repetidos dentro do lote são detectados uma única vez, e os
+    já presentes no cache persistente não passam pelo detector.
+
+    Os pendentes são enviados ao detector em poucas fatias grandes: dentro
+    de cada chamada o detector repassa os textos ao `nlp.pipe` em lotes de
+    `batch_size`, e as fatias só definem a frequência do progresso.
+
+    Args:
+        detector: Instância de PIIDetector
+        textos: Lista de textos
+        batch_size: Lote do `nlp.pipe` dentro do detector
+        motor: MotorParalelo opcional (multiprocesso)
+        progresso: Callback opcional progresso(processados, total)
+        cache: CacheResultados opcional
+        tamanho_fatia: Textos por chamada ao detector (padrão: ~20 atualizações
+            de progresso, entre `batch_size` e LIMITE_FATIA)
+        instrumentacao: Progresso opcional que acumula o tempo de 'cache' e 'deteccao'
+
+    Returns:
+        Lista de resultados na ordem de `textos`
+    """
+    total = len(textos)
+
+    # Colapsa duplicatas: cada texto distinto é detectado uma vez
+    unicos = list(dict.fromkeys(textos))
+    resultados = {}
+    if cache is not None:
+        with medir(instrumentacao, 'cache'):
+            resultados = cache.buscar(unicos)
+    pendentes = [texto for texto in unicos if texto not in resultados]
+
+    # Progresso reportado em registros da entrada (inclui repetidos e cache)
+    ja_resolvidos = total - len(pendentes)
+
+    def progresso_total(processados, _total_pendentes):
+        if progresso:
+            progresso(ja_resolvidos + processados, total)
+
+    if motor is not None:
+        with medir(instrumentacao, 'deteccao'):
+            novos = motor.detect_pii_batch(pendentes, batch_size=batch_size, progresso=progresso_total)
+    else:
+        if tamanho_fatia is None:
+            tamanho_fatia = min(max(batch_size, -(-len(pendentes) // ATUALIZACOES_PROGRESSO)), LIMITE_FATIA)
+        novos = []
+        for i in range(0, len(pendentes), tamanho_fatia):
+            with medir(instrumentacao, 'deteccao'):
+                novos.extend(detector.detect_pii_batch(pendentes[i:i+tamanho_fatia], batch_size=batch_size))
+            progresso_total(min(i + tamanho_fatia, len(pendentes)), len(pendentes))
+
+    novos = dict(zip(pendentes, novos))
+    if cache is not None and novos:
+        with medir(instrumentacao, 'cache'):
+            cache.salvar(novos)
+    resultados.update(novos)
+
+    if progresso and total and not pendentes:
+        progresso(total, total)
+
+    return [resultados[texto] for texto in textos]
+
+
+def detectar_colunar(detector, textos: list, tamanho_bloco: int = 5000, motor=None, progresso=None,
+                     cache=None, batch_size: int = 50, instrumentacao=None):
+    """
+    Detecta PII e acumula os resultados direto em formato colunar.
+
+    Os textos são detectados em blocos de `tamanho_bloco`; os dicionários
+    de resultado de cada bloco são convertidos em colunas compactas (e
+    spans) e descartados antes do bloco seguinte, em vez de ficarem todos
+    vivos até a montagem do DataFrame. Textos repetidos em qualquer ponto
+    do arquivo continuam sendo detectados uma única vez.
+
+    Args:
+        detector: Instância de PIIDetector
+        textos: Lista de textos
+        tamanho_bloco: Textos por bloco de detecção
+        motor: MotorParalelo opcional (multiprocesso)
+        progresso: Callback opcional progresso(processados, total)
+        cache: CacheResultados opcional
+        batch_size: Lote do `nlp.pipe` dentro do detector
+        instrumentacao: Progresso opcional; acumula também 'colunas_spans'
+
+    Returns:
+        Tupla (ResultadosColunares, spans_lista) na ordem de `textos`
+    """
+    total = len(textos)
+    colunas = ResultadosColunares()
+    spans_lista = []
+    primeira_linha = {}
+
+    for inicio in range(0, total, tamanho_bloco):
+        bloco = textos[inicio:inicio+tamanho_bloco]
+        novos = [texto for texto in dict.fromkeys(bloco) if texto not in primeira_linha]
+
+        def progresso_bloco(processados, total_bloco):
+            if progresso:
+                progresso(inicio + processados * len(bloco) // max(total_bloco, 1), total)
+
+        resultados = dict(zip(novos, detectar_textos(detector, novos, batch_size=batch_size, motor=motor,
+                                                     progresso=progresso_bloco, cache=cache,
+                                                     instrumentacao=instrumentacao)))
+
+        with medir(instrumentacao, 'colunas_spans'):
+            for texto in bloco:
+                linha = primeira_linha.get(texto)
+                if linha is None:
+                    primeira_linha[texto] = len(spans_lista)
+                    colunas.adicionar(resultados[texto])
+                    spans_lista.append(extrair_spans(texto, resultados[texto]))
+                else:
+                    colunas.repetir(linha)
+                    spans_lista.append(spans_lista[linha])
+
+        del resultados
+        if progresso:
+            progresso(inicio + len(bloco), total)
+
+    return colunas, spans_lista
+
+
+def mascarar_textos(detector, textos: list, modo: str, tipos_pii: list = None, spans_lista: list = None,
+                    batch_size: int = 100, motor=None, progresso=None, instrumentacao=None,
+                    estatisticas: dict = None) -> list:
+    """
+    Mascara os textos, reaproveitando spans da análise quando disponíveis.
+
+    Args:
+        detector: Instância de PIIDetector
+        textos: Lista de textos originais
+        modo: 'PARCIAL' ou 'PROTECAO_TOTAL'
+        tipos_pii: Tipos a mascarar ou ['todos']
+        spans_lista: Spans por texto de `extrair_spans` (None = re-detecta)
+        batch_size: Quantidade de textos por lote
+        motor: MotorParalelo opcional para o caminho sem spans
+        progresso: Callback opcional progresso(processados, total)
+        instrumentacao: Progresso opcional que acumula o tempo de 'mascaramento'
+        estatisticas: Dicionário opcional com 'nao_localizados' e 'textos_detector'
+            do caminho por spans (ver `mascarar_textos_por_spans`)
+
+    Returns:
+        Lista de textos mascarados
+    """
+    total = len(textos)
+    usar_spans = spans_lista is not None and len(spans_lista) == total
+
+    if not usar_spans and motor is not None:
+        with medir(instrumentacao, 'mascaramento'):
+            return motor.apply_masking_batch(textos, mode=modo, progresso=progresso)
+
+    textos_mascarados = []
+    for i in range(0, total, batch_size):
+        batch = textos[i:i+batch_size]
+        with medir(instrumentacao, 'mascaramento'):
+            if usar_spans:
+                mascarados = mascarar_textos_por_spans(batch, spans_lista[i:i+batch_size], modo, detector,
+                                                       tipos_pii, estatisticas)
+            else:
+                mascarados = detector.apply_masking_batch(batch, mode=modo)
+        textos_mascarados.extend(mascarados)
+        if progresso:
+            progresso(min(i + batch_size, total), total)
+
+    return textos_mascarados
+
+
+def montar_colunas_resultado(df, all_results, assinatura: str = ''):
+    """
+    Adiciona ao DataFrame as colunas de contagem e listas de PII.
+
+    Nova estrutura retorna:
+    - verificado: dados validados matematicamente
+    - suspeito: padrão correto mas falhou validação
+    - score_risco: 0.0 a 1.0
+
+    Args:
+        df: DataFrame analisado (modificado no lugar)
+        all_results: ResultadosColunares, ou lista de resultados de
+            `detect_pii_batch` na ordem das linhas
+        assinatura: Assinatura do detector que gerou os resultados
+            (`cache.assinatura_detector`); a reanálise incremental só
+            reaproveita análises com a mesma assinatura
+
+    Returns:
+        O mesmo DataFrame com as colunas de resultado
+    """
+    if not isinstance(all_results, ResultadosColunares):
+        all_results = ResultadosColunares.de_resultados(all_results)
+
+    all_results.para_dataframe(df)
+    df['data_analise'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    df['assinatura_deteccao'] = assinatura
+
+    return df
+
+
+def mascarar_coluna_lista(serie, mascarador, cache: dict = None):
+    """
+    Mascara uma coluna `pii_*_lista` (valores separados por ';') sem iterrows.
+
+    Equivalente à versão linha a linha: células vazias ficam como estão,
+    itens vazios entre ';' são descartados e cada item não vazio passa pelo
+    mascarador. Cada valor distinto é mascarado uma única vez (memoizado),
+    e a coluna é reconstruída de uma vez, sem escrita célula a célula.
+
+    Args:
+        serie: Coluna de listas (Series)
+        mascarador: Função que mascara um único valor
+        cache: Dicionário {valor: mascarado} reaproveitado entre colunas
+
+    Returns:
+        Nova Series com as listas mascaradas (mesmo índice e dtype)
+    """
+    cache = {} if cache is None else cache
+
+    def mascarar_celula(celula):
+        if not celula or celula == '':
+            return celula
+        itens = [item for item in str(celula).split(';') if item]
+        for item in itens:
+            if item not in cache:
+                cache[item] = mascarador(item)
+        return ';'.join([cache[item] for item in itens])
+
+    return type(serie)(
+        [mascarar_celula(celula) for celula in serie.tolist()],
+        index=serie.index,
+        dtype=serie.dtype,
+        name=serie.name
+    )
+
+
+def anonimizar_listas(df, tipos_pii: list, modo: str, detector):
+    """
+    Mascara as colunas `pii_*_lista` do DataFrame analisado.
+
+    Args:
+        df: DataFrame com as colunas de resultado (modificado no lugar)
+        tipos_pii: Lista de tipos a anonimizar ['cpf', 'email', etc.] ou 'todos'
+        modo: 'PARCIAL' ou 'PROTECAO_TOTAL'
+        detector: Instância de PIIDetector (mascaradores parciais)
+
+    Returns:
+        O mesmo DataFrame com as listas mascaradas
+    """
+    df_anonimizado = df
+
+    if modo == 'PROTECAO_TOTAL':
+        # Substitui todas as listas de PII por [INFORMAÇÃO PROTEGIDA LGPD]
+        if 'todos' in tipos_pii or len(tipos_pii) > 0:
+            for tipo in ['cpf', 'rg', 'email', 'telefone', 'nome']:
+                if 'todos' in tipos_pii or tipo in tipos_pii:
+                    if f'pii_{tipo}_lista' in df_anonimizado.columns:
+                        # Substitui valores não vazios
+                        mask = df_anonimizado[f'pii_{tipo}_lista'] != ''
+                        df_anonimizado.loc[mask, f'pii_{tipo}_lista'] = TAG_PROTECAO
+
+    elif modo == 'PARCIAL':
+        # Mascara coluna a coluna: cada valor distinto passa uma única vez
+        # pelo mascarador (cache compartilhado entre colunas do mesmo tipo)
+        caches = {}
+        for tipo, coluna, metodo in COLUNAS_LISTA_PARCIAL:
+            if ('todos' in tipos_pii or tipo in tipos_pii) and coluna in df_anonimizado.columns:
+                df_anonimizado[coluna] = mascarar_coluna_lista(
+                    df_anonimizado[coluna],
+                    getattr(detector, metodo),
+                    caches.setdefault(metodo, {})
+                )
+
+    return df_anonimizado
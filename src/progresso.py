@@ -0,0 +1,266 @@
+"""
+Progresso e Instrumentação de Execuções
+=======================================
+
+Os laços de análise e mascaramento (app e processar_lote.py) mostravam só
+"processados/total". `Progresso` acompanha uma etapa e calcula:
+
+- registros/s e ETA (pela taxa média desde o início da etapa)
+- tempo acumulado por estágio (cache, detecção, colunas, mascaramento...),
+  medido com `medir(estagio)` nos trechos do pipeline
+- memória residente do processo
+
+Os mesmos números vão para a tela (`exibir`), para o log de texto
+(`logger`) e para um log estruturado da execução (`LogExecucao`, uma linha
+JSON por evento), para se ver onde um lote grande gasta o tempo.
+
+Uso:
+    log = LogExecucao('output/logs/execucao.jsonl')
+    progresso = Progresso('Análise', total=len(textos), log=log)
+    detectar_colunar(detector, textos, progresso=progresso, instrumentacao=progresso)
+    resumo = progresso.finalizar()
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+
+def memoria_processo_mb():
+    """
+    Memória residente (RSS) atual do processo, em MB.
+
+    Returns:
+        float, ou None se não for possível medir nesta plataforma
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+
+    # Linux: /proc/self/statm (páginas residentes no 2º campo)
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # Windows: GetProcessMemoryInfo (WorkingSetSize)
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _Contadores(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            contadores = _Contadores()
+            contadores.cb = ctypes.sizeof(_Contadores)
+            processo = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb):
+                return contadores.WorkingSetSize / (1024 * 1024)
+        except (OSError, AttributeError):
+            pass
+
+    return None
+
+
+def formatar_duracao(segundos: float) -> str:
+    """Duração curta para a tela: '42s', '3min 05s', '1h 02min'."""
+    segundos = int(round(segundos))
+    if segundos < 60:
+        return f'{segundos}s'
+    minutos, segundos = divmod(segundos, 60)
+    if minutos < 60:
+        return f'{minutos}min {segundos:02d}s'
+    horas, minutos = divmod(minutos, 60)
+    return f'{horas}h {minutos:02d}min'
+
+
+def medir(instrumentacao, estagio: str):
+    """
+    Contexto que acumula o tempo de `estagio` em `instrumentacao`.
+
+    Sem instrumentação (None) não mede nada, para que as funções do
+    pipeline possam chamá-lo sempre.
+    """
+    if instrumentacao is None:
+        return nullcontext()
+    return instrumentacao.medir(estagio)
+
+
+class LogExecucao:
+    """
+    Log estruturado de uma execução: uma linha JSON por evento.
+
+    Pode ser compartilhado pelas etapas da mesma execução (análise e
+    mascaramento gravam no mesmo arquivo).
+    """
+
+    def __init__(self, caminho):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._trava = threading.Lock()
+
+    @classmethod
+    def nova(cls, diretorio, prefixo: str = 'execucao') -> 'LogExecucao':
+        """Cria um log em `diretorio` com nome pelo horário de início."""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return cls(Path(diretorio) / f'{prefixo}_{timestamp}.jsonl')
+
+    def registrar(self, evento: str, **dados):
+        """Acrescenta um evento ao arquivo."""
+        linha = {'momento': datetime.now().isoformat(timespec='milliseconds'), 'evento': evento, **dados}
+        with self._trava, open(self.caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps(linha, ensure_ascii=False) + '\n')
+
+
+class Progresso:
+    """
+    Acompanha uma etapa de processamento (ex: 'Análise', 'Mascaramento').
+
+    A instância é chamável como os callbacks `progresso(processados, total)`
+    do pipeline, e `medir(estagio)` acumula o tempo de cada estágio.
+    """
+
+    def __init__(self, etapa: str, total: int = None, exibir=None, logger=None, log: LogExecucao = None,
+                 intervalo: float = 5.0):
+        """
+        Args:
+            etapa: Nome da etapa exibido na tela e nos logs
+            total: Registros esperados (None quando desconhecido, ex: streaming)
+            exibir: Função opcional exibir(progresso), chamada a cada atualização
+            logger: logging.Logger opcional para linhas de texto
+            log: LogExecucao opcional para os eventos estruturados
+            intervalo: Segundos mínimos entre dois registros em `logger`/`log`
+        """
+        self.etapa = etapa
+        self.total = total
+        self.exibir = exibir
+        self.logger = logger
+        self.log = log
+        self.intervalo = intervalo
+        self.processados = 0
+        self.estagios = {}
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self._ultimo_registro = self.inicio
+        if self.log is not None:
+            memoria = memoria_processo_mb()
+            self.log.registrar('inicio', etapa=etapa, total=total,
+                               memoria_mb=None if memoria is None else round(memoria, 1))
+
+    def __call__(self, processados: int, total: int = None):
+        if self.total is None and total is not None:
+            self.total = total
+        if self.total is not None:
+            processados = min(processados, self.total)
+        self.processados = max(self.processados, processados)
+
+        if self.exibir is not None:
+            self.exibir(self)
+
+        agora = time.perf_counter()
+        if agora - self._ultimo_registro >= self.intervalo:
+            self._ultimo_registro = agora
+            self._registrar('progresso')
+
+    @contextmanager
+    def medir(self, estagio: str):
+        """Acumula o tempo do bloco `with` no estágio."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.adicionar_tempo(estagio, time.perf_counter() - inicio)
+
+    def adicionar_tempo(self, estagio: str, segundos: float):
+        """Soma segundos a um estágio (medidos fora de `medir`)."""
+        self.estagios[estagio] = self.estagios.get(estagio, 0.0) + segundos
+
+    @property
+    def decorrido(self) -> float:
+        return (self.fim or time.perf_counter()) - self.inicio
+
+    @property
+    def fracao(self) -> float:
+        """Fração concluída (0 a 1); 0 quando o total é desconhecido."""
+        if not self.total:
+            return 1.0 if self.fim is not None else 0.0
+        return self.processados / self.total
+
+    def taxa(self) -> float:
+        """Registros por segundo desde o início da etapa."""
+        decorrido = self.decorrido
+        return self.processados / decorrido if decorrido > 0 else 0.0
+
+    def eta(self) -> float:
+        """Segundos restantes estimados (None sem total ou antes do primeiro registro)."""
+        taxa = self.taxa()
+        if self.total is None or taxa <= 0:
+            return None
+        return (self.total - self.processados) / taxa
+
+    def resumo(self) -> dict:
+        """Números atuais da etapa (os mesmos gravados no log estruturado)."""
+        memoria = memoria_processo_mb()
+        eta = self.eta()
+        return {
+            'etapa': self.etapa,
+            'processados': self.processados,
+            'total': self.total,
+            'segundos': round(self.decorrido, 3),
+            'registros_por_s': round(self.taxa(), 1),
+            'eta_s': None if eta is None else round(eta, 1),
+            'memoria_mb': None if memoria is None else round(memoria, 1),
+            'estagios': {estagio: round(segundos, 3) for estagio, segundos in self.estagios.items()},
+        }
+
+    def descricao(self) -> str:
+        """Linha curta para a tela e o log de texto."""
+        resumo = self.resumo()
+        contagem = f"{resumo['processados']:,}" + (f"/{resumo['total']:,}" if resumo['total'] is not None else '')
+        partes = [f"{self.etapa}: {contagem} registros", f"{resumo['registros_por_s']:,.1f} reg/s"]
+        if self.fim is None and resumo['eta_s'] is not None:
+            partes.append(f"ETA {formatar_duracao(resumo['eta_s'])}")
+        elif self.fim is not None:
+            partes.append(f"em {formatar_duracao(resumo['segundos'])}")
+        if resumo['memoria_mb'] is not None:
+            partes.append(f"{resumo['memoria_mb']:,.0f} MB")
+        return ' · '.join(partes)
+
+    def descricao_estagios(self) -> str:
+        """Tempo por estágio, do mais demorado ao mais rápido, com a fração da etapa."""
+        decorrido = self.decorrido
+        itens = sorted(self.estagios.items(), key=lambda item: -item[1])
+        return ', '.join(
+            f'{estagio} {segundos:.1f}s ({segundos / decorrido * 100:.0f}%)' if decorrido > 0
+            else f'{estagio} {segundos:.1f}s'
+            for estagio, segundos in itens
+        )
+
+    def finalizar(self) -> dict:
+        """Encerra a etapa, registra o resumo final e o devolve."""
+        if self.fim is None:
+            self.fim = time.perf_counter()
+            self._registrar('fim')
+            if self.logger is not None and self.estagios:
+                self.logger.info(f'{self.etapa} - tempo por estágio: {self.descricao_estagios()}')
+        return self.resumo()
+
+    def _registrar(self, evento: str):
+        if self.logger is not None:
+            self.logger.info(self.descricao())
+        if self.log is not None:
+            self.log.registrar(evento, **self.resumo())
@@ -0,0 +1,148 @@
+"""
+Resumo da Análise para o Dashboard
+==================================
+
+O Streamlit reexecuta o script inteiro a cada clique, e as páginas de
+resultados, o relatório e a barra lateral somavam as colunas do DataFrame
+analisado (`cpf_validado.sum()`, `contém_pii.sum()`, `score_risco.mean()`...)
+dezenas de vezes por execução, varrendo todas as linhas.
+
+`ResumoAnalise` faz essas agregações uma única vez, ao fim da análise, e
+guarda só números:
+
+- totais de registros, com e sem PII
+- por tipo de dado: entidades detectadas (soma da coluna) e registros com
+  pelo menos uma
+- score de risco médio e máximo, histograma em faixas de 0,1 e registros
+  por nível de risco (BAIXO / MÉDIO / ALTO)
+
+Métricas, gráficos e tabelas leem do resumo, e o custo de uma interação
+deixa de depender do número de linhas.
+
+Uso:
+    resumo = ResumoAnalise.calcular(df_analisado)
+    resumo.com_pii, resumo.por_tipo['cpf_validado'], resumo.nivel_risco()
+"""
+
+import numpy as np
+import pandas as pd
+
+# Coluna de contagem -> rótulo (APENAS CPF TEM DUAS CATEGORIAS!)
+TIPOS_RESUMO = {
+    'cpf_validado': '✅ CPF Validado',
+    'cpf_nao_validado': '⚠️ CPF Não Validado',
+    'rg_detectado': 'RG',
+    'email_detectado': 'E-mail',
+    'telefone_detectado': 'Telefone',
+    'nome_detectado': 'Nome',
+    'endereco_detectado': 'Endereço',
+}
+
+# Score médio acima de cada limiar: MÉDIO (> 0.4) e ALTO (> 0.7), como nas telas
+LIMIAR_MEDIO = 0.4
+LIMIAR_ALTO = 0.7
+
+FAIXAS_HISTOGRAMA = 10
+
+
+def nivel_risco(score: float) -> str:
+    """'ALTO', 'MÉDIO' ou 'BAIXO' para um score de 0.0 a 1.0."""
+    return 'ALTO' if score > LIMIAR_ALTO else 'MÉDIO' if score > LIMIAR_MEDIO else 'BAIXO'
+
+
+def _valores(df: pd.DataFrame, coluna: str, tipo) -> np.ndarray:
+    """Coluna como array numérico (vazio/ausente = 0)."""
+    if coluna not in df.columns:
+        return np.zeros(len(df), dtype=tipo)
+    return pd.to_numeric(df[coluna], errors='coerce').fillna(0).to_numpy(dtype=tipo)
+
+
+class ResumoAnalise:
+    """Agregados de uma análise, calculados uma vez e lidos por todas as telas."""
+
+    def __init__(self, total: int, com_pii: int, por_tipo: dict, registros_por_tipo: dict,
+                 score_medio: float, score_maximo: float, histograma_score: list, faixas_risco: dict):
+        self.total = total
+        self.com_pii = com_pii
+        self.sem_pii = total - com_pii
+        self.por_tipo = por_tipo
+        self.registros_por_tipo = registros_por_tipo
+        self.score_medio = score_medio
+        self.score_maximo = score_maximo
+        self.histograma_score = histograma_score
+        self.faixas_risco = faixas_risco
+
+    @classmethod
+    def calcular(cls, df: pd.DataFrame) -> 'ResumoAnalise':
+        """
+        Agrega o DataFrame analisado (colunas ausentes contam como zero).
+
+        Args:
+            df: DataFrame com as colunas de `montar_colunas_resultado`
+        """
+        total = len(df)
+        com_pii = int(_valores(df, 'contém_pii', np.int64).sum())
+
+        por_tipo = {}
+        registros_por_tipo = {}
+        for coluna in TIPOS_RESUMO:
+            contagens = _valores(df, coluna, np.int64)
+            por_tipo[coluna] = int(contagens.sum())
+            registros_por_tipo[coluna] = int(np.count_nonzero(contagens))
+
+        scores = _valores(df, 'score_risco', np.float64)
+        frequencias, limites = np.histogram(scores, bins=FAIXAS_HISTOGRAMA, range=(0.0, 1.0))
+        histograma = [
+            (round(float(limites[i]), 2), round(float(limites[i + 1]), 2), int(frequencias[i]))
+            for i in range(FAIXAS_HISTOGRAMA)
+        ]
+        altos = int(np.count_nonzero(scores > LIMIAR_ALTO))
+        medios = int(np.count_nonzero(scores > LIMIAR_MEDIO)) - altos
+
+        return cls(
+            total=total,
+            com_pii=com_pii,
+            por_tipo=por_tipo,
+            registros_por_tipo=registros_por_tipo,
+            score_medio=float(scores.mean()) if total else 0.0,
+            score_maximo=float(scores.max()) if total else 0.0,
+            histograma_score=histograma,
+            faixas_risco={'BAIXO': total - medios - altos, 'MÉDIO': medios, 'ALTO': altos},
+        )
+
+    @property
+    def percentual_pii(self) -> float:
+        return self.com_pii / self.total * 100 if self.total else 0.0
+
+    @property
+    def percentual_sem_pii(self) -> float:
+        return self.sem_pii / self.total * 100 if self.total else 0.0
+
+    @property
+    def cpfs(self) -> int:
+        """CPFs validados + não validados."""
+        return self.por_tipo['cpf_validado'] + self.por_tipo['cpf_nao_validado']
+
+    def nivel_risco(self) -> str:
+        """Nível do score médio: 'ALTO', 'MÉDIO' ou 'BAIXO'."""
+        return nivel_risco(self.score_medio)
+
+    def emoji_risco(self) -> str:
+        return {'ALTO': '🔴', 'MÉDIO': '🟡', 'BAIXO': '🟢'}[self.nivel_risco()]
+
+    def tipos_grafico(self) -> dict:
+        """Rótulo -> entidades detectadas, na ordem dos gráficos."""
+        return {rotulo: self.por_tipo[coluna] for coluna, rotulo in TIPOS_RESUMO.items()}
+
+    def como_dict(self) -> dict:
+        """Resumo serializável (log da execução)."""
+        return {
+            'total': self.total,
+            'com_pii': self.com_pii,
+            'por_tipo': dict(self.por_tipo),
+            'registros_por_tipo': dict(self.registros_por_tipo),
+            'score_medio': round(self.score_medio, 4),
+            'score_maximo': round(self.score_maximo, 4),
+            'histograma_score': [list(faixa) for faixa in self.histograma_score],
+            'faixas_risco': dict(self.faixas_risco),
+        }
@@ -0,0 +1,492 @@
+"""
+Serviço HTTP de Detecção
+========================
+
+Expõe a detecção e o mascaramento para outros sistemas (ex: entrada de
+manifestações da ouvidoria) e para o próprio app, com um conjunto de
+detectores aquecidos compartilhado por todos os clientes:
+
+- `ServicoDeteccao`: servidor asyncio (HTTP/1.1 + JSON, só biblioteca padrão)
+    POST /detectar   {"textos": [...], "batch_size": 50}   -> {"resultados": [...]}
+    POST /mascarar   {"textos": [...], "modo": "PARCIAL"}   -> {"textos": [...]}
+    GET  /saude                                             -> métricas do serviço
+- micro-lotes: pedidos que chegam juntos são reunidos (até `max_lote`
+  textos ou `espera_ms`) em uma única chamada de `detect_pii_batch`
+- contrapressão: com mais de `max_pendentes` textos na fila o serviço
+  responde 503 com `Retry-After`, em vez de acumular memória
+- `ClienteServico`: cliente com a mesma interface do `MotorParalelo`
+  (`detect_pii_batch`/`apply_masking_batch`), usado pelo app e pelo lote
+
+Os `n_detectores` rodam em threads de um único processo: as regras em
+Python disputam o GIL, e só os trechos que o liberam (partes do spaCy)
+correm em paralelo. Mais detectores ajudam a atender pedidos simultâneos,
+não multiplicam a vazão pelos núcleos; para isso, suba vários serviços
+(um processo cada) atrás de um balanceador, ou use `--workers` no lote.
+
+Para subir o serviço: `python servico_deteccao.py --porta 8765`.
+"""
+
+import asyncio
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+ROTAS = {'/detectar': 'detectar', '/mascarar': 'mascarar'}
+MODOS_MASCARAMENTO = ('PARCIAL', 'PROTECAO_TOTAL')
+
+STATUS_HTTP = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+
+class ServicoOcupado(Exception):
+    """Fila de pedidos cheia (contrapressão)."""
+
+
+class _Pedido:
+    """Textos de uma requisição aguardando um lote."""
+
+    __slots__ = ('operacao', 'argumento', 'textos', 'futuro')
+
+    def __init__(self, operacao: str, argumento, textos: list, futuro: asyncio.Future):
+        self.operacao = operacao
+        self.argumento = argumento
+        self.textos = textos
+        self.futuro = futuro
+
+
+# =====================================================================
+# SERVIDOR
+# =====================================================================
+
+class ServicoDeteccao:
+    """
+    Servidor HTTP com detectores aquecidos e micro-lotes.
+
+    Uso:
+        servico = ServicoDeteccao(lambda: criar_detector(), n_detectores=2)
+        asyncio.run(servico.executar('127.0.0.1', 8765))
+    """
+
+    def __init__(self, fabrica_detector, n_detectores: int = 1, max_lote: int = 256, espera_ms: float = 10,
+                 max_pendentes: int = 20000, max_corpo_mb: float = 50):
+        """
+        Args:
+            fabrica_detector: Função sem argumentos que cria um detector aquecido
+            n_detectores: Detectores no conjunto (cada um atende um lote por vez, em uma thread
+                deste processo: o GIL limita o paralelismo das regras em Python)
+            max_lote: Máximo de textos reunidos em uma chamada ao detector
+            espera_ms: Tempo máximo de espera por outros pedidos para completar o lote
+            max_pendentes: Textos na fila a partir dos quais novos pedidos recebem 503
+            max_corpo_mb: Tamanho máximo do corpo de uma requisição
+        """
+        self.fabrica_detector = fabrica_detector
+        self.n_detectores = max(1, n_detectores)
+        self.max_lote = max(1, max_lote)
+        self.espera = espera_ms / 1000
+        self.max_pendentes = max_pendentes
+        self.max_corpo = int(max_corpo_mb * 1024 * 1024)
+
+        self.detectores = []
+        self._fila = None
+        self._consumidores = []
+        self._executor = None
+        self._servidor = None
+        self._conexoes = set()
+        self.pendentes = 0
+        self.metricas = {
+            'requisicoes': 0, 'rejeitadas': 0, 'erros': 0,
+            'textos': 0, 'lotes': 0, 'segundos_detector': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def iniciar(self, host: str = '127.0.0.1', porta: int = 8765):
+        """Carrega os detectores (em paralelo) e começa a aceitar conexões."""
+        loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=self.n_detectores, thread_name_prefix='detector')
+        self.detectores = list(await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self.fabrica_detector) for _ in range(self.n_detectores)
+        )))
+
+        self._fila = asyncio.Queue()
+        self._consumidores = [asyncio.create_task(self._consumir(detector)) for detector in self.detectores]
+        self._servidor = await asyncio.start_server(self._atender, host, porta)
+        return self._servidor
+
+    async def encerrar(self):
+        """Para de aceitar conexões e libera os detectores."""
+        if self._servidor is not None:
+            self._servidor.close()
+            # Conexões keep-alive ociosas seguram o `wait_closed`
+            for escritor in list(self._conexoes):
+                escritor.close()
+            await self._servidor.wait_closed()
+            self._servidor = None
+        for tarefa in self._consumidores:
+            tarefa.cancel()
+        await asyncio.gather(*self._consumidores, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def executar(self, host: str = '127.0.0.1', porta: int = 8765):
+        """Sobe o serviço e atende até ser interrompido."""
+        servidor = await self.iniciar(host, porta)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await self.encerrar()
+
+    # ------------------------------------------------------------------
+    # Micro-lotes
+    # ------------------------------------------------------------------
+
+    async def enfileirar(self, operacao: str, argumento, textos: list) -> list:
+        """
+        Coloca os textos na fila e aguarda o resultado.
+
+        Raises:
+            ServicoOcupado: Se a fila já tiver `max_pendentes` textos
+        """
+        if self.pendentes and self.pendentes + len(textos) > self.max_pendentes:
+            self.metricas['rejeitadas'] += 1
+            raise ServicoOcupado()
+        if not textos:
+            return []
+
+        futuro = asyncio.get_running_loop().create_future()
+        self.pendentes += len(textos)
+        self._fila.put_nowait(_Pedido(operacao, argumento, textos, futuro))
+        try:
+            return await futuro
+        finally:
+            self.pendentes -= len(textos)
+
+    async def _coletar_lote(self) -> list:
+        """Primeiro pedido da fila + os que chegarem em até `espera` segundos."""
+        pedidos = [await self._fila.get()]
+        tamanho = len(pedidos[0].textos)
+        limite = asyncio.get_running_loop().time() + self.espera
+
+        while tamanho < self.max_lote:
+            if self._fila.empty():
+                restante = limite - asyncio.get_running_loop().time()
+                if restante <= 0:
+                    break
+                try:
+                    pedido = await asyncio.wait_for(self._fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                pedido = self._fila.get_nowait()
+            pedidos.append(pedido)
+            tamanho += len(pedido.textos)
+        return pedidos
+
+    async def _consumir(self, detector):
+        """Laço de um detector: coleta um lote, executa e distribui os resultados."""
+        loop = asyncio.get_running_loop()
+        while True:
+            pedidos = await self._coletar_lote()
+
+            # Um lote pode misturar operações; cada grupo vira uma chamada ao detector
+            grupos = {}
+            for pedido in pedidos:
+                if not pedido.futuro.done():   # cliente desistiu enquanto esperava
+                    grupos.setdefault((pedido.operacao, pedido.argumento), []).append(pedido)
+
+            for (operacao, argumento), grupo in grupos.items():
+                textos = [texto for pedido in grupo for texto in pedido.textos]
+                inicio = time.perf_counter()
+                try:
+                    resultados = await loop.run_in_executor(
+                        self._executor, _executar_operacao, detector, operacao, argumento, textos
+                    )
+                except Exception as erro:
+                    self.metricas['erros'] += 1
+                    for pedido in grupo:
+                        if not pedido.futuro.done():
+                            pedido.futuro.set_exception(erro)
+                    continue
+
+                self.metricas['lotes'] += 1
+                self.metricas['textos'] += len(textos)
+                self.metricas['segundos_detector'] += time.perf_counter() - inicio
+
+                posicao = 0
+                for pedido in grupo:
+                    fim = posicao + len(pedido.textos)
+                    if not pedido.futuro.done():
+                        pedido.futuro.set_result(resultados[posicao:fim])
+                    posicao = fim
+
+    def estatisticas(self) -> dict:
+        """Métricas do serviço (também em GET /saude)."""
+        lotes = self.metricas['lotes']
+        return {
+            **self.metricas,
+            'detectores': len(self.detectores),
+            'pendentes': self.pendentes,
+            'textos_por_lote': self.metricas['textos'] / lotes if lotes else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """Atende uma conexão (várias requisições com keep-alive)."""
+        self._conexoes.add(escritor)
+        try:
+            while True:
+                requisicao = await _ler_requisicao(leitor, self.max_corpo)
+                if requisicao is None:
+                    break
+                metodo, caminho, corpo, manter = requisicao
+                status, resposta, cabecalhos = await self._responder(metodo, caminho, corpo)
+                _escrever_resposta(escritor, status, resposta, cabecalhos, manter)
+                await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except _ErroRequisicao as erro:
+            _escrever_resposta(escritor, erro.status, {'erro': str(erro)}, {}, False)
+        finally:
+            self._conexoes.discard(escritor)
+            escritor.close()
+
+    async def _responder(self, metodo: str, caminho: str, corpo: bytes) -> tuple:
+        """
+        Returns:
+            Tupla (status, objeto JSON da resposta, cabeçalhos extras)
+        """
+        caminho = caminho.split('?', 1)[0]
+        if caminho == '/saude':
+            return 200, self.estatisticas(), {}
+        if caminho not in ROTAS:
+            return 404, {'erro': f'rota desconhecida: {caminho}'}, {}
+        if metodo != 'POST':
+            return 405, {'erro': 'use POST'}, {'Allow': 'POST'}
+
+        self.metricas['requisicoes'] += 1
+        try:
+            dados = json.loads(corpo or b'{}')
+            textos = dados['textos']
+            if not isinstance(textos, list) or not all(isinstance(t, str) for t in textos):
+                raise ValueError('"textos" deve ser uma lista de strings')
+            if ROTAS[caminho] == 'detectar':
+                argumento = int(dados.get('batch_size', 50))
+            else:
+                argumento = dados.get('modo', 'PARCIAL')
+                if argumento not in MODOS_MASCARAMENTO:
+                    raise ValueError(f'modo inválido: {argumento}')
+        except (ValueError, KeyError, TypeError) as erro:
+            return 400, {'erro': f'requisição inválida: {erro}'}, {}
+
+        try:
+            resultados = await self.enfileirar(ROTAS[caminho], argumento, textos)
+        except ServicoOcupado:
+            return 503, {'erro': 'serviço ocupado, tente novamente'}, {'Retry-After': '1'}
+        except Exception as erro:
+            return 500, {'erro': f'{type(erro).__name__}: {erro}'}, {}
+
+        chave = 'resultados' if ROTAS[caminho] == 'detectar' else 'textos'
+        return 200, {chave: resultados}, {}
+
+
+def _executar_operacao(detector, operacao: str, argumento, textos: list) -> list:
+    """Chamada ao detector (roda na thread do executor)."""
+    if operacao == 'detectar':
+        return detector.detect_pii_batch(textos, batch_size=argumento)
+    return detector.apply_masking_batch(textos, mode=argumento)
+
+
+class _ErroRequisicao(Exception):
+    """Requisição HTTP malformada ou grande demais."""
+
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+async def _ler_requisicao(leitor: asyncio.StreamReader, max_corpo: int):
+    """
+    Lê uma requisição HTTP/1.1.
+
+    Returns:
+        Tupla (metodo, caminho, corpo, manter_conexao), ou None se a conexão foi fechada
+
+    Raises:
+        _ErroRequisicao: Linha de requisição ou Content-Length inválidos (400), corpo grande demais (413)
+    """
+    linha = await leitor.readline()
+    if not linha:
+        return None
+    try:
+        metodo, caminho, versao = linha.decode('latin-1').split()
+    except ValueError:
+        raise _ErroRequisicao(400, 'linha de requisição inválida')
+
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    if 'transfer-encoding' in cabecalhos:
+        raise _ErroRequisicao(400, 'Transfer-Encoding não suportado; envie Content-Length')
+    tamanho = cabecalhos.get('content-length', '0') or '0'
+    if not (tamanho.isascii() and tamanho.isdigit()):
+        raise _ErroRequisicao(400, f'Content-Length inválido: {tamanho!r}')
+    tamanho = int(tamanho)
+    if tamanho > max_corpo:
+        raise _ErroRequisicao(413, f'corpo maior que {max_corpo} bytes')
+    corpo = await leitor.readexactly(tamanho) if tamanho else b''
+
+    conexao = cabecalhos.get('connection', '').lower()
+    manter = conexao != 'close' if versao == 'HTTP/1.1' else conexao == 'keep-alive'
+    return metodo.upper(), caminho, corpo, manter
+
+
+def _escrever_resposta(escritor: asyncio.StreamWriter, status: int, dados, cabecalhos: dict, manter: bool):
+    """Serializa a resposta JSON."""
+    corpo = json.dumps(dados, ensure_ascii=False, default=list).encode('utf-8')
+    linhas = [
+        f'HTTP/1.1 {status} {STATUS_HTTP.get(status, "")}',
+        'Content-Type: application/json; charset=utf-8',
+        f'Content-Length: {len(corpo)}',
+        f'Connection: {"keep-alive" if manter else "close"}',
+        *(f'{nome}: {valor}' for nome, valor in cabecalhos.items()),
+    ]
+    escritor.write(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + corpo)
+
+
+# =====================================================================
+# CLIENTE
+# =====================================================================
+
+class ClienteServico:
+    """
+    Cliente do serviço com a interface do `MotorParalelo`.
+
+    Uso:
+        cliente = ClienteServico('http://127.0.0.1:8765')
+        resultados = cliente.detect_pii_batch(textos, progresso=callback)
+    """
+
+    def __init__(self, url: str, chunk_size: int = 500, timeout: float = 300, tentativas: int = 5):
+        """
+        Args:
+            url: Endereço do serviço (ex: http://127.0.0.1:8765)
+            chunk_size: Textos por requisição (o progresso é atualizado a cada uma)
+            timeout: Tempo máximo de uma requisição, em segundos
+            tentativas: Novas tentativas quando o serviço responde 503 (ocupado)
+        """
+        partes = urlsplit(url if '://' in url else f'http://{url}')
+        self.url = url
+        self.host = partes.hostname or '127.0.0.1'
+        self.porta = partes.port or 80
+        self.chunk_size = max(1, chunk_size)
+        self.timeout = timeout
+        self.tentativas = tentativas
+        # Uma conexão (keep-alive) por thread
+        self._local = threading.local()
+
+    def _conexao(self) -> http.client.HTTPConnection:
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = http.client.HTTPConnection(self.host, self.porta, timeout=self.timeout)
+            self._local.conexao = conexao
+        return conexao
+
+    def encerrar(self):
+        """Fecha a conexão desta thread."""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.encerrar()
+
+    def _requisitar(self, metodo: str, caminho: str, dados: dict = None) -> dict:
+        """
+        Envia uma requisição, repetindo enquanto o serviço estiver ocupado.
+
+        Raises:
+            ConnectionError: Se o serviço não responder ou continuar ocupado
+            RuntimeError: Se o serviço devolver erro
+        """
+        corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8') if dados is not None else None
+        cabecalhos = {'Content-Type': 'application/json'} if corpo is not None else {}
+
+        for tentativa in range(self.tentativas + 1):
+            try:
+                conexao = self._conexao()
+                conexao.request(metodo, caminho, body=corpo, headers=cabecalhos)
+                resposta = conexao.getresponse()
+                conteudo = resposta.read()
+            except (OSError, http.client.HTTPException) as erro:
+                # Conexão keep-alive fechada pelo servidor: reabre uma vez
+                self.encerrar()
+                if tentativa == 0:
+                    continue
+                raise ConnectionError(f'serviço de detecção indisponível em {self.url}: {erro}') from erro
+
+            if resposta.status == 503 and tentativa < self.tentativas:
+                time.sleep(float(resposta.getheader('Retry-After', 1)) * (tentativa + 1))
+                continue
+            if resposta.status == 503:
+                raise ConnectionError(f'serviço de detecção ocupado em {self.url}')
+            dados_resposta = json.loads(conteudo)
+            if resposta.status != 200:
+                raise RuntimeError(f'serviço de detecção: {dados_resposta.get("erro", resposta.status)}')
+            return dados_resposta
+
+        raise ConnectionError(f'serviço de detecção indisponível em {self.url}')
+
+    def saude(self) -> dict:
+        """Métricas do serviço (GET /saude)."""
+        return self._requisitar('GET', '/saude')
+
+    def _executar(self, caminho: str, chave: str, textos: list, parametros: dict, progresso=None) -> list:
+        resultados = []
+        total = len(textos)
+        for i in range(0, total, self.chunk_size):
+            resposta = self._requisitar('POST', caminho, {'textos': textos[i:i + self.chunk_size], **parametros})
+            resultados.extend(resposta[chave])
+            if progresso:
+                progresso(len(resultados), total)
+        return resultados
+
+    def detect_pii_batch(self, textos: list, batch_size: int = 50, progresso=None) -> list:
+        """
+        Equivalente remoto de `PIIDetector.detect_pii_batch`.
+
+        Returns:
+            Lista de resultados na ordem da entrada
+        """
+        return self._executar('/detectar', 'resultados', textos, {'batch_size': batch_size}, progresso)
+
+    def apply_masking_batch(self, textos: list, mode: str = 'PARCIAL', progresso=None) -> list:
+        """
+        Equivalente remoto de `PIIDetector.apply_masking_batch`.
+
+        Returns:
+            Lista de textos mascarados na ordem da entrada
+        """
+        return self._executar('/mascarar', 'textos', textos, {'modo': mode}, progresso)
@@ -0,0 +1,366 @@
+"""
+Índice de Titulares (Direitos do Titular — Art. 18 da LGPD)
+===========================================================
+
+Quando um cidadão pergunta em quais manifestações aparecem os seus dados,
+era preciso reanalisar todos os arquivos. A análise já extrai CPFs,
+e-mails, telefones e nomes para as colunas `pii_*_lista`, mas só como
+texto concatenado em cada arquivo.
+
+`IndiceTitulares` guarda em SQLite, de forma persistente, um índice
+invertido valor da entidade -> registros, alimentado a cada arquivo
+analisado (app e `processar_lote.py`) e consultado em milissegundos em
+todos os conjuntos já processados.
+
+- Valores normalizados antes de indexar: CPF, RG e telefone só com
+  dígitos (telefone sem o +55), e-mail em minúsculas, nome em minúsculas,
+  sem acentos e com espaços simples
+- O índice NÃO guarda os valores: a chave é um HMAC-SHA256 (truncado em
+  128 bits) do tipo + valor normalizado, com uma chave secreta mantida
+  fora do banco (arquivo `.chave` ao lado do banco, com permissão 0600,
+  ou a variável de ambiente INDICE_TITULARES_CHAVE em hexadecimal).
+  Sem a chave, o banco não permite testar CPFs por força bruta
+- Cada conjunto é identificado pelo nome + impressão do conteúdo
+  (`impressao_arquivo`): dois uploads diferentes com o mesmo nome viram
+  dois conjuntos. Reindexar o mesmo conteúdo refaz só as suas entradas;
+  apagar as versões anteriores de um nome é uma ação explícita
+  (`substituir=True` ou `remover_conjunto`)
+
+Uso:
+    indice = IndiceTitulares('./cache/indice_titulares.sqlite')
+    indice.indexar('manifestacoes_2024_01.xlsx', df_analisado, impressao=impressao_arquivo(caminho))
+    indice.buscar('123.456.789-09')   # [{'conjunto': ..., 'linha': 12, 'tipo': 'cpf', ...}]
+"""
+
+import hashlib
+import hmac
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from chaves import carregar_chave
+from explorador import normalizar
+from exportacao import assinatura_conteudo
+
+# Tipo da entidade -> colunas `pii_*_lista` de onde os valores são lidos
+COLUNAS_TITULAR = {
+    'cpf': ('pii_cpf_validado_lista', 'pii_cpf_nao_validado_lista'),
+    'rg': ('pii_rg_lista',),
+    'email': ('pii_email_lista',),
+    'telefone': ('pii_telefone_lista',),
+    'nome': ('pii_nome_lista',),
+}
+
+VARIAVEL_CHAVE = 'INDICE_TITULARES_CHAVE'
+
+_NAO_DIGITO = re.compile(r'\D')
+_NAO_RG = re.compile(r'[^0-9x]')
+_ESPACOS = re.compile(r'\s+')
+
+# Limite de parâmetros por consulta IN (...) no SQLite
+_LOTE_SQL = 500
+
+_BLOCO_LEITURA = 1 << 20
+
+
+def normalizar_valor(tipo: str, valor: str) -> str:
+    """
+    Forma canônica de um valor para o índice ('' = nada a indexar).
+
+    Args:
+        tipo: Chave de COLUNAS_TITULAR
+        valor: Valor como detectado ('123.456.789-09', 'Maria@Gov.br'...)
+    """
+    valor = valor.strip()
+    if tipo == 'cpf':
+        return _NAO_DIGITO.sub('', valor)
+    if tipo == 'rg':
+        return _NAO_RG.sub('', valor.lower())
+    if tipo == 'telefone':
+        digitos = _NAO_DIGITO.sub('', valor)
+        # +55 (DDD) número: o código do país não faz parte do número
+        if len(digitos) in (12, 13) and digitos.startswith('55'):
+            digitos = digitos[2:]
+        return digitos.lstrip('0')
+    if tipo == 'email':
+        return valor.lower()
+    if tipo == 'nome':
+        return _ESPACOS.sub(' ', normalizar(valor)).strip()
+    raise ValueError(f"Tipo de entidade desconhecido: {tipo}")
+
+
+def tipos_provaveis(valor: str) -> list:
+    """Tipos em que uma consulta sem tipo informado pode estar (ex: 11 dígitos = CPF ou celular)."""
+    if '@' in valor:
+        return ['email']
+    digitos = _NAO_DIGITO.sub('', valor)
+    if not digitos:
+        return ['nome']
+    if len(digitos) >= len(valor.strip()) // 2:
+        return ['cpf', 'telefone', 'rg']
+    return ['nome']
+
+
+def impressao_arquivo(origem) -> str:
+    """
+    Impressão do conteúdo de um arquivo (blake2b de 128 bits dos bytes), que o identifica no índice.
+
+    Args:
+        origem: Caminho ou buffer com `getvalue()` (ex: arquivo enviado ao Streamlit)
+    """
+    resumo = hashlib.blake2b(digest_size=16)
+    if hasattr(origem, 'getvalue'):
+        resumo.update(origem.getvalue())
+    else:
+        with open(origem, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(_BLOCO_LEITURA), b''):
+                resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+class IndiceTitulares:
+    """
+    Índice persistente (SQLite) de entidades -> registros, com chaves HMAC.
+
+    Seguro para uso entre threads (reexecuções do Streamlit) como o
+    CacheResultados.
+    """
+
+    def __init__(self, caminho: str, chave: bytes = None):
+        """
+        Args:
+            caminho: Arquivo SQLite do índice
+            chave: Chave secreta do HMAC (None = `carregar_chave` ao lado do banco)
+        """
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._chave = chave if chave is not None else carregar_chave(self.caminho.with_suffix('.chave'), VARIAVEL_CHAVE)
+
+        self._lock = threading.Lock()
+        self._conexao = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                nome TEXT PRIMARY KEY,
+                valor TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS conjuntos (
+                id INTEGER PRIMARY KEY,
+                nome TEXT NOT NULL,
+                impressao TEXT NOT NULL,
+                registros INTEGER NOT NULL,
+                entidades INTEGER NOT NULL,
+                indexado_em REAL NOT NULL,
+                UNIQUE (nome, impressao)
+            );
+            CREATE TABLE IF NOT EXISTS entidades (
+                chave BLOB NOT NULL,
+                conjunto INTEGER NOT NULL,
+                linha INTEGER NOT NULL,
+                tipo TEXT NOT NULL,
+                identificador TEXT,
+                PRIMARY KEY (chave, conjunto, linha)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_entidades_conjunto ON entidades (conjunto);
+        """)
+        self._migrar_conjuntos()
+        self._verificar_chave()
+        self._conexao.commit()
+
+    def _migrar_conjuntos(self):
+        """Bancos anteriores identificavam o conjunto só pelo nome: acrescenta a impressão (vazia)."""
+        colunas = [linha[1] for linha in self._conexao.execute('PRAGMA table_info(conjuntos)')]
+        if 'impressao' in colunas:
+            return
+        self._conexao.executescript("""
+            ALTER TABLE conjuntos RENAME TO conjuntos_antigos;
+            CREATE TABLE conjuntos (
+                id INTEGER PRIMARY KEY,
+                nome TEXT NOT NULL,
+                impressao TEXT NOT NULL,
+                registros INTEGER NOT NULL,
+                entidades INTEGER NOT NULL,
+                indexado_em REAL NOT NULL,
+                UNIQUE (nome, impressao)
+            );
+            INSERT INTO conjuntos (id, nome, impressao, registros, entidades, indexado_em)
+                SELECT id, nome, '', registros, entidades, indexado_em FROM conjuntos_antigos;
+            DROP TABLE conjuntos_antigos;
+        """)
+
+    def _verificar_chave(self):
+        """Recusa abrir o banco com uma chave diferente da usada para criá-lo."""
+        impressao = self.hash('meta', 'impressao-da-chave').hex()
+        linha = self._conexao.execute("SELECT valor FROM meta WHERE nome = 'impressao_chave'").fetchone()
+        if linha is None:
+            self._conexao.execute("INSERT INTO meta (nome, valor) VALUES ('impressao_chave', ?)", (impressao,))
+        elif linha[0] != impressao:
+            self._conexao.close()
+            raise ValueError(f"A chave do índice de titulares não corresponde à usada em {self.caminho}")
+
+    def hash(self, tipo: str, valor_normalizado: str) -> bytes:
+        """HMAC-SHA256 (16 bytes) de tipo + valor normalizado."""
+        return hmac.new(self._chave, f'{tipo}\0{valor_normalizado}'.encode('utf-8'), hashlib.sha256).digest()[:16]
+
+    def iniciar_conjunto(self, nome: str, impressao: str, substituir: bool = False) -> int:
+        """
+        Registra (ou reinicia) um conjunto de dados e devolve o seu id.
+
+        Args:
+            nome: Nome do arquivo
+            impressao: Impressão do conteúdo (`impressao_arquivo` ou `assinatura_conteudo`)
+            substituir: Apaga também os conjuntos com o mesmo nome e outro conteúdo
+
+        Só as entradas de uma indexação anterior do mesmo nome + conteúdo são
+        refeitas; outras versões do arquivo continuam no índice, salvo com `substituir`.
+        """
+        with self._lock:
+            if substituir:
+                self._apagar('nome = ? AND impressao <> ?', (nome, impressao))
+            linha = self._conexao.execute(
+                'SELECT id FROM conjuntos WHERE nome = ? AND impressao = ?', (nome, impressao)).fetchone()
+            if linha is not None:
+                self._conexao.execute('DELETE FROM entidades WHERE conjunto = ?', (linha[0],))
+                self._conexao.execute(
+                    'UPDATE conjuntos SET registros = 0, entidades = 0, indexado_em = ? WHERE id = ?',
+                    (time.time(), linha[0]))
+                identificador = linha[0]
+            else:
+                identificador = self._conexao.execute(
+                    'INSERT INTO conjuntos (nome, impressao, registros, entidades, indexado_em) '
+                    'VALUES (?, ?, 0, 0, ?)', (nome, impressao, time.time())).lastrowid
+            self._conexao.commit()
+        return identificador
+
+    def adicionar(self, conjunto: int, df: pd.DataFrame, inicio: int = 0, coluna_id: str = None) -> int:
+        """
+        Indexa as entidades de um bloco do conjunto.
+
+        Args:
+            conjunto: Retorno de `iniciar_conjunto`
+            df: DataFrame com as colunas `pii_*_lista`
+            inicio: Posição da primeira linha do bloco no arquivo (processamento em blocos)
+            coluna_id: Coluna com o identificador do registro (ex: protocolo), guardado junto
+
+        Returns:
+            Entradas (entidade, registro) indexadas
+        """
+        identificadores = df[coluna_id].astype(str).tolist() if coluna_id else None
+        entradas = {}
+        for tipo, colunas in COLUNAS_TITULAR.items():
+            for coluna in colunas:
+                if coluna not in df.columns:
+                    continue
+                for posicao, valores in enumerate(df[coluna].tolist()):
+                    if not isinstance(valores, str) or not valores:
+                        continue
+                    for valor in valores.split(';'):
+                        normalizado = normalizar_valor(tipo, valor)
+                        if normalizado:
+                            chave = self.hash(tipo, normalizado)
+                            entradas[(chave, inicio + posicao)] = (
+                                tipo, identificadores[posicao] if identificadores else None)
+
+        registros = [(chave, conjunto, linha, tipo, identificador)
+                     for (chave, linha), (tipo, identificador) in entradas.items()]
+        with self._lock:
+            self._conexao.executemany(
+                'INSERT OR REPLACE INTO entidades (chave, conjunto, linha, tipo, identificador) VALUES (?, ?, ?, ?, ?)',
+                registros
+            )
+            self._conexao.execute(
+                'UPDATE conjuntos SET registros = MAX(registros, ?), entidades = entidades + ?, indexado_em = ? '
+                'WHERE id = ?', (inicio + len(df), len(registros), time.time(), conjunto))
+            self._conexao.commit()
+        return len(registros)
+
+    def indexar(self, nome: str, df: pd.DataFrame, coluna_id: str = None, impressao: str = None,
+                substituir: bool = False) -> int:
+        """
+        `iniciar_conjunto` + `adicionar` de um DataFrame analisado inteiro.
+
+        Args:
+            impressao: Impressão do arquivo de origem (None = hash do conteúdo de `df`)
+        """
+        if impressao is None:
+            impressao = assinatura_conteudo(df)
+        return self.adicionar(self.iniciar_conjunto(nome, impressao, substituir), df, coluna_id=coluna_id)
+
+    def buscar(self, valor: str, tipo: str = None) -> list:
+        """
+        Registros, em todos os conjuntos indexados, que contêm o valor.
+
+        Args:
+            valor: CPF, e-mail, telefone, RG ou nome, em qualquer formatação
+            tipo: Chave de COLUNAS_TITULAR (None = tipos prováveis do valor)
+
+        Returns:
+            Lista de {'conjunto', 'impressao', 'linha', 'identificador', 'tipo'}, por conjunto e linha
+        """
+        tipos = [tipo] if tipo else tipos_provaveis(valor)
+        chaves = [self.hash(tipo, normalizado) for tipo in tipos
+                  for normalizado in [normalizar_valor(tipo, valor)] if normalizado]
+        if not chaves:
+            return []
+
+        with self._lock:
+            linhas = []
+            for i in range(0, len(chaves), _LOTE_SQL):
+                lote = chaves[i:i + _LOTE_SQL]
+                linhas += self._conexao.execute(
+                    f"""SELECT c.nome, c.impressao, e.linha, e.identificador, e.tipo
+                        FROM entidades e JOIN conjuntos c ON c.id = e.conjunto
+                        WHERE e.chave IN ({','.join('?' * len(lote))})
+                        ORDER BY c.nome, c.indexado_em, e.linha""",
+                    lote
+                ).fetchall()
+
+        return [{'conjunto': conjunto, 'impressao': impressao, 'linha': linha, 'identificador': identificador,
+                 'tipo': tipo}
+                for conjunto, impressao, linha, identificador, tipo in linhas]
+
+    def conjuntos(self) -> list:
+        """Conjuntos indexados: [{'nome', 'impressao', 'registros', 'entidades', 'indexado_em'}]."""
+        with self._lock:
+            linhas = self._conexao.execute(
+                'SELECT nome, impressao, registros, entidades, indexado_em FROM conjuntos ORDER BY indexado_em DESC'
+            ).fetchall()
+        return [{'nome': nome, 'impressao': impressao, 'registros': registros, 'entidades': entidades,
+                 'indexado_em': indexado_em}
+                for nome, impressao, registros, entidades, indexado_em in linhas]
+
+    def remover_conjunto(self, nome: str, impressao: str = None) -> int:
+        """
+        Apaga um conjunto do índice (ex: arquivo descartado pelo prazo de retenção).
+
+        Args:
+            nome: Nome do arquivo
+            impressao: Só a versão com esta impressão (None = todas as versões do nome)
+
+        Returns:
+            Conjuntos apagados
+        """
+        with self._lock:
+            if impressao is None:
+                removidos = self._apagar('nome = ?', (nome,))
+            else:
+                removidos = self._apagar('nome = ? AND impressao = ?', (nome, impressao))
+            self._conexao.commit()
+        return removidos
+
+    def _apagar(self, condicao: str, parametros: tuple) -> int:
+        """Apaga os conjuntos que satisfazem a condição e as suas entradas (chamado com o lock)."""
+        ids = [linha[0] for linha in self._conexao.execute(f'SELECT id FROM conjuntos WHERE {condicao}', parametros)]
+        for identificador in ids:
+            self._conexao.execute('DELETE FROM entidades WHERE conjunto = ?', (identificador,))
+            self._conexao.execute('DELETE FROM conjuntos WHERE id = ?', (identificador,))
+        return len(ids)
+
+    def fechar(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conexao.close()
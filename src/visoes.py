@@ -0,0 +1,80 @@
+"""
+Visões da Sessão sem Cópias (original + resultado + texto mascarado)
+====================================================================
+
+O app mantinha por usuário várias cópias inteiras da planilha: `df_original`,
+`df_analisado` (uma `df.copy()` que recebia ~25 colunas de resultado) e
+`df_mascarado_limpo` (outra `df_original.copy()` com o texto mascarado),
+além das cópias dos caminhos de mascaramento e restauração.
+
+O estado da sessão passa a guardar cada dado uma única vez:
+
+- o original, como carregado, somente leitura (nada escreve nele)
+- o resultado da análise em um DataFrame compacto só com as colunas de
+  resultado (`COLUNAS_RESULTADO`), alinhado ao original pela posição da linha
+- o texto mascarado como uma única coluna de substituição
+
+As tabelas exibidas e exportadas são montadas por `montar_visao`. Com o
+Copy-on-Write do pandas, a visão reaproveita os arrays do original e do
+resultado (não copia dados); uma escrita em uma visão copia só a coluna
+alterada, sem afetar o original. O Copy-on-Write é o padrão a partir do
+pandas 3; no pandas 2.x, app e lote o ligam ao iniciar
+(`ativar_copy_on_write`) — sem ele, cada visão copiaria os dados e uma
+escrita nela poderia alterar o original.
+
+Uso:
+    resultado = separar_resultado(df_com_colunas)
+    df_analisado = montar_visao(df_original, resultado)
+    df_mascarado = montar_visao(df_original, substituicoes={'texto': textos_mascarados})
+"""
+
+import pandas as pd
+
+from processamento import COLUNAS_RESULTADO
+
+
+def ativar_copy_on_write():
+    """Liga o Copy-on-Write no pandas 2.x (no pandas 3 ele é sempre ligado e a opção foi descontinuada)."""
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def separar_resultado(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Só as colunas de resultado, indexadas pela posição da linha (0..n-1).
+
+    Args:
+        df: DataFrame com as colunas de `montar_colunas_resultado`
+    """
+    return df[COLUNAS_RESULTADO].set_axis(pd.RangeIndex(len(df)), axis=0)
+
+
+def montar_visao(original: pd.DataFrame, resultado: pd.DataFrame = None, substituicoes: dict = None) -> pd.DataFrame:
+    """
+    Tabela completa para exibição/exportação, sem copiar os dados.
+
+    Args:
+        original: DataFrame carregado (não é alterado)
+        resultado: Colunas de resultado por posição de linha (`separar_resultado`), acrescentadas à direita;
+            colunas do original com o mesmo nome (ex: planilha que já era uma análise) são substituídas
+        substituicoes: {coluna: valores} que trocam colunas do original (ex: texto mascarado)
+
+    Returns:
+        Novo DataFrame com o índice do original
+    """
+    visao = original
+    if substituicoes:
+        visao = visao.assign(**{
+            coluna: pd.Series(valores, index=original.index) if not isinstance(valores, pd.Series)
+            else valores.set_axis(original.index, axis=0)
+            for coluna, valores in substituicoes.items()
+        })
+    if resultado is not None:
+        repetidas = [coluna for coluna in resultado.columns if coluna in visao.columns]
+        if repetidas:
+            visao = visao.drop(columns=repetidas)
+        visao = pd.concat([visao, resultado.set_axis(original.index, axis=0)], axis=1)
+    elif visao is original:
+        # Nunca devolve o próprio original: quem recebe a visão pode acrescentar colunas
+        visao = original.copy(deep=False)
+    return visao
@@ -0,0 +1,8 @@
+"""Configuração dos testes: módulos de `src/` e scripts da raiz importáveis."""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+sys.path.insert(0, RAIZ)
@@ -0,0 +1,94 @@
+"""
+Detector de Teste (sem spaCy)
+=============================
+
+Substitui o `PIIDetector` nos testes: mesma interface usada pelo pipeline
+(`detect_pii_batch`, `apply_masking_batch`, mascaradores parciais) e
+mesma estrutura de resultado, com regras regex simples e determinísticas.
+"""
+
+import re
+
+TAG_PROTECAO = "[INFORMAÇÃO PROTEGIDA LGPD]"
+
+_CPF = re.compile(r'(?<!\d)\d{3}\.?\d{3}\.?\d{3}-?\d{2}(?!\d)')
+_RG = re.compile(r'RG (\d\.\d{3}\.\d{3})')
+_EMAIL = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+')
+_TELEFONE = re.compile(r'\(\d{2}\) 9\d{4}-\d{4}')
+_NOME = re.compile(r'(?:Sou|nome é) ([A-Z][a-z]+ [A-Z][a-z]+)')
+_ENDERECO = re.compile(r'Rua [A-Z][a-z]+, \d+')
+
+
+def cpf_valido(cpf: str) -> bool:
+    """Dígitos verificadores do CPF."""
+    digitos = [int(c) for c in cpf if c.isdigit()]
+    for posicao in (9, 10):
+        soma = sum(digitos[i] * (posicao + 1 - i) for i in range(posicao))
+        if (soma * 10 % 11) % 10 != digitos[posicao]:
+            return False
+    return True
+
+
+class DetectorFalso:
+    """Detector determinístico; `chamadas` conta os textos que passaram por `detect_pii`."""
+
+    nlp = None
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def detect_pii(self, texto: str) -> dict:
+        self.chamadas += 1
+        cpfs = _CPF.findall(texto)
+        entidades = {
+            'cpf': {'verificado': [c for c in cpfs if cpf_valido(c)],
+                    'suspeito': [c for c in cpfs if not cpf_valido(c)]},
+            'rg': {'verificado': _RG.findall(texto), 'suspeito': []},
+            'email': {'verificado': _EMAIL.findall(texto), 'suspeito': []},
+            'telefone': {'verificado': _TELEFONE.findall(texto), 'suspeito': []},
+            'nlp_contexto': {'pessoas': _NOME.findall(texto)},
+            'endereco': {'detectado': _ENDERECO.findall(texto)},
+        }
+        encontrados = sum(len(valores) for grupo in entidades.values() for valores in grupo.values())
+        return {'contem_pii': encontrados > 0, 'score_risco': min(1.0, 0.1 * encontrados), 'entidades': entidades}
+
+    def detect_pii_batch(self, textos: list, batch_size: int = 50) -> list:
+        return [self.detect_pii(texto) for texto in textos]
+
+    def _mascara_cpf_parcial(self, cpf: str) -> str:
+        return f'***.{cpf[4:7]}.{cpf[8:11]}-**'
+
+    def _mascara_rg_parcial(self, rg: str) -> str:
+        return '**' + rg[1:]
+
+    def _mascara_email_parcial(self, email: str) -> str:
+        usuario, dominio = email.split('@', 1)
+        return f'{usuario[:2]}***@{dominio}'
+
+    def _mascara_telefone_parcial(self, telefone: str) -> str:
+        return telefone[:6] + '****' + telefone[10:]
+
+    def _mascara_nome_parcial(self, nome: str) -> str:
+        return ' '.join(parte[0] + '*' for parte in nome.split())
+
+    def apply_masking(self, texto: str, mode: str = 'PARCIAL') -> str:
+        entidades = self.detect_pii(texto)['entidades']
+        pares = [(v, self._mascara_cpf_parcial) for v in entidades['cpf']['verificado'] + entidades['cpf']['suspeito']]
+        pares += [(v, self._mascara_rg_parcial) for v in entidades['rg']['verificado']]
+        pares += [(v, self._mascara_email_parcial) for v in entidades['email']['verificado']]
+        pares += [(v, self._mascara_telefone_parcial) for v in entidades['telefone']['verificado']]
+        pares += [(v, self._mascara_nome_parcial) for v in entidades['nlp_contexto']['pessoas']]
+        pares += [(v, lambda endereco: re.sub(r'\d', '#', endereco)) for v in entidades['endereco']['detectado']]
+        for valor, mascarador in pares:
+            texto = texto.replace(valor, TAG_PROTECAO if mode == 'PROTECAO_TOTAL' else mascarador(valor))
+        return texto
+
+    def apply_masking_batch(self, textos: list, mode: str = 'PARCIAL') -> list:
+        return [self.apply_masking(texto, mode) for texto in textos]
+
+
+class DetectorFalsoComEndereco(DetectorFalso):
+    """Variante com mascarador parcial de endereço (igual ao de `apply_masking`)."""
+
+    def _mascara_endereco_parcial(self, endereco: str) -> str:
+        return re.sub(r'\d', '#', endereco)
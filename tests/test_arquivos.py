@@ -0,0 +1,46 @@
+"""Escrita streaming em Parquet/Feather: colunas cujo tipo muda entre blocos, sem erro nem perda."""
+
+import io
+
+import pandas as pd
+import pytest
+
+from arquivos import ler_tabela, salvar_streaming
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture(params=['parquet', 'feather'])
+def formato(request):
+    return request.param
+
+
+@pytest.mark.parametrize('em_buffer', [False, True])
+def test_coluna_numerica_que_vira_alfanumerica(tmp_path, formato, em_buffer):
+    df = pd.DataFrame({'codigo': pd.Series([7] * 5001 + ['ABC-149'] * 20, dtype=object), 'n': range(5021)})
+    destino = io.BytesIO() if em_buffer else tmp_path / f'saida.{formato}'
+    salvar_streaming(df, destino, formato)
+    if em_buffer:
+        destino.name = f'saida.{formato}'
+        destino.seek(0)
+
+    lido = ler_tabela(destino)
+    assert lido['codigo'].tolist() == ['7'] * 5001 + ['ABC-149'] * 20
+    assert lido['n'].tolist() == list(range(5021))
+    assert list(tmp_path.iterdir()) == ([] if em_buffer else [destino])
+
+
+def test_inteiros_seguidos_de_decimal_nao_perdem_precisao(tmp_path, formato):
+    df = pd.DataFrame({'valor': pd.Series([1] * 6000 + [2.75], dtype=object)})
+    salvar_streaming(df, tmp_path / f'saida.{formato}')
+
+    lido = ler_tabela(tmp_path / f'saida.{formato}')
+    assert lido['valor'].iloc[-1] == 2.75
+    assert lido['valor'].iloc[0] == 1
+
+
+def test_inteiro_grande_que_nao_cabe_em_decimal_vira_texto(tmp_path, formato):
+    df = pd.DataFrame({'valor': pd.Series([2 ** 60] * 3 + [0.5], dtype=object)})
+    salvar_streaming(df, tmp_path / f'saida.{formato}', tamanho_bloco=3)
+
+    assert ler_tabela(tmp_path / f'saida.{formato}')['valor'].tolist() == [str(2 ** 60)] * 3 + ['0.5']
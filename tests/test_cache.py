@@ -0,0 +1,155 @@
+"""Cache de resultados: ida e volta, nada em claro no banco, validade, total de tamanho e LRU."""
+
+import sqlite3
+import time
+
+import pytest
+
+import expurgar_cache
+from cache import CacheResultados
+from tests.detector_falso import DetectorFalso
+
+CHAVE = bytes(range(32))
+TEXTOS = ['Sou Maria Silva, CPF 12345678909', 'E-mail joao@x.com', 'Nada a declarar']
+
+
+def _abrir(caminho, **opcoes):
+    return CacheResultados(caminho, 'falso-1', chave=CHAVE, **opcoes)
+
+
+def _soma_tamanhos(cache):
+    return cache._conexao.execute('SELECT COALESCE(SUM(tamanho), 0) FROM resultados').fetchone()[0]
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return tmp_path / 'resultados.sqlite'
+
+
+def test_ida_e_volta(caminho):
+    resultados = DetectorFalso().detect_pii_batch(TEXTOS)
+    cache = _abrir(caminho)
+    cache.salvar(dict(zip(TEXTOS, resultados)))
+    cache.fechar()
+
+    cache = _abrir(caminho)
+    encontrados = cache.buscar(TEXTOS + ['outro texto'])
+    assert [encontrados[texto]['entidades']['cpf'] for texto in TEXTOS] == \
+        [resultado['entidades']['cpf'] for resultado in resultados]
+    assert (cache.hits, cache.misses) == (3, 1)
+    cache.fechar()
+
+
+def test_nada_em_claro_no_banco(caminho):
+    cache = _abrir(caminho)
+    cache.salvar(dict(zip(TEXTOS, DetectorFalso().detect_pii_batch(TEXTOS))))
+    cache.fechar()
+
+    bruto = caminho.read_bytes()
+    for trecho in (b'12345678909', b'joao@x.com', b'Maria Silva'):
+        assert trecho not in bruto
+
+
+def test_outra_chave_ou_assinatura_nao_encontra(caminho):
+    cache = _abrir(caminho)
+    cache.salvar({'texto': {'contem_pii': False}})
+    cache.fechar()
+
+    outra = CacheResultados(caminho, 'falso-1', chave=bytes(32))
+    assert outra.buscar(['texto']) == {}
+    outra.fechar()
+    assinatura = CacheResultados(caminho, 'falso-2', chave=CHAVE)
+    assert assinatura.buscar(['texto']) == {}
+    assinatura.fechar()
+
+
+def test_entrada_adulterada_e_ignorada(caminho):
+    cache = _abrir(caminho)
+    cache.salvar({'texto': {'contem_pii': True}})
+    cache._conexao.execute("UPDATE resultados SET valor = CAST(zeroblob(40) AS BLOB)")
+    cache._conexao.commit()
+    assert cache.buscar(['texto']) == {}
+    cache.fechar()
+
+
+def test_validade(caminho):
+    cache = _abrir(caminho, validade_dias=1)
+    cache.salvar({'antigo': {'n': 1}, 'novo': {'n': 2}})
+    cache._conexao.execute("UPDATE resultados SET criado_em = ? WHERE chave = ?",
+                           (time.time() - 2 * 86400, cache.chave('antigo')))
+    cache._conexao.commit()
+
+    assert list(cache.buscar(['antigo', 'novo'])) == ['novo']
+    assert cache.expurgar() == 1
+    assert cache.estatisticas()['entradas'] == 1
+    assert cache.tamanho_total() == _soma_tamanhos(cache)
+    cache.fechar()
+
+
+def test_total_mantido_sem_somar_a_tabela(caminho):
+    cache = _abrir(caminho)
+    cache.salvar({f'texto {i}': {'n': i} for i in range(50)})
+    cache.salvar({f'texto {i}': {'n': i, 'extra': 'x' * i} for i in range(25, 75)})
+    assert cache.tamanho_total() == _soma_tamanhos(cache)
+
+    # Outra conexão no mesmo banco (ex: outra sessão) enxerga e atualiza o mesmo total
+    outra = _abrir(caminho)
+    outra.salvar({'de outra sessão': {'n': 0}})
+    assert cache.tamanho_total() == outra.tamanho_total() == _soma_tamanhos(cache)
+    outra.fechar()
+
+    cache.limpar()
+    assert cache.tamanho_total() == 0
+    cache.fechar()
+
+
+def test_remocao_lru(caminho):
+    cache = _abrir(caminho)
+    cache.salvar({f'texto {i}': {'n': i} for i in range(10)})
+    tamanho_entrada = cache.tamanho_total() // 10
+    cache.buscar(['texto 0'])
+    cache.tamanho_maximo = tamanho_entrada * 5
+    cache.salvar({'novo': {'n': 99}})
+
+    assert cache.tamanho_total() <= cache.tamanho_maximo
+    assert cache.tamanho_total() == _soma_tamanhos(cache)
+    assert set(cache.buscar(['texto 0', 'novo'])) == {'texto 0', 'novo'}
+    cache.fechar()
+
+
+def test_formato_antigo_em_claro_e_descartado(caminho):
+    conexao = sqlite3.connect(str(caminho))
+    conexao.execute('CREATE TABLE resultados (chave TEXT PRIMARY KEY, valor BLOB NOT NULL, '
+                    'tamanho INTEGER NOT NULL, ultimo_acesso REAL NOT NULL)')
+    conexao.execute("INSERT INTO resultados VALUES ('a', '{\"cpf\": \"12345678909\"}', 24, 0)")
+    conexao.commit()
+    conexao.close()
+
+    cache = _abrir(caminho)
+    assert cache.estatisticas()['entradas'] == 0
+    cache.fechar()
+    assert b'12345678909' not in caminho.read_bytes()
+
+
+def test_script_de_expurgo(caminho, capsys, monkeypatch):
+    monkeypatch.setenv('CACHE_RESULTADOS_CHAVE', CHAVE.hex())
+    cache = _abrir(caminho)
+    cache.salvar({'antigo': {'n': 1}, 'novo': {'n': 2}})
+    cache._conexao.execute("UPDATE resultados SET criado_em = 0 WHERE chave = ?", (cache.chave('antigo'),))
+    cache._conexao.commit()
+    cache.fechar()
+
+    assert expurgar_cache.main(['--cache', str(caminho)]) == 0
+    assert '1 entradas apagadas; restam 1' in capsys.readouterr().out
+    assert expurgar_cache.main(['--cache', str(caminho), '--tudo']) == 0
+    assert 'restam 0' in capsys.readouterr().out
+
+
+def test_valor_trocado_de_linha_e_ignorado(caminho):
+    cache = _abrir(caminho)
+    cache.salvar({'a': {'n': 1}, 'b': {'n': 2}})
+    valor_b = cache._conexao.execute('SELECT valor FROM resultados WHERE chave = ?', (cache.chave('b'),)).fetchone()[0]
+    cache._conexao.execute('UPDATE resultados SET valor = ? WHERE chave = ?', (valor_b, cache.chave('a')))
+    cache._conexao.commit()
+    assert cache.buscar(['a', 'b']) == {'b': {'n': 2}}
+    cache.fechar()
@@ -0,0 +1,73 @@
+"""Explorador de resultados: filtros por bitmap e busca no índice invertido contra uma varredura direta."""
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from explorador import FILTROS, IndiceResultados, normalizar, termos, termos_pii
+from processamento import detectar_colunar, montar_colunas_resultado
+from tests.detector_falso import DetectorFalso
+
+PECAS = ['Sou Maria Silva', 'Sou José Araújo', 'CPF 123.456.789-09', 'e-mail ana@x.com',
+         'telefone (61) 98765-4321', 'Rua Azul, 12', 'nada consta', 'protocolo 2024', 'Joana']
+
+
+def _analise(textos):
+    colunas, _spans = detectar_colunar(DetectorFalso(), textos)
+    return montar_colunas_resultado(pd.DataFrame({'texto': textos}), colunas, 'falso-1')
+
+
+def _varredura(df, tipos, busca):
+    """Referência: máscaras booleanas e termos de cada linha, sem índice."""
+    linhas = []
+    for posicao in range(len(df)):
+        linha = df.iloc[posicao]
+        if tipos and not all(any(pd.to_numeric(linha.get(coluna, 0)) > 0 for coluna in FILTROS[tipo]
+                                 if coluna in df.columns) for tipo in tipos):
+            continue
+        if busca.strip():
+            encontrados = termos(linha['texto'])
+            for coluna in df.columns:
+                if coluna.startswith('pii_') and coluna.endswith('_lista') and isinstance(linha[coluna], str):
+                    encontrados |= termos_pii(linha[coluna])
+            consulta = [t for t in normalizar(busca).replace('.', ' ').replace('-', ' ').split() if t]
+            if len(consulta) > 1 and all(t.isdigit() for t in consulta):
+                consulta = [''.join(consulta)]
+            *inteiros, prefixo = consulta
+            if not all(t in encontrados for t in inteiros if len(t) >= 2):
+                continue
+            if not any(t.startswith(prefixo) for t in encontrados):
+                continue
+        linhas.append(posicao)
+    return linhas
+
+
+def test_filtros_e_busca_iguais_a_varredura():
+    aleatorio = random.Random(7)
+    textos = [', '.join(aleatorio.sample(PECAS, aleatorio.randint(0, 3))) for _ in range(300)]
+    df = _analise(textos)
+    indice = IndiceResultados.construir(df, 'texto')
+
+    for tipos, busca in [([], ''), (['cpf'], ''), (['pii', 'email'], ''), ([], 'maria'),
+                         ([], 'jose arau'), (['nome'], 'sil'), ([], '123.456.789-09'), ([], '12345678909'),
+                         ([], 'inexistente'), (['telefone'], '98765')]:
+        assert indice.filtrar(tipos, busca).tolist() == _varredura(df, tipos, busca), (tipos, busca)
+
+
+def test_contagem_e_paginas():
+    df = _analise(['CPF 123.456.789-09', 'nada', 'Sou Maria Silva, CPF 111.444.777-35'] * 40)
+    indice = IndiceResultados.construir(df, 'texto')
+
+    assert indice.contar('cpf') == 80
+    assert indice.contar('nome') == 40
+    posicoes = indice.filtrar(['cpf'])
+    assert indice.pagina(posicoes, 0, 50).tolist() == posicoes[:50].tolist()
+    assert len(indice.pagina(posicoes, 1, 50)) == 30
+    assert posicoes.dtype == np.int32
+
+
+def test_sem_coluna_de_texto_busca_so_nas_listas():
+    df = _analise(['Sou Maria Silva', 'Maria não é citada como nome aqui'])
+    indice = IndiceResultados.construir(df)
+    assert indice.buscar('maria').tolist() == [0]
@@ -0,0 +1,66 @@
+"""Exportações: geração em segundo plano, prazo de validade e remoção dos arquivos de uma sessão."""
+
+import os
+import stat
+import time
+
+import pandas as pd
+import pytest
+
+from arquivos import salvar_streaming
+from exportacao import GeradorExportacoes
+
+DF = pd.DataFrame({'texto': ['CPF 123.456.789-09', 'nada'], 'pii_cpf_validado_lista': ['12345678909', '']})
+
+
+def _gerar(gerador, df=DF, nome='analise'):
+    chave = gerador.chave(df, nome, 'csv')
+    gerador.solicitar(chave, lambda destino: salvar_streaming(df, destino, 'csv'))
+    gerador.aguardar(chave)
+    return chave
+
+
+def _envelhecer(caminho, horas):
+    antigo = time.time() - horas * 3600
+    os.utime(caminho, (antigo, antigo))
+
+
+def test_gera_uma_vez_e_reaproveita(tmp_path):
+    gerador = GeradorExportacoes(tmp_path)
+    chave = _gerar(gerador)
+    assert gerador.estado(chave) == 'pronto'
+    assert gerador.chave(DF.copy(), 'analise', 'csv') == chave
+    if os.name == 'posix':
+        assert stat.S_IMODE(gerador.caminho(chave).stat().st_mode) == 0o600
+
+
+def test_arquivo_vencido_e_apagado(tmp_path):
+    gerador = GeradorExportacoes(tmp_path, validade_horas=1)
+    chave = _gerar(gerador)
+    _envelhecer(gerador.caminho(chave), 2)
+
+    assert gerador.estado(chave) == 'ausente'
+    assert not gerador.caminho(chave).exists()
+
+
+@pytest.mark.parametrize('ao_iniciar', [True, False])
+def test_limpeza_apaga_vencidos(tmp_path, ao_iniciar):
+    gerador = GeradorExportacoes(tmp_path, validade_horas=1)
+    antiga = _gerar(gerador)
+    _envelhecer(gerador.caminho(antiga), 2)
+
+    if ao_iniciar:
+        GeradorExportacoes(tmp_path, validade_horas=1)
+    else:
+        _gerar(gerador, DF.iloc[:1], 'outra')
+    assert not gerador.caminho(antiga).exists()
+
+
+def test_remover_arquivos_da_sessao(tmp_path):
+    gerador = GeradorExportacoes(tmp_path)
+    sessao = {_gerar(gerador), _gerar(gerador, DF.iloc[:1], 'mascarado')}
+    outra = _gerar(gerador, DF.iloc[1:], 'outra')
+
+    assert gerador.remover(sessao) == 2
+    assert [gerador.estado(chave) for chave in sessao] == ['ausente', 'ausente']
+    assert gerador.estado(outra) == 'pronto'
@@ -0,0 +1,50 @@
+"""FASE 1: `ExtratorCombinado` contra a referência `extrair_separado`."""
+
+import random
+
+import pytest
+
+from extracao import ExtratorCombinado, extrair_separado
+
+ADVERSARIAIS = [
+    'ligue 98765432',
+    '(61) 33456789',
+    'tel 61 98765432',
+    '12.345.678-9 e 123.456.789-09',
+    'rua das flores 12345678, casa',
+    'Quadra 3 61 98765-4321.',
+    'contato: a.b@c.com.br 61 3345-6789',
+    '1234567890123456789',
+    'Av. Brasil 100, apto 98765-4321',
+    'CPF12345678909',
+    '',
+]
+
+# Peças que produzem candidatos sobrepostos de tipos diferentes
+PECAS = ['9', '61', '(61)', ' ', '-', '.', '98765', '4321', '123', '456.789', '-09', 'X', 'x',
+         'rua ', 'Qd ', 'SQS ', ', ', '@', 'a', 'b.com', 'tel ', ';', '\n', 'ç']
+
+
+@pytest.fixture(scope='module')
+def extrator():
+    return ExtratorCombinado()
+
+
+@pytest.mark.parametrize('texto', ADVERSARIAIS)
+def test_casos_adversariais(extrator, texto):
+    assert extrator.extrair(texto) == extrair_separado(texto, extrator.compilar_separados())
+
+
+def test_textos_aleatorios(extrator):
+    separados = extrator.compilar_separados()
+    rng = random.Random(11)
+    for _ in range(20000):
+        texto = ''.join(rng.choice(PECAS) for _ in range(rng.randint(1, 14)))
+        assert extrator.extrair(texto) == extrair_separado(texto, separados), texto
+
+
+def test_extrair_por_tipo(extrator):
+    valores = extrator.extrair_por_tipo('(61) 33456789 e joao@x.com')
+    assert valores['rg'] == ['33456789']
+    assert valores['email'] == ['joao@x.com']
+    assert valores['telefone'] == []
@@ -0,0 +1,148 @@
+"""Hierarquia exclusiva e sobreposição de spans contra as versões de referência."""
+
+import copy
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from hierarquia import (
+    ORDEM_HIERARQUIA, aplicar_hierarquia_exclusiva, aplicar_hierarquia_referencia, chave_hierarquia,
+    resolver_sobreposicoes, resolver_sobreposicoes_referencia
+)
+
+METODOLOGIA = Path(__file__).resolve().parent.parent / 'METODOLOGIA_TECNICA.md'
+
+
+def _referencia(entidades: dict) -> dict:
+    return aplicar_hierarquia_referencia(copy.deepcopy(entidades))
+
+
+def _formatar(rng, digitos: str) -> str:
+    """Mesmo número com formatações diferentes (pontos, hífen, parênteses)."""
+    estilo = rng.randrange(4)
+    if estilo == 0:
+        return digitos
+    if estilo == 1:
+        return '.'.join(digitos[i:i + 3] for i in range(0, len(digitos), 3))
+    if estilo == 2:
+        return f'({digitos[:2]}) {digitos[2:-4]}-{digitos[-4:]}'
+    return f'{digitos[:-2]}-{digitos[-2:]}'
+
+
+def _numeros(rng, quantidade: int) -> list:
+    return [''.join(rng.choice('0123456789') for _ in range(rng.choice([8, 9, 11]))) for _ in range(quantidade)]
+
+
+def _caso_com_repeticoes(rng) -> dict:
+    """Entidades com números repetidos entre tipos, e-mails sem dígitos e valores iguais."""
+    base = _numeros(rng, 6)
+    emails = ['joao@email.com', 'maria@gdf.df.gov.br', 'jose123@email.com']
+    return {
+        tipo: [_formatar(rng, rng.choice(base)) if rng.random() < 0.8 else rng.choice(emails)
+               for _ in range(rng.randint(0, 6))]
+        for tipo in ORDEM_HIERARQUIA
+    }
+
+
+def _caso_sem_diferencas(rng) -> dict:
+    """Todo valor com dígitos; só o último valor de cada tipo pode repetir uma chave já vista."""
+    vistos = []
+    entidades = {}
+    for tipo in ORDEM_HIERARQUIA:
+        novos = list(dict.fromkeys(numero for numero in _numeros(rng, rng.randint(0, 4)) if numero not in vistos))
+        valores = [_formatar(rng, numero) for numero in novos]
+        if vistos and rng.random() < 0.6:
+            valores.append(_formatar(rng, rng.choice(vistos)))
+        vistos += novos
+        entidades[tipo] = valores
+    return entidades
+
+
+def test_referencia_e_a_versao_documentada():
+    """A referência se comporta como o código da seção 3.2 da metodologia."""
+    bloco = re.search(r'```python\n(def aplicar_hierarquia_exclusiva.*?)```', METODOLOGIA.read_text(encoding='utf-8'),
+                      re.S).group(1)
+    escopo = {'re': re}
+    exec(bloco, escopo)
+    documentada = escopo['aplicar_hierarquia_exclusiva']
+
+    rng = random.Random(3)
+    for _ in range(2000):
+        entidades = _caso_com_repeticoes(rng)
+        assert _referencia(entidades) == documentada(copy.deepcopy(entidades))
+
+
+def test_igual_a_referencia_fora_das_diferencas():
+    rng = random.Random(5)
+    for _ in range(5000):
+        entidades = _caso_sem_diferencas(rng)
+        assert aplicar_hierarquia_exclusiva(entidades) == _referencia(entidades), entidades
+
+
+def test_diferenca_nao_altera_a_entrada_e_aceita_tipos_ausentes():
+    entidades = {'cpf_validado': ['123.456.789-09'], 'telefone': ['12345678909']}
+    assert aplicar_hierarquia_exclusiva(entidades)['telefone'] == []
+    assert entidades['telefone'] == ['12345678909']
+    with pytest.raises(KeyError):
+        _referencia(entidades)
+
+
+def test_diferenca_list_remove_pula_o_seguinte():
+    entidades = {tipo: [] for tipo in ORDEM_HIERARQUIA}
+    entidades['cpf_validado'] = ['11111111111', '22222222222']
+    entidades['telefone'] = ['111.111.111-11', '222.222.222-22', '33333333']
+    # O segundo telefone repete um CPF, mas é pulado depois da remoção do primeiro
+    assert _referencia(entidades)['telefone'] == ['222.222.222-22', '33333333']
+    assert aplicar_hierarquia_exclusiva(entidades)['telefone'] == ['33333333']
+
+
+def test_diferenca_list_remove_tira_a_primeira_ocorrencia():
+    entidades = {tipo: [] for tipo in ORDEM_HIERARQUIA}
+    entidades['rg'] = ['1.234.567', '7.654.321', '1.234.567']
+    assert _referencia(entidades)['rg'] == ['7.654.321', '1.234.567']
+    assert aplicar_hierarquia_exclusiva(entidades)['rg'] == ['1.234.567', '7.654.321']
+
+
+def test_diferenca_emails_sem_digitos():
+    entidades = {tipo: [] for tipo in ORDEM_HIERARQUIA}
+    entidades['email'] = ['joao@email.com', 'maria@email.com']
+    assert _referencia(entidades)['email'] == ['joao@email.com']
+    assert aplicar_hierarquia_exclusiva(entidades)['email'] == ['joao@email.com', 'maria@email.com']
+
+
+def test_propriedades_da_hierarquia():
+    """Subsequência da entrada, chaves únicas e rejeitados já classificados."""
+    rng = random.Random(13)
+    for _ in range(5000):
+        entidades = _caso_com_repeticoes(rng)
+        resultado = aplicar_hierarquia_exclusiva(entidades)
+        vistos = set()
+        for tipo in ORDEM_HIERARQUIA:
+            aceitos = iter(resultado[tipo])
+            proximo = next(aceitos, None)
+            for dado in entidades[tipo]:
+                chave = chave_hierarquia(dado)
+                if proximo is not None and dado == proximo and chave not in vistos:
+                    vistos.add(chave)
+                    proximo = next(aceitos, None)
+                else:
+                    assert chave in vistos, (tipo, dado)
+            assert proximo is None
+
+
+def test_sobreposicoes_igual_a_referencia():
+    tipos = ['cpf', 'rg', 'email', 'telefone', 'nome', 'endereco']
+    rng = random.Random(17)
+    for _ in range(5000):
+        limite = rng.randint(1, 60)
+        spans = []
+        for _ in range(rng.randint(0, 25)):
+            inicio = rng.randint(0, limite)
+            fim = inicio + rng.choice([0, 1, 1, 2, 3, 5, 8, 13])
+            tipo = rng.choice(tipos)
+            spans.append((inicio, fim, tipo, f'{tipo}{inicio}-{fim}'))
+        obtido = resolver_sobreposicoes(spans, tipos)
+        assert obtido == resolver_sobreposicoes_referencia(spans, tipos)
+        assert all(b[1] <= a[0] or b[0] >= a[1] for i, a in enumerate(obtido) for b in obtido[i + 1:])
@@ -0,0 +1,82 @@
+"""Reanálise incremental: ida e volta por arquivo, valores não localizados e assinatura."""
+
+import pandas as pd
+import pytest
+
+from incremental import analisar_incremental, ler_analise_anterior, motivo_incompatibilidade
+from processamento import COLUNAS_RESULTADO, detectar_colunar, mascarar_textos, montar_colunas_resultado
+from tests.detector_falso import DetectorFalso
+
+ASSINATURA = 'falso-1'
+
+TEXTOS = [
+    'Sou Maria Silva, CPF 12345678909',
+    'Nada a declarar',
+    'E-mail joao@x.com e telefone (61) 98765-4321',
+    '00123',
+    'CPF 111.444.777-35 no protocolo',
+]
+
+
+def _analisar(detector, textos):
+    colunas, _spans = detectar_colunar(detector, textos)
+    return montar_colunas_resultado(pd.DataFrame({'texto': textos}), colunas, ASSINATURA)
+
+
+@pytest.mark.parametrize('extensao', ['csv', 'xlsx'])
+def test_ida_e_volta_por_arquivo_reaproveita_e_mascara(tmp_path, extensao):
+    detector = DetectorFalso()
+    caminho = tmp_path / f'analise.{extensao}'
+    anterior = _analisar(detector, TEXTOS)
+    if extensao == 'csv':
+        anterior.to_csv(caminho, index=False)
+    else:
+        anterior.to_excel(caminho, index=False)
+
+    lida = ler_analise_anterior(caminho, 'texto')
+    assert lida.loc[0, 'pii_cpf_validado_lista'] == '12345678909'
+    assert lida.loc[3, 'texto'] == '00123'
+
+    novos = TEXTOS + ['Sou Ana Lima']
+    detector.chamadas = 0
+    df, spans_lista, estatisticas = analisar_incremental(pd.DataFrame({'texto': novos}), 'texto', lida, detector,
+                                                         assinatura=ASSINATURA)
+    assert estatisticas == {'reaproveitados': len(TEXTOS), 'analisados': 1, 'nao_localizados': 0}
+    assert detector.chamadas == 1
+    assert df['pii_cpf_validado_lista'].tolist()[:1] == ['12345678909']
+
+    mascarados = mascarar_textos(detector, novos, 'PROTECAO_TOTAL', ['todos'], spans_lista=spans_lista)
+    assert mascarados == detector.apply_masking_batch(novos, mode='PROTECAO_TOTAL')
+    assert '12345678909' not in mascarados[0]
+
+
+def test_valor_reaproveitado_nao_localizado_volta_ao_detector():
+    detector = DetectorFalso()
+    anterior = _analisar(detector, TEXTOS)
+    anterior.loc[2, 'pii_email_lista'] = 'outro@y.com'
+
+    detector.chamadas = 0
+    df, spans_lista, estatisticas = analisar_incremental(pd.DataFrame({'texto': TEXTOS}), 'texto', anterior,
+                                                         detector, assinatura=ASSINATURA)
+    assert estatisticas['nao_localizados'] == 1
+    assert estatisticas['analisados'] == 1
+    assert detector.chamadas == 1
+    assert df.loc[2, 'pii_email_lista'] == 'joao@x.com'
+    assert [span[3] for span in spans_lista[2]] == ['joao@x.com', '(61) 98765-4321']
+
+
+def test_assinatura_diferente_nao_e_reaproveitada():
+    detector = DetectorFalso()
+    anterior = _analisar(detector, TEXTOS)
+    assert motivo_incompatibilidade(anterior, 'texto', ASSINATURA) is None
+    assert motivo_incompatibilidade(anterior, 'texto', 'falso-2')
+    assert motivo_incompatibilidade(anterior.drop(columns=['assinatura_deteccao']), 'texto')
+
+    with pytest.raises(ValueError):
+        analisar_incremental(pd.DataFrame({'texto': TEXTOS}), 'texto', anterior, detector, assinatura='falso-2')
+
+
+def test_colunas_resultado_com_assinatura():
+    df = _analisar(DetectorFalso(), TEXTOS)
+    assert set(COLUNAS_RESULTADO) <= set(df.columns)
+    assert (df['assinatura_deteccao'] == ASSINATURA).all()
@@ -0,0 +1,73 @@
+"""Mascaramento por spans comparado ao `apply_masking_batch` do detector."""
+
+from processamento import (
+    NAO_LOCALIZADO, TAG_PROTECAO, extrair_spans, mascarar_texto_por_spans, mascarar_textos, spans_completos
+)
+from tests.detector_falso import DetectorFalso, DetectorFalsoComEndereco
+
+TEXTOS = [
+    'Sou Maria Silva, CPF 123.456.789-09, e-mail maria.silva@email.com',
+    'Ligar para (61) 98765-4321 ou (61) 98765-4321 de novo',
+    'RG 1.234.567 e CPF inválido 123.456.789-00',
+    'Moro na Rua Azul, 123 perto da praça',
+    'Sem dados pessoais aqui',
+    '',
+    'Meu nome é Joao Souza e o email joao@x.com.br; Sou Ana Lima',
+]
+
+
+def _mascarar_por_spans(detector, textos, modo, tipos=None, resultados=None, estatisticas=None):
+    resultados = resultados or detector.detect_pii_batch(textos)
+    spans_lista = [extrair_spans(texto, resultado) for texto, resultado in zip(textos, resultados)]
+    return mascarar_textos(detector, textos, modo, tipos or ['todos'], spans_lista=spans_lista,
+                           estatisticas=estatisticas)
+
+
+def test_spans_igual_apply_masking_batch():
+    for detector in (DetectorFalso(), DetectorFalsoComEndereco()):
+        for modo in ('PARCIAL', 'PROTECAO_TOTAL'):
+            assert _mascarar_por_spans(detector, TEXTOS, modo) == detector.apply_masking_batch(TEXTOS, mode=modo)
+
+
+def test_endereco_parcial_sem_mascarador_vai_ao_detector():
+    detector = DetectorFalso()
+    estatisticas = {}
+    mascarados = _mascarar_por_spans(detector, TEXTOS[3:4], 'PARCIAL', estatisticas=estatisticas)
+    assert mascarados == ['Moro na Rua Azul, ### perto da praça']
+    assert estatisticas == {'nao_localizados': 0, 'textos_detector': 1}
+
+
+def test_valor_com_outra_pontuacao_e_localizado():
+    texto = 'CPF 123.456.789-09 e MARIA  SILVA'
+    resultado = DetectorFalso().detect_pii('')
+    resultado['entidades']['cpf']['verificado'] = ['12345678909']
+    resultado['entidades']['nlp_contexto']['pessoas'] = ['Maria Silva']
+    spans = extrair_spans(texto, resultado)
+    assert spans_completos(spans)
+    assert [(texto[inicio:fim], tipo) for inicio, fim, tipo, _ in spans] == [
+        ('123.456.789-09', 'cpf'), ('MARIA  SILVA', 'nome')
+    ]
+
+
+def test_valor_nao_localizado_cai_no_detector():
+    detector = DetectorFalso()
+    texto = 'Sou Maria Silva, CPF 123.456.789-09'
+    resultado = detector.detect_pii(texto)
+    # Valor normalizado pelo detector que não existe no texto
+    resultado['entidades']['email']['verificado'] = ['maria@exemplo.com']
+    spans = extrair_spans(texto, resultado)
+    assert spans[0] == (NAO_LOCALIZADO, NAO_LOCALIZADO, 'email', 'maria@exemplo.com')
+    assert not spans_completos(spans)
+
+    estatisticas = {}
+    mascarados = _mascarar_por_spans(detector, [texto], 'PROTECAO_TOTAL', resultados=[resultado],
+                                     estatisticas=estatisticas)
+    assert mascarados == detector.apply_masking_batch([texto], mode='PROTECAO_TOTAL')
+    assert estatisticas == {'nao_localizados': 1, 'textos_detector': 1}
+    assert mascarar_texto_por_spans(texto, spans, 'PROTECAO_TOTAL', detector) == mascarados[0]
+
+
+def test_tipos_pii_mascara_so_os_tipos_escolhidos():
+    detector = DetectorFalso()
+    mascarado, = _mascarar_por_spans(detector, TEXTOS[:1], 'PROTECAO_TOTAL', tipos=['cpf'])
+    assert mascarado == f'Sou Maria Silva, CPF {TAG_PROTECAO}, e-mail maria.silva@email.com'
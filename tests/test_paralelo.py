@@ -0,0 +1,62 @@
+"""Motor paralelo: ordem dos resultados e contagens do pré-filtro vindas dos workers."""
+
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import paralelo
+from paralelo import MotorParalelo, VisaoMotor
+from prefiltro import DetectorComPrefiltro, PrefiltroNomes
+from tests.detector_falso import DetectorFalso
+
+TEXTOS = ['Maria Silva', 'Nada a declarar hoje', 'Sou Ana Lima, CPF 111.444.777-35', 'ok', 'CPF 12345678909'] * 3
+
+
+def _criar_detector_falso(prefiltro=None, desligar_pipes=False):
+    detector = DetectorFalso()
+    return DetectorComPrefiltro(detector, prefiltro) if prefiltro is not None else detector
+
+
+def test_contagens_vem_dos_workers_sem_reavaliar(monkeypatch):
+    monkeypatch.setattr(paralelo, '_detector_worker', _criar_detector_falso(PrefiltroNomes()))
+    motor = MotorParalelo(n_workers=1, chunk_size=2, prefiltro=PrefiltroNomes())
+    # Executor em thread: os blocos rodam neste processo, com o detector do "worker" acima
+    motor._executor = ThreadPoolExecutor(max_workers=1)
+    sessao = PrefiltroNomes()
+    try:
+        resultados = VisaoMotor(motor, sessao).detect_pii_batch(TEXTOS)
+    finally:
+        motor.encerrar()
+
+    assert resultados == DetectorFalso().detect_pii_batch(TEXTOS)
+    esperado = PrefiltroNomes()
+    esperado.selecionar(TEXTOS)
+    assert sessao.estatisticas() == esperado.estatisticas()
+    # A sessão recebeu as contagens; o pré-filtro do motor não avaliou nada de novo
+    assert motor.prefiltro.estatisticas()['avaliados'] == 0
+
+
+def test_visao_nao_encerra_o_pool():
+    motor = MotorParalelo(n_workers=1).iniciar()
+    try:
+        VisaoMotor(motor).encerrar()
+        assert motor._executor is not None
+    finally:
+        motor.encerrar()
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='o detector falso chega aos workers pelo fork')
+def test_processos_reais(monkeypatch):
+    monkeypatch.setattr(paralelo, 'criar_detector', _criar_detector_falso)
+    prefiltro = PrefiltroNomes()
+    with MotorParalelo(n_workers=2, chunk_size=3, prefiltro=prefiltro) as motor:
+        resultados = motor.detect_pii_batch(TEXTOS)
+        mascarados = motor.apply_masking_batch(TEXTOS, 'PARCIAL')
+
+    assert resultados == DetectorFalso().detect_pii_batch(TEXTOS)
+    assert mascarados == DetectorFalso().apply_masking_batch(TEXTOS, 'PARCIAL')
+    esperado = PrefiltroNomes()
+    esperado.selecionar(TEXTOS)
+    assert prefiltro.estatisticas() == esperado.estatisticas()
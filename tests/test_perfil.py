@@ -0,0 +1,42 @@
+"""Perfil por fase: percentuais das subfases e contagens aproximadas de candidatos."""
+
+import json
+
+from perfil import DetectorPerfilado, PerfilPipeline
+from tests.detector_falso import DetectorFalso
+
+
+def test_percentual_da_subfase_e_sobre_a_fase_principal():
+    perfil = PerfilPipeline()
+    perfil.registrar('detect_pii_batch', 6.0, itens=10)
+    perfil.registrar('detect_pii_batch/fase4_spacy', 4.5, itens=10)
+    perfil.registrar('detect_pii_batch/regras', 1.5, itens=10)
+    perfil.registrar('apply_masking_batch', 2.0, itens=10)
+    perfil.registrar('apply_masking_batch/fase4_spacy', 1.0, itens=10)
+    perfil.registrar('reproducao/fase1_extracao', 0.5, itens=10)
+
+    fases = perfil.resumo()['fases']
+    assert fases['detect_pii_batch']['percentual'] == 75.0
+    assert fases['apply_masking_batch']['percentual'] == 25.0
+    assert fases['detect_pii_batch/fase4_spacy']['percentual'] == 75.0
+    assert fases['detect_pii_batch/regras']['percentual'] == 25.0
+    assert fases['apply_masking_batch/fase4_spacy']['percentual'] == 50.0
+    assert fases['detect_pii_batch/regras']['percentual_de'] == 'detect_pii_batch'
+    assert fases['detect_pii_batch']['percentual_de'] == 'detector'
+    assert fases['reproducao/fase1_extracao']['percentual'] is None
+
+
+def test_candidatos_marcados_como_aproximacao():
+    perfil = PerfilPipeline()
+    detector = DetectorPerfilado(DetectorFalso(), perfil)
+    textos = ['CPF 123.456.789-09 e telefone (61) 98765-4321', 'Nada a declarar']
+
+    assert detector.detect_pii_batch(textos) == DetectorFalso().detect_pii_batch(textos)
+
+    exportado = json.loads(perfil.exportar_json())
+    candidatos = exportado['candidatos']
+    assert candidatos['aproximado'] is True
+    assert 'ExtratorCombinado' in candidatos['observacao']
+    assert candidatos['fase1']['cpf'] == 1
+    assert candidatos['apos_imunidade'] == candidatos['numericos'] - candidatos['descartados_imunidade']
+    assert exportado['fases']['detect_pii_batch']['itens'] == 2
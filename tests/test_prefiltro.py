@@ -0,0 +1,99 @@
+"""Pré-filtro de nomes: sinais, textos curtos, contadores entre threads e detector envolvido."""
+
+import contextlib
+import pickle
+import threading
+
+from prefiltro import DetectorComPrefiltro, PrefiltroNomes
+from tests.detector_falso import DetectorFalso
+
+
+class NlpFalso:
+    """Imita `nlp.pipe_names`/`select_pipes` e registra se o NER estava ligado em cada chamada."""
+
+    def __init__(self):
+        self.pipe_names = ['tok2vec', 'ner']
+        self.desligado = False
+
+    @contextlib.contextmanager
+    def select_pipes(self, disable):
+        self.desligado = True
+        try:
+            yield
+        finally:
+            self.desligado = False
+
+
+class DetectorComNlp(DetectorFalso):
+    """Detector falso que anota quais textos passaram com os componentes do spaCy ligados."""
+
+    def __init__(self):
+        super().__init__()
+        self.nlp = NlpFalso()
+        self.com_nlp = []
+
+    def detect_pii_batch(self, textos, batch_size=50):
+        if not self.nlp.desligado:
+            self.com_nlp.extend(textos)
+        return super().detect_pii_batch(textos, batch_size)
+
+
+def test_nome_conhecido_em_texto_curto_e_candidato():
+    prefiltro = PrefiltroNomes(min_caracteres=12)
+    assert len('Maria Silva') < prefiltro.min_caracteres
+    assert prefiltro.candidato('Maria Silva')
+    assert prefiltro.candidato('sou joão')
+
+
+def test_texto_curto_sem_nome_conhecido_e_dispensado():
+    prefiltro = PrefiltroNomes(min_caracteres=12)
+    assert not prefiltro.candidato('Ok, Xablau')
+    assert not prefiltro.candidato('Sr. Fulano')
+    assert prefiltro.candidato('Reclamação do Sr. Fulano sobre a obra')
+
+
+def test_sinais_em_texto_longo():
+    prefiltro = PrefiltroNomes(limiar=1)
+    assert not prefiltro.candidato('Solicito informações sobre a Secretaria de Saúde do DF.')
+    assert prefiltro.candidato('Solicito informações sobre o atendimento de Xablau Quiriquiri.')
+    assert PrefiltroNomes(limiar=2).pontuacao('Atendimento de Xablau ontem.') == 1
+
+
+def test_contadores_entre_threads():
+    prefiltro = PrefiltroNomes()
+    textos = ['Maria Silva', 'Nada a declarar hoje', 'ok'] * 50
+
+    def avaliar():
+        for _ in range(200):
+            prefiltro.selecionar(textos)
+
+    threads = [threading.Thread(target=avaliar) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    estatisticas = prefiltro.estatisticas()
+    assert estatisticas['avaliados'] == 8 * 200 * len(textos)
+    assert estatisticas['dispensados'] == 8 * 200 * 100
+
+
+def test_serializavel_para_os_processos():
+    prefiltro = PrefiltroNomes(limiar=2)
+    prefiltro.selecionar(['Maria Silva'])
+    copia = pickle.loads(pickle.dumps(prefiltro))
+    assert copia.configuracao == prefiltro.configuracao
+    assert copia.estatisticas() == prefiltro.estatisticas()
+    copia.selecionar(['Maria Silva'])
+
+
+def test_detector_com_prefiltro_pula_o_nlp_so_dos_nao_candidatos():
+    textos = ['Maria Silva', 'CPF 12345678909 no protocolo 99', 'Sou Ana Lima, CPF 111.444.777-35', 'ok']
+    detector = DetectorComNlp()
+    envolvido = DetectorComPrefiltro(detector, PrefiltroNomes())
+
+    resultados = envolvido.detect_pii_batch(textos)
+
+    assert resultados == DetectorFalso().detect_pii_batch(textos)
+    assert detector.com_nlp == ['Maria Silva', 'Sou Ana Lima, CPF 111.444.777-35']
+    assert envolvido.prefiltro.estatisticas()['dispensados'] == 2
@@ -0,0 +1,102 @@
+"""Processamento em lote: entradas ilegíveis terminam com erro claro, antes do modelo; saída em streaming."""
+
+import logging
+import sys
+import types
+
+import pytest
+
+import processar_lote
+from arquivos import ler_tabela
+from tests.detector_falso import DetectorFalso
+
+
+@pytest.fixture
+def detector_falso(monkeypatch):
+    """`from detector import PIIDetector` do lote passa a carregar o detector de teste."""
+    modulo = types.ModuleType('detector')
+    modulo.PIIDetector = DetectorFalso
+    monkeypatch.setitem(sys.modules, 'detector', modulo)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+@pytest.mark.parametrize('nome, conteudo', [
+    ('ausente.xlsx', None),
+    ('corrompido.xlsx', b'nao sou um zip'),
+    ('corrompido.parquet', b'PAR1 truncado'),
+    ('corrompido.feather', b'ARROW1 truncado'),
+])
+def test_entrada_ilegivel(tmp_path, caplog, nome, conteudo, streaming):
+    pytest.importorskip('pyarrow')
+    caminho = tmp_path / nome
+    if conteudo is not None:
+        caminho.write_bytes(conteudo)
+
+    argv = [str(caminho), '--coluna', 'texto', '--saida', str(tmp_path / 'saida')]
+    with caplog.at_level(logging.ERROR):
+        assert processar_lote.main(argv + (['--streaming'] if streaming else [])) == 2
+    assert f'Erro ao ler {caminho}' in caplog.text
+
+
+def test_coluna_inexistente(tmp_path, caplog):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_text('outra\nvalor\n', encoding='utf-8')
+
+    with caplog.at_level(logging.ERROR):
+        assert processar_lote.main([str(caminho), '--coluna', 'texto', '--colunas', 'texto',
+                                    '--saida', str(tmp_path / 'saida')]) == 2
+    assert 'Erro ao ler' in caplog.text
+
+
+@pytest.mark.parametrize('formato', ['parquet', 'feather'])
+def test_streaming_com_coluna_que_muda_de_tipo(tmp_path, detector_falso, formato):
+    pytest.importorskip('pyarrow')
+    caminho = tmp_path / 'mix.csv'
+    linhas = [f'Sou Maria Silva {i},{i if i < 120 else f"ABC-{i}"},{1 if i < 200 else 2.75}' for i in range(300)]
+    caminho.write_text('texto,codigo,valor\n' + '\n'.join(linhas) + '\n', encoding='utf-8')
+
+    saida = tmp_path / 'saida'
+    assert processar_lote.main([str(caminho), '--coluna', 'texto', '--streaming', '--tamanho-bloco', '50',
+                                '--formato', formato, '--saida', str(saida)]) == 0
+    analise = ler_tabela(next(saida.glob(f'analise_pii_*.{formato}')))
+    assert analise['codigo'].tolist() == [str(i) if i < 120 else f'ABC-{i}' for i in range(300)]
+    assert analise['valor'].tolist() == [1.0] * 200 + [2.75] * 100
+
+
+def _csv(tmp_path, linhas=120):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_text('texto,id\n' + ''.join(f'Sou Maria Silva,{i}\n' for i in range(linhas)), encoding='utf-8')
+    return caminho
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+@pytest.mark.parametrize('opcoes', [['--coluna', 'outra'], ['--coluna', 'texto', '--coluna-id', 'outra',
+                                                            '--indice-titulares', 'indice.sqlite']])
+def test_coluna_obrigatoria_ausente_antes_do_modelo(tmp_path, monkeypatch, caplog, opcoes, streaming):
+    modulo = types.ModuleType('detector')
+    modulo.PIIDetector = lambda: pytest.fail('o modelo não deveria ser carregado')
+    monkeypatch.setitem(sys.modules, 'detector', modulo)
+
+    with caplog.at_level(logging.ERROR):
+        assert processar_lote.main([str(_csv(tmp_path)), *opcoes, '--saida', str(tmp_path / 'saida')]
+                                   + (['--streaming'] if streaming else [])) == 2
+    assert "'outra' não encontrada" in caplog.text
+    assert not (tmp_path / 'saida').exists()
+
+
+def test_erro_no_meio_apaga_saidas_parciais(tmp_path, detector_falso, monkeypatch):
+    processar_bloco = processar_lote.processar_bloco
+    chamadas = []
+
+    def falhar_no_segundo(*args, **kwargs):
+        chamadas.append(1)
+        if len(chamadas) == 2:
+            raise RuntimeError('falha no 2º bloco')
+        return processar_bloco(*args, **kwargs)
+
+    monkeypatch.setattr(processar_lote, 'processar_bloco', falhar_no_segundo)
+    saida = tmp_path / 'saida'
+    with pytest.raises(RuntimeError):
+        processar_lote.main([str(_csv(tmp_path)), '--coluna', 'texto', '--streaming', '--tamanho-bloco', '50',
+                             '--formato', 'csv', '--saida', str(saida)])
+    assert not list(saida.glob('analise_pii_*')) and not list(saida.glob('dados_mascarados_*'))
@@ -0,0 +1,80 @@
+"""Serviço de detecção: leitura das requisições HTTP e ida e volta com o cliente."""
+
+import asyncio
+
+import pytest
+
+from servico import ClienteServico, ServicoDeteccao, _ErroRequisicao, _ler_requisicao
+from tests.detector_falso import DetectorFalso
+
+MAX_CORPO = 1024
+
+
+def _ler(bruto: bytes):
+    async def executar():
+        leitor = asyncio.StreamReader()
+        leitor.feed_data(bruto)
+        leitor.feed_eof()
+        return await _ler_requisicao(leitor, MAX_CORPO)
+    return asyncio.run(executar())
+
+
+def test_requisicao_com_corpo():
+    metodo, caminho, corpo, manter = _ler(
+        b'post /detectar HTTP/1.1\r\nContent-Length: 4\r\n\r\n{}{}')
+    assert (metodo, caminho, corpo, manter) == ('POST', '/detectar', b'{}{}', True)
+
+
+def test_conexao_fechada_e_http_1_0():
+    assert _ler(b'') is None
+    assert _ler(b'GET /saude HTTP/1.0\r\n\r\n')[3] is False
+    assert _ler(b'GET /saude HTTP/1.1\r\nConnection: close\r\n\r\n')[3] is False
+
+
+@pytest.mark.parametrize('valor', [b'-5', b'abc', b'1e3', b'+4', b'\xd9\xa3'])
+def test_content_length_invalido_e_400(valor):
+    with pytest.raises(_ErroRequisicao) as erro:
+        _ler(b'POST /detectar HTTP/1.1\r\nContent-Length: ' + valor + b'\r\n\r\n{}')
+    assert erro.value.status == 400
+
+
+def test_corpo_grande_demais_e_413():
+    with pytest.raises(_ErroRequisicao) as erro:
+        _ler(b'POST /detectar HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % (MAX_CORPO + 1))
+    assert erro.value.status == 413
+
+
+@pytest.mark.parametrize('bruto', [
+    b'LIXO\r\n\r\n',
+    b'POST /detectar HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n2\r\n{}\r\n0\r\n\r\n',
+])
+def test_requisicao_malformada_e_400(bruto):
+    with pytest.raises(_ErroRequisicao) as erro:
+        _ler(bruto)
+    assert erro.value.status == 400
+
+
+def test_ida_e_volta_com_o_cliente():
+    textos = ['Sou Maria Silva, CPF 12345678909', 'Nada a declarar']
+    referencia = DetectorFalso()
+
+    async def executar():
+        servico = ServicoDeteccao(DetectorFalso, n_detectores=2, espera_ms=1)
+        servidor = await servico.iniciar('127.0.0.1', 0)
+        porta = servidor.sockets[0].getsockname()[1]
+        try:
+            with ClienteServico(f'http://127.0.0.1:{porta}', chunk_size=1) as cliente:
+                resultados = await asyncio.to_thread(cliente.detect_pii_batch, textos)
+                mascarados = await asyncio.to_thread(cliente.apply_masking_batch, textos, 'PARCIAL')
+                with pytest.raises(RuntimeError, match='modo inválido'):
+                    await asyncio.to_thread(cliente.apply_masking_batch, textos, 'OUTRO')
+                saude = await asyncio.to_thread(cliente.saude)
+        finally:
+            await servico.encerrar()
+        return resultados, mascarados, saude
+
+    resultados, mascarados, saude = asyncio.run(executar())
+    assert [r['entidades']['cpf'] for r in resultados] == \
+        [r['entidades']['cpf'] for r in referencia.detect_pii_batch(textos)]
+    assert mascarados == referencia.apply_masking_batch(textos, 'PARCIAL')
+    assert saude['detectores'] == 2 and saude['textos'] == 4
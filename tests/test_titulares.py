@@ -0,0 +1,119 @@
+"""Índice de titulares: normalização, conjuntos por nome + conteúdo e substituição explícita."""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from titulares import IndiceTitulares, impressao_arquivo, normalizar_valor
+
+CHAVE = bytes(range(32))
+
+
+def _analise(cpfs):
+    return pd.DataFrame({
+        'pii_cpf_validado_lista': cpfs,
+        'pii_email_lista': ['Maria@Gov.br' if i == 0 else '' for i in range(len(cpfs))],
+    })
+
+
+@pytest.fixture
+def indice(tmp_path):
+    indice = IndiceTitulares(tmp_path / 'indice.sqlite', chave=CHAVE)
+    yield indice
+    indice.fechar()
+
+
+def test_normalizacao():
+    assert normalizar_valor('cpf', '123.456.789-09') == '12345678909'
+    assert normalizar_valor('telefone', '+55 (61) 99999-8888') == '61999998888'
+    assert normalizar_valor('email', ' Maria@Gov.br ') == 'maria@gov.br'
+    assert normalizar_valor('nome', 'José  da   Silva') == 'jose da silva'
+
+
+def test_busca_em_qualquer_formatacao(indice):
+    indice.indexar('a.xlsx', _analise(['12345678909', '11144477735']), impressao='v1')
+    encontrados = indice.buscar('123.456.789-09')
+    assert [(item['conjunto'], item['linha'], item['tipo']) for item in encontrados] == [('a.xlsx', 0, 'cpf')]
+    assert indice.buscar('maria@gov.br')[0]['linha'] == 0
+
+
+def test_mesmo_nome_com_outro_conteudo_nao_apaga(indice):
+    indice.indexar('upload.xlsx', _analise(['12345678909']), impressao='v1')
+    indice.indexar('upload.xlsx', _analise(['11144477735']), impressao='v2')
+
+    assert len(indice.buscar('12345678909')) == 1
+    assert len(indice.buscar('11144477735')) == 1
+    assert sorted(conjunto['impressao'] for conjunto in indice.conjuntos()) == ['v1', 'v2']
+
+
+def test_reindexar_o_mesmo_conteudo_refaz_as_entradas(indice):
+    df = _analise(['12345678909'])
+    indice.indexar('a.xlsx', df, impressao='v1')
+    indice.indexar('a.xlsx', df, impressao='v1')
+
+    assert len(indice.buscar('12345678909')) == 1
+    assert [conjunto['entidades'] for conjunto in indice.conjuntos()] == [2]
+
+
+def test_substituir_e_acao_explicita(indice):
+    indice.indexar('upload.xlsx', _analise(['12345678909']), impressao='v1')
+    indice.indexar('outro.xlsx', _analise(['12345678909']), impressao='v1')
+    indice.indexar('upload.xlsx', _analise(['11144477735']), impressao='v2', substituir=True)
+
+    assert [item['conjunto'] for item in indice.buscar('12345678909')] == ['outro.xlsx']
+    assert indice.buscar('11144477735')[0]['impressao'] == 'v2'
+
+
+def test_remover_conjunto_por_versao(indice):
+    indice.indexar('a.xlsx', _analise(['12345678909']), impressao='v1')
+    indice.indexar('a.xlsx', _analise(['11144477735']), impressao='v2')
+
+    assert indice.remover_conjunto('a.xlsx', 'v1') == 1
+    assert indice.buscar('12345678909') == []
+    assert indice.remover_conjunto('a.xlsx') == 1
+    assert indice.conjuntos() == []
+
+
+def test_impressao_padrao_e_o_conteudo_do_dataframe(indice):
+    indice.indexar('a.xlsx', _analise(['12345678909']))
+    indice.indexar('a.xlsx', _analise(['11144477735']))
+    assert len(indice.conjuntos()) == 2
+
+
+def test_impressao_arquivo_caminho_e_buffer(tmp_path):
+    caminho = tmp_path / 'dados.csv'
+    caminho.write_bytes(b'texto\nabc\n')
+
+    class Enviado:
+        def getvalue(self):
+            return b'texto\nabc\n'
+
+    assert impressao_arquivo(caminho) == impressao_arquivo(Enviado())
+    caminho.write_bytes(b'texto\nabd\n')
+    assert impressao_arquivo(caminho) != impressao_arquivo(Enviado())
+
+
+def test_chave_diferente_e_recusada(tmp_path):
+    IndiceTitulares(tmp_path / 'indice.sqlite', chave=CHAVE).fechar()
+    with pytest.raises(ValueError):
+        IndiceTitulares(tmp_path / 'indice.sqlite', chave=bytes(32))
+
+
+def test_migra_banco_identificado_so_pelo_nome(tmp_path):
+    caminho = tmp_path / 'indice.sqlite'
+    conexao = sqlite3.connect(str(caminho))
+    conexao.executescript("""
+        CREATE TABLE conjuntos (id INTEGER PRIMARY KEY, nome TEXT UNIQUE NOT NULL, registros INTEGER NOT NULL,
+                                entidades INTEGER NOT NULL, indexado_em REAL NOT NULL);
+        INSERT INTO conjuntos VALUES (1, 'antigo.xlsx', 10, 3, 0);
+    """)
+    conexao.close()
+
+    indice = IndiceTitulares(caminho, chave=CHAVE)
+    try:
+        assert [(c['nome'], c['impressao']) for c in indice.conjuntos()] == [('antigo.xlsx', '')]
+        indice.indexar('antigo.xlsx', _analise(['12345678909']), impressao='v2')
+        assert len(indice.conjuntos()) == 2
+    finally:
+        indice.fechar()
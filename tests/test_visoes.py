@@ -0,0 +1,21 @@
+"""Visões da sessão: reaproveitam os arrays do original e nunca escrevem nele."""
+
+import numpy as np
+import pandas as pd
+
+from visoes import ativar_copy_on_write, montar_visao
+
+
+def test_visao_sem_copia_e_sem_escrita_no_original():
+    ativar_copy_on_write()
+    original = pd.DataFrame({'texto': ['a', 'b', 'c'], 'valor': np.arange(3.0)})
+    resultado = pd.DataFrame({'contém_pii': [True, False, True]})
+
+    visao = montar_visao(original, resultado)
+    assert np.shares_memory(visao['valor'].to_numpy(), original['valor'].to_numpy())
+
+    visao.loc[0, 'valor'] = 99.0
+    rasa = montar_visao(original)
+    rasa.loc[1, 'valor'] = 99.0
+    assert original['valor'].tolist() == [0.0, 1.0, 2.0]
+    assert visao['valor'].tolist() == [99.0, 1.0, 2.0]